@@ -120,6 +120,27 @@ def are_push_notifications_enabled() -> bool:
 # Attendance
 @frappe.whitelist()
 def get_attendance_calendar_events(employee: str, from_date: str, to_date: str) -> dict[str, str]:
+	days = frappe.get_all(
+		"Employee Attendance Day",
+		filters={"employee": employee, "attendance_date": ["between", [from_date, to_date]]},
+		fields=["attendance_date", "status", "attendance"],
+		order_by="attendance_date",
+	)
+
+	if not days:
+		# days are backfilled in the background, so read attendance and holidays until they are
+		return get_attendance_calendar_events_from_records(employee, from_date, to_date)
+
+	return {
+		d.attendance_date.strftime("%Y-%m-%d"): d.status if d.attendance else "Holiday"
+		for d in days
+		if d.status
+	}
+
+
+def get_attendance_calendar_events_from_records(
+	employee: str, from_date: str, to_date: str
+) -> dict[str, str]:
 	holidays = get_holidays_for_calendar(employee, from_date, to_date)
 	attendance = get_attendance_for_calendar(employee, from_date, to_date)
 	events = {}
@@ -373,12 +394,12 @@ def get_leave_balance_map(employee: str) -> dict[str, dict[str, float]]:
 	        'Earned Leave': {'allocated_leaves': 3.0, 'balance_leaves': 3.0},
 	}
 	"""
-	from hrms.hr.doctype.leave_application.leave_application import get_leave_details
+	from hrms.hr.doctype.leave_application.leave_application import get_leave_details_bulk
 
 	date = getdate()
 	leave_map = {}
 
-	leave_details = get_leave_details(employee, date)
+	leave_details = get_leave_details_bulk([employee], date)[employee]
 	allocation = leave_details["leave_allocation"]
 
 	for leave_type, details in allocation.items():
@@ -471,11 +492,11 @@ def get_department_approvers(department: str, parentfield: str) -> list[str]:
 
 @frappe.whitelist()
 def get_leave_types(employee: str, date: str) -> list:
-	from hrms.hr.doctype.leave_application.leave_application import get_leave_details
+	from hrms.hr.doctype.leave_application.leave_application import get_leave_details_bulk
 
 	date = date or getdate()
 
-	leave_details = get_leave_details(employee, date)
+	leave_details = get_leave_details_bulk([employee], date)[employee]
 	leave_types = list(leave_details["leave_allocation"].keys()) + leave_details["lwps"]
 
 	return leave_types
@@ -0,0 +1,59 @@
+import click
+
+from frappe.commands import get_site, pass_context
+
+
+@click.command("backfill-attendance-days")
+@click.option(
+	"--from-date", help="Date from which attendance days are built. Defaults to the earliest record"
+)
+@click.option("--to-date", help="Date till which attendance days are built. Defaults to the latest record")
+@click.option("--company", help="Only build attendance days of employees in this company")
+@pass_context
+def backfill_attendance_days(context, from_date=None, to_date=None, company=None):
+	"""Queue background jobs that build Employee Attendance Day records for existing attendance and holidays"""
+	import frappe
+
+	from hrms.hr.doctype.employee_attendance_day.employee_attendance_day import enqueue_backfill
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		enqueue_backfill(from_date, to_date, company)
+		frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+@click.command("rebuild-advance-balances")
+@click.option("--verify", is_flag=True, help="Only report balances that do not match the submitted advances")
+@pass_context
+def rebuild_advance_balances(context, verify=False):
+	"""Rebuild Employee Advance Balance records from submitted Employee Advances"""
+	import frappe
+
+	from hrms.hr.doctype.employee_advance_balance.employee_advance_balance import (
+		get_balance_mismatches,
+		rebuild_balances,
+	)
+
+	frappe.init(site=get_site(context))
+	frappe.connect()
+	try:
+		if verify:
+			mismatches = get_balance_mismatches()
+			for d in mismatches:
+				click.echo(
+					f"{d['employee']} ({d['company']}, {d['currency']}): {d['field']} is {d['ledger']}, expected {d['expected']}"
+				)
+			if mismatches:
+				raise SystemExit(1)
+			click.echo("Employee advance balances match the submitted advances")
+		else:
+			rebuild_balances()
+			frappe.db.commit()
+	finally:
+		frappe.destroy()
+
+
+commands = [backfill_attendance_days, rebuild_advance_balances]
@@ -175,8 +175,14 @@ doc_events = {
 		"on_trash": "hrms.overrides.company.handle_linked_docs",
 	},
 	"Holiday List": {
-		"on_update": "hrms.utils.holiday_list.invalidate_cache",
-		"on_trash": "hrms.utils.holiday_list.invalidate_cache",
+		"on_update": [
+			"hrms.utils.holiday_list.invalidate_cache",
+			"hrms.hr.doctype.employee_attendance_day.employee_attendance_day.update_holiday_list_days",
+		],
+		"on_trash": [
+			"hrms.utils.holiday_list.invalidate_cache",
+			"hrms.hr.doctype.employee_attendance_day.employee_attendance_day.update_holiday_list_days",
+		],
 	},
 	"Timesheet": {"validate": "hrms.hr.utils.validate_active_employee"},
 	"Payment Entry": {
@@ -208,11 +214,16 @@ doc_events = {
 		"on_update": [
 			"hrms.overrides.employee_master.update_approver_role",
 			"hrms.overrides.employee_master.publish_update",
+			"hrms.hr.doctype.leave_application.leave_application.clear_leave_calendar_cache",
+			"hrms.hr.doctype.employee_attendance_day.employee_attendance_day.update_employee_days",
 		],
 		"after_insert": "hrms.overrides.employee_master.update_job_applicant_and_offer",
 		"on_trash": "hrms.overrides.employee_master.update_employee_transfer",
 		"after_delete": "hrms.overrides.employee_master.publish_update",
 	},
+	"Department": {
+		"on_update": "hrms.hr.doctype.leave_application.leave_application.clear_leave_calendar_cache",
+	},
 	"Project": {"validate": "hrms.controllers.employee_boarding_controller.update_employee_boarding_status"},
 	"Task": {"on_update": "hrms.controllers.employee_boarding_controller.update_task"},
 }
@@ -248,6 +259,8 @@ scheduler_events = {
 	"monthly": ["hrms.controllers.employee_reminders.send_reminders_in_advance_monthly"],
 }
 
+default_log_clearing_doctypes = {"Report Execution Log": 30, "Payroll Report Snapshot": 30}
+
 advance_payment_payable_doctypes = ["Leave Encashment", "Gratuity", "Employee Advance"]
 
 invoice_doctypes = ["Expense Claim"]
@@ -17,6 +17,7 @@ from frappe.utils import (
 )
 
 import hrms
+from hrms.hr.doctype.employee_attendance_day.employee_attendance_day import sync_attendance_days
 from hrms.hr.doctype.shift_assignment.shift_assignment import has_overlapping_timings
 from hrms.hr.utils import (
 	get_holiday_dates_for_employee,
@@ -51,8 +52,15 @@ class Attendance(Document):
 		self.validate_employee_status()
 		self.check_leave_record()
 
+	def on_submit(self):
+		self.update_attendance_day()
+
 	def on_cancel(self):
 		self.unlink_attendance_from_checkins()
+		self.update_attendance_day()
+
+	def update_attendance_day(self):
+		sync_attendance_days([self.employee], self.attendance_date, self.attendance_date)
 
 	def validate_attendance_date(self):
 		date_of_joining = frappe.db.get_value("Employee", self.employee, "date_of_joining")
@@ -250,6 +258,10 @@ class Attendance(Document):
 		hrms.refetch_resource("hrms:attendance_calendar_events", employee_user)
 
 	def on_update_after_submit(self):
+		self.adjust_overtime()
+		self.update_attendance_day()
+
+	def adjust_overtime(self):
 		# Only allow overtime adjustment for today's attendance record
 		if self.attendance_date != frappe.utils.today():
 			frappe.throw("Overtime adjustment can only be made for today's attendance record.")
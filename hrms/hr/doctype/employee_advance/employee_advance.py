@@ -12,6 +12,11 @@ import erpnext
 from erpnext.accounts.doctype.journal_entry.journal_entry import get_default_bank_cash_account
 
 import hrms
+from hrms.hr.doctype.employee_advance_balance.employee_advance_balance import (
+	BALANCE_FIELDS,
+	get_advance_balance,
+	update_advance_balance,
+)
 from hrms.hr.utils import validate_active_employee
 
 
@@ -47,9 +52,13 @@ class EmployeeAdvance(Document):
 					title=_("Missing Advance Account"),
 				)
 
+	def on_submit(self):
+		self.update_advance_balance()
+
 	def on_cancel(self):
 		self.ignore_linked_doctypes = ("GL Entry", "Payment Ledger Entry", "Advance Payment Ledger Entry")
 		self.check_linked_payment_entry()
+		self.flags.balance_before = self.get_balance_amounts(docstatus=1)
 		self.set_status(update=True)
 
 	def on_update(self):
@@ -115,11 +124,43 @@ class EmployeeAdvance(Document):
 
 		if update:
 			self.db_set("status", status)
+			if (balance_before := self.flags.pop("balance_before", None)) is not None:
+				self.update_advance_balance(balance_before)
 			self.publish_update()
 			self.notify_update()
 		else:
 			self.status = status
 
+	def update_advance_balance(self, balance_before: dict | None = None):
+		"""Applies the change in this advance's amounts since `balance_before` to the employee's
+		balance row. Paid, claimed and returned amounts are always followed by a status update, so
+		callers set `flags.balance_before` before changing them and the change is applied from there."""
+		balance_before = balance_before or dict.fromkeys(BALANCE_FIELDS, 0.0)
+		balance = self.get_balance_amounts()
+		update_advance_balance(
+			self.employee,
+			self.employee_name,
+			self.company,
+			self.currency,
+			{field: flt(balance[field]) - flt(balance_before[field]) for field in BALANCE_FIELDS},
+		)
+
+	def get_balance_amounts(self, docstatus: int | None = None) -> dict:
+		"""Returns the amounts this advance adds to the employee's balance"""
+		if (docstatus or self.docstatus) != 1:
+			return dict.fromkeys(BALANCE_FIELDS, 0.0)
+
+		advance_amount, paid_amount = flt(self.advance_amount), flt(self.paid_amount)
+		claimed_amount, return_amount = flt(self.claimed_amount), flt(self.return_amount)
+		return {
+			"advance_amount": advance_amount,
+			"paid_amount": paid_amount,
+			"pending_amount": advance_amount - paid_amount if self.status == "Unpaid" else 0.0,
+			"claimed_amount": claimed_amount,
+			"return_amount": return_amount,
+			"balance_amount": paid_amount - claimed_amount - return_amount,
+		}
+
 	def set_total_advance_paid(self):
 		aple = frappe.qb.DocType("Advance Payment Ledger Entry")
 
@@ -181,6 +222,7 @@ class EmployeeAdvance(Document):
 		if return_amount > 0 and return_amount > flt(paid_amount - self.claimed_amount, precision):
 			frappe.throw(_("Return amount cannot be greater than unclaimed amount"))
 
+		self.flags.balance_before = self.get_balance_amounts()
 		self.db_set("paid_amount", paid_amount)
 		self.db_set("return_amount", return_amount)
 		self.set_status(update=True)
@@ -204,22 +246,18 @@ class EmployeeAdvance(Document):
 				& (ec.docstatus == 1)
 			)
 		).run()[0][0] or 0
+		balance_before = self.get_balance_amounts()
 		frappe.db.set_value("Employee Advance", self.name, "claimed_amount", flt(claimed_amount))
 		self.reload()
+		self.flags.balance_before = balance_before
 		self.set_status(update=True)
 
 	def set_pending_amount(self):
-		Advance = frappe.qb.DocType("Employee Advance")
-		self.pending_amount = (
-			frappe.qb.from_(Advance)
-			.select(Sum(Advance.advance_amount - Advance.paid_amount))
-			.where(
-				(Advance.employee == self.employee)
-				& (Advance.docstatus == 1)
-				& (Advance.posting_date <= self.posting_date)
-				& (Advance.status == "Unpaid")
-			)
-		).run()[0][0] or 0.0
+		# unpaid advances of the company and currency, regardless of their posting date: the ledger
+		# holds totals, and advances posted later are still pending for the employee
+		self.pending_amount = get_advance_balance(
+			self.employee, company=self.company, currency=self.currency
+		).pending_amount
 
 	def check_linked_payment_entry(self):
 		from erpnext.accounts.utils import (
@@ -27,6 +27,7 @@ from hrms.payroll.doctype.salary_structure.test_salary_structure import make_sal
 class TestEmployeeAdvance(IntegrationTestCase):
 	def setUp(self):
 		frappe.db.delete("Employee Advance")
+		frappe.db.delete("Employee Advance Balance")
 		self.update_company_in_fiscal_year()
 		frappe.db.set_value("Account", "Employee Advances - _TC", "account_type", "Receivable")
 		frappe.db.set_value("Account", "_Test Employee Advance - _TC", "account_type", "Receivable")
@@ -0,0 +1,185 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Max, Sum
+from frappe.utils import flt, now
+
+BALANCE_FIELDS = (
+	"advance_amount",
+	"paid_amount",
+	"pending_amount",
+	"claimed_amount",
+	"return_amount",
+	"balance_amount",
+)
+
+
+class EmployeeAdvanceBalance(Document):
+	"""Totals of an employee's submitted advances per company and currency. Maintained from Employee
+	Advance changes, so outstanding advances can be read from a single row."""
+
+	pass
+
+
+def get_advance_balance(employee: str, company: str | None = None, currency: str | None = None):
+	"""Returns the advance totals of an employee, optionally limited to a company and currency"""
+	filters = {"employee": employee}
+	if company:
+		filters["company"] = company
+	if currency:
+		filters["currency"] = currency
+
+	balance = frappe._dict.fromkeys(BALANCE_FIELDS, 0.0)
+	for row in frappe.get_all("Employee Advance Balance", filters=filters, fields=list(BALANCE_FIELDS)):
+		for field in BALANCE_FIELDS:
+			balance[field] += flt(row[field])
+
+	return balance
+
+
+def update_advance_balance(
+	employee: str, employee_name: str, company: str, currency: str, changes: dict
+) -> None:
+	"""Adds `changes` to the amounts of the employee's balance row for the company and currency. The
+	row is updated in place with increments, so concurrent updates of the same row do not conflict."""
+	changes = {field: flt(changes.get(field)) for field in BALANCE_FIELDS if flt(changes.get(field))}
+	if not changes:
+		return
+
+	filters = {"employee": employee, "company": company, "currency": currency}
+	if not frappe.db.exists("Employee Advance Balance", filters):
+		create_balance_row({**filters, "employee_name": employee_name})
+
+	AdvanceBalance = frappe.qb.DocType("Employee Advance Balance")
+	query = (
+		frappe.qb.update(AdvanceBalance)
+		.set(AdvanceBalance.modified, now())
+		.set(AdvanceBalance.modified_by, frappe.session.user)
+		.where(
+			(AdvanceBalance.employee == employee)
+			& (AdvanceBalance.company == company)
+			& (AdvanceBalance.currency == currency)
+		)
+	)
+	for field, amount in changes.items():
+		query = query.set(AdvanceBalance[field], AdvanceBalance[field] + amount)
+	query.run()
+
+
+def create_balance_row(details: dict) -> None:
+	timestamp, user = now(), frappe.session.user
+	row = frappe.get_doc({"doctype": "Employee Advance Balance", **details})
+	row.update(name=frappe.generate_hash(length=10), creation=timestamp, modified=timestamp)
+	row.update(owner=user, modified_by=user)
+
+	savepoint = "before_advance_balance_row"
+	frappe.db.savepoint(savepoint)
+	try:
+		row.db_insert()
+	except frappe.UniqueValidationError:
+		# created by a concurrent update, which the increments are applied on
+		frappe.db.rollback(save_point=savepoint)
+
+
+def get_expected_balances(employees: list[str] | None = None) -> list[dict]:
+	"""Aggregates submitted advances per employee, company and currency"""
+	Advance = frappe.qb.DocType("Employee Advance")
+	query = (
+		frappe.qb.from_(Advance)
+		.select(
+			Advance.employee,
+			Max(Advance.employee_name).as_("employee_name"),
+			Advance.company,
+			Advance.currency,
+			Sum(Advance.advance_amount).as_("advance_amount"),
+			Sum(Advance.paid_amount).as_("paid_amount"),
+			Sum(
+				Case().when(Advance.status == "Unpaid", Advance.advance_amount - Advance.paid_amount).else_(0)
+			).as_("pending_amount"),
+			Sum(Advance.claimed_amount).as_("claimed_amount"),
+			Sum(Advance.return_amount).as_("return_amount"),
+			Sum(Advance.paid_amount - Advance.claimed_amount - Advance.return_amount).as_("balance_amount"),
+		)
+		.where(Advance.docstatus == 1)
+		.groupby(Advance.employee, Advance.company, Advance.currency)
+	)
+	if employees:
+		query = query.where(Advance.employee.isin(employees))
+
+	return query.run(as_dict=True)
+
+
+def insert_balances(balances: list[dict]) -> None:
+	if not balances:
+		return
+
+	timestamp, user = now(), frappe.session.user
+	for row in balances:
+		row.update(name=frappe.generate_hash(length=10), creation=timestamp, modified=timestamp)
+		row.update(owner=user, modified_by=user)
+
+	fields = list(balances[0])
+	frappe.db.bulk_insert(
+		"Employee Advance Balance", fields, [[row[field] for field in fields] for row in balances]
+	)
+
+
+@frappe.whitelist()
+def rebuild_advance_balances() -> None:
+	frappe.only_for(["System Manager", "HR Manager", "Accounts Manager"])
+	rebuild_balances()
+
+
+@frappe.whitelist()
+def verify_advance_balances() -> list[dict]:
+	frappe.only_for(["System Manager", "HR Manager", "Accounts Manager"])
+	return get_balance_mismatches()
+
+
+def rebuild_balances() -> None:
+	"""Rebuilds all balance rows from submitted advances. Only meant for repairs, as regular changes
+	are applied to the affected row as increments by `update_advance_balance`."""
+	frappe.db.delete("Employee Advance Balance")
+	insert_balances(get_expected_balances())
+
+
+def get_balance_mismatches() -> list[dict]:
+	"""Returns the balance amounts that do not match the submitted advances"""
+
+	def key(row):
+		return (row["employee"], row["company"], row["currency"])
+
+	expected = {key(d): d for d in get_expected_balances()}
+	ledger = {
+		key(d): d
+		for d in frappe.get_all(
+			"Employee Advance Balance", fields=["employee", "company", "currency", *BALANCE_FIELDS]
+		)
+	}
+
+	mismatches = []
+	for row_key in expected.keys() | ledger.keys():
+		expected_row, ledger_row = expected.get(row_key, {}), ledger.get(row_key, {})
+		for field in BALANCE_FIELDS:
+			expected_amount, ledger_amount = flt(expected_row.get(field), 2), flt(ledger_row.get(field), 2)
+			if expected_amount != ledger_amount:
+				employee, company, currency = row_key
+				mismatches.append(
+					{
+						"employee": employee,
+						"company": company,
+						"currency": currency,
+						"field": field,
+						"expected": expected_amount,
+						"ledger": ledger_amount,
+					}
+				)
+
+	return mismatches
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Employee Advance Balance", ["employee", "company", "currency"])
@@ -0,0 +1,79 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+
+from erpnext.setup.doctype.employee.test_employee import make_employee
+
+from hrms.hr.doctype.employee_advance.test_employee_advance import (
+	make_employee_advance,
+	make_payment_entry,
+)
+from hrms.hr.doctype.employee_advance_balance.employee_advance_balance import (
+	get_advance_balance,
+	get_balance_mismatches,
+	rebuild_balances,
+	update_advance_balance,
+)
+
+
+class TestEmployeeAdvanceBalance(IntegrationTestCase):
+	def setUp(self):
+		frappe.db.delete("Employee Advance")
+		frappe.db.delete("Employee Advance Balance")
+		frappe.db.set_value("Account", "_Test Employee Advance - _TC", "account_type", "Receivable")
+		self.employee = make_employee("test_advance_balance@example.com", company="_Test Company")
+
+	def test_balance_on_payment_and_cancellation(self):
+		advance = make_employee_advance(self.employee)
+		balance = get_advance_balance(self.employee)
+		self.assertEqual(balance.advance_amount, 1000)
+		self.assertEqual(balance.pending_amount, 1000)
+		self.assertEqual(balance.balance_amount, 0)
+
+		payment_entry = make_payment_entry(advance, 600)
+		balance = get_advance_balance(self.employee, company="_Test Company")
+		self.assertEqual(balance.paid_amount, 600)
+		self.assertEqual(balance.pending_amount, 400)
+		self.assertEqual(balance.balance_amount, 600)
+		# the payment updated the existing row in place
+		self.assertEqual(frappe.db.count("Employee Advance Balance", {"employee": self.employee}), 1)
+
+		payment_entry.cancel()
+		advance.reload()
+		advance.cancel()
+		self.assertEqual(get_advance_balance(self.employee).advance_amount, 0)
+		self.assertEqual(get_balance_mismatches(), [])
+
+	def test_rebuild_and_verify(self):
+		advance = make_employee_advance(self.employee)
+		make_payment_entry(advance, 1000)
+
+		frappe.db.set_value(
+			"Employee Advance Balance",
+			{"employee": self.employee},
+			"balance_amount",
+			0,
+			update_modified=False,
+		)
+		mismatches = get_balance_mismatches()
+		self.assertEqual(len(mismatches), 1)
+		self.assertEqual(mismatches[0]["field"], "balance_amount")
+		self.assertEqual(mismatches[0]["expected"], 1000)
+
+		rebuild_balances()
+		self.assertEqual(get_balance_mismatches(), [])
+		self.assertEqual(get_advance_balance(self.employee).balance_amount, 1000)
+
+	def test_pending_amount_of_company_and_currency(self):
+		advance = make_employee_advance(self.employee)
+		make_payment_entry(advance, 600)
+		# advances of another company and currency are not part of the pending amount
+		update_advance_balance(
+			self.employee, None, "_Test Company 1", "USD", {"advance_amount": 500, "pending_amount": 500}
+		)
+
+		new_advance = make_employee_advance(self.employee, do_not_submit=True)
+		new_advance.set_pending_amount()
+		self.assertEqual(new_advance.pending_amount, 400)
@@ -0,0 +1,330 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder.functions import Max, Min
+from frappe.utils import cint, create_batch, date_diff, flt, getdate, now, today
+
+SYNC_SHARD_SIZE = 500
+
+# when an employee has multiple shift attendances on a day, the day takes the first matching status
+STATUS_PRIORITY = ["On Leave", "Present", "Work From Home", "Half Day", "Absent", "Invalid"]
+
+
+class EmployeeAttendanceDay(Document):
+	"""One row per employee per day with the attendance and holiday status for that day.
+	Maintained from Attendance and Holiday List changes, so reports can read a single table."""
+
+	pass
+
+
+def sync_attendance_days(employees: list[str], from_date, to_date) -> None:
+	"""Rebuilds the attendance days of `employees` between the given dates from their submitted
+	attendance and holiday lists using a fixed number of queries"""
+	if not employees:
+		return
+
+	from_date, to_date = getdate(from_date), getdate(to_date)
+	# syncs of the same employee from documents and background jobs would otherwise race on the unique
+	# (employee, attendance_date) index, so they are serialized on the employee rows
+	lock_employees(employees)
+	employee_details = get_employee_details(employees)
+	holidays = get_holidays(
+		{d.holiday_list for d in employee_details.values() if d.holiday_list}, from_date, to_date
+	)
+	attendance = get_attendance(employees, from_date, to_date)
+
+	days = {}
+	for employee in employee_details.values():
+		for holiday_date, weekly_off in holidays.get(employee.holiday_list, {}).items():
+			days[(employee.name, holiday_date)] = make_attendance_day(employee, holiday_date, weekly_off)
+
+	for d in attendance:
+		employee = employee_details.get(d.employee)
+		if not employee:
+			continue
+
+		key = (d.employee, d.attendance_date)
+		if key not in days:
+			days[key] = make_attendance_day(employee, d.attendance_date)
+		merge_attendance(days[key], d)
+
+	AttendanceDay = frappe.qb.DocType("Employee Attendance Day")
+	frappe.qb.from_(AttendanceDay).delete().where(
+		(AttendanceDay.employee.isin(employees)) & (AttendanceDay.attendance_date.between(from_date, to_date))
+	).run()
+
+	if not days:
+		return
+
+	timestamp, user = now(), frappe.session.user
+	rows = list(days.values())
+	for row in rows:
+		row.update(name=frappe.generate_hash(length=10), creation=timestamp, modified=timestamp)
+		row.update(owner=user, modified_by=user)
+
+	fields = list(rows[0])
+	frappe.db.bulk_insert(
+		"Employee Attendance Day", fields, [[row[field] for field in fields] for row in rows], chunk_size=5000
+	)
+
+
+def lock_employees(employees: list[str]) -> None:
+	Employee = frappe.qb.DocType("Employee")
+	(
+		frappe.qb.from_(Employee)
+		.select(Employee.name)
+		.where(Employee.name.isin(employees))
+		.orderby(Employee.name)
+		.for_update()
+	).run()
+
+
+def get_employee_details(employees: list[str]) -> dict:
+	Employee = frappe.qb.DocType("Employee")
+	Company = frappe.qb.DocType("Company")
+
+	details = (
+		frappe.qb.from_(Employee)
+		.left_join(Company)
+		.on(Employee.company == Company.name)
+		.select(
+			Employee.name,
+			Employee.employee_name,
+			Employee.company,
+			Employee.department,
+			Employee.holiday_list,
+			Company.default_holiday_list,
+		)
+		.where(Employee.name.isin(employees))
+	).run(as_dict=True)
+
+	for d in details:
+		d.holiday_list = d.holiday_list or d.default_holiday_list
+
+	return {d.name: d for d in details}
+
+
+def get_holidays(holiday_lists: set, from_date, to_date) -> dict[str, dict]:
+	"""Returns holiday dates of each holiday list with their weekly off flag"""
+	holidays = {}
+	if not holiday_lists:
+		return holidays
+
+	Holiday = frappe.qb.DocType("Holiday")
+	for d in (
+		frappe.qb.from_(Holiday)
+		.select(Holiday.parent, Holiday.holiday_date, Holiday.weekly_off)
+		.where(
+			(Holiday.parenttype == "Holiday List")
+			& (Holiday.parent.isin(list(holiday_lists)))
+			& (Holiday.holiday_date.between(from_date, to_date))
+		)
+	).run(as_dict=True):
+		holidays.setdefault(d.parent, {})[d.holiday_date] = cint(d.weekly_off)
+
+	return holidays
+
+
+def get_attendance(employees: list[str], from_date, to_date) -> list[dict]:
+	return frappe.get_all(
+		"Attendance",
+		filters={
+			"employee": ("in", employees),
+			"attendance_date": ("between", [from_date, to_date]),
+			"docstatus": 1,
+		},
+		fields=[
+			"name",
+			"employee",
+			"attendance_date",
+			"status",
+			"shift",
+			"leave_type",
+			"leave_application",
+			"late_entry",
+			"early_exit",
+			"working_hours",
+		],
+		order_by="attendance_date",
+	)
+
+
+def make_attendance_day(employee: dict, attendance_date, weekly_off: int | None = None) -> frappe._dict:
+	is_holiday = weekly_off is not None
+	status = ("Weekly Off" if weekly_off else "Holiday") if is_holiday else None
+
+	return frappe._dict(
+		employee=employee.name,
+		employee_name=employee.employee_name,
+		company=employee.company,
+		department=employee.department,
+		holiday_list=employee.holiday_list,
+		attendance_date=attendance_date,
+		status=status,
+		is_holiday=cint(is_holiday),
+		is_weekly_off=cint(weekly_off),
+		attendance=None,
+		shift=None,
+		leave_type=None,
+		leave_application=None,
+		working_hours=0,
+		late_entry=0,
+		early_exit=0,
+	)
+
+
+def merge_attendance(day: frappe._dict, attendance: dict) -> None:
+	"""Adds an attendance record to the day. Working hours and late/early flags are combined across
+	shifts, while status and references come from the record with the highest priority status"""
+	day.working_hours = flt(day.working_hours) + flt(attendance.working_hours)
+	day.late_entry = cint(day.late_entry or attendance.late_entry)
+	day.early_exit = cint(day.early_exit or attendance.early_exit)
+
+	if day.attendance and get_status_priority(day.status) <= get_status_priority(attendance.status):
+		return
+
+	day.update(
+		status=attendance.status,
+		attendance=attendance.name,
+		shift=attendance.shift,
+		leave_type=attendance.leave_type,
+		leave_application=attendance.leave_application,
+	)
+
+
+def get_status_priority(status: str) -> int:
+	return STATUS_PRIORITY.index(status) if status in STATUS_PRIORITY else len(STATUS_PRIORITY)
+
+
+def update_holiday_list_days(doc, method=None):
+	"""Re-syncs the days of employees following the holiday list over its period"""
+	dates = [getdate(d) for d in (doc.from_date, doc.to_date) if d]
+	if previous := doc.get_doc_before_save():
+		# days dropped from a shortened period should lose their holiday flags too
+		dates.extend(getdate(d) for d in (previous.from_date, previous.to_date) if d)
+
+	if not dates:
+		return
+
+	employees = get_holiday_list_employees(doc.name)
+	enqueue_sync(employees, min(dates), max(dates))
+
+
+def update_employee_days(doc, method=None):
+	"""Re-syncs the days of an employee when their holiday list or company changes, over the period of
+	their existing days and of the holiday lists followed before and after the change. Name and
+	department changes are copied to the existing days."""
+	if not (doc.has_value_changed("holiday_list") or doc.has_value_changed("company")):
+		if doc.has_value_changed("employee_name") or doc.has_value_changed("department"):
+			AttendanceDay = frappe.qb.DocType("Employee Attendance Day")
+			(
+				frappe.qb.update(AttendanceDay)
+				.set(AttendanceDay.employee_name, doc.employee_name)
+				.set(AttendanceDay.department, doc.department)
+				.where(AttendanceDay.employee == doc.name)
+			).run()
+		return
+
+	holiday_lists = {get_employee_details([doc.name])[doc.name].holiday_list}
+	if previous := doc.get_doc_before_save():
+		holiday_lists.add(
+			previous.holiday_list
+			or frappe.get_cached_value("Company", previous.company, "default_holiday_list")
+		)
+
+	AttendanceDay = frappe.qb.DocType("Employee Attendance Day")
+	HolidayList = frappe.qb.DocType("Holiday List")
+	days = (
+		frappe.qb.from_(AttendanceDay)
+		.select(Min(AttendanceDay.attendance_date), Max(AttendanceDay.attendance_date))
+		.where(AttendanceDay.employee == doc.name)
+	).run()[0]
+	periods = (
+		frappe.qb.from_(HolidayList)
+		.select(Min(HolidayList.from_date), Max(HolidayList.to_date))
+		.where(HolidayList.name.isin([d for d in holiday_lists if d] or [""]))
+	).run()[0]
+
+	dates = [getdate(d) for d in (*days, *periods) if d]
+	if dates:
+		sync_attendance_days([doc.name], min(dates), max(dates))
+
+
+def get_holiday_list_employees(holiday_list: str) -> list[str]:
+	Employee = frappe.qb.DocType("Employee")
+	Company = frappe.qb.DocType("Company")
+
+	return (
+		frappe.qb.from_(Employee)
+		.left_join(Company)
+		.on(Employee.company == Company.name)
+		.select(Employee.name)
+		.where(
+			(Employee.holiday_list == holiday_list)
+			| (
+				((Employee.holiday_list.isnull()) | (Employee.holiday_list == ""))
+				& (Company.default_holiday_list == holiday_list)
+			)
+		)
+	).run(pluck=True)
+
+
+def enqueue_sync(employees: list[str], from_date, to_date) -> None:
+	for shard in create_batch(employees, SYNC_SHARD_SIZE):
+		frappe.enqueue(
+			sync_attendance_days,
+			queue="long",
+			timeout=3000,
+			enqueue_after_commit=True,
+			employees=list(shard),
+			from_date=from_date,
+			to_date=to_date,
+		)
+
+
+@frappe.whitelist()
+def backfill_attendance_days(from_date=None, to_date=None, company: str | None = None) -> None:
+	frappe.only_for(["System Manager", "HR Manager"])
+	enqueue_backfill(from_date, to_date, company)
+
+
+def enqueue_backfill(from_date=None, to_date=None, company: str | None = None) -> None:
+	"""Builds attendance days for history in background jobs of `SYNC_SHARD_SIZE` employees.
+	Defaults to the period from the earliest attendance or holiday till the latest one."""
+	if not (from_date and to_date):
+		earliest, latest = get_history_period()
+		from_date = from_date or earliest
+		to_date = to_date or latest
+
+	if date_diff(to_date, from_date) < 0:
+		return
+
+	filters = {"company": company} if company else {}
+	enqueue_sync(frappe.get_all("Employee", filters=filters, pluck="name"), from_date, to_date)
+
+
+def get_history_period() -> tuple:
+	Attendance = frappe.qb.DocType("Attendance")
+	HolidayList = frappe.qb.DocType("Holiday List")
+
+	attendance = (
+		frappe.qb.from_(Attendance)
+		.select(Min(Attendance.attendance_date), Max(Attendance.attendance_date))
+		.where(Attendance.docstatus == 1)
+	).run()[0]
+	holiday_lists = (
+		frappe.qb.from_(HolidayList).select(Min(HolidayList.from_date), Max(HolidayList.to_date))
+	).run()[0]
+
+	dates = [getdate(d) for d in (*attendance, *holiday_lists) if d]
+	if not dates:
+		return getdate(today()), getdate(today())
+
+	return min(dates), max(dates)
+
+
+def on_doctype_update():
+	frappe.db.add_unique("Employee Attendance Day", ["employee", "attendance_date"])
+	frappe.db.add_index("Employee Attendance Day", ["attendance_date", "company"])
@@ -0,0 +1,134 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, add_months, get_year_ending, get_year_start, getdate
+
+from erpnext.setup.doctype.employee.test_employee import make_employee
+
+from hrms.api import get_attendance_calendar_events
+from hrms.hr.doctype.attendance.attendance import mark_attendance
+from hrms.hr.doctype.employee_attendance_day.employee_attendance_day import sync_attendance_days
+from hrms.tests.test_utils import get_first_sunday
+
+
+class TestEmployeeAttendanceDay(IntegrationTestCase):
+	def setUp(self):
+		from hrms.payroll.doctype.salary_slip.test_salary_slip import make_holiday_list
+
+		from_date = get_year_start(add_months(getdate(), -1))
+		to_date = get_year_ending(getdate())
+		self.holiday_list = make_holiday_list(from_date=from_date, to_date=to_date)
+		self.employee = make_employee("test_attendance_day@example.com", company="_Test Company")
+		frappe.db.set_value("Employee", self.employee, "holiday_list", self.holiday_list)
+		frappe.db.delete("Attendance")
+		frappe.db.delete("Employee Attendance Day")
+
+	def test_attendance_day_on_submit_and_cancel(self):
+		date = add_days(get_first_sunday(self.holiday_list), 1)
+		attendance = mark_attendance(self.employee, date, "Present", late_entry=1)
+
+		day = frappe.get_doc("Employee Attendance Day", {"employee": self.employee, "attendance_date": date})
+		self.assertEqual(day.status, "Present")
+		self.assertEqual(day.attendance, attendance)
+		self.assertEqual(day.late_entry, 1)
+		self.assertEqual(day.is_holiday, 0)
+
+		frappe.get_doc("Attendance", attendance).cancel()
+		self.assertFalse(
+			frappe.db.exists("Employee Attendance Day", {"employee": self.employee, "attendance_date": date})
+		)
+
+	def test_sync_attendance_days_with_holidays(self):
+		sunday = get_first_sunday(self.holiday_list)
+		monday = add_days(sunday, 1)
+		mark_attendance(self.employee, monday, "Absent")
+		# attendance on a holiday keeps the holiday flag
+		mark_attendance(self.employee, sunday, "Present")
+
+		frappe.db.delete("Employee Attendance Day")
+		sync_attendance_days([self.employee], sunday, add_days(sunday, 7))
+
+		days = {
+			d.attendance_date: d
+			for d in frappe.get_all(
+				"Employee Attendance Day",
+				filters={"employee": self.employee},
+				fields=["attendance_date", "status", "is_holiday", "is_weekly_off"],
+			)
+		}
+		self.assertEqual(days[sunday].status, "Present")
+		self.assertEqual(days[sunday].is_holiday, 1)
+		self.assertEqual(days[monday].status, "Absent")
+
+		next_sunday = add_days(sunday, 7)
+		self.assertEqual(days[next_sunday].status, "Weekly Off")
+		self.assertEqual(days[next_sunday].is_weekly_off, 1)
+		# unmarked working days have no rows
+		self.assertNotIn(add_days(sunday, 2), days)
+
+	def test_attendance_days_on_holiday_list_change(self):
+		from hrms.payroll.doctype.salary_slip.test_salary_slip import make_holiday_list
+
+		sunday = get_first_sunday(self.holiday_list)
+		date = add_days(sunday, 1)
+		mark_attendance(self.employee, date, "Present")
+		sync_attendance_days([self.employee], sunday, date)
+		self.assertTrue(
+			frappe.db.exists(
+				"Employee Attendance Day", {"employee": self.employee, "attendance_date": sunday}
+			)
+		)
+
+		holiday_list = make_holiday_list(
+			"_Test Attendance Day Holiday List",
+			from_date=get_year_start(add_months(getdate(), -1)),
+			to_date=get_year_ending(getdate()),
+			weekly_off_days=["Monday"],
+		)
+		employee = frappe.get_doc("Employee", self.employee)
+		employee.holiday_list = holiday_list
+		employee.save()
+
+		day = frappe.get_doc("Employee Attendance Day", {"employee": self.employee, "attendance_date": date})
+		self.assertEqual(day.status, "Present")
+		self.assertEqual(day.holiday_list, holiday_list)
+		self.assertEqual(day.is_weekly_off, 1)
+		# sundays are working days on the new holiday list
+		self.assertFalse(
+			frappe.db.exists(
+				"Employee Attendance Day", {"employee": self.employee, "attendance_date": sunday}
+			)
+		)
+
+	def test_calendar_events_before_backfill(self):
+		sunday = get_first_sunday(self.holiday_list)
+		monday = add_days(sunday, 1)
+		mark_attendance(self.employee, monday, "Present")
+
+		# days not built yet are read from attendance and holidays
+		frappe.db.delete("Employee Attendance Day")
+		events = get_attendance_calendar_events(self.employee, sunday, monday)
+		self.assertEqual(events, {str(sunday): "Holiday", str(monday): "Present"})
+
+	def test_attendance_days_on_department_change(self):
+		date = add_days(get_first_sunday(self.holiday_list), 1)
+		mark_attendance(self.employee, date, "Present")
+
+		employee = frappe.get_doc("Employee", self.employee)
+		department = frappe.get_all(
+			"Department",
+			filters={"is_group": 0, "name": ("!=", employee.department or "")},
+			pluck="name",
+			limit=1,
+		)[0]
+		employee.department = department
+		employee.save()
+
+		self.assertEqual(
+			frappe.db.get_value(
+				"Employee Attendance Day", {"employee": self.employee, "attendance_date": date}, "department"
+			),
+			department,
+		)
@@ -563,3 +563,7 @@ def calculate_time_difference(start_time, end_time):
 	time_difference = abs(start_time - end_time)
 
 	return round(time_difference.total_seconds() / 3600, 2)
+
+
+def on_doctype_update():
+	frappe.db.add_index("Employee Checkin", ["attendance"])
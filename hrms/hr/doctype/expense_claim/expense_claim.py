@@ -2,14 +2,18 @@
 # License: GNU General Public License v3. See license.txt
 
 
+import time
+
 import frappe
 from frappe import _
 from frappe.model.mapper import get_mapped_doc
 from frappe.model.workflow import get_workflow_name
+from frappe.query_builder import Case
 from frappe.query_builder.functions import Sum
-from frappe.utils import cstr, flt, get_link_to_form, today
+from frappe.utils import cint, create_batch, cstr, flt, get_link_to_form, getdate, now, today
 
 import erpnext
+from erpnext.accounts.doctype.accounting_dimension.accounting_dimension import get_accounting_dimensions
 from erpnext.accounts.doctype.repost_accounting_ledger.repost_accounting_ledger import (
 	validate_docs_for_voucher_types,
 )
@@ -23,9 +27,15 @@ from erpnext.accounts.utils import (
 from erpnext.controllers.accounts_controller import AccountsController
 
 import hrms
+from hrms.hr.doctype.employee_advance_balance.employee_advance_balance import get_advance_balance
 from hrms.hr.utils import set_employee_name, share_doc_with_approver, validate_active_employee
 from hrms.mixins.pwa_notifications import PWANotificationsMixin
 
+# expense claims paid by each journal entry of a reimbursement run
+REIMBURSEMENT_BATCH_SIZE = 200
+REIMBURSEMENT_RUN = "expense_claim_reimbursement_run"
+EXPENSE_CLAIM_ACCOUNTS = "expense_claim_accounts"
+
 
 class InvalidExpenseApproverError(frappe.ValidationError):
 	pass
@@ -66,30 +76,7 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 			self.project = frappe.db.get_value("Task", self.task, "project")
 
 	def set_status(self, update=False):
-		status = {"0": "Draft", "1": "Submitted", "2": "Cancelled"}[cstr(self.docstatus or 0)]
-
-		precision = self.precision("grand_total")
-
-		if self.docstatus == 1:
-			if self.approval_status == "Approved":
-				if (
-					# set as paid
-					self.is_paid
-					or (
-						flt(self.total_sanctioned_amount) > 0
-						and (
-							# grand total is reimbursed
-							(flt(self.grand_total, precision) == flt(self.total_amount_reimbursed, precision))
-							# grand total (to be paid) is 0 since linked advances already cover the claimed amount
-							or (flt(self.grand_total, precision) == 0)
-						)
-					)
-				):
-					status = "Paid"
-				elif flt(self.total_sanctioned_amount) > 0:
-					status = "Unpaid"
-			elif self.approval_status == "Rejected":
-				status = "Rejected"
+		status = get_expense_claim_status(self, self.precision("grand_total"))
 
 		if update:
 			self.db_set("status", status)
@@ -203,6 +190,7 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 	def get_gl_entries(self):
 		gl_entry = []
 		self.validate_account_details()
+		expense_accounts = ",".join(dict.fromkeys(d.default_account for d in self.expenses))
 
 		# payable entry
 		if self.grand_total:
@@ -213,7 +201,7 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 						"credit": self.base_grand_total,
 						"credit_in_account_currency": self.grand_total,
 						"credit_in_transaction_currency": self.grand_total,
-						"against": ",".join([d.default_account for d in self.expenses]),
+						"against": expense_accounts,
 						"party_type": "Employee",
 						"party": self.employee,
 						"against_voucher_type": self.doctype,
@@ -227,22 +215,22 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 				)
 			)
 
-		# expense entries
-		for data in self.expenses:
+		# expense entries, one per account, cost center, project and accounting dimensions
+		for data in self.get_grouped_expenses():
 			gl_entry.append(
 				self.get_gl_dict(
 					{
-						"account": data.default_account,
+						"account": data.row.default_account,
 						"debit": data.base_sanctioned_amount,
 						"debit_in_account_currency": data.sanctioned_amount,
 						"debit_in_transaction_currency": data.sanctioned_amount,
 						"against": self.employee,
-						"cost_center": data.cost_center or self.cost_center,
-						"project": data.project or self.project,
+						"cost_center": data.row.cost_center or self.cost_center,
+						"project": data.row.project or self.project,
 						"transaction_exchange_rate": self.exchange_rate,
 					},
 					account_currency=self.currency,
-					item=data,
+					item=data.row,
 				)
 			)
 
@@ -257,7 +245,7 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 					"credit": data.base_allocated_amount,
 					"credit_in_account_currency": data.allocated_amount,
 					"credit_in_transaction_currency": data.allocated_amount,
-					"against": ",".join([d.default_account for d in self.expenses]),
+					"against": expense_accounts,
 					"party_type": "Employee",
 					"party": self.employee,
 					"against_voucher_type": self.doctype,
@@ -316,6 +304,32 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 
 		return gl_entry
 
+	def get_grouped_expenses(self) -> list:
+		"""Sums the expense rows booked against the same account, cost center, project and accounting
+		dimensions, so claims with many rows post one GL entry per combination"""
+		dimensions = get_accounting_dimensions()
+		grouped_expenses = {}
+
+		for data in self.expenses:
+			key = (
+				data.default_account,
+				data.cost_center or self.cost_center,
+				data.project or self.project,
+				*(data.get(dimension) for dimension in dimensions),
+			)
+			group = grouped_expenses.setdefault(
+				key, frappe._dict(row=data, sanctioned_amount=0.0, base_sanctioned_amount=0.0)
+			)
+			group.sanctioned_amount = flt(
+				group.sanctioned_amount + flt(data.sanctioned_amount), data.precision("sanctioned_amount")
+			)
+			group.base_sanctioned_amount = flt(
+				group.base_sanctioned_amount + flt(data.base_sanctioned_amount),
+				data.precision("base_sanctioned_amount"),
+			)
+
+		return list(grouped_expenses.values())
+
 	def add_tax_gl_entries(self, gl_entries):
 		# tax table gl entries
 		for tax in self.get("taxes"):
@@ -515,11 +529,12 @@ class ExpenseClaim(AccountsController, PWANotificationsMixin):
 				)
 
 	def set_expense_account(self, validate=False):
+		accounts = get_expense_claim_accounts(self.company)
 		for expense in self.expenses:
 			if not expense.default_account or not validate:
-				expense.default_account = get_expense_claim_account(expense.expense_type, self.company)[
-					"account"
-				]
+				expense.default_account = accounts.get(expense.expense_type) or get_expense_claim_account(
+					expense.expense_type, self.company
+				).get("account")
 
 	def update_against_claim_in_pe(self):
 		reference_against_pe = []
@@ -560,6 +575,33 @@ def update_reimbursed_amount(doc):
 	doc.set_status(update=True)
 
 
+def get_expense_claim_status(claim, precision: int) -> str:
+	status = {"0": "Draft", "1": "Submitted", "2": "Cancelled"}[cstr(claim.docstatus or 0)]
+
+	if claim.docstatus == 1:
+		if claim.approval_status == "Approved":
+			if (
+				# set as paid
+				claim.is_paid
+				or (
+					flt(claim.total_sanctioned_amount) > 0
+					and (
+						# grand total is reimbursed
+						(flt(claim.grand_total, precision) == flt(claim.total_amount_reimbursed, precision))
+						# grand total (to be paid) is 0 since linked advances already cover the claimed amount
+						or (flt(claim.grand_total, precision) == 0)
+					)
+				)
+			):
+				status = "Paid"
+			elif flt(claim.total_sanctioned_amount) > 0:
+				status = "Unpaid"
+		elif claim.approval_status == "Rejected":
+			status = "Rejected"
+
+	return status
+
+
 def get_total_reimbursed_amount(doc):
 	if doc.is_paid:
 		# No need to check for cancelled state here as it will anyways update status as cancelled
@@ -653,6 +695,230 @@ def make_bank_entry(dt, dn):
 	return je.as_dict()
 
 
+@frappe.whitelist()
+def reimburse_expense_claims(
+	company: str,
+	reference_no: str,
+	posting_date: str | None = None,
+	payment_account: str | None = None,
+	employee: str | None = None,
+	department: str | None = None,
+	from_date: str | None = None,
+	to_date: str | None = None,
+	batch_size: int = REIMBURSEMENT_BATCH_SIZE,
+	submit: bool = True,
+) -> str:
+	"""Queues bank entries paying the outstanding amounts of approved, unpaid claims matching the
+	filters. Each journal entry pays up to `batch_size` claims and is created by its own background job.
+	Claims already referenced in a draft journal entry are left out, so a run can be repeated safely."""
+	frappe.has_permission("Journal Entry", "submit" if cint(submit) else "create", throw=True)
+
+	args = frappe._dict(
+		company=company,
+		reference_no=reference_no,
+		posting_date=getdate(posting_date),
+		submit=cint(submit),
+		cost_center=erpnext.get_default_cost_center(company),
+	)
+	args.update(get_reimbursement_payment_account(company, payment_account))
+
+	claims = get_claims_to_reimburse(
+		args, employee=employee, department=department, from_date=from_date, to_date=to_date
+	)
+	if not claims:
+		frappe.throw(_("No approved and unpaid Expense Claims found for the selected filters"))
+
+	run_id = frappe.generate_hash(length=12)
+	batches = list(create_batch(claims, cint(batch_size) or REIMBURSEMENT_BATCH_SIZE))
+	frappe.cache().hset(
+		REIMBURSEMENT_RUN, run_id, {"total": len(claims), "processed": 0, "started_at": time.time()}
+	)
+
+	for batch in batches:
+		frappe.enqueue(
+			make_reimbursement_entry,
+			queue="long",
+			timeout=3000,
+			args=args,
+			claims=list(batch),
+			run_id=run_id,
+		)
+
+	frappe.msgprint(
+		_("Reimbursement of {0} Expense Claims has been queued in {1} journal entries.").format(
+			len(claims), len(batches)
+		),
+		alert=True,
+		indicator="blue",
+	)
+	return run_id
+
+
+def get_reimbursement_payment_account(company: str, payment_account: str | None = None) -> dict:
+	from erpnext.accounts.doctype.journal_entry.journal_entry import get_default_bank_cash_account
+
+	if payment_account:
+		account = frappe.db.get_value(
+			"Account", payment_account, ["name", "account_currency", "account_type"], as_dict=True
+		)
+	else:
+		account = get_default_bank_cash_account(company, "Bank") or get_default_bank_cash_account(
+			company, "Cash"
+		)
+		account = account and frappe._dict(
+			name=account.account, account_currency=account.account_currency, account_type=account.account_type
+		)
+
+	if not account:
+		frappe.throw(_("Please set a default Bank or Cash account in Company {0}").format(company))
+
+	return {
+		"payment_account": account.name,
+		"payment_account_currency": account.account_currency,
+		"voucher_type": "Cash Entry" if account.account_type == "Cash" else "Bank Entry",
+	}
+
+
+def get_claims_to_reimburse(args: dict, **filters) -> list:
+	"""Returns approved and unpaid claims in the payment account's currency, with their outstanding amounts"""
+	ExpenseClaim = frappe.qb.DocType("Expense Claim")
+	JournalEntryAccount = frappe.qb.DocType("Journal Entry Account")
+
+	in_draft_entries = (
+		frappe.qb.from_(JournalEntryAccount)
+		.select(JournalEntryAccount.reference_name)
+		.where((JournalEntryAccount.reference_type == "Expense Claim") & (JournalEntryAccount.docstatus == 0))
+	)
+	query = (
+		frappe.qb.from_(ExpenseClaim)
+		.select(
+			ExpenseClaim.name,
+			ExpenseClaim.employee,
+			ExpenseClaim.payable_account,
+			ExpenseClaim.total_sanctioned_amount,
+			ExpenseClaim.total_taxes_and_charges,
+			ExpenseClaim.total_amount_reimbursed,
+			ExpenseClaim.total_advance_amount,
+		)
+		.where(
+			(ExpenseClaim.docstatus == 1)
+			& (ExpenseClaim.company == args.company)
+			& (ExpenseClaim.approval_status == "Approved")
+			& (ExpenseClaim.status == "Unpaid")
+			& (ExpenseClaim.is_paid == 0)
+			& (ExpenseClaim.currency == args.payment_account_currency)
+			& (ExpenseClaim.name.notin(in_draft_entries))
+		)
+		.orderby(ExpenseClaim.posting_date)
+		.orderby(ExpenseClaim.name)
+	)
+	for field in ("employee", "department"):
+		if filters.get(field):
+			query = query.where(ExpenseClaim[field] == filters[field])
+	if filters.get("from_date"):
+		query = query.where(ExpenseClaim.posting_date >= filters["from_date"])
+	if filters.get("to_date"):
+		query = query.where(ExpenseClaim.posting_date <= filters["to_date"])
+
+	claims = []
+	for claim in query.run(as_dict=True):
+		claim.outstanding_amount = get_outstanding_amount_for_claim(claim)
+		if claim.outstanding_amount > 0:
+			claims.append(claim)
+
+	return claims
+
+
+def make_reimbursement_entry(args: dict, claims: list, run_id: str | None = None) -> str | None:
+	"""Creates one journal entry paying the outstanding amounts of a batch of claims. Claim statuses
+	are updated together by `update_payment_for_expense_claim` when the entry is submitted."""
+	args = frappe._dict(args)
+	claims = [frappe._dict(d) for d in claims]
+
+	je = frappe.new_doc("Journal Entry")
+	je.update(
+		voucher_type=args.voucher_type,
+		company=args.company,
+		posting_date=args.posting_date,
+		cheque_no=args.reference_no,
+		cheque_date=args.posting_date,
+		user_remark=_("Reimbursement of {0} Expense Claims").format(len(claims)),
+	)
+	for claim in claims:
+		je.append(
+			"accounts",
+			{
+				"account": claim.payable_account,
+				"debit_in_account_currency": claim.outstanding_amount,
+				"reference_type": "Expense Claim",
+				"reference_name": claim.name,
+				"party_type": "Employee",
+				"party": claim.employee,
+				"cost_center": args.cost_center,
+			},
+		)
+	je.append(
+		"accounts",
+		{
+			"account": args.payment_account,
+			"credit_in_account_currency": sum(flt(d.outstanding_amount) for d in claims),
+			"cost_center": args.cost_center,
+		},
+	)
+
+	savepoint = "before_expense_claim_reimbursement"
+	frappe.db.savepoint(savepoint)
+	try:
+		je.insert()
+		if args.submit:
+			je.submit()
+	except Exception:
+		frappe.db.rollback(save_point=savepoint)
+		frappe.log_error("Expense Claim reimbursement failed for a batch", reference_doctype="Expense Claim")
+		success, failure = [], [d.name for d in claims]
+	else:
+		success, failure = [je.name], []
+
+	if run_id:
+		update_reimbursement_progress(run_id, len(claims), success, failure)
+
+	return je.name if success else None
+
+
+def update_reimbursement_progress(run_id: str, processed: int, success: list, failure: list) -> None:
+	cache = frappe.cache()
+	# batches finish in any order, so lock the run while merging the results of this batch
+	with cache.lock(f"{REIMBURSEMENT_RUN}::{run_id}", timeout=60):
+		run = cache.hget(REIMBURSEMENT_RUN, run_id) or {}
+		run["processed"] = run.get("processed", 0) + processed
+		for key, value in (("journal_entries", success), ("failure", failure)):
+			run[key] = run.get(key, []) + value
+		cache.hset(REIMBURSEMENT_RUN, run_id, run)
+
+	total = run.get("total") or processed
+	frappe.publish_progress(
+		run["processed"] * 100 / total,
+		title=_("Reimbursing Expense Claims..."),
+		description=_("{0} of {1} claims processed").format(run["processed"], total),
+	)
+
+	if run["processed"] >= total:
+		cache.hdel(REIMBURSEMENT_RUN, run_id)
+		time_taken = time.time() - run.get("started_at", time.time())
+		paid = total - len(run["failure"])
+		frappe.publish_realtime(
+			"completed_expense_claim_reimbursement",
+			message={
+				"journal_entries": run["journal_entries"],
+				"failure": run["failure"],
+				"time_taken": flt(time_taken, 3),
+				"throughput": flt(paid / time_taken, 2) if time_taken else paid,
+			},
+			user=frappe.session.user,
+			after_commit=True,
+		)
+
+
 @frappe.whitelist()
 def get_expense_claim_account_and_cost_center(expense_claim_type, company):
 	data = get_expense_claim_account(expense_claim_type, company)
@@ -663,9 +929,7 @@ def get_expense_claim_account_and_cost_center(expense_claim_type, company):
 
 @frappe.whitelist()
 def get_expense_claim_account(expense_claim_type, company):
-	account = frappe.db.get_value(
-		"Expense Claim Account", {"parent": expense_claim_type, "company": company}, "default_account"
-	)
+	account = get_expense_claim_accounts(company).get(expense_claim_type)
 	if not account:
 		frappe.throw(
 			_("Set the default account for the {0} {1}").format(
@@ -677,6 +941,22 @@ def get_expense_claim_account(expense_claim_type, company):
 	return {"account": account}
 
 
+def get_expense_claim_accounts(company: str) -> dict:
+	"""Returns the default account of each Expense Claim Type for the company"""
+
+	def _get_expense_claim_accounts():
+		return dict(
+			frappe.get_all(
+				"Expense Claim Account",
+				filters={"company": company, "parenttype": "Expense Claim Type"},
+				fields=["parent", "default_account"],
+				as_list=True,
+			)
+		)
+
+	return frappe.cache().hget(EXPENSE_CLAIM_ACCOUNTS, company, generator=_get_expense_claim_accounts)
+
+
 @frappe.whitelist()
 def get_advances(expense_claim, advance_id=None):
 	import json
@@ -686,6 +966,10 @@ def get_advances(expense_claim, advance_id=None):
 	expense_claim_doc = frappe.get_doc(expense_claim)
 	expense_claim_doc.advances = []
 
+	if not advance_id and get_advance_balance(expense_claim.employee).balance_amount <= 0:
+		# nothing paid to the employee is left to be claimed
+		return expense_claim_doc.advances
+
 	advance = frappe.qb.DocType("Employee Advance")
 
 	query = frappe.qb.from_(advance).select(
@@ -850,34 +1134,191 @@ def update_payment_for_expense_claim(doc, method=None):
 
 	payment_table, doctype_field = doctype_field_map[doc.doctype]
 
+	references = {}
 	for d in doc.get(payment_table):
 		if d.get(doctype_field) == "Expense Claim" and d.reference_name:
-			expense_claim = frappe.get_doc("Expense Claim", d.reference_name)
-			update_reimbursed_amount(expense_claim)
+			references.setdefault(d.reference_name, []).append(d.name)
+
+	if not references:
+		return
+
+	claims = update_reimbursed_amounts(list(references))
 
-			if doc.doctype == "Payment Entry":
-				update_outstanding_amount_in_payment_entry(expense_claim, d.name)
+	if doc.doctype == "Payment Entry":
+		outstanding_amounts = {
+			pe_reference: get_outstanding_amount_for_claim(claims[claim])
+			for claim, pe_references in references.items()
+			if claim in claims
+			for pe_reference in pe_references
+		}
+		update_outstanding_amounts_in_payment_entry(outstanding_amounts)
+
+
+def update_reimbursed_amounts(claim_names: list) -> dict:
+	"""Set-based equivalent of `update_reimbursed_amount` for a batch of claims. The reimbursed amounts
+	of all claims are aggregated together and their amounts and statuses are written in one update."""
+	claims = {
+		d.name: d
+		for d in frappe.get_all(
+			"Expense Claim",
+			filters={"name": ("in", claim_names)},
+			fields=[
+				"name",
+				"employee",
+				"docstatus",
+				"approval_status",
+				"is_paid",
+				"grand_total",
+				"total_sanctioned_amount",
+				"total_taxes_and_charges",
+				"total_advance_amount",
+			],
+		)
+	}
+	if not claims:
+		return claims
+
+	reimbursed_amounts = get_total_reimbursed_amounts([d.name for d in claims.values() if not d.is_paid])
+	precision = frappe.get_precision("Expense Claim", "grand_total")
+	for claim in claims.values():
+		claim.total_amount_reimbursed = (
+			claim.grand_total if claim.is_paid else flt(reimbursed_amounts.get(claim.name))
+		)
+		claim.status = get_expense_claim_status(claim, precision)
+
+	modified = now()
+	ExpenseClaim = frappe.qb.DocType("Expense Claim")
+	reimbursed_amount_case, status_case = Case(), Case()
+	for claim in claims.values():
+		reimbursed_amount_case = reimbursed_amount_case.when(
+			ExpenseClaim.name == claim.name, claim.total_amount_reimbursed
+		)
+		status_case = status_case.when(ExpenseClaim.name == claim.name, claim.status)
+
+	(
+		frappe.qb.update(ExpenseClaim)
+		.set(ExpenseClaim.total_amount_reimbursed, reimbursed_amount_case)
+		.set(ExpenseClaim.status, status_case)
+		.set(ExpenseClaim.modified, modified)
+		.set(ExpenseClaim.modified_by, frappe.session.user)
+		.where(ExpenseClaim.name.isin(list(claims)))
+	).run()
+
+	publish_claim_updates(list(claims.values()), modified)
+	return claims
+
+
+def get_total_reimbursed_amounts(claim_names: list) -> dict:
+	"""Returns the amount reimbursed via journal and payment entries against each claim"""
+	amounts = {}
+	if not claim_names:
+		return amounts
+
+	JournalEntryAccount = frappe.qb.DocType("Journal Entry Account")
+	PaymentEntryReference = frappe.qb.DocType("Payment Entry Reference")
+	queries = (
+		frappe.qb.from_(JournalEntryAccount)
+		.select(
+			JournalEntryAccount.reference_name,
+			Sum(
+				JournalEntryAccount.debit_in_account_currency - JournalEntryAccount.credit_in_account_currency
+			),
+		)
+		.where((JournalEntryAccount.reference_name.isin(claim_names)) & (JournalEntryAccount.docstatus == 1))
+		.groupby(JournalEntryAccount.reference_name),
+		frappe.qb.from_(PaymentEntryReference)
+		.select(PaymentEntryReference.reference_name, Sum(PaymentEntryReference.allocated_amount))
+		.where(
+			(PaymentEntryReference.reference_name.isin(claim_names)) & (PaymentEntryReference.docstatus == 1)
+		)
+		.groupby(PaymentEntryReference.reference_name),
+	)
+
+	for query in queries:
+		for claim, amount in query.run():
+			amounts[claim] = flt(amounts.get(claim)) + flt(amount)
+
+	return amounts
+
+
+def publish_claim_updates(claims: list, modified: str) -> None:
+	"""Batched equivalent of `ExpenseClaim.publish_update` and `notify_update` for claims updated in bulk"""
+	for claim in claims:
+		frappe.clear_document_cache("Expense Claim", claim.name)
+		frappe.publish_realtime(
+			"doc_update",
+			{"modified": modified, "doctype": "Expense Claim", "name": claim.name},
+			doctype="Expense Claim",
+			docname=claim.name,
+			after_commit=True,
+		)
+
+	employees = list({claim.employee for claim in claims})
+	for user in set(frappe.get_all("Employee", filters={"name": ("in", employees)}, pluck="user_id")):
+		if user:
+			hrms.refetch_resource("hrms:my_claims", user)
+	hrms.refetch_resource("hrms:team_claims")
+	frappe.publish_realtime("list_update", {"doctype": "Expense Claim"}, after_commit=True)
+
+
+def update_outstanding_amounts_in_payment_entry(outstanding_amounts: dict) -> None:
+	"""updates outstanding amounts back in Payment Entry references, keyed by reference row name"""
+	if not outstanding_amounts:
+		return
+
+	PaymentEntryReference = frappe.qb.DocType("Payment Entry Reference")
+	outstanding_amount_case = Case()
+	for pe_reference, outstanding_amount in outstanding_amounts.items():
+		outstanding_amount_case = outstanding_amount_case.when(
+			PaymentEntryReference.name == pe_reference, outstanding_amount
+		)
+
+	(
+		frappe.qb.update(PaymentEntryReference)
+		.set(PaymentEntryReference.outstanding_amount, outstanding_amount_case)
+		.where(PaymentEntryReference.name.isin(list(outstanding_amounts)))
+	).run()
 
 
 def update_outstanding_amount_in_payment_entry(expense_claim: dict, pe_reference: str):
 	"""updates outstanding amount back in Payment Entry reference"""
 	# TODO: refactor convoluted code after erpnext payment entry becomes extensible
-	outstanding_amount = get_outstanding_amount_for_claim(expense_claim)
-	frappe.db.set_value("Payment Entry Reference", pe_reference, "outstanding_amount", outstanding_amount)
+	update_outstanding_amounts_in_payment_entry(
+		{pe_reference: get_outstanding_amount_for_claim(expense_claim)}
+	)
 
 
 def validate_expense_claim_in_jv(doc, method=None):
 	"""Validates Expense Claim amount in Journal Entry"""
-	if doc.voucher_type != "Exchange Gain Or Loss":
-		for d in doc.accounts:
-			if d.reference_type == "Expense Claim":
-				outstanding_amt = get_outstanding_amount_for_claim(d.reference_name)
-				if d.debit and (d.debit > outstanding_amt):
-					frappe.throw(
-						_(
-							"Row No {0}: Amount cannot be greater than the Outstanding Amount against Expense Claim {1}. Outstanding Amount is {2}"
-						).format(d.idx, d.reference_name, outstanding_amt)
-					)
+	if doc.voucher_type == "Exchange Gain Or Loss":
+		return
+
+	rows = [d for d in doc.accounts if d.reference_type == "Expense Claim"]
+	if not rows:
+		return
+
+	claims = {
+		d.name: d
+		for d in frappe.get_all(
+			"Expense Claim",
+			filters={"name": ("in", list({d.reference_name for d in rows}))},
+			fields=[
+				"name",
+				"total_sanctioned_amount",
+				"total_taxes_and_charges",
+				"total_amount_reimbursed",
+				"total_advance_amount",
+			],
+		)
+	}
+	for d in rows:
+		outstanding_amt = get_outstanding_amount_for_claim(claims.get(d.reference_name) or frappe._dict())
+		if d.debit and (d.debit > outstanding_amt):
+			frappe.throw(
+				_(
+					"Row No {0}: Amount cannot be greater than the Outstanding Amount against Expense Claim {1}. Outstanding Amount is {2}"
+				).format(d.idx, d.reference_name, outstanding_amt)
+			)
 
 
 @frappe.whitelist()
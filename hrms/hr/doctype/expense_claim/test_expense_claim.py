@@ -2,7 +2,7 @@
 # See license.txt
 
 import frappe
-from frappe.utils import flt, nowdate, random_string, today
+from frappe.utils import flt, getdate, nowdate, random_string, today
 
 from erpnext import get_company_currency
 from erpnext.accounts.doctype.account.test_account import create_account
@@ -12,9 +12,12 @@ from erpnext.setup.utils import get_exchange_rate
 
 from hrms.hr.doctype.expense_claim.expense_claim import (
 	MismatchError,
+	get_claims_to_reimburse,
 	get_outstanding_amount_for_claim,
+	get_reimbursement_payment_account,
 	make_bank_entry,
 	make_expense_claim_for_delivery_trip,
+	make_reimbursement_entry,
 )
 from hrms.tests.utils import HRMSTestSuite
 
@@ -103,15 +106,76 @@ class TestExpenseClaim(HRMSTestSuite):
 		gl_entry = frappe.get_all("GL Entry", {"voucher_type": "Expense Claim", "voucher_no": claim.name})
 		self.assertEqual(len(gl_entry), 0)
 
+	def test_claims_reconciled_together_from_journal_entry(self):
+		payable_account = get_payable_account(company_name)
+		claims = [
+			make_expense_claim(payable_account, 300, 200, company_name, "Travel Expenses - _TC3"),
+			make_expense_claim(payable_account, 500, 400, company_name, "Travel Expenses - _TC3"),
+		]
+
+		je = frappe.get_doc(make_bank_entry("Expense Claim", claims[0].name))
+		for row in make_bank_entry("Expense Claim", claims[1].name)["accounts"]:
+			row.update(name=None, idx=None)
+			je.append("accounts", row)
+		je.cheque_no = random_string(5)
+		je.cheque_date = nowdate()
+		je.submit()
+
+		for claim, amount in zip(claims, (200, 400), strict=True):
+			claim.load_from_db()
+			self.assertEqual(claim.status, "Paid")
+			self.assertEqual(claim.total_amount_reimbursed, amount)
+
+		je.cancel()
+		for claim in claims:
+			claim.load_from_db()
+			self.assertEqual(claim.status, "Unpaid")
+			self.assertEqual(claim.total_amount_reimbursed, 0)
+
+	def test_bulk_reimbursement(self):
+		payable_account = get_payable_account(company_name)
+		employee = make_employee("test_bulk_reimbursement@expenseclaim.com", company=company_name)
+		claims = [
+			make_expense_claim(
+				payable_account, 300, amount, company_name, "Travel Expenses - _TC3", employee=employee
+			)
+			for amount in (100, 200, 300)
+		]
+
+		args = frappe._dict(
+			company=company_name,
+			reference_no=random_string(5),
+			posting_date=getdate(),
+			submit=1,
+			cost_center=frappe.db.get_value("Company", company_name, "cost_center"),
+		)
+		args.update(get_reimbursement_payment_account(company_name))
+		to_reimburse = get_claims_to_reimburse(args, employee=employee)
+		self.assertEqual(
+			{d.name: d.outstanding_amount for d in to_reimburse},
+			{claim.name: claim.total_sanctioned_amount for claim in claims},
+		)
+
+		je = frappe.get_doc("Journal Entry", make_reimbursement_entry(args, to_reimburse))
+		self.assertEqual(je.total_credit, 600)
+
+		for claim in claims:
+			claim.load_from_db()
+			self.assertEqual(claim.status, "Paid")
+		self.assertFalse(get_claims_to_reimburse(args, employee=employee))
+
 	def test_expense_claim_status_as_payment_from_payment_entry(self):
 		payable_account = get_payable_account(company_name)
 
 		expense_claim = make_expense_claim(payable_account, 300, 200, company_name, "Travel Expenses - _TC3")
+		self.assertEqual(frappe.get_cached_doc("Expense Claim", expense_claim.name).status, "Unpaid")
 
 		pe = make_claim_payment_entry(expense_claim, 200)
 
 		expense_claim.load_from_db()
 		self.assertEqual(expense_claim.status, "Paid")
+		# the bulk update clears the cached document too
+		self.assertEqual(frappe.get_cached_doc("Expense Claim", expense_claim.name).status, "Paid")
 
 		pe.cancel()
 		expense_claim.load_from_db()
@@ -361,6 +425,31 @@ class TestExpenseClaim(HRMSTestSuite):
 			self.assertEqual(expected_values[gle.account][1], gle.debit)
 			self.assertEqual(expected_values[gle.account][2], gle.credit)
 
+	def test_expense_rows_aggregated_in_gl_entries(self):
+		payable_account = get_payable_account(company_name)
+		expense_claim = make_expense_claim(
+			payable_account, 300, 200, company_name, "Travel Expenses - _TC3", do_not_submit=True
+		)
+		row = expense_claim.expenses[0]
+		expense_claim.append(
+			"expenses",
+			{
+				"expense_type": row.expense_type,
+				"default_account": row.default_account,
+				"amount": 400,
+				"sanctioned_amount": 300,
+				"cost_center": row.cost_center,
+			},
+		)
+		expense_claim.submit()
+
+		gl_entries = frappe.get_all(
+			"GL Entry",
+			filters={"voucher_type": "Expense Claim", "voucher_no": expense_claim.name, "debit": (">", 0)},
+			fields=["account", "debit"],
+		)
+		self.assertEqual(gl_entries, [{"account": "Travel Expenses - _TC3", "debit": 500.0}])
+
 	def test_invalid_gain_loss_for_expense_claim(self):
 		payable_account = get_payable_account(company_name)
 		taxes = generate_taxes()
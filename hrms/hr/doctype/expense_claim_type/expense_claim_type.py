@@ -12,6 +12,12 @@ class ExpenseClaimType(Document):
 		self.validate_accounts()
 		self.validate_repeating_companies()
 
+	def clear_cache(self):
+		from hrms.hr.doctype.expense_claim.expense_claim import EXPENSE_CLAIM_ACCOUNTS
+
+		frappe.cache().delete_value(EXPENSE_CLAIM_ACCOUNTS)
+		return super().clear_cache()
+
 	def validate_repeating_companies(self):
 		"""Error when Same Company is entered multiple times in accounts"""
 		accounts_list = []
@@ -1,16 +1,23 @@
 # Copyright (c) 2021, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import time
+from collections import Counter
+
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import flt, get_link_to_form, today
+from frappe.utils import create_batch, flt, get_link_to_form, getdate, today
 
 from hrms.hr.doctype.full_and_final_statement.full_and_final_statement_loan_utils import (
 	cancel_loan_repayment,
 	process_loan_accrual,
 )
 
+# employees whose statements are created per background job in a bulk run
+BULK_STATEMENT_SHARD_SIZE = 100
+BULK_STATEMENT_RUN = "bulk_full_and_final_statement_run"
+
 
 class FullandFinalStatement(Document):
 	def before_insert(self):
@@ -75,15 +82,22 @@ class FullandFinalStatement(Document):
 				_("Set Relieving Date for Employee: {0}").format(get_link_to_form("Employee", self.employee))
 			)
 
+		documents = self.get_prefetched("documents", get_outstanding_documents)
 		if not self.payables:
 			self.add_withheld_salary_slips()
 			components = self.get_payable_component()
-			self.create_component_row(components, "payables")
+			self.create_component_row(components, "payables", documents)
 		if not self.receivables:
 			components = self.get_receivable_component()
-			self.create_component_row(components, "receivables")
+			self.create_component_row(components, "receivables", documents)
 		self.get_assets_statements()
 
+	def get_prefetched(self, key, loader):
+		"""Returns the rows prefetched for this employee by a bulk run, or loads them with `loader`"""
+		if self.flags.prefetched:
+			return self.flags.prefetched[key]
+		return loader([self.employee])[self.employee]
+
 	def get_assets_statements(self):
 		if not len(self.get("assets_allocated", [])):
 			for data in self.get_assets_movement():
@@ -112,17 +126,7 @@ class FullandFinalStatement(Document):
 		)
 
 	def add_withheld_salary_slips(self):
-		salary_slips = frappe.get_all(
-			"Salary Slip",
-			filters={
-				"employee": self.employee,
-				"status": "Withheld",
-				"docstatus": ("!=", 2),
-			},
-			fields=["name", "net_pay"],
-		)
-
-		for slip in salary_slips:
+		for slip in self.get_prefetched("salary_slips", get_withheld_salary_slips):
 			self.append(
 				"payables",
 				{
@@ -130,21 +134,33 @@ class FullandFinalStatement(Document):
 					"component": "Salary Slip",
 					"reference_document_type": "Salary Slip",
 					"reference_document": slip.name,
+					"account": slip.payroll_payable_account,
 					"amount": slip.net_pay,
 					"paid_via_salary_slip": 1,
 				},
 			)
 
-	def create_component_row(self, components, component_type):
+	def create_component_row(self, components, component_type, documents=None):
+		"""Adds a row per outstanding document of each component, or an empty row for the component
+		if the employee has none"""
 		for component in components:
-			self.append(
-				component_type,
-				{
-					"status": "Unsettled",
-					"reference_document_type": component if component != "Bonus" else "Additional Salary",
-					"component": component,
-				},
-			)
+			reference_doctype = component if component != "Bonus" else "Additional Salary"
+			references = [
+				d for d in (documents or {}).get(reference_doctype, []) if d.company == self.company
+			] or [frappe._dict()]
+
+			for reference in references:
+				self.append(
+					component_type,
+					{
+						"status": "Unsettled",
+						"reference_document_type": reference_doctype,
+						"component": component,
+						"reference_document": reference.name,
+						"account": reference.account,
+						"amount": reference.amount,
+					},
+				)
 
 	def get_payable_component(self):
 		return [
@@ -161,12 +177,7 @@ class FullandFinalStatement(Document):
 		return receivables
 
 	def get_assets_movement(self):
-		asset_movements = frappe.get_all(
-			"Asset Movement Item",
-			filters={"docstatus": 1},
-			fields=["asset", "from_employee", "to_employee", "parent", "asset_name"],
-			or_filters={"from_employee": self.employee, "to_employee": self.employee},
-		)
+		asset_movements = self.get_prefetched("asset_movements", get_asset_movements)
 
 		data = []
 		inward_movements = []
@@ -178,19 +189,18 @@ class FullandFinalStatement(Document):
 			if movement.from_employee and movement.from_employee == self.employee:
 				outward_movements.append(movement)
 
-		for movement in inward_movements:
-			outwards_count = [movement.asset for movement in outward_movements].count(movement.asset)
-			inwards_counts = [movement.asset for movement in inward_movements].count(movement.asset)
+		inwards_counts = Counter(movement.asset for movement in inward_movements)
+		outwards_counts = Counter(movement.asset for movement in outward_movements)
 
-			if inwards_counts > outwards_count:
-				cost = frappe.db.get_value("Asset", movement.asset, "total_asset_cost")
+		for movement in inward_movements:
+			if inwards_counts[movement.asset] > outwards_counts[movement.asset]:
 				data.append(
 					{
 						"reference": movement.parent,
 						"asset_name": movement.asset_name,
-						"date": frappe.db.get_value("Asset Movement", movement.parent, "transaction_date"),
-						"actual_cost": cost,
-						"cost": cost,
+						"date": movement.transaction_date,
+						"actual_cost": movement.total_asset_cost,
+						"cost": movement.total_asset_cost,
 						"action": "Return",
 						"status": "Owned",
 					}
@@ -337,3 +347,272 @@ def update_full_and_final_statement_status(doc, method=None):
 			fnf.db_set("status", status)
 			fnf.notify_update()
 			fnf.update_linked_payable_documents()
+
+
+@frappe.whitelist()
+def create_full_and_final_statements(employees: list[str] | str, transaction_date: str | None = None) -> str:
+	"""Queues draft statements for relieved employees that do not have one yet. Statements are created
+	by background jobs of up to `BULK_STATEMENT_SHARD_SIZE` employees, each of which prefetches the
+	outstanding documents of all its employees together."""
+	frappe.has_permission("Full and Final Statement", "create", throw=True)
+
+	employees = frappe.parse_json(employees) if isinstance(employees, str) else employees
+	to_settle = get_employees_to_settle(employees)
+	if not to_settle:
+		frappe.throw(_("No relieved employees without a Full and Final Statement found"))
+
+	if skipped := len(employees) - len(to_settle):
+		frappe.msgprint(
+			_("{0} employees were skipped as they are not relieved or already have a statement").format(
+				skipped
+			),
+			alert=True,
+			indicator="orange",
+		)
+
+	return enqueue_full_and_final_statements(to_settle, getdate(transaction_date))
+
+
+def get_employees_to_settle(employees: list[str]) -> list[str]:
+	"""Returns the employees with a relieving date that do not have a statement yet"""
+	existing = set(
+		frappe.get_all(
+			"Full and Final Statement",
+			filters={"employee": ("in", employees), "docstatus": ("!=", 2)},
+			pluck="employee",
+		)
+	)
+	relieved = frappe.get_all(
+		"Employee",
+		filters={"name": ("in", employees), "relieving_date": ("is", "set")},
+		pluck="name",
+		order_by="name",
+	)
+	return [employee for employee in relieved if employee not in existing]
+
+
+def enqueue_full_and_final_statements(employees: list[str], transaction_date, now: bool = False) -> str:
+	"""Splits the employees into shards whose statements are created by separate background jobs, or
+	creates all of them in this request if `now` is set"""
+	run_id = frappe.generate_hash(length=12)
+	shards = [employees] if now else list(create_batch(employees, BULK_STATEMENT_SHARD_SIZE))
+	frappe.cache().hset(
+		BULK_STATEMENT_RUN, run_id, {"total": len(employees), "processed": 0, "started_at": time.time()}
+	)
+
+	for shard in shards:
+		frappe.enqueue(
+			make_full_and_final_statements,
+			queue="long",
+			timeout=3000,
+			now=now,
+			employees=list(shard),
+			transaction_date=transaction_date,
+			run_id=run_id,
+		)
+
+	return run_id
+
+
+def make_full_and_final_statements(employees: list[str], transaction_date, run_id: str | None = None) -> list:
+	"""Creates the draft statements of a shard of employees from their prefetched withheld salary slips,
+	outstanding documents and asset movements. Returns the created statements."""
+	prefetched = {employee: frappe._dict() for employee in employees}
+	for key, loader in (
+		("salary_slips", get_withheld_salary_slips),
+		("documents", get_outstanding_documents),
+		("asset_movements", get_asset_movements),
+	):
+		for employee, rows in loader(employees).items():
+			prefetched[employee][key] = rows
+
+	success, failure = [], []
+	for employee in employees:
+		fnf = frappe.new_doc("Full and Final Statement", employee=employee, transaction_date=transaction_date)
+		fnf.flags.prefetched = prefetched[employee]
+
+		savepoint = "before_full_and_final_statement"
+		frappe.db.savepoint(savepoint)
+		try:
+			fnf.insert()
+		except frappe.ValidationError as e:
+			frappe.db.rollback(save_point=savepoint)
+			failure.append({"employee": employee, "error": str(e)})
+		else:
+			success.append(fnf.name)
+
+	frappe.clear_messages()
+
+	if failure:
+		frappe.log_error(
+			"Bulk creation of Full and Final Statements failed for some employees",
+			message="\n".join(f"{d['employee']}: {d['error']}" for d in failure),
+			reference_doctype="Full and Final Statement",
+		)
+
+	if run_id:
+		update_bulk_statement_progress(run_id, len(employees), success, [d["employee"] for d in failure])
+
+	return success
+
+
+def get_withheld_salary_slips(employees: list[str]) -> dict[str, list]:
+	"""Returns the withheld salary slips of `employees` with their payroll payable accounts"""
+	SalarySlip = frappe.qb.DocType("Salary Slip")
+	PayrollEntry = frappe.qb.DocType("Payroll Entry")
+	salary_slips = (
+		frappe.qb.from_(SalarySlip)
+		.left_join(PayrollEntry)
+		.on(SalarySlip.payroll_entry == PayrollEntry.name)
+		.select(
+			SalarySlip.name, SalarySlip.employee, SalarySlip.net_pay, PayrollEntry.payroll_payable_account
+		)
+		.where(
+			(SalarySlip.employee.isin(employees))
+			& (SalarySlip.status == "Withheld")
+			& (SalarySlip.docstatus != 2)
+		)
+		.orderby(SalarySlip.name)
+		.run(as_dict=True)
+	)
+
+	slips_by_employee = {employee: [] for employee in employees}
+	for slip in salary_slips:
+		slips_by_employee[slip.employee].append(slip)
+	return slips_by_employee
+
+
+def get_outstanding_documents(employees: list[str]) -> dict[str, dict]:
+	"""Returns the unpaid gratuities, leave encashments and expense claims and the unsettled advances of
+	`employees` by document type, with the accounts and amounts `get_account_and_amount` would return"""
+	Gratuity = frappe.qb.DocType("Gratuity")
+	LeaveEncashment = frappe.qb.DocType("Leave Encashment")
+	ExpenseClaim = frappe.qb.DocType("Expense Claim")
+	EmployeeAdvance = frappe.qb.DocType("Employee Advance")
+
+	queries = {
+		"Gratuity": frappe.qb.from_(Gratuity)
+		.select(Gratuity.payable_account.as_("account"), Gratuity.amount)
+		.where(
+			(Gratuity.docstatus == 1) & (Gratuity.status == "Unpaid") & (Gratuity.pay_via_salary_slip == 0)
+		),
+		"Leave Encashment": frappe.qb.from_(LeaveEncashment)
+		.select(LeaveEncashment.encashment_amount.as_("amount"))
+		.where(
+			(LeaveEncashment.docstatus == 1)
+			& (LeaveEncashment.status == "Unpaid")
+			& (LeaveEncashment.pay_via_payment_entry == 1)
+		),
+		"Expense Claim": frappe.qb.from_(ExpenseClaim)
+		.select(
+			ExpenseClaim.payable_account.as_("account"),
+			(
+				ExpenseClaim.grand_total
+				- (ExpenseClaim.total_amount_reimbursed + ExpenseClaim.total_advance_amount)
+			).as_("amount"),
+		)
+		.where(
+			(ExpenseClaim.docstatus == 1)
+			& (ExpenseClaim.status == "Unpaid")
+			& (ExpenseClaim.approval_status == "Approved")
+		),
+		"Employee Advance": frappe.qb.from_(EmployeeAdvance)
+		.select(
+			EmployeeAdvance.advance_account.as_("account"),
+			(
+				EmployeeAdvance.paid_amount - (EmployeeAdvance.claimed_amount + EmployeeAdvance.return_amount)
+			).as_("amount"),
+		)
+		.where(EmployeeAdvance.docstatus == 1),
+	}
+
+	documents_by_employee = {employee: {} for employee in employees}
+	for doctype, query in queries.items():
+		table = frappe.qb.DocType(doctype)
+		documents = (
+			query.select(table.name, table.employee, table.company)
+			.where(table.employee.isin(employees))
+			.orderby(table.name)
+			.run(as_dict=True)
+		)
+		for d in documents:
+			if flt(d.amount) <= 0:
+				continue
+			if doctype == "Leave Encashment":
+				d.account = frappe.get_cached_value("Company", d.company, "default_payroll_payable_account")
+			documents_by_employee[d.employee].setdefault(doctype, []).append(d)
+
+	return documents_by_employee
+
+
+def get_asset_movements(employees: list[str]) -> dict[str, list]:
+	"""Returns the submitted asset movements to or from `employees` along with the movement dates and
+	asset costs"""
+	AssetMovementItem = frappe.qb.DocType("Asset Movement Item")
+	AssetMovement = frappe.qb.DocType("Asset Movement")
+	Asset = frappe.qb.DocType("Asset")
+	asset_movements = (
+		frappe.qb.from_(AssetMovementItem)
+		.join(AssetMovement)
+		.on(AssetMovementItem.parent == AssetMovement.name)
+		.left_join(Asset)
+		.on(AssetMovementItem.asset == Asset.name)
+		.select(
+			AssetMovementItem.asset,
+			AssetMovementItem.from_employee,
+			AssetMovementItem.to_employee,
+			AssetMovementItem.parent,
+			AssetMovementItem.asset_name,
+			AssetMovement.transaction_date,
+			Asset.total_asset_cost,
+		)
+		.where(
+			(AssetMovementItem.docstatus == 1)
+			& (
+				AssetMovementItem.from_employee.isin(employees)
+				| AssetMovementItem.to_employee.isin(employees)
+			)
+		)
+		.orderby(AssetMovement.transaction_date)
+		.orderby(AssetMovementItem.parent)
+		.run(as_dict=True)
+	)
+
+	movements_by_employee = {employee: [] for employee in employees}
+	for movement in asset_movements:
+		for employee in {movement.from_employee, movement.to_employee}:
+			if employee in movements_by_employee:
+				movements_by_employee[employee].append(movement)
+	return movements_by_employee
+
+
+def update_bulk_statement_progress(run_id: str, processed: int, success: list, failure: list) -> None:
+	cache = frappe.cache()
+	# shards finish in any order, so lock the run while merging the results of this shard
+	with cache.lock(f"{BULK_STATEMENT_RUN}::{run_id}", timeout=60):
+		run = cache.hget(BULK_STATEMENT_RUN, run_id) or {}
+		run["processed"] = run.get("processed", 0) + processed
+		for key, value in (("success", success), ("failure", failure)):
+			run[key] = run.get(key, []) + value
+		cache.hset(BULK_STATEMENT_RUN, run_id, run)
+
+	total = run.get("total") or processed
+	frappe.publish_progress(
+		run["processed"] * 100 / total,
+		title=_("Creating Full and Final Statements..."),
+		description=_("{0} of {1} employees processed").format(run["processed"], total),
+	)
+
+	if run["processed"] >= total:
+		cache.hdel(BULK_STATEMENT_RUN, run_id)
+		time_taken = time.time() - run.get("started_at", time.time())
+		frappe.publish_realtime(
+			"completed_bulk_full_and_final_statement",
+			message={
+				"success": run["success"],
+				"failure": run["failure"],
+				"time_taken": flt(time_taken, 3),
+			},
+			user=frappe.session.user,
+			after_commit=True,
+		)
@@ -9,6 +9,11 @@ from erpnext.assets.doctype.asset.test_asset import create_asset_data
 from erpnext.setup.doctype.employee.test_employee import make_employee
 from erpnext.stock.doctype.purchase_receipt.test_purchase_receipt import make_purchase_receipt
 
+from hrms.hr.doctype.full_and_final_statement.full_and_final_statement import (
+	get_employees_to_settle,
+	make_full_and_final_statements,
+)
+
 
 class TestFullandFinalStatement(IntegrationTestCase):
 	def setUp(self):
@@ -71,6 +76,23 @@ class TestFullandFinalStatement(IntegrationTestCase):
 		self.assertEqual(debit_entry.reference_type, "Full and Final Statement")
 		self.assertEqual(debit_entry.reference_name, self.fnf.name)
 
+	def test_bulk_creation(self):
+		employee = make_employee(
+			"test_bulk_fnf@example.com", company="_Test Company", relieving_date=add_days(today(), 30)
+		)
+		movement = create_asset_movement(employee)
+
+		# employees with a statement are skipped
+		self.assertEqual(get_employees_to_settle([self.employee, employee]), [employee])
+
+		statements = make_full_and_final_statements([employee], today())
+		fnf = frappe.get_doc("Full and Final Statement", statements[0])
+		self.assertEqual(fnf.employee, employee)
+		self.assertEqual([d.component for d in fnf.payables], [d.component for d in self.fnf.payables])
+		self.assertEqual([d.reference for d in fnf.assets_allocated], [movement])
+		self.assertEqual(fnf.assets_allocated[0].cost, 100000.0)
+		self.assertFalse(get_employees_to_settle([employee]))
+
 
 def create_full_and_final_statement(employee):
 	fnf = frappe.new_doc("Full and Final Statement")
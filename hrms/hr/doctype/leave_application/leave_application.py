@@ -2,6 +2,8 @@
 # License: GNU General Public License v3. See license.txt
 
 import datetime
+import hashlib
+from collections.abc import Callable
 
 import frappe
 from frappe import _
@@ -9,14 +11,21 @@ from frappe.model.workflow import get_workflow_name
 from frappe.query_builder.functions import Max, Min, Sum
 from frappe.utils import (
 	add_days,
+	add_months,
+	add_to_date,
 	cint,
 	cstr,
 	date_diff,
 	flt,
 	formatdate,
+	get_datetime,
+	get_first_day,
 	get_fullname,
+	get_last_day,
 	get_link_to_form,
 	getdate,
+	now,
+	now_datetime,
 	nowdate,
 )
 
@@ -25,7 +34,11 @@ from erpnext.setup.doctype.employee.employee import get_holiday_list_for_employe
 
 import hrms
 from hrms.api import get_current_employee_info
-from hrms.hr.doctype.leave_block_list.leave_block_list import get_applicable_block_dates
+from hrms.hr.doctype.employee_attendance_day.employee_attendance_day import sync_attendance_days
+from hrms.hr.doctype.leave_block_list.leave_block_list import (
+	get_applicable_block_dates,
+	get_applicable_block_lists,
+)
 from hrms.hr.doctype.leave_ledger_entry.leave_ledger_entry import create_leave_ledger_entry
 from hrms.hr.utils import (
 	get_holiday_dates_for_employee,
@@ -62,6 +75,16 @@ class LeaveAcrossAllocationsError(frappe.ValidationError):
 	pass
 
 
+# cached calendar feeds, one hash per (company, department) with a field per month
+LEAVE_CALENDAR_FEED = "leave_calendar_feed"
+# holiday events, one hash per holiday list with a field per month
+HOLIDAY_CALENDAR_FEED = "holiday_calendar_feed"
+# leave applications deleted from a department's calendar, used for incremental fetch
+DELETED_CALENDAR_LEAVES = "leave_calendar_deleted_leaves"
+# deleted leave applications are tracked for this long, older incremental fetches get the whole feed
+DELETED_CALENDAR_LEAVES_RETENTION_HOURS = 24
+
+
 from frappe.model.document import Document
 
 
@@ -73,21 +96,49 @@ class LeaveApplication(Document, PWANotificationsMixin):
 		self.notify_approver()
 
 	def validate(self):
+		# leave type details and the employee's leave index are loaded once per validation
+		self._leave_type_details = None
+		self._leave_index = None
+
 		validate_active_employee(self.employee)
 		set_employee_name(self)
 		self.validate_dates()
 		self.validate_balance_leaves()
 		self.validate_leave_overlap()
 		self.validate_max_days()
-		self.show_block_day_warning()
 		self.validate_block_days()
 		self.validate_salary_processed_days()
 		self.validate_attendance()
 		self.set_half_day_date()
-		if frappe.db.get_value("Leave Type", self.leave_type, "is_optional_leave"):
+		if self.get_leave_type_details().is_optional_leave:
 			self.validate_optional_leave()
 		self.validate_applicable_after()
 
+	def get_leave_type_details(self) -> frappe._dict:
+		if not getattr(self, "_leave_type_details", None) or self._leave_type_details.name != self.leave_type:
+			self._leave_type_details = frappe.db.get_value(
+				"Leave Type",
+				self.leave_type,
+				[
+					"name",
+					"is_lwp",
+					"is_optional_leave",
+					"include_holiday",
+					"allow_negative",
+					"applicable_after",
+					"max_continuous_days_allowed",
+				],
+				as_dict=True,
+			) or frappe._dict(name=self.leave_type)
+
+		return self._leave_type_details
+
+	def get_leave_index(self) -> "EmployeeLeaveIndex":
+		if not getattr(self, "_leave_index", None) or self._leave_index.employee != self.employee:
+			self._leave_index = EmployeeLeaveIndex(self.employee)
+
+		return self._leave_index
+
 	def on_update(self):
 		if self.status == "Open" and self.docstatus < 1:
 			# notify leave approver about creation
@@ -127,16 +178,19 @@ class LeaveApplication(Document, PWANotificationsMixin):
 
 	def after_delete(self):
 		self.publish_update()
+		company, department = get_calendar_feed_scope(self.employee)
+		record_deleted_calendar_leave(self.name, company, department)
 
 	def publish_update(self):
 		employee_user = frappe.db.get_value("Employee", self.employee, "user_id", cache=True)
 		hrms.refetch_resource("hrms:my_leaves", employee_user)
 		hrms.refetch_resource("hrms:team_leaves")
+		clear_leave_calendar_cache(self)
 
 	def validate_applicable_after(self):
 		if self.leave_type:
-			leave_type = frappe.get_doc("Leave Type", self.leave_type)
-			if leave_type.applicable_after > 0:
+			leave_type = self.get_leave_type_details()
+			if cint(leave_type.applicable_after) > 0:
 				date_of_joining = frappe.db.get_value("Employee", self.employee, "date_of_joining")
 				leave_days = get_approved_leaves_for_period(
 					self.employee, False, date_of_joining, self.from_date
@@ -144,7 +198,7 @@ class LeaveApplication(Document, PWANotificationsMixin):
 				number_of_days = date_diff(getdate(self.from_date), date_of_joining)
 				if number_of_days >= 0:
 					holidays = 0
-					if not frappe.db.get_value("Leave Type", self.leave_type, "include_holiday"):
+					if not leave_type.include_holiday:
 						holidays = get_holidays(self.employee, date_of_joining, self.from_date)
 					number_of_days = number_of_days - leave_days - holidays
 					if number_of_days < leave_type.applicable_after:
@@ -190,12 +244,12 @@ class LeaveApplication(Document, PWANotificationsMixin):
 		):
 			frappe.throw(_("Half Day Date should be between From Date and To Date"))
 
-		if not is_lwp(self.leave_type):
+		if not self.get_leave_type_details().is_lwp:
 			self.validate_dates_across_allocation()
 			self.validate_back_dated_application()
 
 	def validate_dates_across_allocation(self):
-		if frappe.db.get_value("Leave Type", self.leave_type, "allow_negative"):
+		if self.get_leave_type_details().allow_negative:
 			return
 
 		alloc_on_from_date, alloc_on_to_date = self.get_allocation_based_on_application_dates()
@@ -211,20 +265,22 @@ class LeaveApplication(Document, PWANotificationsMixin):
 	def get_allocation_based_on_application_dates(self) -> tuple[dict, dict]:
 		"""Returns allocation name, from and to dates for application dates"""
 
-		def _get_leave_allocation_record(date):
-			LeaveAllocation = frappe.qb.DocType("Leave Allocation")
-			allocation = (
-				frappe.qb.from_(LeaveAllocation)
-				.select(LeaveAllocation.name, LeaveAllocation.from_date, LeaveAllocation.to_date)
-				.where(
-					(LeaveAllocation.employee == self.employee)
-					& (LeaveAllocation.leave_type == self.leave_type)
-					& (LeaveAllocation.docstatus == 1)
-					& ((date >= LeaveAllocation.from_date) & (date <= LeaveAllocation.to_date))
-				)
-			).run(as_dict=True)
+		LeaveAllocation = frappe.qb.DocType("Leave Allocation")
+		allocations = (
+			frappe.qb.from_(LeaveAllocation)
+			.select(LeaveAllocation.name, LeaveAllocation.from_date, LeaveAllocation.to_date)
+			.where(
+				(LeaveAllocation.employee == self.employee)
+				& (LeaveAllocation.leave_type == self.leave_type)
+				& (LeaveAllocation.docstatus == 1)
+				& (LeaveAllocation.from_date <= self.to_date)
+				& (LeaveAllocation.to_date >= self.from_date)
+			)
+		).run(as_dict=True)
 
-			return allocation and allocation[0]
+		def _get_leave_allocation_record(date):
+			date = getdate(date)
+			return next((d for d in allocations if d.from_date <= date <= d.to_date), {})
 
 		allocation_based_on_from_date = _get_leave_allocation_record(self.from_date)
 		allocation_based_on_to_date = _get_leave_allocation_record(self.to_date)
@@ -280,6 +336,9 @@ class LeaveApplication(Document, PWANotificationsMixin):
 
 			self.create_or_update_attendance(attendance_name, date)
 
+		# existing attendance is updated without hooks
+		sync_attendance_days([self.employee], self.from_date, self.to_date)
+
 	def create_or_update_attendance(self, attendance_name, date):
 		status = (
 			"Half Day" if self.half_day_date and getdate(date) == getdate(self.half_day_date) else "On Leave"
@@ -326,8 +385,10 @@ class LeaveApplication(Document, PWANotificationsMixin):
 			for name in attendance:
 				frappe.db.set_value("Attendance", name, "docstatus", 2)
 
+			sync_attendance_days([self.employee], self.from_date, self.to_date)
+
 	def validate_salary_processed_days(self):
-		if not frappe.db.get_value("Leave Type", self.leave_type, "is_lwp"):
+		if not self.get_leave_type_details().is_lwp:
 			return
 
 		last_processed_pay_slip = frappe.db.sql(
@@ -347,15 +408,16 @@ class LeaveApplication(Document, PWANotificationsMixin):
 				).format(formatdate(last_processed_pay_slip[0][0]), formatdate(last_processed_pay_slip[0][1]))
 			)
 
-	def show_block_day_warning(self):
-		block_dates = get_applicable_block_dates(
-			self.from_date,
-			self.to_date,
-			self.employee,
-			self.company,
-			all_lists=True,
-			leave_type=self.leave_type,
-		)
+	def show_block_day_warning(self, block_dates=None):
+		if block_dates is None:
+			block_dates = get_applicable_block_dates(
+				self.from_date,
+				self.to_date,
+				self.employee,
+				self.company,
+				all_lists=True,
+				leave_type=self.leave_type,
+			)
 
 		if block_dates:
 			frappe.msgprint(_("Warning: Leave application contains following block dates") + ":")
@@ -363,11 +425,28 @@ class LeaveApplication(Document, PWANotificationsMixin):
 				frappe.msgprint(formatdate(d.block_date) + ": " + d.reason)
 
 	def validate_block_days(self):
-		block_dates = get_applicable_block_dates(
-			self.from_date, self.to_date, self.employee, self.company, leave_type=self.leave_type
+		"""Warns about all block dates in the application period and blocks approval on dates of lists
+		the user is not allowed to approve leaves for. Block dates are fetched once for both checks."""
+		block_lists = get_applicable_block_lists(self.employee, self.company, True, self.leave_type)
+		block_dates = frappe.db.get_all(
+			"Leave Block List Date",
+			filters={
+				"parent": ["IN", block_lists],
+				"block_date": ["BETWEEN", [getdate(self.from_date), getdate(self.to_date)]],
+			},
+			fields=["block_date", "reason", "parent"],
 		)
+		self.show_block_day_warning(block_dates)
+
+		if not block_dates or self.status != "Approved":
+			return
 
-		if block_dates and self.status == "Approved":
+		allowed_lists = frappe.db.get_all(
+			"Leave Block List Allow",
+			filters={"parent": ["IN", block_lists], "allow_user": frappe.session.user},
+			pluck="parent",
+		)
+		if any(d.parent not in allowed_lists for d in block_dates):
 			frappe.throw(_("You are not authorized to approve leaves on Block Dates"), LeaveDayBlockedError)
 
 	def validate_balance_leaves(self):
@@ -390,7 +469,7 @@ class LeaveApplication(Document, PWANotificationsMixin):
 					)
 				)
 
-			if not is_lwp(self.leave_type):
+			if not self.get_leave_type_details().is_lwp:
 				leave_balance = get_leave_balance_on(
 					self.employee,
 					self.leave_type,
@@ -410,7 +489,7 @@ class LeaveApplication(Document, PWANotificationsMixin):
 	def show_insufficient_balance_message(self, leave_balance_for_consumption: float) -> None:
 		alloc_on_from_date, alloc_on_to_date = self.get_allocation_based_on_application_dates()
 
-		if frappe.db.get_value("Leave Type", self.leave_type, "allow_negative"):
+		if self.get_leave_type_details().allow_negative:
 			if leave_balance_for_consumption != self.leave_balance:
 				msg = _("Warning: Insufficient leave balance for Leave Type {0} in this allocation.").format(
 					frappe.bold(self.leave_type)
@@ -437,22 +516,7 @@ class LeaveApplication(Document, PWANotificationsMixin):
 			# hack! if name is null, it could cause problems with !=
 			self.name = "New Leave Application"
 
-		for d in frappe.db.sql(
-			"""
-			select
-				name, leave_type, posting_date, from_date, to_date, total_leave_days, half_day_date
-			from `tabLeave Application`
-			where employee = %(employee)s and docstatus < 2 and status in ('Open', 'Approved')
-			and to_date >= %(from_date)s and from_date <= %(to_date)s
-			and name != %(name)s""",
-			{
-				"employee": self.employee,
-				"from_date": self.from_date,
-				"to_date": self.to_date,
-				"name": self.name,
-			},
-			as_dict=1,
-		):
+		for d in self.get_leave_index().get_overlapping_applications(self.from_date, self.to_date, self.name):
 			if (
 				cint(self.half_day) == 1
 				and getdate(self.half_day_date) == getdate(d.half_day_date)
@@ -476,21 +540,10 @@ class LeaveApplication(Document, PWANotificationsMixin):
 		frappe.throw(msg, OverlapError)
 
 	def get_total_leaves_on_half_day(self):
-		leave_count_on_half_day_date = frappe.db.sql(
-			"""select count(name) from `tabLeave Application`
-			where employee = %(employee)s
-			and docstatus < 2
-			and status in ('Open', 'Approved')
-			and half_day = 1
-			and half_day_date = %(half_day_date)s
-			and name != %(name)s""",
-			{"employee": self.employee, "half_day_date": self.half_day_date, "name": self.name},
-		)[0][0]
-
-		return leave_count_on_half_day_date * 0.5
+		return self.get_leave_index().get_half_day_leave_count(self.half_day_date, self.name) * 0.5
 
 	def validate_max_days(self):
-		max_days = frappe.db.get_value("Leave Type", self.leave_type, "max_continuous_days_allowed")
+		max_days = self.get_leave_type_details().max_continuous_days_allowed
 		if not max_days:
 			return
 
@@ -510,50 +563,9 @@ class LeaveApplication(Document, PWANotificationsMixin):
 			frappe.throw(msg, title=_("Maximum Consecutive Leaves Exceeded"))
 
 	def get_consecutive_leave_details(self) -> dict:
-		leave_applications = set()
-
-		def _get_first_from_date(reference_date):
-			"""gets `from_date` of first leave application from previous consecutive leave applications"""
-			prev_date = add_days(reference_date, -1)
-			application = frappe.db.get_value(
-				"Leave Application",
-				{
-					"employee": self.employee,
-					"leave_type": self.leave_type,
-					"to_date": prev_date,
-					"docstatus": ["!=", 2],
-					"status": ["in", ["Open", "Approved"]],
-				},
-				["name", "from_date"],
-				as_dict=True,
-			)
-			if application:
-				leave_applications.add(application.name)
-				return _get_first_from_date(application.from_date)
-			return reference_date
-
-		def _get_last_to_date(reference_date):
-			"""gets `to_date` of last leave application from following consecutive leave applications"""
-			next_date = add_days(reference_date, 1)
-			application = frappe.db.get_value(
-				"Leave Application",
-				{
-					"employee": self.employee,
-					"leave_type": self.leave_type,
-					"from_date": next_date,
-					"docstatus": ["!=", 2],
-					"status": ["in", ["Open", "Approved"]],
-				},
-				["name", "to_date"],
-				as_dict=True,
-			)
-			if application:
-				leave_applications.add(application.name)
-				return _get_last_to_date(application.to_date)
-			return reference_date
-
-		first_from_date = _get_first_from_date(self.from_date)
-		last_to_date = _get_last_to_date(self.to_date)
+		first_from_date, last_to_date, leave_applications = self.get_leave_index().get_consecutive_span(
+			self.leave_type, self.from_date, self.to_date
+		)
 
 		total_consecutive_leaves = get_number_of_leave_days(
 			self.employee, self.leave_type, first_from_date, last_to_date
@@ -707,7 +719,7 @@ class LeaveApplication(Document, PWANotificationsMixin):
 		expiry_date = get_allocation_expiry_for_cf_leaves(
 			self.employee, self.leave_type, self.to_date, self.from_date
 		)
-		lwp = frappe.db.get_value("Leave Type", self.leave_type, "is_lwp")
+		lwp = self.get_leave_type_details().is_lwp
 
 		if expiry_date:
 			self.create_ledger_entry_for_intermediate_allocation_expiry(expiry_date, submit, lwp)
@@ -850,6 +862,68 @@ class LeaveApplication(Document, PWANotificationsMixin):
 		)
 
 
+class EmployeeLeaveIndex:
+	"""Open and approved leave applications of an employee, loaded with a single query and indexed by
+	dates so that overlap, half day and consecutive leave checks can be answered in memory."""
+
+	def __init__(self, employee: str):
+		self.employee = employee
+		self.applications = frappe.get_all(
+			"Leave Application",
+			filters={"employee": employee, "docstatus": ("<", 2), "status": ("in", ["Open", "Approved"])},
+			fields=[
+				"name",
+				"leave_type",
+				"posting_date",
+				"from_date",
+				"to_date",
+				"total_leave_days",
+				"half_day",
+				"half_day_date",
+			],
+			order_by="from_date",
+		)
+		self.by_from_date = {(d.leave_type, d.from_date): d for d in self.applications}
+		self.by_to_date = {(d.leave_type, d.to_date): d for d in self.applications}
+
+	def get_overlapping_applications(self, from_date, to_date, exclude: str | None = None) -> list[dict]:
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		return [
+			d
+			for d in self.applications
+			if d.to_date >= from_date and d.from_date <= to_date and d.name != exclude
+		]
+
+	def get_half_day_leave_count(self, half_day_date, exclude: str | None = None) -> int:
+		half_day_date = getdate(half_day_date)
+		return sum(
+			1
+			for d in self.applications
+			if d.half_day and d.half_day_date == half_day_date and d.name != exclude
+		)
+
+	def get_consecutive_span(self, leave_type: str, from_date, to_date) -> tuple:
+		"""Returns the first `from_date` and last `to_date` of the leave applications of `leave_type`
+		that are consecutive to the given period, along with their names"""
+		leave_applications = set()
+
+		first_from_date = getdate(from_date)
+		while application := self.by_to_date.get((leave_type, add_days(first_from_date, -1))):
+			if application.name in leave_applications:
+				break
+			leave_applications.add(application.name)
+			first_from_date = application.from_date
+
+		last_to_date = getdate(to_date)
+		while application := self.by_from_date.get((leave_type, add_days(last_to_date, 1))):
+			if application.name in leave_applications:
+				break
+			leave_applications.add(application.name)
+			last_to_date = application.to_date
+
+		return first_from_date, last_to_date, leave_applications
+
+
 def get_allocation_expiry_for_cf_leaves(
 	employee: str, leave_type: str, to_date: datetime.date, from_date: datetime.date
 ) -> str:
@@ -921,15 +995,9 @@ def get_leave_details(employee, date, for_salary_slip=False):
 
 		leaves_taken = get_leaves_for_period(employee, d, allocation.from_date, to_date) * -1
 		leaves_pending = get_leaves_pending_approval_for_period(employee, d, allocation.from_date, to_date)
-		expired_leaves = allocation.total_leaves_allocated - (remaining_leaves + leaves_taken)
-
-		leave_allocation[d] = {
-			"total_leaves": flt(allocation.total_leaves_allocated, precision),
-			"expired_leaves": flt(expired_leaves, precision) if expired_leaves > 0 else 0,
-			"leaves_taken": flt(leaves_taken, precision),
-			"leaves_pending_approval": flt(leaves_pending, precision),
-			"remaining_leaves": flt(remaining_leaves, precision),
-		}
+		leave_allocation[d] = get_allocation_summary(
+			allocation, remaining_leaves, leaves_taken, leaves_pending, precision
+		)
 
 	# is used in set query
 	lwp = frappe.get_list("Leave Type", filters={"is_lwp": 1}, pluck="name")
@@ -941,6 +1009,292 @@ def get_leave_details(employee, date, for_salary_slip=False):
 	}
 
 
+def get_leave_details_bulk(employees: list[str], date, for_salary_slip: bool = False) -> dict[str, dict]:
+	"""Returns `get_leave_details` of each employee on `date`. Balances are computed in memory from
+	grouped ledger and leave application queries, so the query count does not grow with employees."""
+	if not employees:
+		return {}
+
+	date = getdate(date)
+	precision = cint(frappe.db.get_single_value("System Settings", "float_precision")) or 2
+	allocation_records = get_leave_allocation_records_bulk(employees, date)
+	index = LeaveBalanceIndex(employees, allocation_records)
+	leave_approvers = get_leave_approvers(employees)
+
+	# is used in set query
+	lwp = frappe.get_list("Leave Type", filters={"is_lwp": 1}, pluck="name")
+
+	details = {}
+	for employee in employees:
+		leave_allocation = {}
+		for leave_type, allocation in allocation_records.get(employee, {}).items():
+			to_date = date if for_salary_slip else allocation.to_date
+			remaining_leaves = index.get_leave_balance(
+				allocation,
+				date,
+				to_date=to_date,
+				consider_all_leaves_in_the_allocation_period=not for_salary_slip,
+			)
+
+			leaves_taken = (
+				index.get_leaves_for_period(employee, leave_type, allocation.from_date, to_date) * -1
+			)
+			leaves_pending = index.get_leaves_pending_approval_for_period(
+				employee, leave_type, allocation.from_date, to_date
+			)
+			leave_allocation[leave_type] = get_allocation_summary(
+				allocation, remaining_leaves, leaves_taken, leaves_pending, precision
+			)
+
+		details[employee] = {
+			"leave_allocation": leave_allocation,
+			"leave_approver": leave_approvers.get(employee),
+			"lwps": lwp,
+		}
+
+	return details
+
+
+def get_allocation_summary(
+	allocation: dict, remaining_leaves: float, leaves_taken: float, leaves_pending: float, precision: int
+) -> dict[str, float]:
+	expired_leaves = allocation.total_leaves_allocated - (remaining_leaves + leaves_taken)
+
+	return {
+		"total_leaves": flt(allocation.total_leaves_allocated, precision),
+		"expired_leaves": flt(expired_leaves, precision) if expired_leaves > 0 else 0,
+		"leaves_taken": flt(leaves_taken, precision),
+		"leaves_pending_approval": flt(leaves_pending, precision),
+		"remaining_leaves": flt(remaining_leaves, precision),
+	}
+
+
+class LeaveBalanceIndex:
+	"""Leave ledger entries, carry forward expiries and open leave applications of many employees, loaded
+	with a fixed number of queries so that balances can be computed in memory like `get_leave_balance_on`."""
+
+	def __init__(self, employees: list[str], allocation_records: dict[str, dict]):
+		self.employees = employees
+		allocations = [a for records in allocation_records.values() for a in records.values()]
+		if not allocations:
+			self.entries, self.cf_expiries, self.pending_applications = {}, {}, {}
+			return
+
+		from_date = min(getdate(a.from_date) for a in allocations)
+		to_date = max(getdate(a.to_date) for a in allocations)
+
+		self.entries = self.get_leave_entries(from_date, to_date)
+		self.cf_expiries = self.get_cf_expiries(from_date, to_date)
+		self.pending_applications = self.get_pending_applications()
+		self.set_leave_day_inputs(from_date, to_date)
+
+	def get_leave_entries(self, from_date, to_date) -> dict[tuple, list]:
+		Ledger = frappe.qb.DocType("Leave Ledger Entry")
+		entries = (
+			frappe.qb.from_(Ledger)
+			.select(
+				Ledger.employee,
+				Ledger.leave_type,
+				Ledger.from_date,
+				Ledger.to_date,
+				Ledger.leaves,
+				Ledger.transaction_name,
+				Ledger.transaction_type,
+				Ledger.holiday_list,
+				Ledger.is_carry_forward,
+				Ledger.is_expired,
+			)
+			.where(
+				(Ledger.employee.isin(self.employees))
+				& (Ledger.docstatus == 1)
+				& ((Ledger.leaves < 0) | (Ledger.is_expired == 1))
+				& (Ledger.from_date <= to_date)
+				& (Ledger.to_date >= from_date)
+			)
+		).run(as_dict=True)
+
+		entries_by_type = {}
+		for d in entries:
+			entries_by_type.setdefault((d.employee, d.leave_type), []).append(d)
+		return entries_by_type
+
+	def get_cf_expiries(self, from_date, to_date) -> dict[tuple, list]:
+		Ledger = frappe.qb.DocType("Leave Ledger Entry")
+		expiries = (
+			frappe.qb.from_(Ledger)
+			.select(Ledger.employee, Ledger.leave_type, Ledger.to_date)
+			.where(
+				(Ledger.employee.isin(self.employees))
+				& (Ledger.is_carry_forward == 1)
+				& (Ledger.transaction_type == "Leave Allocation")
+				& (Ledger.to_date.between(from_date, to_date))
+				& (Ledger.docstatus == 1)
+			)
+			.orderby(Ledger.to_date)
+		).run(as_dict=True)
+
+		expiries_by_type = {}
+		for d in expiries:
+			expiries_by_type.setdefault((d.employee, d.leave_type), []).append(d.to_date)
+		return expiries_by_type
+
+	def get_pending_applications(self) -> dict[tuple, list]:
+		applications = frappe.get_all(
+			"Leave Application",
+			filters={"employee": ("in", self.employees), "status": "Open"},
+			fields=["employee", "leave_type", "from_date", "to_date", "total_leave_days"],
+		)
+
+		applications_by_type = {}
+		for d in applications:
+			applications_by_type.setdefault((d.employee, d.leave_type), []).append(d)
+		return applications_by_type
+
+	def set_leave_day_inputs(self, from_date, to_date) -> None:
+		"""Loads what `get_number_of_leave_days` would otherwise query for each leave application entry"""
+		entries = [d for entries in self.entries.values() for d in entries]
+		half_day_applications = [
+			d.transaction_name for d in entries if d.transaction_type == "Leave Application" and d.leaves % 1
+		]
+		self.half_day_dates = (
+			dict(
+				frappe.get_all(
+					"Leave Application",
+					filters={"name": ("in", half_day_applications)},
+					fields=["name", "half_day_date"],
+					as_list=True,
+				)
+			)
+			if half_day_applications
+			else {}
+		)
+
+		self.include_holiday = dict(
+			frappe.get_all("Leave Type", fields=["name", "include_holiday"], as_list=True)
+		)
+
+		Employee = frappe.qb.DocType("Employee")
+		Company = frappe.qb.DocType("Company")
+		self.employee_holiday_lists = {
+			d.name: d.holiday_list or d.default_holiday_list
+			for d in (
+				frappe.qb.from_(Employee)
+				.left_join(Company)
+				.on(Employee.company == Company.name)
+				.select(Employee.name, Employee.holiday_list, Company.default_holiday_list)
+				.where(Employee.name.isin(self.employees))
+			).run(as_dict=True)
+		}
+
+		holiday_lists = {d.holiday_list for d in entries if d.holiday_list}
+		holiday_lists.update(d for d in self.employee_holiday_lists.values() if d)
+		self.holidays = {}
+		if not (entries and holiday_lists):
+			return
+
+		from_date = min(from_date, *(getdate(d.from_date) for d in entries))
+		to_date = max(to_date, *(getdate(d.to_date) for d in entries))
+		Holiday = frappe.qb.DocType("Holiday")
+		for holiday_list, holiday_date in (
+			frappe.qb.from_(Holiday)
+			.select(Holiday.parent, Holiday.holiday_date)
+			.where(
+				(Holiday.parenttype == "Holiday List")
+				& (Holiday.parent.isin(list(holiday_lists)))
+				& (Holiday.holiday_date.between(from_date, to_date))
+			)
+		).run():
+			self.holidays.setdefault(holiday_list, set()).add(getdate(holiday_date))
+
+	def get_leave_balance(
+		self,
+		allocation: dict,
+		date: datetime.date,
+		to_date: datetime.date,
+		consider_all_leaves_in_the_allocation_period: bool = False,
+	) -> float:
+		"""In-memory equivalent of `get_leave_balance_on` for an allocation record"""
+		employee, leave_type = allocation.employee, allocation.leave_type
+		end_date = allocation.to_date if consider_all_leaves_in_the_allocation_period else date
+		cf_expiry = self.get_allocation_expiry_for_cf_leaves(
+			employee, leave_type, to_date, allocation.from_date
+		)
+		leaves_taken = self.get_leaves_for_period(employee, leave_type, allocation.from_date, end_date)
+		manually_expired_leaves = self.get_manually_expired_leaves(
+			employee, leave_type, allocation.from_date, end_date
+		)
+
+		return get_remaining_leaves(
+			allocation,
+			leaves_taken,
+			date,
+			cf_expiry,
+			manually_expired_leaves,
+			leaves_for_period=self.get_leaves_for_period,
+		).get("leave_balance")
+
+	def get_leaves_for_period(
+		self, employee: str, leave_type: str, from_date: datetime.date, to_date: datetime.date
+	) -> float:
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		entries = [
+			d
+			for d in self.entries.get((employee, leave_type), [])
+			if d.from_date <= to_date and d.to_date >= from_date
+		]
+		return get_leaves_from_entries(entries, from_date, to_date, self.get_leave_days)
+
+	def get_leave_days(self, leave_entry: dict, from_date: datetime.date, to_date: datetime.date) -> float:
+		"""In-memory equivalent of `get_application_leave_days`"""
+		if not leave_entry.leaves % 1:
+			leave_days = date_diff(to_date, from_date) + 1
+		elif from_date == to_date:
+			leave_days = 0.5
+		else:
+			half_day_date = self.half_day_dates.get(leave_entry.transaction_name)
+			half_day = half_day_date and from_date <= getdate(half_day_date) <= to_date
+			leave_days = date_diff(to_date, from_date) + (0.5 if half_day else 1)
+
+		if not self.include_holiday.get(leave_entry.leave_type):
+			holiday_list = leave_entry.holiday_list or self.employee_holiday_lists.get(leave_entry.employee)
+			leave_days -= len([d for d in self.holidays.get(holiday_list, ()) if from_date <= d <= to_date])
+
+		return leave_days
+
+	def get_allocation_expiry_for_cf_leaves(
+		self, employee: str, leave_type: str, to_date: datetime.date, from_date: datetime.date
+	) -> datetime.date | str:
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		for expiry in self.cf_expiries.get((employee, leave_type), []):
+			if from_date <= expiry <= to_date:
+				return expiry
+		return ""
+
+	def get_manually_expired_leaves(
+		self, employee: str, leave_type: str, from_date: datetime.date, end_date: datetime.date
+	) -> float:
+		from_date, end_date = getdate(from_date), getdate(end_date)
+		return sum(
+			d.leaves
+			for d in self.entries.get((employee, leave_type), [])
+			if d.transaction_type == "Leave Allocation"
+			and d.is_expired
+			and not d.is_carry_forward
+			and d.from_date >= from_date
+			and d.to_date <= end_date
+		)
+
+	def get_leaves_pending_approval_for_period(
+		self, employee: str, leave_type: str, from_date: datetime.date, to_date: datetime.date
+	) -> float:
+		from_date, to_date = getdate(from_date), getdate(to_date)
+		return sum(
+			flt(d.total_leave_days)
+			for d in self.pending_applications.get((employee, leave_type), [])
+			if from_date <= d.from_date <= to_date or from_date <= d.to_date <= to_date
+		)
+
+
 @frappe.whitelist()
 def get_leave_balance_on(
 	employee: str,
@@ -991,6 +1345,11 @@ def get_leave_balance_on(
 
 def get_leave_allocation_records(employee, date, leave_type=None):
 	"""Returns the total allocated leaves and carry forwarded leaves based on ledger entries"""
+	return get_leave_allocation_records_bulk([employee], date, leave_type).get(employee, frappe._dict())
+
+
+def get_leave_allocation_records_bulk(employees: list[str], date, leave_type=None) -> dict[str, dict]:
+	"""Returns allocation records of each employee by leave type, like `get_leave_allocation_records`"""
 	Ledger = frappe.qb.DocType("Leave Ledger Entry")
 	LeaveAllocation = frappe.qb.DocType("Leave Allocation")
 	LeaveAdjustment = frappe.qb.DocType("Leave Adjustment")
@@ -1022,7 +1381,7 @@ def get_leave_allocation_records(employee, date, leave_type=None):
 				(Ledger.transaction_type == "Leave Allocation")
 				| (Ledger.transaction_type == "Leave Adjustment")
 			)
-			& (Ledger.employee == employee)
+			& (Ledger.employee.isin(employees))
 			& (Ledger.is_expired == 0)
 			& (Ledger.is_lwp == 0)
 			& (
@@ -1051,7 +1410,7 @@ def get_leave_allocation_records(employee, date, leave_type=None):
 	allocation_details = query.run(as_dict=True)
 	allocated_leaves = frappe._dict()
 	for d in allocation_details:
-		allocated_leaves.setdefault(
+		allocated_leaves.setdefault(d.employee, frappe._dict()).setdefault(
 			d.leave_type,
 			frappe._dict(
 				{
@@ -1085,7 +1444,12 @@ def get_leaves_pending_approval_for_period(
 
 
 def get_remaining_leaves(
-	allocation: dict, leaves_taken: float, date: str, cf_expiry: str, manually_expired_leaves: float
+	allocation: dict,
+	leaves_taken: float,
+	date: str,
+	cf_expiry: str,
+	manually_expired_leaves: float,
+	leaves_for_period: Callable | None = None,
 ) -> dict[str, float]:
 	"""Returns a dict of leave_balance and leave_balance_for_consumption
 	leave_balance returns the available leave balance
@@ -1102,7 +1466,9 @@ def get_remaining_leaves(
 
 	if cf_expiry and allocation.unused_leaves:
 		# allocation contains both carry forwarded and new leaves
-		new_leaves_taken, cf_leaves_taken = get_new_and_cf_leaves_taken(allocation, cf_expiry)
+		new_leaves_taken, cf_leaves_taken = get_new_and_cf_leaves_taken(
+			allocation, cf_expiry, leaves_for_period
+		)
 
 		if getdate(date) > getdate(cf_expiry):
 			# carry forwarded leaves have expired
@@ -1154,12 +1520,15 @@ def get_manually_expired_leaves(
 	return leaves[0][0] if leaves else 0.0
 
 
-def get_new_and_cf_leaves_taken(allocation: dict, cf_expiry: str) -> tuple[float, float]:
+def get_new_and_cf_leaves_taken(
+	allocation: dict, cf_expiry: str, leaves_for_period: Callable | None = None
+) -> tuple[float, float]:
 	"""returns new leaves taken and carry forwarded leaves taken within an allocation period based on cf leave expiry"""
-	cf_leaves_taken = get_leaves_for_period(
+	leaves_for_period = leaves_for_period or get_leaves_for_period
+	cf_leaves_taken = leaves_for_period(
 		allocation.employee, allocation.leave_type, allocation.from_date, cf_expiry
 	)
-	new_leaves_taken = get_leaves_for_period(
+	new_leaves_taken = leaves_for_period(
 		allocation.employee, allocation.leave_type, add_days(cf_expiry, 1), allocation.to_date
 	)
 
@@ -1180,12 +1549,25 @@ def get_leaves_for_period(
 	skip_expired_leaves: bool = True,
 ) -> float:
 	leave_entries = get_leave_entries(employee, leave_type, from_date, to_date)
+	return get_leaves_from_entries(
+		leave_entries, from_date, to_date, get_application_leave_days, skip_expired_leaves
+	)
+
+
+def get_leaves_from_entries(
+	leave_entries: list[dict],
+	from_date: datetime.date,
+	to_date: datetime.date,
+	get_leave_days: Callable,
+	skip_expired_leaves: bool = True,
+) -> float:
+	"""Returns leaves consumed between the dates by the given ledger entries. `get_leave_days` counts the
+	days of a leave application entry within its dates clipped to the period"""
+	from_date, to_date = getdate(from_date), getdate(to_date)
 	leave_days = 0
 
 	for leave_entry in leave_entries:
-		inclusive_period = leave_entry.from_date >= getdate(from_date) and leave_entry.to_date <= getdate(
-			to_date
-		)
+		inclusive_period = leave_entry.from_date >= from_date and leave_entry.to_date <= to_date
 
 		if inclusive_period and leave_entry.transaction_type == "Leave Encashment":
 			leave_days += leave_entry.leaves
@@ -1199,36 +1581,34 @@ def get_leaves_for_period(
 			leave_days += leave_entry.leaves
 
 		elif leave_entry.transaction_type == "Leave Application":
-			if leave_entry.from_date < getdate(from_date):
-				leave_entry.from_date = from_date
-			if leave_entry.to_date > getdate(to_date):
-				leave_entry.to_date = to_date
-
-			half_day = 0
-			half_day_date = None
-			# fetch half day date for leaves with half days
-			if leave_entry.leaves % 1:
-				half_day = 1
-				half_day_date = frappe.db.get_value(
-					"Leave Application", leave_entry.transaction_name, "half_day_date"
-				)
-
-			leave_days += (
-				get_number_of_leave_days(
-					employee,
-					leave_type,
-					leave_entry.from_date,
-					leave_entry.to_date,
-					half_day,
-					half_day_date,
-					holiday_list=leave_entry.holiday_list,
-				)
-				* -1
-			)
+			entry_from_date = max(leave_entry.from_date, from_date)
+			entry_to_date = min(leave_entry.to_date, to_date)
+			leave_days += get_leave_days(leave_entry, entry_from_date, entry_to_date) * -1
 
 	return leave_days
 
 
+def get_application_leave_days(leave_entry: dict, from_date: datetime.date, to_date: datetime.date) -> float:
+	half_day = 0
+	half_day_date = None
+	# fetch half day date for leaves with half days
+	if leave_entry.leaves % 1:
+		half_day = 1
+		half_day_date = frappe.db.get_value(
+			"Leave Application", leave_entry.transaction_name, "half_day_date"
+		)
+
+	return get_number_of_leave_days(
+		leave_entry.employee,
+		leave_entry.leave_type,
+		from_date,
+		to_date,
+		half_day,
+		half_day_date,
+		holiday_list=leave_entry.holiday_list,
+	)
+
+
 def get_leave_entries(employee, leave_type, from_date, to_date):
 	"""Returns leave entries between from_date and to_date."""
 	return frappe.db.sql(
@@ -1283,13 +1663,16 @@ def get_events(start, end, filters=None):
 	events = []
 
 	employee = frappe.db.get_value(
-		"Employee", filters={"user_id": frappe.session.user}, fieldname=["name", "company"], as_dict=True
+		"Employee",
+		filters={"user_id": frappe.session.user},
+		fieldname=["name", "company", "department"],
+		as_dict=True,
 	)
 
 	if employee:
-		employee, company = employee.name, employee.company
+		employee, company, department = employee.name, employee.company, employee.department
 	else:
-		employee = ""
+		employee = department = ""
 		company = frappe.db.get_single_value("Global Defaults", "default_company")
 
 	# show department leaves for employee
@@ -1297,7 +1680,7 @@ def get_events(start, end, filters=None):
 		add_department_leaves(events, start, end, employee, company)
 
 	add_leaves(events, start, end, filters)
-	add_block_dates(events, start, end, employee, company)
+	add_block_dates(events, start, end, employee, company, department)
 	add_holidays(events, start, end, employee, company)
 
 	return events
@@ -1308,6 +1691,16 @@ def add_department_leaves(events, start, end, employee, company):
 		department_employees = frappe.get_list(
 			"Employee", filters={"department": department, "company": company}, pluck="name"
 		)
+
+		if cint(
+			frappe.db.get_single_value("HR Settings", "show_leaves_of_all_department_members_in_calendar")
+		):
+			# the shared feed holds the leaves of the whole department, keep only the permitted employees
+			add_cached_calendar_events(
+				events, start, end, company, department, "Leave Application", employees=department_employees
+			)
+			return
+
 		filters = [["employee", "in", department_employees]]
 		add_leaves(events, start, end, filters=filters)
 
@@ -1352,7 +1745,11 @@ def add_leaves(events, start, end, filters=None):
 			events.append(d)
 
 
-def add_block_dates(events, start, end, employee, company):
+def add_block_dates(events, start, end, employee, company, department=None):
+	if company and department:
+		add_cached_calendar_events(events, start, end, company, department, "Leave Block List Date")
+		return
+
 	cnt = 0
 	block_dates = get_applicable_block_dates(start, end, employee, company, all_lists=True)
 
@@ -1375,13 +1772,204 @@ def add_holidays(events, start, end, employee, company):
 	if not applicable_holiday_list:
 		return
 
-	for holiday in frappe.db.sql(
-		"""select name, holiday_date, description
-		from `tabHoliday` where parent=%s and holiday_date between %s and %s""",
-		(applicable_holiday_list, start, end),
-		as_dict=True,
+	for month_start in get_months_between(start, end):
+		for holiday in get_cached_holiday_events(applicable_holiday_list, month_start):
+			if getdate(start) <= holiday["from_date"] <= getdate(end):
+				events.append(holiday)
+
+
+@frappe.whitelist()
+def get_leave_calendar_feed(
+	company: str,
+	department: str | None = None,
+	month: str | None = None,
+	etag: str | None = None,
+	since: str | None = None,
+) -> dict:
+	"""Returns the leaves and block dates of a department for a month (YYYY-MM) from a shared cache.
+
+	Pass the `etag` of a previous response to get `not_modified` if nothing has changed since, or its
+	`timestamp` as `since` to only get the leave applications changed or removed after it."""
+	validate_calendar_feed_access(company, department)
+
+	month_start = get_first_day(getdate(f"{month}-01") if month else getdate())
+	feed = get_cached_calendar_feed(company, department, month_start)
+
+	if etag and etag == feed["etag"]:
+		return {"not_modified": 1, "etag": feed["etag"], "timestamp": feed["timestamp"]}
+
+	if since:
+		return get_calendar_feed_changes(company, department, month_start, feed, since)
+
+	return feed
+
+
+def validate_calendar_feed_access(company: str, department: str | None) -> None:
+	if {"HR Manager", "HR User"}.intersection(frappe.get_roles()):
+		return
+
+	employee = frappe.db.get_value(
+		"Employee", {"user_id": frappe.session.user}, ["company", "department"], as_dict=True
+	)
+	if (
+		not employee
+		or employee.company != company
+		or not department
+		or employee.department != department
+		or not cint(
+			frappe.db.get_single_value("HR Settings", "show_leaves_of_all_department_members_in_calendar")
+		)
 	):
-		events.append(
+		frappe.throw(
+			_("Not permitted to view the leave calendar of {0}").format(department or company),
+			frappe.PermissionError,
+		)
+
+
+def get_cached_calendar_feed(company: str, department: str | None, month_start) -> dict:
+	cache_key = f"{LEAVE_CALENDAR_FEED}::{company}::{department or ''}"
+	month = month_start.strftime("%Y-%m")
+
+	feed = frappe.cache().hget(cache_key, month)
+	if feed is None:
+		month_end = get_last_day(month_start)
+		events = get_department_leave_events(company, department, month_start, month_end)
+		events += get_block_date_events(company, department, month_start, month_end)
+		feed = {"events": events, "etag": get_calendar_etag(events), "timestamp": now()}
+		frappe.cache().hset(cache_key, month, feed)
+
+	return feed
+
+
+def get_calendar_feed_changes(
+	company: str, department: str | None, month_start, feed: dict, since: str
+) -> dict:
+	"""Returns leave events modified after `since` along with the leave applications that were cancelled,
+	rejected or deleted after it. Block dates are always returned in full."""
+	since = get_datetime(since)
+	if since < get_deleted_calendar_leaves_cutoff():
+		# deletions this old are no longer tracked, so the client has to replace its events
+		return {**feed, "removed": [], "reset": 1}
+
+	month_end = get_last_day(month_start)
+
+	events, removed = [], []
+	for d in get_department_leave_events(
+		company, department, month_start, month_end, modified_after=since, active_only=False
+	):
+		if d.pop("is_active"):
+			events.append(d)
+		else:
+			removed.append(d.name)
+
+	deleted = frappe.cache().hgetall(f"{DELETED_CALENDAR_LEAVES}::{company}::{department or ''}") or {}
+	removed += [name for name, deleted_on in deleted.items() if get_datetime(deleted_on) > since]
+
+	return {
+		"etag": feed["etag"],
+		"timestamp": feed["timestamp"],
+		"events": events + [d for d in feed["events"] if d["doctype"] != "Leave Application"],
+		"removed": removed,
+	}
+
+
+def get_department_leave_events(
+	company: str,
+	department: str | None,
+	start,
+	end,
+	modified_after=None,
+	active_only: bool = True,
+) -> list[dict]:
+	LeaveApplication = frappe.qb.DocType("Leave Application")
+	Employee = frappe.qb.DocType("Employee")
+
+	is_active = (LeaveApplication.status.isin(["Approved", "Open"])) & (LeaveApplication.docstatus < 2)
+	query = (
+		frappe.qb.from_(LeaveApplication)
+		.inner_join(Employee)
+		.on(LeaveApplication.employee == Employee.name)
+		.select(
+			LeaveApplication.name,
+			LeaveApplication.from_date,
+			LeaveApplication.to_date,
+			LeaveApplication.color,
+			LeaveApplication.docstatus,
+			LeaveApplication.employee,
+			LeaveApplication.employee_name,
+			LeaveApplication.leave_type,
+			LeaveApplication.status,
+		)
+		.where(
+			(Employee.company == company)
+			& (LeaveApplication.from_date <= end)
+			& (LeaveApplication.to_date >= start)
+		)
+	)
+
+	if department:
+		query = query.where(Employee.department == department)
+	if active_only:
+		query = query.where(is_active)
+	if modified_after:
+		query = query.where(LeaveApplication.modified > modified_after)
+
+	events = []
+	for d in query.run(as_dict=True):
+		event = frappe._dict(
+			name=d.name,
+			from_date=d.from_date,
+			to_date=d.to_date,
+			color=d.color,
+			docstatus=d.docstatus,
+			allDay=1,
+			doctype="Leave Application",
+			title=f"{d.employee_name} ({d.leave_type})",
+			employee=d.employee,
+		)
+		if not active_only:
+			event.is_active = d.status in ("Approved", "Open") and d.docstatus < 2
+		events.append(event)
+
+	return events
+
+
+def get_block_date_events(company: str, department: str | None, start, end) -> list[dict]:
+	block_lists = frappe.get_all(
+		"Leave Block List", filters={"applies_to_all_departments": 1, "company": company}, pluck="name"
+	)
+	if department and (
+		department_block_list := frappe.db.get_value("Department", department, "leave_block_list")
+	):
+		block_lists.append(department_block_list)
+
+	if not block_lists:
+		return []
+
+	return [
+		frappe._dict(
+			doctype="Leave Block List Date",
+			from_date=d.block_date,
+			to_date=d.block_date,
+			title=_("Leave Blocked") + ": " + d.reason,
+			name="_" + d.name,
+			allDay=1,
+		)
+		for d in frappe.get_all(
+			"Leave Block List Date",
+			filters={"parent": ("in", list(set(block_lists))), "block_date": ("between", [start, end])},
+			fields=["name", "block_date", "reason"],
+		)
+	]
+
+
+def get_cached_holiday_events(holiday_list: str, month_start) -> list[dict]:
+	cache_key = f"{HOLIDAY_CALENDAR_FEED}::{holiday_list}"
+	month = month_start.strftime("%Y-%m")
+
+	events = frappe.cache().hget(cache_key, month)
+	if events is None:
+		events = [
 			{
 				"doctype": "Holiday",
 				"from_date": holiday.holiday_date,
@@ -1390,7 +1978,101 @@ def add_holidays(events, start, end, employee, company):
 				"name": holiday.name,
 				"allDay": 1,
 			}
-		)
+			for holiday in frappe.get_all(
+				"Holiday",
+				filters={
+					"parent": holiday_list,
+					"holiday_date": ("between", [month_start, get_last_day(month_start)]),
+				},
+				fields=["name", "holiday_date", "description"],
+			)
+		]
+		frappe.cache().hset(cache_key, month, events)
+
+	return events
+
+
+def add_cached_calendar_events(events, start, end, company, department, doctype, employees=None):
+	start, end = getdate(start), getdate(end)
+	if employees is not None:
+		employees = set(employees)
+
+	for month_start in get_months_between(start, end):
+		for event in get_cached_calendar_feed(company, department, month_start)["events"]:
+			if event["doctype"] != doctype or event["from_date"] > end or event["to_date"] < start:
+				continue
+
+			event = frappe._dict(event)
+			if employees is not None and event.pop("employee", None) not in employees:
+				continue
+
+			if event not in events:
+				events.append(event)
+
+
+def get_months_between(start, end) -> list:
+	months = []
+	month_start = get_first_day(start)
+	while month_start <= getdate(end):
+		months.append(month_start)
+		month_start = add_months(month_start, 1)
+
+	return months
+
+
+def get_calendar_etag(events: list) -> str:
+	return hashlib.md5(frappe.as_json(events).encode(), usedforsecurity=False).hexdigest()
+
+
+def record_deleted_calendar_leave(leave_application: str, company: str, department: str) -> None:
+	"""Tracks a deleted leave application for incremental fetches of the department and company feeds,
+	dropping the deletions older than the retention period"""
+	cache = frappe.cache()
+	cutoff = get_deleted_calendar_leaves_cutoff()
+
+	for key in {
+		f"{DELETED_CALENDAR_LEAVES}::{company}::{department}",
+		f"{DELETED_CALENDAR_LEAVES}::{company}::",
+	}:
+		for name, deleted_on in (cache.hgetall(key) or {}).items():
+			if get_datetime(deleted_on) < cutoff:
+				cache.hdel(key, name)
+		cache.hset(key, leave_application, now())
+
+
+def get_deleted_calendar_leaves_cutoff():
+	return add_to_date(now_datetime(), hours=-DELETED_CALENDAR_LEAVES_RETENTION_HOURS)
+
+
+def get_calendar_feed_scope(employee: str) -> tuple[str, str]:
+	company, department = frappe.db.get_value("Employee", employee, ["company", "department"]) or (None, None)
+	return company, department or ""
+
+
+def clear_leave_calendar_cache(doc, method=None):
+	"""Invalidates the cached calendar feeds affected by a change in `doc`"""
+	cache = frappe.cache()
+
+	if doc.doctype == "Holiday List":
+		cache.delete_value(f"{HOLIDAY_CALENDAR_FEED}::{doc.name}")
+	elif doc.doctype == "Leave Application":
+		# the leave is listed under the department it was filed in, which may differ from the employee's
+		departments = {doc.department or "", get_calendar_feed_scope(doc.employee)[1]}
+		if previous_doc := doc.get_doc_before_save():
+			departments.add(previous_doc.department or "")
+
+		for department in departments:
+			cache.delete_value(f"{LEAVE_CALENDAR_FEED}::{doc.company}::{department}")
+		# feeds of the whole company include this leave too
+		cache.delete_value(f"{LEAVE_CALENDAR_FEED}::{doc.company}::")
+	elif doc.doctype == "Department":
+		cache.delete_value(f"{LEAVE_CALENDAR_FEED}::{doc.company}::{doc.name}")
+	elif doc.doctype == "Employee":
+		if doc.has_value_changed("department") or doc.has_value_changed("company"):
+			cache.delete_keys(f"{LEAVE_CALENDAR_FEED}::")
+	elif doc.get("company"):
+		# block lists applicable to all departments are part of every department's feed
+		cache.delete_keys(f"{LEAVE_CALENDAR_FEED}::{doc.company}::")
 
 
 @frappe.whitelist()
@@ -1463,5 +2145,30 @@ def get_leave_approver(employee):
 	return leave_approver
 
 
+def get_leave_approvers(employees: list[str]) -> dict[str, str]:
+	"""Returns `get_leave_approver` of each employee with two queries"""
+	employee_details = frappe.get_all(
+		"Employee",
+		filters={"name": ("in", employees)},
+		fields=["name", "leave_approver", "department"],
+	)
+
+	departments = list({d.department for d in employee_details if not d.leave_approver and d.department})
+	department_approvers = (
+		dict(
+			frappe.get_all(
+				"Department Approver",
+				filters={"parent": ("in", departments), "parentfield": "leave_approvers", "idx": 1},
+				fields=["parent", "approver"],
+				as_list=True,
+			)
+		)
+		if departments
+		else {}
+	)
+
+	return {d.name: d.leave_approver or department_approvers.get(d.department) for d in employee_details}
+
+
 def on_doctype_update():
 	frappe.db.add_index("Leave Application", ["employee", "from_date", "to_date"])
@@ -1,6 +1,8 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+from unittest.mock import patch
+
 import frappe
 from frappe.permissions import clear_user_permissions_for_doctype
 from frappe.utils import (
@@ -20,14 +22,18 @@ from erpnext.setup.doctype.holiday_list.test_holiday_list import set_holiday_lis
 from hrms.hr.doctype.attendance.attendance import mark_attendance
 from hrms.hr.doctype.leave_allocation.test_leave_allocation import create_leave_allocation
 from hrms.hr.doctype.leave_application.leave_application import (
+	EmployeeLeaveIndex,
 	InsufficientLeaveBalanceError,
 	LeaveAcrossAllocationsError,
 	LeaveDayBlockedError,
 	NotAnOptionalHoliday,
 	OverlapError,
+	add_department_leaves,
 	get_leave_allocation_records,
 	get_leave_balance_on,
+	get_leave_calendar_feed,
 	get_leave_details,
+	get_leave_details_bulk,
 	get_new_and_cf_leaves_taken,
 )
 from hrms.hr.doctype.leave_ledger_entry.leave_ledger_entry import expire_allocation
@@ -41,6 +47,8 @@ from hrms.payroll.doctype.salary_slip.test_salary_slip import (
 )
 from hrms.tests.test_utils import get_first_sunday
 from hrms.tests.utils import HRMSTestSuite
+from hrms.utils import bulk_insert_documents
+from hrms.utils.leave_history_import import import_leave_history
 
 test_dependencies = ["Leave Block List"]
 
@@ -1100,6 +1108,57 @@ class TestLeaveApplication(HRMSTestSuite):
 		self.assertEqual(leave_allocation["leaves_pending_approval"], 1)
 		self.assertEqual(leave_allocation["remaining_leaves"], 26)
 
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_get_leave_details_bulk(self):
+		employee = get_employee()
+		other_employee = frappe.get_doc("Employee", make_employee("test_bulk_leave_details@example.com"))
+		date = getdate()
+		year_start = getdate(get_year_start(date))
+		year_end = getdate(get_year_ending(date))
+
+		leave_type = create_leave_type(leave_type_name="_Test Leave Type Excluding Holidays")
+		leave_type.db_set("include_holiday", 0)
+		make_allocation_record(
+			employee=employee.name, leave_type=leave_type.name, from_date=year_start, to_date=year_end
+		)
+
+		# 9 days with a weekly off and a half day
+		first_sunday = get_first_sunday(self.holiday_list)
+		make_leave_application(
+			employee.name,
+			add_days(first_sunday, 1),
+			add_days(first_sunday, 9),
+			leave_type.name,
+			half_day=1,
+			half_day_date=add_days(first_sunday, 9),
+		)
+		application = make_leave_application(
+			employee.name,
+			add_days(first_sunday, 12),
+			add_days(first_sunday, 12),
+			leave_type.name,
+			submit=False,
+		)
+		application.db_set("status", "Open")
+
+		cf_leave_type = create_leave_type(
+			leave_type_name="_Test_CF_leave_expiry",
+			is_carry_forward=1,
+			expire_carry_forwarded_leaves_after_days=90,
+		)
+		create_carry_forwarded_allocation(other_employee, cf_leave_type)
+
+		for for_salary_slip in (False, True):
+			details = get_leave_details_bulk([employee.name, other_employee.name], date, for_salary_slip)
+			for emp in (employee.name, other_employee.name):
+				self.assertEqual(details[emp], get_leave_details(emp, date, for_salary_slip))
+
+		leave_allocation = get_leave_details_bulk([employee.name], date)[employee.name]["leave_allocation"]
+		self.assertEqual(leave_allocation["_Test Leave Type Excluding Holidays"]["leaves_taken"], 7.5)
+		self.assertEqual(
+			leave_allocation["_Test Leave Type Excluding Holidays"]["leaves_pending_approval"], 1
+		)
+
 	@set_holiday_list("Holiday List w/o Weekly Offs", "_Test Company")
 	def test_leave_details_with_expired_cf_leaves(self):
 		"""Tests leave details:
@@ -1427,6 +1486,284 @@ class TestLeaveApplication(HRMSTestSuite):
 
 		self.assertEqual(leave_balance, 0)
 
+	def test_leave_calendar_feed(self):
+		employee = get_employee()
+		frappe.db.set_value("Employee", employee.name, "holiday_list", self.holiday_list)
+		make_allocation_record(
+			employee=employee.name, from_date=get_year_start(getdate()), to_date=get_year_ending(getdate())
+		)
+
+		month = getdate().strftime("%Y-%m")
+		first_day = get_first_day(getdate())
+		feed = get_leave_calendar_feed(employee.company, employee.department, month)
+
+		leave_application = make_leave_application(
+			employee.name, first_day, add_days(first_day, 1), "_Test Leave Type", submit=False
+		)
+		# saving the application invalidates the cached feed
+		updated_feed = get_leave_calendar_feed(
+			employee.company, employee.department, month, etag=feed["etag"]
+		)
+		self.assertNotEqual(updated_feed["etag"], feed["etag"])
+		self.assertIn(leave_application.name, [d.name for d in updated_feed["events"]])
+
+		# unchanged feed is not sent again
+		response = get_leave_calendar_feed(
+			employee.company, employee.department, month, etag=updated_feed["etag"]
+		)
+		self.assertTrue(response["not_modified"])
+
+		# incremental fetch returns deleted applications
+		leave_application.delete()
+		changes = get_leave_calendar_feed(
+			employee.company, employee.department, month, since=feed["timestamp"]
+		)
+		self.assertIn(leave_application.name, changes["removed"])
+		self.assertNotIn(leave_application.name, [d.name for d in changes["events"]])
+
+	def test_department_leaves_from_calendar_feed(self):
+		frappe.db.set_single_value("HR Settings", "show_leaves_of_all_department_members_in_calendar", 1)
+		department = "_Test Department 1 - _TC"
+		employee = frappe.get_doc("Employee", make_employee("test_feed_1@example.com", "_Test Company"))
+		colleague = frappe.get_doc("Employee", make_employee("test_feed_2@example.com", "_Test Company"))
+		for emp in (employee, colleague):
+			emp.db_set("department", department)
+			make_allocation_record(
+				employee=emp.name, from_date=get_year_start(getdate()), to_date=get_year_ending(getdate())
+			)
+
+		first_day = get_first_day(getdate())
+		leave_application = make_leave_application(
+			colleague.name, first_day, first_day, "_Test Leave Type", submit=False
+		)
+
+		events = []
+		add_department_leaves(events, first_day, get_last_day(first_day), employee.name, employee.company)
+		self.assertIn(leave_application.name, [d.name for d in events])
+
+		# cached leaves of employees the user cannot read are left out
+		events = []
+		with patch("frappe.get_list", return_value=[employee.name]):
+			add_department_leaves(events, first_day, get_last_day(first_day), employee.name, employee.company)
+		self.assertNotIn(leave_application.name, [d.name for d in events])
+
+		# after a transfer, updating the leave clears the feed of the department it was filed in
+		get_leave_calendar_feed(colleague.company, department, first_day.strftime("%Y-%m"))
+		frappe.db.set_value("Employee", colleague.name, "department", "_Test Department - _TC")
+		leave_application.reload()
+		leave_application.description = "Transferred"
+		leave_application.save()
+		self.assertIsNone(
+			frappe.cache().hget(
+				f"leave_calendar_feed::{colleague.company}::{department}", first_day.strftime("%Y-%m")
+			)
+		)
+
+	def test_leave_calendar_feed_access(self):
+		user = "test_calendar_feed@example.com"
+		employee = frappe.get_doc("Employee", make_employee(user, "_Test Company"))
+		frappe.db.set_single_value("HR Settings", "show_leaves_of_all_department_members_in_calendar", 1)
+
+		frappe.set_user(user)
+		# employees only get the feed of their own department, never the company wide one
+		self.assertRaises(frappe.PermissionError, get_leave_calendar_feed, employee.company)
+		self.assertRaises(
+			frappe.PermissionError, get_leave_calendar_feed, employee.company, "_Test Department 1 - _TC"
+		)
+
+	def test_employee_leave_index(self):
+		employee = get_employee()
+		make_allocation_record(employee=employee.name, from_date="2013-01-01", to_date="2013-12-31")
+
+		first = make_leave_application(employee.name, "2013-03-04", "2013-03-05", "_Test Leave Type")
+		second = make_leave_application(employee.name, "2013-03-06", "2013-03-07", "_Test Leave Type")
+		half_day = frappe.get_doc(
+			dict(
+				doctype="Leave Application",
+				employee=employee.name,
+				leave_type="_Test Leave Type",
+				from_date="2013-03-12",
+				to_date="2013-03-12",
+				half_day=1,
+				half_day_date="2013-03-12",
+				company="_Test Company",
+				status="Approved",
+			)
+		).insert()
+
+		index = EmployeeLeaveIndex(employee.name)
+		self.assertEqual(
+			[d.name for d in index.get_overlapping_applications("2013-03-05", "2013-03-06")],
+			[first.name, second.name],
+		)
+		self.assertEqual(index.get_overlapping_applications("2013-03-05", "2013-03-05", first.name), [])
+		self.assertEqual(index.get_half_day_leave_count("2013-03-12"), 1)
+		self.assertEqual(index.get_half_day_leave_count("2013-03-12", half_day.name), 0)
+
+		first_from_date, last_to_date, applications = index.get_consecutive_span(
+			"_Test Leave Type", "2013-03-08", "2013-03-08"
+		)
+		self.assertEqual(first_from_date, getdate("2013-03-04"))
+		self.assertEqual(last_to_date, getdate("2013-03-08"))
+		self.assertEqual(applications, {first.name, second.name})
+
+		# overlapping application is still rejected through the index
+		leave_application = frappe.get_doc(
+			dict(
+				doctype="Leave Application",
+				employee=employee.name,
+				leave_type="_Test Leave Type",
+				from_date="2013-03-07",
+				to_date="2013-03-08",
+				company="_Test Company",
+				status="Approved",
+			)
+		)
+		self.assertRaises(OverlapError, leave_application.insert)
+
+	def test_import_leave_history_failed_batch(self):
+		employee = get_employee()
+
+		def fail_allocations(docs, *args, **kwargs):
+			if docs[0].doctype == "Leave Allocation":
+				raise frappe.ValidationError
+			return bulk_insert_documents(docs, *args, **kwargs)
+
+		with patch("hrms.utils.leave_history_import.bulk_insert_documents", side_effect=fail_allocations):
+			result = import_leave_history(
+				allocations=[
+					dict(
+						employee=employee.name,
+						leave_type="_Test Leave Type",
+						from_date="2014-01-01",
+						to_date="2014-12-31",
+						new_leaves_allocated=15,
+					)
+				],
+				applications=[
+					dict(
+						employee=employee.name,
+						leave_type="_Test Leave Type",
+						from_date="2014-03-03",
+						to_date="2014-03-04",
+						status="Approved",
+					)
+				],
+			)
+
+		# applications are not validated against allocations of a batch that was rolled back
+		self.assertEqual(len(result["allocations"]["failed"]), 1)
+		self.assertEqual(len(result["applications"]["success"]), 0)
+		self.assertIn("No leave allocation found", result["applications"]["failed"][0]["error"])
+
+	def test_import_leave_history(self):
+		employee = get_employee()
+		frappe.db.set_value("Employee", employee.name, "holiday_list", self.holiday_list)
+
+		result = import_leave_history(
+			allocations=[
+				dict(
+					employee=employee.name,
+					leave_type="_Test Leave Type",
+					from_date="2014-01-01",
+					to_date="2014-12-31",
+					new_leaves_allocated=15,
+				),
+				# overlaps the allocation above
+				dict(
+					employee=employee.name,
+					leave_type="_Test Leave Type",
+					from_date="2014-06-01",
+					to_date="2015-05-31",
+					new_leaves_allocated=15,
+				),
+			],
+			applications=[
+				dict(
+					employee=employee.name,
+					leave_type="_Test Leave Type",
+					from_date="2014-03-03",
+					to_date="2014-03-04",
+					status="Approved",
+				),
+				# overlaps the application above
+				dict(
+					employee=employee.name,
+					leave_type="_Test Leave Type",
+					from_date="2014-03-04",
+					to_date="2014-03-05",
+					status="Approved",
+				),
+			],
+		)
+
+		self.assertEqual(len(result["allocations"]["success"]), 1)
+		self.assertEqual(len(result["allocations"]["failed"]), 1)
+		self.assertEqual(len(result["applications"]["success"]), 1)
+		self.assertEqual(len(result["applications"]["failed"]), 1)
+
+		application = frappe.get_doc(
+			"Leave Application", result["applications"]["success"][0]["leave_application"]
+		)
+		self.assertEqual(application.docstatus, 1)
+		self.assertEqual(application.total_leave_days, 2)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Leave Ledger Entry",
+				{"transaction_type": "Leave Application", "transaction_name": application.name},
+				"leaves",
+			),
+			-2,
+		)
+		self.assertEqual(
+			frappe.db.count(
+				"Attendance", {"leave_application": application.name, "status": "On Leave", "docstatus": 1}
+			),
+			2,
+		)
+		self.assertEqual(
+			get_leave_balance_on(employee.name, "_Test Leave Type", "2014-03-05"),
+			13,
+		)
+
+	def test_import_leave_history_balance(self):
+		employee = get_employee()
+		frappe.db.set_value("Employee", employee.name, "holiday_list", self.holiday_list)
+
+		def application(from_date, to_date):
+			return dict(
+				employee=employee.name,
+				leave_type="_Test Leave Type",
+				from_date=from_date,
+				to_date=to_date,
+				status="Approved",
+			)
+
+		result = import_leave_history(
+			allocations=[
+				dict(
+					employee=employee.name,
+					leave_type="_Test Leave Type",
+					from_date="2014-01-01",
+					to_date="2014-12-31",
+					new_leaves_allocated=3,
+				)
+			],
+			applications=[
+				application("2014-03-03", "2014-03-04"),
+				# only 1 leave is left after the application above
+				application("2014-03-05", "2014-03-06"),
+				# no allocation covers this period
+				application("2015-01-05", "2015-01-05"),
+				application("2014-03-07", "2014-03-07"),
+			],
+		)
+
+		self.assertEqual(len(result["applications"]["success"]), 2)
+		failed = result["applications"]["failed"]
+		self.assertIn("not enough leave balance", failed[0]["error"])
+		self.assertIn("No leave allocation found", failed[1]["error"])
+
 
 def create_carry_forwarded_allocation(employee, leave_type, date=None):
 	date = date or nowdate()
@@ -3,12 +3,20 @@
 
 
 import frappe
+from frappe import _
 from frappe.model.document import Document
-from frappe.utils import cint, flt, get_link_to_form
+from frappe.query_builder.functions import Sum
+from frappe.utils import cint, create_batch, date_diff, flt, get_link_to_form, getdate
 
 from erpnext import get_default_company
 
-from hrms.hr.utils import validate_bulk_tool_fields
+from hrms.hr.doctype.leave_policy_assignment.leave_policy_assignment import bulk_grant_leave_policy
+from hrms.hr.utils import get_leave_period, validate_bulk_tool_fields
+from hrms.utils import bulk_insert_documents
+
+# employees processed per background job when allocating in bulk
+BULK_ALLOCATION_SHARD_SIZE = 500
+BULK_ALLOCATION_RUN = "leave_control_panel_bulk_allocation"
 
 
 class LeaveControlPanel(Document):
@@ -30,11 +38,253 @@ class LeaveControlPanel(Document):
 	@frappe.whitelist()
 	def allocate_leave(self, employees: list):
 		self.validate_fields(employees)
+		if len(employees) > 30:
+			return self.enqueue_bulk_allocation(employees)
+
 		if self.allocate_based_on_leave_policy:
 			return self.create_leave_policy_assignments(employees)
 		return self.create_leave_allocations(employees)
 
-	def create_leave_allocations(self, employees: list) -> dict:
+	def enqueue_bulk_allocation(self, employees: list) -> str:
+		"""Splits the employees into shards and processes each shard in a separate background job.
+		Employees that already have an allocation for the period are skipped by every shard,
+		so re-running the same selection resumes a partially completed run."""
+		if not self.allocate_based_on_leave_policy:
+			self.validate_leave_type_for_bulk_allocation()
+
+		run_id = frappe.generate_hash(length=12)
+		shards = list(create_batch(employees, BULK_ALLOCATION_SHARD_SIZE))
+		frappe.cache().hset(BULK_ALLOCATION_RUN, run_id, {"total": len(employees), "processed": 0})
+
+		for shard in shards:
+			frappe.enqueue(
+				self.process_allocation_shard,
+				queue="long",
+				timeout=3000,
+				employees=list(shard),
+				run_id=run_id,
+			)
+
+		frappe.msgprint(
+			_(
+				"Leave allocation for {0} employees has been queued in {1} batches. It may take a few minutes."
+			).format(len(employees), len(shards)),
+			alert=True,
+			indicator="blue",
+		)
+		return run_id
+
+	def process_allocation_shard(self, employees: list, run_id: str) -> None:
+		from_date, to_date = self.get_from_to_date()
+		employee_details = frappe.get_all(
+			"Employee",
+			filters={"name": ("in", employees)},
+			fields=["name", "employee_name", "company", "department", "date_of_joining"],
+		)
+		# overlap validation for the whole shard in a single query
+		pending = self.get_employees_without_allocations(employee_details, from_date, to_date)
+		pending_names = {d.name for d in pending}
+		skipped = [d.name for d in employee_details if d.name not in pending_names]
+
+		if self.allocate_based_on_leave_policy:
+			success, failure = self.bulk_create_leave_policy_assignments(pending, from_date, to_date)
+		elif cint(self.carry_forward):
+			# carry forwarded leaves depend on each employee's previous allocation
+			success, failure = self.create_leave_allocations(list(pending_names), publish_status=False)
+		else:
+			success, failure = self.bulk_create_leave_allocations(pending, from_date, to_date)
+
+		self.update_bulk_allocation_progress(run_id, len(employees), success, failure, skipped)
+
+	def update_bulk_allocation_progress(
+		self, run_id: str, processed: int, success: list, failure: list, skipped: list
+	) -> None:
+		cache = frappe.cache()
+		# shards finish in any order, so lock the run while merging the results of this shard
+		with cache.lock(f"{BULK_ALLOCATION_RUN}::{run_id}", timeout=60):
+			run = cache.hget(BULK_ALLOCATION_RUN, run_id) or {}
+			run["processed"] = run.get("processed", 0) + processed
+			for key, value in (("success", success), ("failure", failure), ("skipped", skipped)):
+				run[key] = run.get(key, []) + value
+			cache.hset(BULK_ALLOCATION_RUN, run_id, run)
+
+		total = run.get("total") or processed
+		frappe.publish_progress(
+			run["processed"] * 100 / total,
+			title=_("Allocating Leaves..."),
+			description=_("{0} of {1} employees processed").format(run["processed"], total),
+		)
+
+		if run["processed"] >= total:
+			cache.hdel(BULK_ALLOCATION_RUN, run_id)
+			event = (
+				"completed_bulk_leave_policy_assignment"
+				if self.allocate_based_on_leave_policy
+				else "completed_bulk_leave_allocation"
+			)
+			frappe.publish_realtime(
+				event,
+				message={"success": run["success"], "failure": run["failure"], "skipped": run["skipped"]},
+				doctype="Bulk Salary Structure Assignment",
+				after_commit=True,
+			)
+
+	def bulk_create_leave_policy_assignments(self, employees: list, from_date, to_date) -> tuple[list, list]:
+		result = bulk_grant_leave_policy(
+			[
+				{
+					"employee": d.name,
+					"leave_policy": self.leave_policy,
+					"assignment_based_on": None
+					if self.dates_based_on == "Custom Range"
+					else self.dates_based_on,
+					"leave_period": self.get("leave_period"),
+					"effective_from": from_date or d.date_of_joining,
+					"effective_to": to_date,
+					"carry_forward": self.carry_forward,
+				}
+				for d in employees
+			]
+		)
+		success = [
+			{
+				"doc": get_link_to_form("Leave Policy Assignment", d["leave_policy_assignment"]),
+				"employee": d["employee"],
+			}
+			for d in result["success"]
+		]
+		return success, [d["employee"] for d in result["failed"]]
+
+	def validate_leave_type_for_bulk_allocation(self) -> None:
+		if frappe.db.get_value("Leave Type", self.leave_type, "is_lwp"):
+			frappe.throw(
+				_("Leave Type {0} cannot be allocated since it is leave without pay").format(self.leave_type)
+			)
+
+	def bulk_create_leave_allocations(self, employees: list, from_date, to_date) -> tuple[list, list]:
+		"""Creates submitted allocations and their ledger entries with multi-row inserts.
+		Mirrors the validations run by Leave Allocation on submit, using set-based queries."""
+		leave_type = frappe.db.get_value(
+			"Leave Type",
+			self.leave_type,
+			["max_leaves_allowed", "allow_over_allocation", "is_earned_leave", "is_compensatory"],
+			as_dict=True,
+		)
+		new_leaves = flt(self.no_of_days)
+		future_carry_forwards = self.get_employees_with_future_carry_forward(employees, to_date)
+		allocated_in_period = self.get_leaves_allocated_in_leave_period(employees, from_date, to_date)
+
+		success, failure, allocations, ledger_entries = [], [], [], []
+		for employee in employees:
+			allocation_from = getdate(from_date or employee.date_of_joining)
+			days_in_period = date_diff(to_date, allocation_from) + 1
+
+			if (
+				days_in_period <= 1
+				or employee.name in future_carry_forwards
+				or (not new_leaves and not (leave_type.is_earned_leave or leave_type.is_compensatory))
+				or (new_leaves > days_in_period and not leave_type.allow_over_allocation)
+				or (
+					leave_type.max_leaves_allowed > 0
+					and flt(allocated_in_period.get(employee.name)) + new_leaves
+					> leave_type.max_leaves_allowed
+				)
+			):
+				failure.append(employee.name)
+				continue
+
+			allocation = frappe.new_doc(
+				"Leave Allocation",
+				employee=employee.name,
+				employee_name=employee.employee_name,
+				department=employee.department,
+				company=employee.company,
+				leave_type=self.leave_type,
+				from_date=allocation_from,
+				to_date=to_date,
+				new_leaves_allocated=new_leaves,
+				total_leaves_allocated=new_leaves,
+				docstatus=1,
+			)
+			allocation.set_new_name()
+			allocations.append(allocation)
+			ledger_entries.append(
+				frappe.new_doc(
+					"Leave Ledger Entry",
+					employee=employee.name,
+					employee_name=employee.employee_name,
+					company=employee.company,
+					leave_type=self.leave_type,
+					transaction_type="Leave Allocation",
+					transaction_name=allocation.name,
+					leaves=new_leaves,
+					from_date=allocation_from,
+					to_date=to_date,
+					docstatus=1,
+				)
+			)
+			success.append(
+				{"doc": get_link_to_form("Leave Allocation", allocation.name), "employee": employee.name}
+			)
+
+		try:
+			bulk_insert_documents(allocations + ledger_entries)
+		except Exception:
+			frappe.db.rollback()
+			frappe.log_error(
+				"Bulk Leave Allocation failed for a batch of employees", reference_doctype="Leave Allocation"
+			)
+			return [], failure + [d["employee"] for d in success]
+
+		return success, failure
+
+	def get_employees_with_future_carry_forward(self, employees: list, to_date) -> set:
+		Allocation = frappe.qb.DocType("Leave Allocation")
+		return set(
+			frappe.qb.from_(Allocation)
+			.select(Allocation.employee)
+			.distinct()
+			.where(
+				(Allocation.employee.isin([d.name for d in employees] or [""]))
+				& (Allocation.leave_type == self.leave_type)
+				& (Allocation.docstatus == 1)
+				& (Allocation.carry_forward == 1)
+				& (Allocation.from_date > to_date)
+			)
+			.run(pluck=True)
+		)
+
+	def get_leaves_allocated_in_leave_period(self, employees: list, from_date, to_date) -> dict:
+		"""Returns leaves already allocated to each employee in the leave period of their company"""
+		allocated = {}
+		Allocation = frappe.qb.DocType("Leave Allocation")
+
+		for company in {d.company for d in employees}:
+			leave_period = get_leave_period(from_date or to_date, to_date, company)
+			if not leave_period:
+				continue
+
+			period_from, period_to = leave_period[0].from_date, leave_period[0].to_date
+			allocated.update(
+				frappe.qb.from_(Allocation)
+				.select(Allocation.employee, Sum(Allocation.total_leaves_allocated))
+				.where(
+					(Allocation.employee.isin([d.name for d in employees if d.company == company]))
+					& (Allocation.leave_type == self.leave_type)
+					& (Allocation.docstatus == 1)
+					& (
+						(Allocation.from_date.between(period_from, period_to))
+						| (Allocation.to_date.between(period_from, period_to))
+						| ((Allocation.from_date < period_from) & (Allocation.to_date > period_to))
+					)
+				)
+				.groupby(Allocation.employee)
+				.run()
+			)
+
+		return allocated
+
+	def create_leave_allocations(self, employees: list, publish_status: bool = True) -> tuple[list, list]:
 		from_date, to_date = self.get_from_to_date()
 		failure = []
 		success = []
@@ -63,14 +313,18 @@ class LeaveControlPanel(Document):
 				failure.append(employee)
 
 		frappe.clear_messages()
-		frappe.publish_realtime(
-			"completed_bulk_leave_allocation",
-			message={"success": success, "failure": failure},
-			doctype="Bulk Salary Structure Assignment",
-			after_commit=True,
-		)
+		if publish_status:
+			frappe.publish_realtime(
+				"completed_bulk_leave_allocation",
+				message={"success": success, "failure": failure},
+				doctype="Bulk Salary Structure Assignment",
+				after_commit=True,
+			)
+		return success, failure
 
-	def create_leave_policy_assignments(self, employees: list) -> dict:
+	def create_leave_policy_assignments(
+		self, employees: list, publish_status: bool = True
+	) -> tuple[list, list]:
 		from_date, to_date = self.get_from_to_date()
 		assignment_based_on = None if self.dates_based_on == "Custom Range" else self.dates_based_on
 		failure = []
@@ -104,12 +358,14 @@ class LeaveControlPanel(Document):
 				failure.append(employee)
 
 		frappe.clear_messages()
-		frappe.publish_realtime(
-			"completed_bulk_leave_policy_assignment",
-			message={"success": success, "failure": failure},
-			doctype="Bulk Salary Structure Assignment",
-			after_commit=True,
-		)
+		if publish_status:
+			frappe.publish_realtime(
+				"completed_bulk_leave_policy_assignment",
+				message={"success": success, "failure": failure},
+				doctype="Bulk Salary Structure Assignment",
+				after_commit=True,
+			)
+		return success, failure
 
 	def get_from_to_date(self):
 		if self.dates_based_on == "Joining Date":
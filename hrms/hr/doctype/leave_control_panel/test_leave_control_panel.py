@@ -9,7 +9,10 @@ from frappe.tests import IntegrationTestCase
 from erpnext.setup.doctype.employee.test_employee import make_employee
 
 from hrms.hr.doctype.leave_allocation.test_leave_allocation import create_leave_allocation
-from hrms.hr.doctype.leave_control_panel.leave_control_panel import LeaveControlPanel
+from hrms.hr.doctype.leave_control_panel.leave_control_panel import (
+	BULK_ALLOCATION_RUN,
+	LeaveControlPanel,
+)
 from hrms.hr.doctype.leave_period.test_leave_period import create_leave_period
 from hrms.hr.doctype.leave_policy.test_leave_policy import create_leave_policy
 from hrms.tests.test_utils import create_company
@@ -123,6 +126,40 @@ class TestLeaveControlPanel(IntegrationTestCase):
 		self.assertEqual(lpa.effective_from, doj)
 		self.assertEqual(lpa.effective_to, to_date)
 
+	def test_bulk_allocation_in_shards(self):
+		args = {
+			"doctype": "Leave Control Panel",
+			"dates_based_on": "Custom Range",
+			"from_date": date(2030, 6, 1),
+			"to_date": date(2030, 6, 30),
+			"allocate_based_on_leave_policy": 0,
+			"leave_type": "Sick Leave",
+			"no_of_days": 5,
+		}
+		lcp = LeaveControlPanel(args)
+		frappe.cache().hset(BULK_ALLOCATION_RUN, "test-run", {"total": 2, "processed": 0})
+		lcp.process_allocation_shard([self.emp1, self.emp2], "test-run")
+
+		filters = {"employee": ["in", [self.emp1, self.emp2]], "from_date": args["from_date"]}
+		allocations = frappe.get_all(
+			"Leave Allocation", filters=filters, fields=["name", "total_leaves_allocated", "docstatus"]
+		)
+		self.assertEqual(len(allocations), 2)
+		for allocation in allocations:
+			self.assertEqual(allocation.docstatus, 1)
+			self.assertEqual(allocation.total_leaves_allocated, 5)
+			leaves = frappe.db.get_value(
+				"Leave Ledger Entry",
+				{"transaction_name": allocation.name, "transaction_type": "Leave Allocation", "docstatus": 1},
+				"leaves",
+			)
+			self.assertEqual(leaves, 5)
+
+		# re-running the same selection resumes the run and skips employees already allocated
+		frappe.cache().hset(BULK_ALLOCATION_RUN, "test-rerun", {"total": 2, "processed": 0})
+		lcp.process_allocation_shard([self.emp1, self.emp2], "test-rerun")
+		self.assertEqual(frappe.db.count("Leave Allocation", filters), 2)
+
 	def test_get_employees(self):
 		allocation = create_leave_allocation(
 			employee=self.emp1,
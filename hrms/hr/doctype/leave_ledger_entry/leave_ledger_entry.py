@@ -251,3 +251,5 @@ def expire_carried_forward_allocation(allocation):
 
 def on_doctype_update():
 	frappe.db.add_index("Leave Ledger Entry", ["transaction_type", "transaction_name"])
+	# filters and sort order of the Leave Ledger report
+	frappe.db.add_index("Leave Ledger Entry", ["employee", "leave_type", "from_date"])
@@ -3,6 +3,7 @@
 
 
 import json
+import time
 
 import frappe
 from frappe import _, bold
@@ -12,6 +13,7 @@ from frappe.utils import (
 	add_to_date,
 	cint,
 	comma_and,
+	create_batch,
 	date_diff,
 	flt,
 	formatdate,
@@ -26,6 +28,8 @@ from frappe.utils import (
 	rounded,
 )
 
+from hrms.utils import bulk_insert_documents
+
 
 class LeavePolicyAssignment(Document):
 	def validate(self):
@@ -462,6 +466,397 @@ def show_assignment_submission_status(failed):
 	)
 
 
+@frappe.whitelist()
+def bulk_grant_leave_policy(assignments: list | str, chunk_size: int = 500) -> dict:
+	"""Creates submitted Leave Policy Assignments for many employees along with their leave allocations,
+	earned leave schedules and ledger entries. Allocations are computed in memory and persisted with
+	multi-row inserts instead of submitting every document.
+
+	Each assignment is a dict with `employee` and the Leave Policy Assignment fields: `leave_policy`,
+	`assignment_based_on`, `leave_period`, `effective_from`, `effective_to` and `carry_forward`.
+	"""
+	frappe.has_permission("Leave Policy Assignment", "submit", throw=True)
+
+	if isinstance(assignments, str):
+		assignments = json.loads(assignments)
+
+	start = time.monotonic()
+	assignments = [frappe._dict(d) for d in assignments]
+	context = get_bulk_grant_context(assignments)
+	success, failed = [], []
+
+	for batch in create_batch(assignments, cint(chunk_size) or 500):
+		batch_success, batch_failed = grant_leave_policy_for_batch(list(batch), context)
+		success.extend(batch_success)
+		failed.extend(batch_failed)
+
+	frappe.clear_messages()
+	time_taken = time.monotonic() - start
+	return {
+		"success": success,
+		"failed": failed,
+		"time_taken": flt(time_taken, 2),
+		"throughput": flt(len(success) / time_taken, 2) if time_taken else len(success),
+	}
+
+
+def get_bulk_grant_context(assignments: list) -> frappe._dict:
+	"""Loads the employees, leave policies, leave types and leave periods shared by all assignments"""
+	employees = frappe.get_all(
+		"Employee",
+		filters={"name": ("in", {d.employee for d in assignments})},
+		fields=["name", "employee_name", "company", "department", "date_of_joining"],
+	)
+	leave_periods = frappe.get_all(
+		"Leave Period",
+		filters={"company": ("in", {d.company for d in employees}), "is_active": 1},
+		fields=["name", "company", "from_date", "to_date"],
+	)
+
+	policy_details = frappe._dict()
+	for d in frappe.get_all(
+		"Leave Policy Detail",
+		filters={"parent": ("in", {d.leave_policy for d in assignments}), "parenttype": "Leave Policy"},
+		fields=["parent", "leave_type", "annual_allocation"],
+		order_by="idx",
+	):
+		policy_details.setdefault(d.parent, []).append(d)
+
+	leave_types = get_leave_type_details()
+	for d in frappe.get_all("Leave Type", fields=["name", "max_leaves_allowed", "allow_over_allocation"]):
+		leave_types[d.name].update(d)
+
+	return frappe._dict(
+		employees={d.name: d for d in employees},
+		leave_periods={d.name: d for d in leave_periods},
+		policy_details=policy_details,
+		leave_types=leave_types,
+	)
+
+
+def grant_leave_policy_for_batch(assignments: list, context: frappe._dict) -> tuple[list, list]:
+	success, failed = [], []
+	pending = []
+
+	for d in assignments:
+		employee = context.employees.get(d.employee)
+		if not employee:
+			failed.append({"employee": d.employee, "error": _("Employee {0} not found").format(d.employee)})
+			continue
+
+		assignment = frappe.new_doc(
+			"Leave Policy Assignment",
+			employee=employee.name,
+			employee_name=employee.employee_name,
+			company=employee.company,
+			leave_policy=d.leave_policy,
+			assignment_based_on=d.assignment_based_on or None,
+			leave_period=d.leave_period or None,
+			effective_from=getdate(d.effective_from) if d.effective_from else None,
+			effective_to=getdate(d.effective_to) if d.effective_to else None,
+			carry_forward=cint(d.carry_forward),
+		)
+		set_bulk_assignment_dates(assignment, employee, context)
+		pending.append((assignment, employee))
+
+	existing = get_existing_assignments_and_allocations([a for a, _employee in pending])
+	built = []
+
+	for assignment, employee in pending:
+		if assignment.carry_forward:
+			# carry forwarded leaves depend on the previous allocation of each leave type
+			try:
+				validate_bulk_assignment_overlap(assignment, employee, existing)
+			except frappe.ValidationError as e:
+				failed.append({"employee": employee.name, "error": str(e)})
+				continue
+
+			submit_assignment(assignment, success, failed)
+			if assignment.docstatus == 1:
+				add_to_existing_assignments(assignment, existing)
+			continue
+
+		try:
+			assignment_docs = build_assignment_with_allocations(assignment, employee, context, existing)
+		except frappe.ValidationError as e:
+			failed.append({"employee": employee.name, "error": str(e)})
+		else:
+			built.append((assignment, assignment_docs))
+
+	if built:
+		savepoint = "before_bulk_leave_policy_grant"
+		frappe.db.savepoint(savepoint)
+		try:
+			bulk_insert_documents([doc for _assignment, docs in built for doc in docs])
+		except Exception:
+			frappe.db.rollback(save_point=savepoint)
+			frappe.log_error("Bulk Leave Policy Grant failed", reference_doctype="Leave Policy Assignment")
+			# insert the assignments one at a time, so only the ones that fail are reported
+			for assignment, docs in built:
+				insert_assignment_docs(assignment, docs, success, failed)
+		else:
+			success.extend(
+				{"employee": assignment.employee, "leave_policy_assignment": assignment.name}
+				for assignment, _docs in built
+			)
+
+	return success, failed
+
+
+def insert_assignment_docs(assignment, docs: list, success: list, failed: list) -> None:
+	savepoint = "before_assignment_insert"
+	try:
+		frappe.db.savepoint(savepoint)
+		bulk_insert_documents(docs)
+	except Exception as e:
+		frappe.db.rollback(save_point=savepoint)
+		failed.append({"employee": assignment.employee, "error": str(e)})
+	else:
+		success.append({"employee": assignment.employee, "leave_policy_assignment": assignment.name})
+
+
+def set_bulk_assignment_dates(assignment, employee, context) -> None:
+	"""In-memory equivalent of `LeavePolicyAssignment.set_dates`"""
+	if assignment.assignment_based_on == "Leave Period":
+		leave_period = context.leave_periods.get(assignment.leave_period) or frappe._dict()
+		assignment.effective_from = leave_period.from_date
+		assignment.effective_to = leave_period.to_date
+	elif assignment.assignment_based_on == "Joining Date":
+		assignment.effective_from = employee.date_of_joining
+		if not assignment.effective_to:
+			assignment.effective_to = get_last_day(add_months(assignment.effective_from, 12))
+
+
+def get_existing_assignments_and_allocations(assignments: list) -> frappe._dict:
+	"""Fetches submitted assignments and allocations that could overlap with any of the assignments"""
+	existing = frappe._dict(assignments={}, allocations={})
+	dated = [d for d in assignments if d.effective_from and d.effective_to]
+	if not dated:
+		return existing
+
+	employees = list({d.employee for d in dated})
+	from_date = min(getdate(d.effective_from) for d in dated)
+	to_date = max(getdate(d.effective_to) for d in dated)
+
+	for d in frappe.get_all(
+		"Leave Policy Assignment",
+		filters={
+			"employee": ("in", employees),
+			"docstatus": 1,
+			"effective_to": (">=", from_date),
+			"effective_from": ("<=", to_date),
+		},
+		fields=["employee", "leave_policy", "effective_from", "effective_to"],
+	):
+		existing.assignments.setdefault(d.employee, []).append(d)
+
+	# allocations are also needed for the max leaves check of the whole leave period,
+	# so look one year around the assignment dates
+	for d in frappe.get_all(
+		"Leave Allocation",
+		filters={
+			"employee": ("in", employees),
+			"docstatus": 1,
+			"to_date": (">=", add_months(from_date, -12)),
+		},
+		fields=[
+			"name",
+			"employee",
+			"leave_type",
+			"from_date",
+			"to_date",
+			"carry_forward",
+			"total_leaves_allocated",
+		],
+	):
+		existing.allocations.setdefault((d.employee, d.leave_type), []).append(d)
+
+	return existing
+
+
+def build_assignment_with_allocations(assignment, employee, context, existing) -> list:
+	"""Validates the assignment against existing records and returns the assignment, its allocations
+	and their ledger entries as submitted documents, ready to be inserted"""
+	if not (assignment.effective_from and assignment.effective_to):
+		frappe.throw(_("Effective From and Effective To dates are required"))
+
+	effective_from, effective_to = getdate(assignment.effective_from), getdate(assignment.effective_to)
+	validate_bulk_assignment_overlap(assignment, employee, existing)
+
+	if not context.policy_details.get(assignment.leave_policy):
+		frappe.throw(
+			_("Leave Policy {0} does not exist or has no leave types").format(assignment.leave_policy)
+		)
+
+	assignment.docstatus = 1
+	assignment.leaves_allocated = 1
+	assignment.set_new_name()
+	docs = [assignment]
+
+	for policy_detail in context.policy_details[assignment.leave_policy]:
+		leave_details = context.leave_types.get(policy_detail.leave_type)
+		if leave_details.is_lwp:
+			continue
+
+		new_leaves = assignment.get_new_leaves(
+			policy_detail.annual_allocation, leave_details, employee.date_of_joining
+		)
+		validate_bulk_allocation(
+			employee, leave_details, new_leaves, effective_from, effective_to, context, existing
+		)
+
+		allocation = frappe.new_doc(
+			"Leave Allocation",
+			employee=employee.name,
+			employee_name=employee.employee_name,
+			department=employee.department,
+			company=employee.company,
+			leave_type=leave_details.name,
+			from_date=effective_from,
+			to_date=effective_to,
+			new_leaves_allocated=new_leaves,
+			total_leaves_allocated=new_leaves,
+			leave_policy_assignment=assignment.name,
+			leave_policy=assignment.leave_policy,
+			docstatus=1,
+		)
+		if leave_details.is_earned_leave:
+			for row in assignment.get_earned_leave_schedule(
+				policy_detail.annual_allocation, leave_details, employee.date_of_joining, new_leaves
+			):
+				allocation.append("earned_leave_schedule", row)
+
+		allocation.set_new_name()
+		ledger_entry = frappe.new_doc(
+			"Leave Ledger Entry",
+			employee=employee.name,
+			employee_name=employee.employee_name,
+			company=employee.company,
+			leave_type=leave_details.name,
+			transaction_type="Leave Allocation",
+			transaction_name=allocation.name,
+			leaves=new_leaves,
+			from_date=effective_from,
+			to_date=effective_to,
+			docstatus=1,
+		)
+		docs.extend([allocation, ledger_entry])
+
+	# later assignments of the batch are validated against this one too
+	add_to_existing_assignments(assignment, existing)
+	for allocation in (d for d in docs if d.doctype == "Leave Allocation"):
+		existing.allocations.setdefault((employee.name, allocation.leave_type), []).append(
+			frappe._dict(
+				name=allocation.name,
+				employee=employee.name,
+				leave_type=allocation.leave_type,
+				from_date=effective_from,
+				to_date=effective_to,
+				carry_forward=0,
+				total_leaves_allocated=allocation.total_leaves_allocated,
+			)
+		)
+
+	return docs
+
+
+def validate_bulk_assignment_overlap(assignment, employee, existing) -> None:
+	if not (assignment.effective_from and assignment.effective_to):
+		return
+
+	effective_from, effective_to = getdate(assignment.effective_from), getdate(assignment.effective_to)
+	for d in existing.assignments.get(employee.name, []):
+		if d.effective_to >= effective_from and d.effective_from <= effective_to:
+			frappe.throw(
+				_("Leave Policy: {0} already assigned for Employee {1} for period {2} to {3}").format(
+					bold(d.leave_policy),
+					bold(employee.name),
+					bold(formatdate(effective_from)),
+					bold(formatdate(effective_to)),
+				),
+				title=_("Leave Policy Assignment Overlap"),
+			)
+
+
+def add_to_existing_assignments(assignment, existing) -> None:
+	if not (assignment.effective_from and assignment.effective_to):
+		return
+
+	existing.assignments.setdefault(assignment.employee, []).append(
+		frappe._dict(
+			employee=assignment.employee,
+			leave_policy=assignment.leave_policy,
+			effective_from=getdate(assignment.effective_from),
+			effective_to=getdate(assignment.effective_to),
+		)
+	)
+
+
+def validate_bulk_allocation(
+	employee, leave_details, new_leaves, from_date, to_date, context, existing
+) -> None:
+	"""Set-based equivalent of the validations run by Leave Allocation on submit"""
+	if date_diff(to_date, from_date) <= 0:
+		frappe.throw(_("To date cannot be before from date"))
+
+	allocations = existing.allocations.get((employee.name, leave_details.name), [])
+	for d in allocations:
+		if d.to_date >= from_date and d.from_date <= to_date:
+			frappe.throw(
+				_("{0} already allocated for Employee {1} for period {2} to {3}").format(
+					leave_details.name, employee.name, formatdate(from_date), formatdate(to_date)
+				)
+			)
+		if d.carry_forward and d.from_date > to_date:
+			frappe.throw(
+				_(
+					"Leave cannot be allocated before {0}, as leave balance has already been carry-forwarded in the future leave allocation record {1}"
+				).format(formatdate(d.from_date), d.name)
+			)
+
+	if not new_leaves and not (leave_details.is_earned_leave or leave_details.is_compensatory):
+		frappe.throw(_("Total leaves allocated is mandatory for Leave Type {0}").format(leave_details.name))
+
+	if new_leaves > date_diff(to_date, from_date) + 1 and not leave_details.allow_over_allocation:
+		frappe.throw(_("Total Leaves Allocated are more than the number of days in the allocation period"))
+
+	if leave_details.max_leaves_allowed > 0:
+		leave_period = next(
+			(
+				d
+				for d in context.leave_periods.values()
+				if d.company == employee.company and d.from_date <= to_date and d.to_date >= from_date
+			),
+			None,
+		)
+		allocated = 0
+		if leave_period:
+			allocated = sum(
+				flt(d.total_leaves_allocated)
+				for d in allocations
+				if d.to_date >= leave_period.from_date and d.from_date <= leave_period.to_date
+			)
+		if allocated + new_leaves > leave_details.max_leaves_allowed:
+			frappe.throw(
+				_(
+					"Total allocated leaves are more than maximum allocation allowed for {0} leave type for employee {1} in the period"
+				).format(leave_details.name, employee.name)
+			)
+
+
+def submit_assignment(assignment, success: list, failed: list) -> None:
+	savepoint = "before_assignment_submission"
+	try:
+		frappe.db.savepoint(savepoint)
+		assignment.insert()
+		assignment.submit()
+	except Exception as e:
+		frappe.db.rollback(save_point=savepoint)
+		failed.append({"employee": assignment.employee, "error": str(e)})
+	else:
+		success.append({"employee": assignment.employee, "leave_policy_assignment": assignment.name})
+
+
 def get_leave_type_details():
 	leave_type_details = frappe._dict()
 	leave_types = frappe.get_all(
@@ -8,6 +8,7 @@ from hrms.hr.doctype.leave_application.test_leave_application import get_employe
 from hrms.hr.doctype.leave_period.test_leave_period import create_leave_period
 from hrms.hr.doctype.leave_policy.test_leave_policy import create_leave_policy
 from hrms.hr.doctype.leave_policy_assignment.leave_policy_assignment import (
+	bulk_grant_leave_policy,
 	create_assignment,
 	create_assignment_for_multiple_employees,
 )
@@ -269,3 +270,69 @@ class TestLeavePolicyAssignment(HRMSTestSuite):
 		# months passed (18) are calculated correctly but total allocation of 36 exceeds 24 hence 24
 		# this upper cap is intentional, without that 36 leaves would be allocated correctly
 		self.assertEqual(earned_leave_allocation, 24)
+
+	def test_bulk_grant_leave_policy(self):
+		leave_period = get_leave_period()
+		leave_type = create_leave_type(
+			leave_type_name="_Test Earned Leave", is_earned_leave=True, allocate_on_day="Last Day"
+		)
+		leave_policy = create_leave_policy(leave_type=leave_type.name, annual_allocation=12)
+		leave_policy.submit()
+
+		self.employee.date_of_joining = get_first_day(leave_period.from_date)
+		self.employee.save()
+
+		assignment = {
+			"employee": self.employee.name,
+			"assignment_based_on": "Leave Period",
+			"leave_policy": leave_policy.name,
+			"leave_period": leave_period.name,
+		}
+		result = bulk_grant_leave_policy([assignment])
+		self.assertEqual(len(result["success"]), 1)
+		self.assertFalse(result["failed"])
+
+		assignment_name = result["success"][0]["leave_policy_assignment"]
+		self.assertEqual(
+			frappe.db.get_value(
+				"Leave Policy Assignment", assignment_name, ["docstatus", "leaves_allocated"]
+			),
+			(1, 1),
+		)
+
+		allocation = frappe.get_doc("Leave Allocation", {"leave_policy_assignment": assignment_name})
+		self.assertEqual(allocation.docstatus, 1)
+		self.assertEqual(getdate(allocation.from_date), getdate(leave_period.from_date))
+		self.assertTrue(allocation.earned_leave_schedule)
+		self.assertEqual(
+			frappe.db.get_value(
+				"Leave Ledger Entry",
+				{"transaction_name": allocation.name, "transaction_type": "Leave Allocation"},
+				"leaves",
+			),
+			allocation.new_leaves_allocated,
+		)
+
+		# overlapping assignments are reported per employee instead of failing the whole batch
+		result = bulk_grant_leave_policy([assignment])
+		self.assertFalse(result["success"])
+		self.assertEqual(result["failed"][0]["employee"], self.employee.name)
+
+	def test_bulk_grant_overlap_within_batch(self):
+		leave_period = get_leave_period()
+		leave_type = create_leave_type(leave_type_name="_Test Leave Type")
+		leave_policy = create_leave_policy(leave_type=leave_type.name, annual_allocation=10)
+		leave_policy.submit()
+
+		assignment = {
+			"employee": self.employee.name,
+			"assignment_based_on": "Leave Period",
+			"leave_policy": leave_policy.name,
+			"leave_period": leave_period.name,
+		}
+		result = bulk_grant_leave_policy([assignment, assignment])
+		self.assertEqual(len(result["success"]), 1)
+		self.assertEqual(len(result["failed"]), 1)
+		self.assertEqual(
+			frappe.db.count("Leave Policy Assignment", {"employee": self.employee.name, "docstatus": 1}), 1
+		)
@@ -9,13 +9,18 @@ import frappe
 from frappe import _, bold
 from frappe.model.docstatus import DocStatus
 from frappe.model.document import Document
-from frappe.utils import cstr, flt
+from frappe.utils import create_batch, cstr, flt
 from frappe.utils.data import format_time, get_link_to_form, getdate
 
 from hrms.payroll.doctype.payroll_entry.payroll_entry import get_start_end_dates
 from hrms.payroll.doctype.salary_structure_assignment.salary_structure_assignment import (
 	get_assigned_salary_structure,
 )
+from hrms.utils import bulk_insert_documents
+
+# employees or slips processed per background job when Payroll Entry creates or submits overtime slips
+OVERTIME_SHARD_SIZE = 500
+OVERTIME_RUN = "payroll_entry_overtime_run"
 
 
 class OvertimeSlip(Document):
@@ -99,25 +104,26 @@ class OvertimeSlip(Document):
 		records = self.get_attendance_records()
 		if len(records):
 			self.create_overtime_details_row_for_attendance(records)
+		self.set_total_overtime_duration()
+		self.save()
+
+	def set_total_overtime_duration(self):
 		if len(self.overtime_details):
 			total_overtime_duration = 0.0
 			for detail in self.overtime_details:
 				if detail.overtime_duration is not None:
 					total_overtime_duration += detail.overtime_duration
 			self.total_overtime_duration = total_overtime_duration
-		self.save()
 
-	def create_overtime_details_row_for_attendance(self, records):
+	def create_overtime_details_row_for_attendance(self, records, overtime_types: dict | None = None):
 		self.overtime_details = []
-		overtime_type_cache = {}
+		if overtime_types is None:
+			overtime_types = get_overtime_types({record.overtime_type for record in records})
 
 		for record in records:
-			if record.overtime_type not in overtime_type_cache:
-				overtime_type_cache[record.overtime_type] = frappe.db.get_value(
-					"Overtime Type", record.overtime_type, "maximum_overtime_hours_allowed"
-				)
-
-			maximum_overtime_hours_allowed = overtime_type_cache[record.overtime_type]
+			maximum_overtime_hours_allowed = flt(
+				overtime_types.get(record.overtime_type, {}).get("maximum_overtime_hours_allowed")
+			)
 			overtime_duration = record.actual_overtime_duration or 0.0
 
 			if maximum_overtime_hours_allowed > 0:
@@ -135,6 +141,7 @@ class OvertimeSlip(Document):
 						"date": record.attendance_date,
 						"overtime_type": record.overtime_type,
 						"overtime_duration": overtime_duration,
+						"maximum_overtime_hours_allowed": maximum_overtime_hours_allowed,
 						"standard_working_hours": record.standard_working_hours,
 					},
 				)
@@ -198,9 +205,10 @@ class OvertimeSlip(Document):
 		if not self.overtime_details:
 			return {}
 
-		unique_overtime_types = {detail.overtime_type for detail in self.overtime_details}
-
-		self.overtime_types = self._bulk_load_overtime_types(unique_overtime_types)
+		# overtime types and holidays are set beforehand when slips are submitted in a batch
+		if not hasattr(self, "overtime_types"):
+			unique_overtime_types = {detail.overtime_type for detail in self.overtime_details}
+			self.overtime_types = get_overtime_types(unique_overtime_types)
 		holiday_date_map = self.get_holiday_map()
 		overtime_components = {}
 
@@ -226,58 +234,6 @@ class OvertimeSlip(Document):
 
 		return overtime_components
 
-	def _bulk_load_overtime_types(self, overtime_type_names):
-		"""
-		Load all overtime type details in bulk
-		"""
-		if not overtime_type_names:
-			return {}
-
-		# Get all overtime types details
-		overtime_types_data = frappe.get_all(
-			"Overtime Type",
-			filters={"name": ["in", list(overtime_type_names)]},
-			fields=[
-				"name",
-				"standard_multiplier",
-				"weekend_multiplier",
-				"public_holiday_multiplier",
-				"applicable_for_weekend",
-				"applicable_for_public_holiday",
-				"overtime_salary_component",
-				"overtime_calculation_method",
-				"hourly_rate",
-			],
-		)
-
-		overtime_types = {}
-		salary_component_based_types = []
-
-		for ot_data in overtime_types_data:
-			overtime_types[ot_data.name] = ot_data
-			if ot_data.overtime_calculation_method == "Salary Component Based":
-				salary_component_based_types.append(ot_data.name)
-
-		# Bulk load salary components for salary component based types
-		if salary_component_based_types:
-			salary_components_data = frappe.get_all(
-				"Overtime Salary Component",
-				filters={"parent": ["in", salary_component_based_types]},
-				fields=["parent", "salary_component"],
-			)
-
-			# Group by parent
-			components_by_parent = {}
-			for comp_data in salary_components_data:
-				if comp_data.parent not in components_by_parent:
-					components_by_parent[comp_data.parent] = []
-				components_by_parent[comp_data.parent].append(comp_data.salary_component)
-
-			for ot_type in salary_component_based_types:  # Add components to overtime types
-				overtime_types[ot_type]["components"] = components_by_parent.get(ot_type, [])
-
-		return overtime_types
-
 	def _get_applicable_hourly_rate(self, overtime_type, standard_working_hours=0):
 		overtime_details = self.overtime_types[overtime_type]
 		overtime_calculation_method = overtime_details["overtime_calculation_method"]
@@ -295,7 +251,9 @@ class OvertimeSlip(Document):
 		components = self.overtime_types[overtime_type]["components"] or []
 
 		if not hasattr(self, "_cached_salary_slip"):
-			salary_structure = get_assigned_salary_structure(self.employee, self.start_date)
+			salary_structure = getattr(self, "_salary_structure", None) or get_assigned_salary_structure(
+				self.employee, self.start_date
+			)
 			self._cached_salary_slip = self._make_salary_slip(salary_structure)
 
 		if not components or not hasattr(self, "_cached_salary_slip"):
@@ -352,6 +310,9 @@ class OvertimeSlip(Document):
 
 		from hrms.utils.holiday_list import get_holiday_dates_between
 
+		if hasattr(self, "_holiday_date_map"):
+			return self._holiday_date_map
+
 		holiday_list = get_holiday_list_for_employee(self.employee)
 		holiday_dates = get_holiday_dates_between(
 			holiday_list, self.start_date, self.end_date, select_weekly_off=True, as_dict=True
@@ -443,18 +404,297 @@ def filter_employees_for_overtime_slip_creation(start_date, end_date, employees,
 	return eligible_employees
 
 
-def create_overtime_slips_for_employees(employees, args):
-	count = 0
+def get_overtime_types(overtime_type_names) -> dict:
+	"""
+	Load all overtime type details in bulk
+	"""
+	if not overtime_type_names:
+		return {}
+
+	# Get all overtime types details
+	overtime_types_data = frappe.get_all(
+		"Overtime Type",
+		filters={"name": ["in", list(overtime_type_names)]},
+		fields=[
+			"name",
+			"standard_multiplier",
+			"weekend_multiplier",
+			"public_holiday_multiplier",
+			"applicable_for_weekend",
+			"applicable_for_public_holiday",
+			"overtime_salary_component",
+			"overtime_calculation_method",
+			"hourly_rate",
+			"maximum_overtime_hours_allowed",
+		],
+	)
+
+	overtime_types = {}
+	salary_component_based_types = []
+
+	for ot_data in overtime_types_data:
+		overtime_types[ot_data.name] = ot_data
+		if ot_data.overtime_calculation_method == "Salary Component Based":
+			salary_component_based_types.append(ot_data.name)
+
+	# Bulk load salary components for salary component based types
+	if salary_component_based_types:
+		salary_components_data = frappe.get_all(
+			"Overtime Salary Component",
+			filters={"parent": ["in", salary_component_based_types]},
+			fields=["parent", "salary_component"],
+		)
+
+		# Group by parent
+		components_by_parent = {}
+		for comp_data in salary_components_data:
+			if comp_data.parent not in components_by_parent:
+				components_by_parent[comp_data.parent] = []
+			components_by_parent[comp_data.parent].append(comp_data.salary_component)
+
+		for ot_type in salary_component_based_types:  # Add components to overtime types
+			overtime_types[ot_type]["components"] = components_by_parent.get(ot_type, [])
+
+	return overtime_types
+
+
+def get_overtime_attendance(employees: list, start_date, end_date) -> dict:
+	"""Returns present attendance with overtime of each employee between the dates"""
+	attendance = {}
+	if not employees:
+		return attendance
+
+	for record in frappe.get_all(
+		"Attendance",
+		fields=[
+			"name",
+			"employee",
+			"attendance_date",
+			"overtime_type",
+			"actual_overtime_duration",
+			"standard_working_hours",
+		],
+		filters={
+			"employee": ("in", employees),
+			"docstatus": 1,
+			"attendance_date": ("between", [getdate(start_date), getdate(end_date)]),
+			"status": "Present",
+			"overtime_type": ["!=", ""],
+		},
+		order_by="attendance_date",
+	):
+		attendance.setdefault(record.employee, []).append(record)
+
+	return attendance
+
+
+class OvertimeBatch:
+	"""Overtime types, holidays and salary structures shared by a batch of overtime slips, so that
+	submitting them does not query these once per slip"""
+
+	def __init__(self, slips: list):
+		self.overtime_types = get_overtime_types(
+			{detail.overtime_type for slip in slips for detail in slip.overtime_details}
+		)
+		self.holiday_maps = self.get_holiday_maps(slips)
+		self.salary_structures = self.get_salary_structures(slips)
+
+	def prepare(self, slip) -> None:
+		slip.overtime_types = self.overtime_types
+		slip._holiday_date_map = self.holiday_maps.get(slip.employee, {})
+		if slip.name in self.salary_structures:
+			# the preview salary slip is built by the slip when it is needed
+			slip._salary_structure = self.salary_structures[slip.name]
+
+	def release(self, slip) -> None:
+		"""Frees the preview salary slip once the slip has been submitted"""
+		if hasattr(slip, "_cached_salary_slip"):
+			del slip._cached_salary_slip
+
+	def get_holiday_maps(self, slips: list) -> dict:
+		"""Returns {employee: {date: holiday}} over the period of all slips"""
+		if not slips:
+			return {}
+
+		Employee = frappe.qb.DocType("Employee")
+		Company = frappe.qb.DocType("Company")
+		employee_holiday_lists = {
+			d.name: d.holiday_list or d.default_holiday_list
+			for d in (
+				frappe.qb.from_(Employee)
+				.inner_join(Company)
+				.on(Employee.company == Company.name)
+				.select(Employee.name, Employee.holiday_list, Company.default_holiday_list)
+				.where(Employee.name.isin([slip.employee for slip in slips]))
+			).run(as_dict=True)
+		}
+
+		holiday_lists = {d for d in employee_holiday_lists.values() if d}
+		holidays = {}
+		if holiday_lists:
+			for holiday in frappe.get_all(
+				"Holiday",
+				filters={
+					"parent": ("in", list(holiday_lists)),
+					"holiday_date": (
+						"between",
+						[min(getdate(d.start_date) for d in slips), max(getdate(d.end_date) for d in slips)],
+					),
+				},
+				fields=["parent", "holiday_date", "weekly_off"],
+			):
+				holidays.setdefault(holiday.parent, {})[cstr(holiday.holiday_date)] = holiday
+
+		return {
+			employee: holidays.get(holiday_list, {})
+			for employee, holiday_list in employee_holiday_lists.items()
+		}
+
+	def get_salary_structures(self, slips: list) -> dict:
+		"""Returns {overtime slip: assigned salary structure} for slips with salary component based
+		overtime"""
+		slips = [
+			slip
+			for slip in slips
+			if any(
+				self.overtime_types.get(detail.overtime_type, {}).get("overtime_calculation_method")
+				== "Salary Component Based"
+				for detail in slip.overtime_details
+			)
+		]
+		if not slips:
+			return {}
+
+		assignments = {}
+		for assignment in frappe.get_all(
+			"Salary Structure Assignment",
+			filters={
+				"employee": ("in", [slip.employee for slip in slips]),
+				"docstatus": 1,
+				"from_date": ("<=", max(getdate(slip.start_date) for slip in slips)),
+			},
+			fields=["employee", "salary_structure", "from_date"],
+			order_by="from_date desc",
+		):
+			assignments.setdefault(assignment.employee, []).append(assignment)
+
+		salary_structures = {}
+		for slip in slips:
+			assignment = next(
+				(d for d in assignments.get(slip.employee, []) if d.from_date <= getdate(slip.start_date)),
+				None,
+			)
+			if assignment:
+				salary_structures[slip.name] = assignment.salary_structure
+
+		return salary_structures
+
+
+def enqueue_overtime_run(method, records_arg: str, records: list, **kwargs) -> None:
+	"""Splits the records into shards, each processed by a separate background job"""
+	run_id = frappe.generate_hash(length=12)
+	frappe.cache().hset(OVERTIME_RUN, run_id, {"total": len(records), "processed": 0})
+
+	for shard in create_batch(records, OVERTIME_SHARD_SIZE):
+		frappe.enqueue(
+			method,
+			queue="long",
+			timeout=3000,
+			run_id=run_id,
+			**{records_arg: list(shard)},
+			**kwargs,
+		)
+
+
+def update_overtime_run(run_id: str, processed: int, count: int, errors: list) -> dict | None:
+	"""Merges the results of a shard into its run, returns the results of the run once all shards
+	have finished"""
+	cache = frappe.cache()
+	# shards finish in any order, so lock the run while merging the results of this shard
+	with cache.lock(f"{OVERTIME_RUN}::{run_id}", timeout=60):
+		run = cache.hget(OVERTIME_RUN, run_id) or {}
+		run["processed"] = run.get("processed", 0) + processed
+		run["count"] = run.get("count", 0) + count
+		run["errors"] = run.get("errors", []) + errors
+		cache.hset(OVERTIME_RUN, run_id, run)
+
+	total = run.get("total") or processed
+	frappe.publish_progress(
+		run["processed"] * 100 / total,
+		title=_("Processing Overtime Slips..."),
+		description=_("{0} of {1} processed").format(run["processed"], total),
+	)
+
+	if run["processed"] < total:
+		return None
+
+	cache.hdel(OVERTIME_RUN, run_id)
+	return run
+
+
+def create_overtime_slips_for_employees(employees, args, run_id=None):
+	"""Creates draft overtime slips from the overtime attendance of the employees. Attendance and
+	overtime types are fetched for all employees at once and the slips are inserted together."""
+	args = frappe._dict(args)
 	errors = []
+
+	attendance = get_overtime_attendance(employees, args.start_date, args.end_date)
+	overtime_types = get_overtime_types(
+		{record.overtime_type for records in attendance.values() for record in records}
+	)
+	employee_details = {
+		d.name: d
+		for d in frappe.get_all(
+			"Employee",
+			filters={"name": ("in", employees)},
+			fields=["name", "employee_name", "department"],
+		)
+	}
+
+	slips = []
 	for emp in employees:
-		args.update({"doctype": "Overtime Slip", "employee": emp})
-		try:
-			frappe.get_doc(args).get_emp_and_overtime_details()
-			count += 1
-		except Exception as e:
-			frappe.clear_last_message()
-			errors.append(_("Employee {0} : {1}").format(emp, str(e)))
-			frappe.log_error(frappe.get_traceback(), _("Overtime Slip Creation Error for {0}").format(emp))
+		slip = frappe.new_doc(
+			"Overtime Slip",
+			employee=emp,
+			employee_name=employee_details.get(emp, {}).get("employee_name"),
+			department=employee_details.get(emp, {}).get("department"),
+			company=args.company,
+			posting_date=args.posting_date,
+			start_date=args.start_date,
+			end_date=args.end_date,
+			payroll_entry=args.payroll_entry,
+		)
+		slip.create_overtime_details_row_for_attendance(attendance.get(emp, []), overtime_types)
+		if not slip.overtime_details:
+			errors.append(
+				_("Employee {0} : {1}").format(
+					emp,
+					_("No attendance records found for employee {0} between {1} and {2}").format(
+						emp, args.start_date, args.end_date
+					),
+				)
+			)
+			continue
+
+		slip.set_total_overtime_duration()
+		slip.set_new_name()
+		slips.append(slip)
+
+	try:
+		if slips:
+			bulk_insert_documents(slips)
+		count = len(slips)
+	except Exception as e:
+		frappe.db.rollback()
+		count = 0
+		errors.extend(_("Employee {0} : {1}").format(slip.employee, str(e)) for slip in slips)
+		frappe.log_error(frappe.get_traceback(), _("Overtime Slip Creation Error"))
+
+	if run_id:
+		run = update_overtime_run(run_id, len(employees), count, errors)
+		if not run:
+			return
+		count, errors = run["count"], run["errors"]
 
 	if count:
 		frappe.msgprint(
@@ -475,21 +715,33 @@ def create_overtime_slips_for_employees(employees, args):
 	frappe.publish_realtime("completed_overtime_slip_creation", user=frappe.session.user)
 
 
-def submit_overtime_slips_for_employees(overtime_slips, payroll_entry):
+def submit_overtime_slips_for_employees(overtime_slips, payroll_entry, run_id=None):
 	count = 0
 	errors = []
-	for overtime_slip in overtime_slips:
+	docs = [frappe.get_doc("Overtime Slip", overtime_slip) for overtime_slip in overtime_slips]
+	batch = OvertimeBatch(docs)
+
+	for doc in docs:
 		try:
-			doc = frappe.get_doc("Overtime Slip", overtime_slip)
+			batch.prepare(doc)
 			doc.submitted_via_payroll_entry = 1
 			doc.submit()
 			count += 1
 		except Exception as e:
 			frappe.clear_last_message()
-			errors.append(_("{0} : {1}").format(overtime_slip, str(e)))
+			errors.append(_("{0} : {1}").format(doc.name, str(e)))
 			frappe.log_error(
-				frappe.get_traceback(), _("Overtime Slip Submission Error for {0}").format(overtime_slip)
+				frappe.get_traceback(), _("Overtime Slip Submission Error for {0}").format(doc.name)
 			)
+		finally:
+			batch.release(doc)
+
+	if run_id:
+		run = update_overtime_run(run_id, len(overtime_slips), count, errors)
+		if not run:
+			return
+		count, errors = run["count"], run["errors"]
+
 	if count:
 		frappe.msgprint(
 			_("Overtime Slips submitted for {0} employee(s)").format(count),
@@ -139,6 +139,84 @@ class TestOvertimeSlip(IntegrationTestCase):
 
 		self.assertTrue(overtime_slip)
 
+	def test_overtime_slips_processed_in_shards(self):
+		from hrms.hr.doctype.overtime_slip.overtime_slip import (
+			OVERTIME_RUN,
+			create_overtime_slips_for_employees,
+			submit_overtime_slips_for_employees,
+		)
+		from hrms.payroll.doctype.payroll_entry.payroll_entry import get_start_end_dates
+		from hrms.payroll.doctype.payroll_entry.test_payroll_entry import get_payroll_entry
+
+		date = getdate()
+		month_start_date = get_first_day(date)
+
+		company = frappe.get_doc("Company", TEST_COMPANY)
+		employees = [make_employee(f"test_overtime_shard_{i}@example.com") for i in range(2)]
+		overtime_type = create_overtime_type(overtime_calculation_method="Salary Component Based")
+		shift_type = setup_shift_type(
+			company=TEST_COMPANY,
+			shift_type="_Test Overtime Shift",
+			allow_overtime=1,
+			overtime_type=overtime_type.name,
+			last_sync_of_checkin=f"{add_days(date, 10)} 15:00:00",
+			process_attendance_after=add_days(month_start_date, -1),
+			mark_auto_attendance_on_holidays=1,
+		)
+		frappe.db.set_single_value("Payroll Settings", "create_overtime_slip", 1)
+
+		for employee in employees:
+			make_salary_structure(
+				"Test Overtime Salary Slip", "Monthly", employee=employee, company=TEST_COMPANY
+			)
+			make_shift_assignment(
+				shift_type=shift_type.name, employee=employee, start_date=add_days(month_start_date, -1)
+			)
+			create_checkin_records_for_overtime(employee)
+		shift_type.process_auto_attendance()
+
+		dates = get_start_end_dates("Monthly", nowdate())
+		payroll_entry = get_payroll_entry(
+			start_date=dates.start_date,
+			end_date=dates.end_date,
+			payable_account=company.default_payroll_payable_account,
+			currency=company.default_currency,
+			company=company.name,
+		)
+		args = frappe._dict(
+			posting_date=payroll_entry.posting_date,
+			start_date=payroll_entry.start_date,
+			end_date=payroll_entry.end_date,
+			company=payroll_entry.company,
+			payroll_entry=payroll_entry.name,
+		)
+
+		# one shard per employee, the run finishes with the last shard
+		frappe.cache().hset(OVERTIME_RUN, "test_overtime_run", {"total": 2, "processed": 0})
+		for employee in employees:
+			create_overtime_slips_for_employees([employee], args, run_id="test_overtime_run")
+		self.assertFalse(frappe.cache().hget(OVERTIME_RUN, "test_overtime_run"))
+
+		overtime_slips = payroll_entry.get_unsubmitted_overtime_slips()
+		self.assertEqual(len(overtime_slips), 2)
+		self.assertTrue(
+			all(
+				frappe.db.get_value("Overtime Slip", slip, "total_overtime_duration")
+				for slip in overtime_slips
+			)
+		)
+
+		submit_overtime_slips_for_employees(overtime_slips, payroll_entry.name)
+
+		amounts = frappe.get_all(
+			"Additional Salary",
+			filters={"ref_docname": ("in", overtime_slips), "docstatus": 1},
+			pluck="amount",
+		)
+		self.assertEqual(len(amounts), 2)
+		self.assertGreater(amounts[0], 0)
+		self.assertEqual(amounts[0], amounts[1])
+
 	def tearDown(self):
 		frappe.db.rollback()
 
@@ -0,0 +1,135 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import functools
+import json
+import re
+import time
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+from frappe.utils import cint, flt, now
+
+# normalized queries kept per log, ordered by their total time
+MAX_LOGGED_QUERIES = 20
+
+QUOTED_VALUE = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+NUMBER = re.compile(r"(?<![\w`.])-?\d+(?:\.\d+)?\b")
+PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+VALUE_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+class ReportExecutionLog(Document):
+	"""Duration, query count and rows of a script report run, along with the queries it ran"""
+
+	@staticmethod
+	def clear_old_logs(days=30):
+		table = frappe.qb.DocType("Report Execution Log")
+		frappe.db.delete(table, filters=(table.creation < (Now() - Interval(days=days))))
+
+
+class QueryProfiler:
+	"""Counts and times the queries run through `frappe.db.sql` while active, grouped by their
+	normalized text"""
+
+	def __init__(self):
+		self.queries = {}
+		self.query_count = 0
+		self.query_duration = 0.0
+
+	def __enter__(self):
+		self.sql = frappe.db.sql
+
+		def sql(query, *args, **kwargs):
+			start = time.perf_counter()
+			try:
+				return self.sql(query, *args, **kwargs)
+			finally:
+				self.record(str(query), time.perf_counter() - start)
+
+		frappe.db.sql = sql
+		return self
+
+	def __exit__(self, *args):
+		frappe.db.sql = self.sql
+
+	def record(self, query: str, duration: float) -> None:
+		self.query_count += 1
+		self.query_duration += duration
+
+		stats = self.queries.setdefault(normalize_query(query), [0, 0.0])
+		stats[0] += 1
+		stats[1] += duration
+
+	def get_queries(self) -> list[dict]:
+		queries = sorted(self.queries.items(), key=lambda d: d[1][1], reverse=True)
+		return [
+			{"query": query, "count": count, "duration": flt(duration, 4)}
+			for query, (count, duration) in queries
+		]
+
+
+def normalize_query(query: str) -> str:
+	"""Replaces values in a query with placeholders, so queries differing only in values match"""
+	query = PLACEHOLDER.sub("?", query)
+	query = QUOTED_VALUE.sub("?", query)
+	query = NUMBER.sub("?", query)
+	query = VALUE_LIST.sub("(?)", query)
+	return " ".join(query.split())
+
+
+def report_profiler(report_name: str):
+	"""Logs the duration and queries of each run of the decorated report `execute` while report
+	profiling is enabled in HR Settings"""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			if not is_profiling_enabled():
+				return execute(filters)
+
+			return profile_report(report_name, filters, lambda: execute(filters))
+
+		return wrapper
+
+	return decorator
+
+
+def is_profiling_enabled() -> bool:
+	return cint(frappe.db.get_single_value("HR Settings", "enable_report_profiling", cache=True))
+
+
+def profile_report(report_name: str, filters, execute):
+	"""Runs `execute` and queues a log of its duration and queries"""
+	start = time.perf_counter()
+	with QueryProfiler() as profiler:
+		result = execute()
+	duration = time.perf_counter() - start
+
+	threshold = cint(frappe.db.get_single_value("HR Settings", "repeated_query_threshold", cache=True)) or 25
+	queries = profiler.get_queries()
+	data = result[1] if result and len(result) > 1 else None
+
+	# report runs are read only requests, so the log is written by a background job
+	frappe.enqueue(
+		insert_report_execution_log,
+		queue="short",
+		report_name=report_name,
+		user=frappe.session.user,
+		executed_on=now(),
+		duration=flt(duration, 3),
+		query_count=profiler.query_count,
+		query_duration=flt(profiler.query_duration, 3),
+		row_count=len(data) if isinstance(data, list | tuple) else 0,
+		has_repeated_queries=cint(any(d["count"] > threshold for d in queries)),
+		filters=frappe.as_json(filters or {}),
+		queries=json.dumps(queries[:MAX_LOGGED_QUERIES], indent=1),
+	)
+
+	return result
+
+
+def insert_report_execution_log(**kwargs) -> None:
+	frappe.get_doc({"doctype": "Report Execution Log", **kwargs}).insert(ignore_permissions=True)
@@ -0,0 +1,59 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+import types
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase, change_settings
+
+from hrms.hr.doctype.report_execution_log.report_execution_log import (
+	QueryProfiler,
+	normalize_query,
+	report_profiler,
+)
+
+
+class TestReportExecutionLog(IntegrationTestCase):
+	def test_normalize_query(self):
+		self.assertEqual(
+			normalize_query(
+				"select `name` from `tabEmployee`\n where `company`='_Test Company' and idx > 2 and name in ('a', 'b')"
+			),
+			"select `name` from `tabEmployee` where `company`=? and idx > ? and name in (?)",
+		)
+		self.assertEqual(
+			normalize_query("select * from `tabEmployee` where name=%(name)s and status in (%s, %s)"),
+			"select * from `tabEmployee` where name=? and status in (?)",
+		)
+
+	def test_query_profiler_groups_repeated_queries(self):
+		employees = frappe.get_all("Employee", pluck="name", limit=3)
+		self.assertTrue(employees)
+
+		with QueryProfiler() as profiler:
+			for employee in employees:
+				frappe.db.get_value("Employee", employee, "employee_name")
+
+		self.assertEqual(profiler.query_count, len(employees))
+		queries = profiler.get_queries()
+		self.assertEqual(len(queries), 1)
+		self.assertEqual(queries[0]["count"], len(employees))
+
+		# the original method is restored on exit
+		self.assertIsInstance(frappe.db.sql, types.MethodType)
+
+	@change_settings("HR Settings", {"enable_report_profiling": 1})
+	def test_report_profiler(self):
+		@report_profiler("Test Report")
+		def execute(filters=None):
+			return [], frappe.get_all("Employee", filters=filters, limit=1)
+
+		with patch("hrms.hr.doctype.report_execution_log.report_execution_log.frappe.enqueue") as enqueue:
+			columns, data = execute({"status": "Active"})
+
+		self.assertEqual(columns, [])
+		log = enqueue.call_args.kwargs
+		self.assertEqual(log["report_name"], "Test Report")
+		self.assertTrue(log["query_count"])
+		self.assertEqual(log["row_count"], len(data))
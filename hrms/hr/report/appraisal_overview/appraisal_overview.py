@@ -4,7 +4,10 @@
 import frappe
 from frappe import _
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Appraisal Overview")
 def execute(filters: dict | None = None) -> tuple:
 	filters = frappe._dict(filters or {})
 	columns = get_columns()
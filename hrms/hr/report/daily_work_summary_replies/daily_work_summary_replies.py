@@ -6,8 +6,10 @@ import frappe
 from frappe import _
 
 from hrms.hr.doctype.daily_work_summary.daily_work_summary import get_user_emails_from_group
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
 
+@report_profiler("Daily Work Summary Replies")
 def execute(filters=None):
 	if not filters.group:
 		return [], []
@@ -5,7 +5,10 @@
 import frappe
 from frappe import _
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Employee Analytics")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -8,7 +8,10 @@ from frappe import _
 from frappe.query_builder import Order
 from frappe.utils import getdate
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Employee Exits")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
@@ -6,7 +6,10 @@ import frappe
 from frappe import _
 from frappe.utils import flt, getdate
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Employee Hours Utilization Based On Timesheet")
 def execute(filters=None):
 	return EmployeeHoursReport(filters).run()
 
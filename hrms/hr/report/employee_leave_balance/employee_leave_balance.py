@@ -14,10 +14,12 @@ from hrms.hr.doctype.leave_application.leave_application import (
 	get_leave_balance_on,
 	get_leaves_for_period,
 )
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
 Filters = frappe._dict
 
 
+@report_profiler("Employee Leave Balance")
 def execute(filters: Filters | None = None) -> tuple:
 	if filters.to_date <= filters.from_date:
 		frappe.throw(_('"From Date" can not be greater than or equal to "To Date"'))
@@ -5,9 +5,11 @@
 import frappe
 from frappe import _
 
-from hrms.hr.doctype.leave_application.leave_application import get_leave_details
+from hrms.hr.doctype.leave_application.leave_application import get_leave_details_bulk
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
 
+@report_profiler("Employee Leave Balance Summary")
 def execute(filters=None):
 	leave_types = frappe.db.sql_list("select name from `tabLeave Type` order by name asc")
 
@@ -53,10 +55,12 @@ def get_data(filters, leave_types):
 		fields=["name", "employee_name", "department", "user_id"],
 	)
 
+	leave_details = get_leave_details_bulk([employee.name for employee in active_employees], filters.date)
+
 	data = []
 	for employee in active_employees:
 		row = [employee.name, employee.employee_name, employee.department]
-		available_leave = get_leave_details(employee.name, filters.date)
+		available_leave = leave_details[employee.name]
 		for leave_type in leave_types:
 			remaining = 0
 			if leave_type in available_leave["leave_allocation"]:
@@ -4,10 +4,12 @@
 
 import frappe
 from frappe import _
+from frappe.query_builder import Case
 
-from erpnext.setup.doctype.employee.employee import get_holiday_list_for_employee
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
 
+@report_profiler("Employees working on a holiday")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -51,40 +53,54 @@ def get_columns():
 
 
 def get_data(filters):
-	Attendance = frappe.qb.DocType("Attendance")
-	Holiday = frappe.qb.DocType("Holiday")
-
-	data = []
-
+	"""Returns attendance marked on holidays of the employee's holiday list (or the company's default
+	holiday list) for all employees with a single query"""
 	employee_filters = {"company": filters.company}
 	if filters.department:
 		employee_filters["department"] = filters.department
 
-	for employee in frappe.get_list("Employee", filters=employee_filters, pluck="name"):
-		holiday_list = get_holiday_list_for_employee(employee, raise_exception=False)
-		if not holiday_list or (filters.holiday_list and filters.holiday_list != holiday_list):
-			continue
-
-		working_days = (
-			frappe.qb.from_(Attendance)
-			.inner_join(Holiday)
-			.on(Attendance.attendance_date == Holiday.holiday_date)
-			.select(
-				Attendance.employee,
-				Attendance.employee_name,
-				Attendance.attendance_date,
-				Attendance.status,
-				Holiday.description,
-			)
-			.where(
-				(Attendance.employee == employee)
-				& (Attendance.attendance_date[filters.from_date : filters.to_date])
-				& (Attendance.status.notin(["Absent", "On Leave"]))
-				& (Attendance.docstatus == 1)
-				& (Holiday.parent == holiday_list)
-			)
-			.run(as_list=True)
+	employees = frappe.get_list("Employee", filters=employee_filters, pluck="name")
+	if not employees:
+		return []
+
+	Attendance = frappe.qb.DocType("Attendance")
+	Employee = frappe.qb.DocType("Employee")
+	Company = frappe.qb.DocType("Company")
+	Holiday = frappe.qb.DocType("Holiday")
+
+	holiday_list = (
+		Case()
+		.when((Employee.holiday_list.isnull()) | (Employee.holiday_list == ""), Company.default_holiday_list)
+		.else_(Employee.holiday_list)
+	)
+
+	query = (
+		frappe.qb.from_(Attendance)
+		.inner_join(Employee)
+		.on(Attendance.employee == Employee.name)
+		.inner_join(Company)
+		.on(Employee.company == Company.name)
+		.inner_join(Holiday)
+		.on((Holiday.parent == holiday_list) & (Holiday.holiday_date == Attendance.attendance_date))
+		.select(
+			Attendance.employee,
+			Attendance.employee_name,
+			Attendance.attendance_date,
+			Attendance.status,
+			Holiday.description,
 		)
-		data.extend(working_days)
+		.where(
+			(Attendance.employee.isin(employees))
+			& (Attendance.attendance_date[filters.from_date : filters.to_date])
+			& (Attendance.status.notin(["Absent", "On Leave"]))
+			& (Attendance.docstatus == 1)
+			& (Holiday.parenttype == "Holiday List")
+		)
+		.orderby(Attendance.employee)
+		.orderby(Attendance.attendance_date)
+	)
+
+	if filters.holiday_list:
+		query = query.where(holiday_list == filters.holiday_list)
 
-	return data
+	return query.run(as_list=True)
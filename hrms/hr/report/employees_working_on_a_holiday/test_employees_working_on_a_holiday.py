@@ -5,6 +5,7 @@ from frappe.tests import IntegrationTestCase
 from frappe.utils import add_days, get_year_ending, get_year_start, getdate
 
 from erpnext.setup.doctype.employee.test_employee import make_employee
+from erpnext.setup.doctype.holiday_list.test_holiday_list import set_holiday_list
 
 from hrms.hr.doctype.attendance.attendance import mark_attendance
 from hrms.hr.report.employees_working_on_a_holiday.employees_working_on_a_holiday import execute
@@ -67,3 +68,28 @@ class TestEmployeesWorkingOnAHoliday(IntegrationTestCase):
 
 		for d in rows:
 			self.assertEqual(weekly_offs[d[0]], d[4])
+
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_report_with_company_default_holiday_list(self):
+		date = getdate()
+		from_date = get_year_start(date)
+		to_date = get_year_ending(date)
+		make_holiday_list("Salary Slip Test Holiday List", from_date, to_date, True)
+		monday_off = make_holiday_list("Monday Off", from_date, to_date, True, ["Monday"])
+
+		# no holiday list set, falls back to the company's default holiday list with sundays off
+		emp1 = make_employee("testemp@defaultholidays.com", company=self.company)
+		frappe.db.set_value("Employee", emp1, "holiday_list", None)
+		emp2 = make_employee("testemp2@monday.com", company=self.company, holiday_list=monday_off)
+
+		first_sunday = get_first_sunday()
+		mark_attendance(emp1, first_sunday, "Present")
+		mark_attendance(emp2, add_days(first_sunday, 1), "Present")
+
+		filters = frappe._dict({"from_date": from_date, "to_date": to_date, "company": self.company})
+		rows = execute(filters=filters)[1]
+		self.assertEqual([d[0] for d in rows], sorted([emp1, emp2]))
+
+		filters.holiday_list = monday_off
+		rows = execute(filters=filters)[1]
+		self.assertEqual([d[0] for d in rows], [emp2])
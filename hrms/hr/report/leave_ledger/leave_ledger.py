@@ -3,11 +3,15 @@
 
 import frappe
 from frappe import _
-from frappe.query_builder.functions import Date
+from frappe.query_builder.functions import Date, Sum
+from frappe.utils import flt
+
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
 Filters = frappe._dict
 
 
+@report_profiler("Leave Ledger")
 def execute(filters: Filters = None) -> tuple:
 	columns = get_columns()
 	data = get_data(filters)
@@ -61,6 +65,12 @@ def get_columns() -> list[dict]:
 			"fieldtype": "Float",
 			"width": 80,
 		},
+		{
+			"label": _("Balance"),
+			"fieldname": "balance",
+			"fieldtype": "Float",
+			"width": 90,
+		},
 		{
 			"label": _("Leave Type"),
 			"fieldname": "leave_type",
@@ -117,15 +127,26 @@ def get_columns() -> list[dict]:
 
 
 def get_data(filters: Filters) -> list[dict]:
-	Employee = frappe.qb.DocType("Employee")
+	"""Returns the ledger entries with the running balance of each employee and leave type, starting
+	from their balance as on the from date"""
+	balances = get_opening_balances(filters)
+	result = get_ledger_entries(filters)
+
+	for entry in result:
+		key = (entry.employee, entry.leave_type)
+		balances[key] = flt(balances.get(key)) + flt(entry.leaves)
+		entry.balance = balances[key]
+
+	return add_total_row(result, filters)
+
+
+def get_ledger_entries(filters: Filters) -> list[dict]:
 	Ledger = frappe.qb.DocType("Leave Ledger Entry")
 
 	from_date, to_date = filters.get("from_date"), filters.get("to_date")
 
 	query = (
 		frappe.qb.from_(Ledger)
-		.inner_join(Employee)
-		.on(Ledger.employee == Employee.name)
 		.select(
 			Ledger.name.as_("leave_ledger_entry"),
 			Ledger.employee,
@@ -149,21 +170,39 @@ def get_data(filters: Filters) -> list[dict]:
 			& (Ledger.to_date[from_date:to_date])
 		)
 	)
+	query = apply_filters(query, Ledger, filters)
+
+	return query.orderby(Ledger.employee, Ledger.leave_type, Ledger.from_date, Ledger.name).run(as_dict=True)
+
+
+def get_opening_balances(filters: Filters) -> dict:
+	"""Returns the sum of the entries before the from date by employee and leave type"""
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+
+	query = (
+		frappe.qb.from_(Ledger)
+		.select(Ledger.employee, Ledger.leave_type, Sum(Ledger.leaves).as_("leaves"))
+		.where((Ledger.docstatus == 1) & (Ledger.from_date < filters.get("from_date")))
+		.groupby(Ledger.employee, Ledger.leave_type)
+	)
+	query = apply_filters(query, Ledger, filters)
+
+	return {(d.employee, d.leave_type): flt(d.leaves) for d in query.run(as_dict=True)}
 
+
+def apply_filters(query, Ledger, filters: Filters):
 	for field in ("employee", "leave_type", "company", "transaction_type", "transaction_name"):
 		if filters.get(field):
 			query = query.where(Ledger[field] == filters.get(field))
 
-	for field in ("department", "status"):
-		if filters.get(field):
-			query = query.where(Employee[field] == filters.get(field))
-
-	query = query.orderby(Ledger.employee, Ledger.leave_type, Ledger.from_date)
-	result = query.run(as_dict=True)
+	if filters.get("department") or filters.get("status"):
+		Employee = frappe.qb.DocType("Employee")
+		query = query.inner_join(Employee).on(Ledger.employee == Employee.name)
+		for field in ("department", "status"):
+			if filters.get(field):
+				query = query.where(Employee[field] == filters.get(field))
 
-	result = add_total_row(result, filters)
-
-	return result
+	return query
 
 
 def add_total_row(result: list[dict], filters: Filters) -> list[dict]:
@@ -176,12 +215,11 @@ def add_total_row(result: list[dict], filters: Filters) -> list[dict]:
 	if not add_total_row:
 		if not filters.get("employee"):
 			# check if all rows have the same employee
-			employees_from_result = list(set([row.employee for row in result]))
-			if len(employees_from_result) != 1:
+			if len({row.employee for row in result}) != 1:
 				return result
 
 		# check if all rows have the same leave type
-		leave_types_from_result = list(set([row.leave_type for row in result]))
+		leave_types_from_result = list({row.leave_type for row in result})
 		if len(leave_types_from_result) == 1:
 			leave_type = leave_types_from_result[0]
 			add_total_row = True
@@ -190,7 +228,7 @@ def add_total_row(result: list[dict], filters: Filters) -> list[dict]:
 		return result
 
 	total_row = frappe._dict({"employee": _("Total Leaves ({0})").format(leave_type)})
-	total_row["leaves"] = sum((row.get("leaves") or 0) for row in result)
+	total_row["leaves"] = sum(flt(row.leaves) for row in result)
 
 	result.append(total_row)
 	return result
@@ -189,5 +189,21 @@ class TestLeaveLedger(IntegrationTestCase):
 		# 15 leave allocated, 2 leave taken
 		self.assertEqual(total_row.leaves, 13)
 
+	def test_running_balance(self):
+		filters = frappe._dict({"from_date": self.year_start, "to_date": self.year_end})
+		data = execute(filters)[1]
+		self.assertEqual(
+			[row.balance for row in data if row.employee == self.employee_1.name],
+			[3, 1, 2],
+		)
+
+		# the allocation before the from date is carried in as the opening balance
+		filters.from_date = add_months(self.year_start, 2)
+		data = execute(filters)[1]
+		self.assertEqual(
+			[row.balance for row in data if row.employee == self.employee_1.name],
+			[1, 2],
+		)
+
 	def tearDown(self):
 		frappe.flags.current_date = None
@@ -16,6 +16,7 @@ from frappe.query_builder.functions import Count, Extract, Sum
 from frappe.utils import cint, cstr, formatdate, getdate
 from frappe.utils.nestedset import get_descendants_of
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 from hrms.utils import date_diff, get_date_range
 
 Filters = frappe._dict
@@ -34,6 +35,7 @@ status_map = {
 day_abbr = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
 
+@report_profiler("Monthly Attendance Sheet")
 def execute(filters: Filters | None = None) -> tuple:
 	filters = frappe._dict(filters or {})
 
@@ -236,6 +238,7 @@ def get_date_condition(docfield: Field, filters: Filters) -> Criterion:
 def get_data(filters: Filters, attendance_map: dict) -> list[dict]:
 	employee_details, group_by_param_values = get_employee_related_details(filters)
 	holiday_map = get_holiday_map(filters)
+	summary_map = get_attendance_summary_map(filters) if filters.summarized_view else {}
 	data = []
 
 	if filters.group_by:
@@ -245,14 +248,14 @@ def get_data(filters: Filters, attendance_map: dict) -> list[dict]:
 			if not value:
 				continue
 
-			records = get_rows(employee_details[value], filters, holiday_map, attendance_map)
+			records = get_rows(employee_details[value], filters, holiday_map, attendance_map, summary_map)
 
 			if records:
 				data.append({group_by_column: value})
 				data.extend(records)
 
 	else:
-		data = get_rows(employee_details, filters, holiday_map, attendance_map)
+		data = get_rows(employee_details, filters, holiday_map, attendance_map, summary_map)
 
 	return data
 
@@ -420,48 +423,67 @@ def get_holiday_map(filters: Filters) -> dict[str, list[dict]]:
 	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
 	holiday_lists.append(default_holiday_list)
 
-	holiday_map = frappe._dict()
-	Holiday = frappe.qb.DocType("Holiday")
+	holiday_map = frappe._dict({d: [] for d in holiday_lists if d})
+	if not holiday_map:
+		return holiday_map
 
+	Holiday = frappe.qb.DocType("Holiday")
 	holiday_condition = get_date_condition(Holiday.holiday_date, filters)
 
-	for d in holiday_lists:
-		if not d:
-			continue
+	holidays = (
+		frappe.qb.from_(Holiday)
+		.select(Holiday.parent, Holiday.holiday_date, Holiday.weekly_off)
+		.where((Holiday.parent.isin(list(holiday_map))) & (holiday_condition))
+		.orderby(Holiday.holiday_date)
+	).run(as_dict=True)
 
-		holidays = (
-			frappe.qb.from_(Holiday)
-			.select(Holiday.holiday_date, Holiday.weekly_off)
-			.where((Holiday.parent == d) & (holiday_condition))
-		).run(as_dict=True)
-		holiday_map.setdefault(d, holidays)
+	for d in holidays:
+		holiday_map[d.pop("parent")].append(d)
 
 	return holiday_map
 
 
-def get_rows(employee_details: dict, filters: Filters, holiday_map: dict, attendance_map: dict) -> list[dict]:
+def get_rows(
+	employee_details: dict,
+	filters: Filters,
+	holiday_map: dict,
+	attendance_map: dict,
+	summary_map: dict | None = None,
+) -> list[dict]:
 	records = []
 	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
+	summary_defaults = get_defaults_for_summarized_view(filters) if filters.summarized_view else {}
 
 	for employee, details in employee_details.items():
 		emp_holiday_list = details.holiday_list or default_holiday_list
 		holidays = holiday_map.get(emp_holiday_list)
 
 		if filters.summarized_view:
+			summary = (summary_map or {}).get(employee)
+			if not summary:
+				continue
+
 			attendance = get_attendance_status_for_summarized_view(
-				employee, filters, holidays, details.joined_in_current_period, details.joined_date
+				filters,
+				holidays,
+				details.joined_in_current_period,
+				details.joined_date,
+				summary,
+				get_attendance_dates(attendance_map.get(employee)),
 			)
 			if not attendance:
 				continue
 
-			leave_summary = get_leave_summary(employee, filters)
-			entry_exits_summary = get_entry_exits_summary(employee, filters)
-
 			row = {"employee": employee, "employee_name": details.employee_name}
-			set_defaults_for_summarized_view(filters, row)
+			row.update(summary_defaults)
 			row.update(attendance)
-			row.update(leave_summary)
-			row.update(entry_exits_summary)
+			row.update(summary.leaves)
+			row.update(
+				{
+					"total_late_entries": summary.total_late_entries,
+					"total_early_exits": summary.total_early_exits,
+				}
+			)
 
 			records.append(row)
 		else:
@@ -481,31 +503,44 @@ def get_rows(employee_details: dict, filters: Filters, holiday_map: dict, attend
 	return records
 
 
-def set_defaults_for_summarized_view(filters, row):
-	for entry in get_columns(filters):
-		if entry.get("fieldtype") == "Float":
-			row[entry.get("fieldname")] = 0.0
+def get_defaults_for_summarized_view(filters: Filters) -> dict:
+	return {
+		entry.get("fieldname"): 0.0 for entry in get_columns(filters) if entry.get("fieldtype") == "Float"
+	}
+
+
+def get_attendance_dates(employee_attendance: dict | None) -> set:
+	"""Returns the dates on which the employee has attendance in any shift"""
+	if not employee_attendance:
+		return set()
+
+	return {d for status_dict in employee_attendance.values() for d in status_dict}
 
 
 def get_attendance_status_for_summarized_view(
-	employee: str, filters: Filters, holidays: list, joined_in_current_period: int, joined_date: int
+	filters: Filters,
+	holidays: list,
+	joined_in_current_period: int,
+	joined_date: date,
+	summary: dict,
+	attendance_dates: set,
 ) -> dict:
 	"""Returns dict of attendance status for employee like
 	{'total_present': 1.5, 'total_leaves': 0.5, 'total_absent': 13.5, 'total_holidays': 8, 'unmarked_days': 5}
 	"""
-	summary, attendance_days = get_attendance_summary_and_days(employee, filters)
-	if not any(summary.values()):
+	if not any((summary.total_present, summary.total_absent, summary.total_leaves, summary.total_half_days)):
 		return {}
 
 	total_days = get_dates_in_period(filters)
 	total_holidays = total_unmarked_days = 0
+	holiday_status = get_holiday_status_map(holidays)
 
 	for d in total_days:
 		d = getdate(d)
-		if d in attendance_days or (joined_in_current_period and d < joined_date):
+		if d in attendance_dates or (joined_in_current_period and d < joined_date):
 			continue
 
-		status = get_holiday_status(d, holidays)
+		status = holiday_status.get(d)
 		if status in ["Weekly Off", "Holiday"]:
 			total_holidays += 1
 		elif not status:
@@ -520,7 +555,16 @@ def get_attendance_status_for_summarized_view(
 	}
 
 
-def get_attendance_summary_and_days(employee: str, filters: Filters) -> tuple[dict, list]:
+def get_attendance_summary_map(filters: Filters) -> dict[str, dict]:
+	"""Returns attendance, leave type and late entry/early exit summary of all employees
+	computed with grouped queries like:
+	{
+	        'employee1': {
+	                'total_present': 4, 'total_absent': 1, 'total_leaves': 2, 'total_half_days': 0.5,
+	                'total_late_entries': 1, 'total_early_exits': 0, 'leaves': {'sick_leave': 2.5}
+	        }
+	}
+	"""
 	Attendance = frappe.qb.DocType("Attendance")
 
 	present_case = (
@@ -539,37 +583,55 @@ def get_attendance_summary_and_days(employee: str, filters: Filters) -> tuple[di
 	half_day_case = frappe.qb.terms.Case().when(Attendance.status == "Half Day", 0.5).else_(0)
 	sum_half_day = Sum(half_day_case).as_("total_half_days")
 
-	attendance_date_condition = get_date_condition(Attendance.attendance_date, filters)
+	late_entry_case = frappe.qb.terms.Case().when(Attendance.late_entry == "1", "1")
+	count_late_entries = Count(late_entry_case).as_("total_late_entries")
+
+	early_exit_case = frappe.qb.terms.Case().when(Attendance.early_exit == "1", "1")
+	count_early_exits = Count(early_exit_case).as_("total_early_exits")
+
+	attendance_condition = (
+		(Attendance.docstatus == 1)
+		& (Attendance.company.isin(filters.companies))
+		& (get_date_condition(Attendance.attendance_date, filters))
+	)
+	if filters.employee:
+		attendance_condition &= Attendance.employee == filters.employee
 
 	summary = (
 		frappe.qb.from_(Attendance)
 		.select(
+			Attendance.employee,
 			sum_present,
 			sum_absent,
 			sum_leave,
 			sum_half_day,
+			count_late_entries,
+			count_early_exits,
 		)
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company.isin(filters.companies))
-			& (attendance_date_condition)
-		)
+		.where(attendance_condition)
+		.groupby(Attendance.employee)
 	).run(as_dict=True)
 
-	days = (
+	summary_map = {}
+	for d in summary:
+		d.leaves = {}
+		summary_map[d.employee] = d
+
+	day_case = frappe.qb.terms.Case().when(Attendance.status == "Half Day", 0.5).else_(1)
+	sum_leave_days = Sum(day_case).as_("leave_days")
+
+	leave_details = (
 		frappe.qb.from_(Attendance)
-		.select(Extract("day", Attendance.attendance_date).as_("day_of_month"))
-		.distinct()
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company.isin(filters.companies))
-			& (attendance_date_condition)
-		)
-	).run(pluck=True)
+		.select(Attendance.employee, Attendance.leave_type, sum_leave_days)
+		.where(attendance_condition & ((Attendance.leave_type.isnotnull()) | (Attendance.leave_type != "")))
+		.groupby(Attendance.employee, Attendance.leave_type)
+	).run(as_dict=True)
+
+	for d in leave_details:
+		if d.employee in summary_map:
+			summary_map[d.employee].leaves[frappe.scrub(d.leave_type)] = d.leave_days
 
-	return summary[0], days
+	return summary_map
 
 
 def get_attendance_status_for_detailed_view(
@@ -582,6 +644,7 @@ def get_attendance_status_for_detailed_view(
 	]
 	"""
 	total_days = get_dates_in_period(filters)
+	holiday_status = get_holiday_status_map(holidays)
 	attendance_values = []
 
 	for shift, status_dict in employee_attendance.items():
@@ -595,8 +658,8 @@ def get_attendance_status_for_detailed_view(
 
 			status = status_dict.get(d)
 
-			if status is None and holidays:
-				status = get_holiday_status(d, holidays)
+			if status is None:
+				status = holiday_status.get(d)
 
 			abbr = status_map.get(status, "")
 			row[d.strftime("%d-%m-%Y")] = abbr
@@ -606,76 +669,9 @@ def get_attendance_status_for_detailed_view(
 	return attendance_values
 
 
-def get_holiday_status(holiday_date: date, holidays: list) -> str:
-	status = None
-	if holidays:
-		for holiday in holidays:
-			if holiday_date == holiday.get("holiday_date"):
-				if holiday.get("weekly_off"):
-					status = "Weekly Off"
-				else:
-					status = "Holiday"
-				break
-	return status
-
-
-def get_leave_summary(employee: str, filters: Filters) -> dict[str, float]:
-	"""Returns a dict of leave type and corresponding leaves taken by employee like:
-	{'leave_without_pay': 1.0, 'sick_leave': 2.0}
-	"""
-	Attendance = frappe.qb.DocType("Attendance")
-	day_case = frappe.qb.terms.Case().when(Attendance.status == "Half Day", 0.5).else_(1)
-	sum_leave_days = Sum(day_case).as_("leave_days")
-
-	attendance_date_condition = get_date_condition(Attendance.attendance_date, filters)
-
-	leave_details = (
-		frappe.qb.from_(Attendance)
-		.select(Attendance.leave_type, sum_leave_days)
-		.where(
-			(Attendance.employee == employee)
-			& (Attendance.docstatus == 1)
-			& (Attendance.company.isin(filters.companies))
-			& ((Attendance.leave_type.isnotnull()) | (Attendance.leave_type != ""))
-			& (attendance_date_condition)
-		)
-		.groupby(Attendance.leave_type)
-	).run(as_dict=True)
-
-	leaves = {}
-	for d in leave_details:
-		leave_type = frappe.scrub(d.leave_type)
-		leaves[leave_type] = d.leave_days
-
-	return leaves
-
-
-def get_entry_exits_summary(employee: str, filters: Filters) -> dict[str, float]:
-	"""Returns total late entries and total early exits for employee like:
-	{'total_late_entries': 5, 'total_early_exits': 2}
-	"""
-	Attendance = frappe.qb.DocType("Attendance")
-
-	late_entry_case = frappe.qb.terms.Case().when(Attendance.late_entry == "1", "1")
-	count_late_entries = Count(late_entry_case).as_("total_late_entries")
-
-	early_exit_case = frappe.qb.terms.Case().when(Attendance.early_exit == "1", "1")
-	count_early_exits = Count(early_exit_case).as_("total_early_exits")
-
-	attendance_date_condition = get_date_condition(Attendance.attendance_date, filters)
-
-	entry_exits = (
-		frappe.qb.from_(Attendance)
-		.select(count_late_entries, count_early_exits)
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company.isin(filters.companies))
-			& (attendance_date_condition)
-		)
-	).run(as_dict=True)
-
-	return entry_exits[0]
+def get_holiday_status_map(holidays: list | None) -> dict[date, str]:
+	"""Returns holiday status by date so that days can be looked up without scanning the holiday list"""
+	return {d.get("holiday_date"): "Weekly Off" if d.get("weekly_off") else "Holiday" for d in holidays or []}
 
 
 @frappe.whitelist()
@@ -1,3 +1,5 @@
+import calendar
+
 from dateutil.relativedelta import relativedelta
 
 import frappe
@@ -220,6 +222,45 @@ class TestMonthlyAttendanceSheet(IntegrationTestCase):
 		self.assertEqual(row["total_late_entries"], 1)
 		self.assertEqual(row["total_early_exits"], 1)
 
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_summarized_view_for_multiple_employees(self):
+		previous_month_first = get_first_day_for_prev_month()
+		other_employee = make_employee("test_summary_employee@example.com", company=self.company)
+
+		mark_attendance(self.employee, previous_month_first, "Absent", "Day Shift")
+		mark_attendance(self.employee, previous_month_first + relativedelta(days=1), "Present", late_entry=1)
+		mark_attendance(other_employee, previous_month_first, "Present", early_exit=1)
+		mark_attendance(other_employee, previous_month_first + relativedelta(days=1), "Half Day")
+
+		filters = frappe._dict(
+			{
+				"month": previous_month_first.month,
+				"year": previous_month_first.year,
+				"company": self.company,
+				"summarized_view": 1,
+				"filter_based_on": self.filter_based_on,
+			}
+		)
+		report = execute(filters=filters)
+		rows = {row["employee"]: row for row in report[1]}
+		days_in_month = calendar.monthrange(previous_month_first.year, previous_month_first.month)[1]
+
+		row = rows[self.employee]
+		self.assertEqual(row["total_present"], 1)
+		self.assertEqual(row["total_absent"], 1)
+		self.assertEqual(row["total_late_entries"], 1)
+		self.assertEqual(row["total_early_exits"], 0)
+		# days with attendance are neither holidays nor unmarked
+		self.assertEqual(row["total_holidays"] + row["unmarked_days"], days_in_month - 2)
+
+		row = rows[other_employee]
+		self.assertEqual(row["total_present"], 1.5)
+		self.assertEqual(row["total_leaves"], 0.5)
+		self.assertEqual(row["total_absent"], 0)
+		self.assertEqual(row["total_late_entries"], 0)
+		self.assertEqual(row["total_early_exits"], 1)
+		self.assertEqual(row["total_holidays"] + row["unmarked_days"], days_in_month - 2)
+
 	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
 	def test_attendance_with_group_by_filter(self):
 		previous_month_first = get_first_day_for_prev_month()
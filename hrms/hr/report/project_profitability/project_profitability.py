@@ -5,7 +5,10 @@ import frappe
 from frappe import _
 from frappe.utils import cint, flt
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Project Profitability")
 def execute(filters=None):
 	data = get_data(filters)
 	columns = get_columns()
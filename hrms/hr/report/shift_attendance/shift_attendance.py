@@ -1,18 +1,22 @@
 # Copyright (c) 2023, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
-from datetime import timedelta
-
 import frappe
 from frappe import _
+from frappe.query_builder import Case
+from frappe.query_builder.functions import Count, Max, Min, Sum, UnixTimestamp
 from frappe.utils import cint, flt, format_datetime, format_duration
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
+
 
+@report_profiler("Shift Attendance")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
-	chart = get_chart_data(data)
-	report_summary = get_report_summary(data)
+	summary_data = get_summary_data(filters)
+	chart = get_chart_data(summary_data)
+	report_summary = get_report_summary(summary_data)
 	return columns, data, None, chart, report_summary
 
 
@@ -130,30 +134,39 @@ def get_columns():
 
 
 def get_data(filters):
-	query = get_query(filters)
+	query = get_query(filters).orderby(frappe.qb.DocType("Attendance").name)
 	data = query.run(as_dict=True)
-	data = update_data(data, filters)
-	return data
+	precision = cint(frappe.db.get_default("float_precision")) or 2
+	return update_data(data, precision)
 
 
-def get_report_summary(data):
-	if not data:
-		return None
+def get_summary_data(filters):
+	"""Returns record counts per shift, aggregated over the same rows as the report data"""
+	rows = get_query(filters)
+	return (
+		frappe.qb.from_(rows)
+		.select(
+			rows.shift,
+			Count("*").as_("total"),
+			Sum(Case().when(rows.status == "Present", 1).else_(0)).as_("present"),
+			Sum(Case().when(rows.status == "Half Day", 1).else_(0)).as_("half_day"),
+			Sum(rows.late_entry).as_("late_entries"),
+			Sum(rows.early_exit).as_("early_exits"),
+		)
+		.groupby(rows.shift)
+		.orderby(Min(rows.name))
+	).run(as_dict=True)
 
-	present_records = half_day_records = absent_records = late_entries = early_exits = 0
 
-	for entry in data:
-		if entry.status == "Present":
-			present_records += 1
-		elif entry.status == "Half Day":
-			half_day_records += 1
-		else:
-			absent_records += 1
+def get_report_summary(summary_data):
+	if not summary_data:
+		return None
 
-		if entry.late_entry:
-			late_entries += 1
-		if entry.early_exit:
-			early_exits += 1
+	present_records = sum(cint(d.present) for d in summary_data)
+	half_day_records = sum(cint(d.half_day) for d in summary_data)
+	absent_records = sum(cint(d.total) for d in summary_data) - present_records - half_day_records
+	late_entries = sum(cint(d.late_entries) for d in summary_data)
+	early_exits = sum(cint(d.early_exits) for d in summary_data)
 
 	return [
 		{
@@ -189,20 +202,15 @@ def get_report_summary(data):
 	]
 
 
-def get_chart_data(data):
-	if not data:
+def get_chart_data(summary_data):
+	if not summary_data:
 		return None
 
-	total_shift_records = {}
-	for entry in data:
-		total_shift_records.setdefault(entry.shift, 0)
-		total_shift_records[entry.shift] += 1
-
-	labels = [_(d) for d in list(total_shift_records)]
+	labels = [_(d.shift) for d in summary_data]
 	chart = {
 		"data": {
 			"labels": labels,
-			"datasets": [{"name": _("Shift"), "values": list(total_shift_records.values())}],
+			"datasets": [{"name": _("Shift"), "values": [cint(d.total) for d in summary_data]}],
 		},
 		"type": "percentage",
 	}
@@ -214,6 +222,16 @@ def get_query(filters):
 	checkin = frappe.qb.DocType("Employee Checkin")
 	shift_type = frappe.qb.DocType("Shift Type")
 
+	# all checkins of an attendance belong to the same shift instance
+	shift_start = Max(checkin.shift_start)
+	shift_end = Max(checkin.shift_end)
+	late_entry, late_entry_seconds = get_late_entry_fields(
+		attendance, shift_type, shift_start, filters.consider_grace_period
+	)
+	early_exit, early_exit_seconds = get_early_exit_fields(
+		attendance, shift_type, shift_end, filters.consider_grace_period
+	)
+
 	query = (
 		frappe.qb.from_(attendance)
 		.inner_join(checkin)
@@ -230,18 +248,16 @@ def get_query(filters):
 			attendance.in_time,
 			attendance.out_time,
 			attendance.working_hours,
-			attendance.late_entry,
-			attendance.early_exit,
+			late_entry.as_("late_entry"),
+			early_exit.as_("early_exit"),
+			late_entry_seconds.as_("late_entry_hrs"),
+			early_exit_seconds.as_("early_exit_hrs"),
 			attendance.department,
 			attendance.company,
-			checkin.shift_start,
-			checkin.shift_end,
-			checkin.shift_actual_start,
-			checkin.shift_actual_end,
-			shift_type.enable_late_entry_marking,
-			shift_type.late_entry_grace_period,
-			shift_type.enable_early_exit_marking,
-			shift_type.early_exit_grace_period,
+			shift_start.as_("shift_start"),
+			shift_end.as_("shift_end"),
+			Max(checkin.shift_actual_start).as_("shift_actual_start"),
+			Max(checkin.shift_actual_end).as_("shift_actual_end"),
 		)
 		.where(attendance.docstatus == 1)
 		.groupby(attendance.name)
@@ -264,12 +280,41 @@ def get_query(filters):
 	return query
 
 
-def update_data(data, filters):
-	for d in data:
-		update_late_entry(d, filters.consider_grace_period)
-		update_early_exit(d, filters.consider_grace_period)
+def get_late_entry_fields(attendance, shift_type, shift_start, consider_grace_period):
+	"""Returns the late entry flag and the seconds by which the employee was late"""
+	seconds = UnixTimestamp(attendance.in_time) - UnixTimestamp(shift_start)
+	if consider_grace_period:
+		grace_period = (
+			Case()
+			.when(shift_type.enable_late_entry_marking == 1, shift_type.late_entry_grace_period * 60)
+			.else_(0)
+		)
+		return attendance.late_entry, Case().when(attendance.late_entry == 1, seconds - grace_period)
+
+	is_late = attendance.in_time > shift_start
+	return Case().when(is_late, 1).else_(attendance.late_entry), Case().when(is_late, seconds)
+
+
+def get_early_exit_fields(attendance, shift_type, shift_end, consider_grace_period):
+	"""Returns the early exit flag and the seconds by which the employee left early"""
+	seconds = UnixTimestamp(shift_end) - UnixTimestamp(attendance.out_time)
+	if consider_grace_period:
+		grace_period = (
+			Case()
+			.when(shift_type.enable_early_exit_marking == 1, shift_type.early_exit_grace_period * 60)
+			.else_(0)
+		)
+		return attendance.early_exit, Case().when(attendance.early_exit == 1, seconds - grace_period)
+
+	is_early = attendance.out_time < shift_end
+	return Case().when(is_early, 1).else_(attendance.early_exit), Case().when(is_early, seconds)
 
-		d.working_hours = format_float_precision(d.working_hours)
+
+def update_data(data, precision):
+	for d in data:
+		d.late_entry_hrs = format_seconds(d.late_entry_hrs)
+		d.early_exit_hrs = format_seconds(d.early_exit_hrs)
+		d.working_hours = flt(d.working_hours, precision)
 		d.in_time, d.out_time = format_in_out_time(d.in_time, d.out_time, d.attendance_date)
 		d.shift_start, d.shift_end = convert_datetime_to_time_for_same_date(d.shift_start, d.shift_end)
 		d.shift_actual_start, d.shift_actual_end = convert_datetime_to_time_for_same_date(
@@ -278,9 +323,8 @@ def update_data(data, filters):
 	return data
 
 
-def format_float_precision(value):
-	precision = cint(frappe.db.get_default("float_precision")) or 2
-	return flt(value, precision)
+def format_seconds(seconds):
+	return format_duration(flt(seconds)) if seconds else seconds
 
 
 def format_in_out_time(in_time, out_time, attendance_date):
@@ -301,29 +345,3 @@ def convert_datetime_to_time_for_same_date(start, end):
 		start = format_datetime(start)
 		end = format_datetime(end)
 	return start, end
-
-
-def update_late_entry(entry, consider_grace_period):
-	if consider_grace_period:
-		if entry.late_entry:
-			entry_grace_period = entry.late_entry_grace_period if entry.enable_late_entry_marking else 0
-			start_time = entry.shift_start + timedelta(minutes=entry_grace_period)
-			entry.late_entry_hrs = entry.in_time - start_time
-	elif entry.in_time and entry.in_time > entry.shift_start:
-		entry.late_entry = 1
-		entry.late_entry_hrs = entry.in_time - entry.shift_start
-	if entry.late_entry_hrs:
-		entry.late_entry_hrs = format_duration(entry.late_entry_hrs.total_seconds())
-
-
-def update_early_exit(entry, consider_grace_period):
-	if consider_grace_period:
-		if entry.early_exit:
-			exit_grace_period = entry.early_exit_grace_period if entry.enable_early_exit_marking else 0
-			end_time = entry.shift_end - timedelta(minutes=exit_grace_period)
-			entry.early_exit_hrs = end_time - entry.out_time
-	elif entry.out_time and entry.out_time < entry.shift_end:
-		entry.early_exit = 1
-		entry.early_exit_hrs = entry.shift_end - entry.out_time
-	if entry.early_exit_hrs:
-		entry.early_exit_hrs = format_duration(entry.early_exit_hrs.total_seconds())
@@ -175,6 +175,24 @@ class TestShiftAttendance(IntegrationTestCase):
 		early_exits = report[4][4]["value"]
 		self.assertEqual(4, early_exits)
 
+	def test_late_entry_and_early_exit_durations(self):
+		filters = frappe._dict(
+			{
+				"company": "_Test Company",
+				"from_date": date(2023, 1, 1),
+				"to_date": date(2023, 1, 3),
+			}
+		)
+		data = execute(filters)[1]
+
+		self.assertEqual(len(data), 6)
+		durations = [(d.late_entry_hrs, d.early_exit_hrs) for d in data]
+		self.assertEqual(durations[1], ("30m", None))
+		self.assertEqual(durations[2], (None, "30m"))
+		self.assertEqual(durations[3], ("30m", "30m"))
+		self.assertEqual([d.late_entry for d in data], [0, 1, 0, 1, 0, 0])
+		self.assertEqual([d.early_exit for d in data], [0, 0, 1, 1, 1, 1])
+
 
 def make_checkin(employee, time, log_type):
 	frappe.get_doc(
@@ -6,7 +6,10 @@ import frappe
 from frappe import _
 from frappe.query_builder.functions import Sum
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Unpaid Expense Claim")
 def execute(filters=None):
 	columns, data = [], []
 	columns = get_columns()
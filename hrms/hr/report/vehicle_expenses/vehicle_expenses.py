@@ -8,7 +8,10 @@ from frappe.utils import flt
 
 from erpnext.accounts.report.financial_statements import get_period_list
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Vehicle Expenses")
 def execute(filters=None):
 	filters = frappe._dict(filters or {})
 
@@ -0,0 +1,5 @@
+from hrms.hr.doctype.employee_attendance_day.employee_attendance_day import enqueue_backfill
+
+
+def execute():
+	enqueue_backfill()
@@ -0,0 +1,5 @@
+from hrms.hr.doctype.employee_advance_balance.employee_advance_balance import rebuild_balances
+
+
+def execute():
+	rebuild_balances()
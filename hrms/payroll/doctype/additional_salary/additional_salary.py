@@ -2,12 +2,29 @@
 # For license information, please see license.txt
 
 
+import json
+import time
+
 import frappe
 from frappe import _, bold
 from frappe.model.document import Document
-from frappe.utils import comma_and, date_diff, formatdate, get_link_to_form, getdate
+from frappe.utils import (
+	cint,
+	comma_and,
+	create_batch,
+	date_diff,
+	flt,
+	formatdate,
+	get_link_to_form,
+	getdate,
+)
 
 from hrms.hr.utils import validate_active_employee
+from hrms.utils import bulk_insert_documents
+
+# references whose documents are updated when an Additional Salary is submitted
+REFERENCES_WITH_SUBMIT_HOOKS = ("Employee Advance", "Employee Referral")
+BULK_IMPORT_RUN = "additional_salary_import_run"
 
 
 class AdditionalSalary(Document):
@@ -193,15 +210,16 @@ class AdditionalSalary(Document):
 
 	def update_return_amount_in_employee_advance(self):
 		if self.ref_doctype == "Employee Advance" and self.ref_docname:
-			return_amount = frappe.db.get_value("Employee Advance", self.ref_docname, "return_amount")
+			advance = frappe.get_doc("Employee Advance", self.ref_docname)
+			return_amount = advance.return_amount
 
 			if self.docstatus == 2:
 				return_amount -= self.amount
 			else:
 				return_amount += self.amount
 
-			frappe.db.set_value("Employee Advance", self.ref_docname, "return_amount", return_amount)
-			advance = frappe.get_doc("Employee Advance", self.ref_docname)
+			advance.flags.balance_before = advance.get_balance_amounts()
+			advance.db_set("return_amount", return_amount)
 			advance.set_status(update=True)
 
 	def update_employee_referral(self, cancel=False):
@@ -293,3 +311,340 @@ def get_additional_salaries(employee, start_date, end_date, component_type):
 		additional_salaries.append(d)
 
 	return additional_salaries
+
+
+@frappe.whitelist()
+def bulk_import_additional_salaries(rows: list | str, submit: bool = True, chunk_size: int = 1000) -> str:
+	"""Queues the import of many Additional Salaries, each row being a dict of Additional Salary fields.
+	The rows are validated together by a background job, which then queues the inserts in chunks.
+
+	The created documents and the errors of rows that were not imported, along with their index in
+	`rows`, are sent with the `completed_additional_salary_import` realtime event.
+	"""
+	frappe.has_permission("Additional Salary", "submit" if cint(submit) else "create", throw=True)
+
+	if isinstance(rows, str):
+		rows = json.loads(rows)
+
+	run_id = frappe.generate_hash(length=12)
+	frappe.cache().hset(
+		BULK_IMPORT_RUN, run_id, {"total": len(rows), "processed": 0, "started_at": time.time()}
+	)
+	frappe.enqueue(
+		import_additional_salaries,
+		queue="long",
+		timeout=3000,
+		rows=rows,
+		submit=submit,
+		chunk_size=chunk_size,
+		run_id=run_id,
+	)
+
+	frappe.msgprint(
+		_("Import of {0} Additional Salaries has been queued. It may take a few minutes.").format(len(rows)),
+		alert=True,
+		indicator="blue",
+	)
+	return run_id
+
+
+def import_additional_salaries(
+	rows: list,
+	submit: bool = True,
+	chunk_size: int = 1000,
+	run_id: str | None = None,
+	now: bool = False,
+) -> dict:
+	"""Validates all rows with a fixed number of queries against the existing records and against the
+	other rows, then queues the inserts of the valid rows in chunks, or inserts them in this job if
+	`now` is set. Returns the validation errors, along with the results of the inserts if `now` is set."""
+	docstatus = 1 if cint(submit) else 0
+	rows = [frappe._dict(row, idx=idx) for idx, row in enumerate(rows)]
+	context = get_bulk_import_context(rows)
+
+	result = {"success": [], "failed": []}
+	valid_rows = []
+	for row in rows:
+		error = validate_bulk_import_row(row, context)
+		if error:
+			result["failed"].append({"idx": row.idx, "employee": row.employee, "error": error})
+		else:
+			valid_rows.append(row)
+
+	if run_id:
+		update_bulk_import_progress(run_id, len(result["failed"]), [], result["failed"])
+
+	for batch in create_batch(valid_rows, cint(chunk_size) or 1000):
+		batch_result = frappe.enqueue(
+			insert_additional_salaries,
+			queue="long",
+			timeout=3000,
+			now=now,
+			rows=list(batch),
+			context=get_batch_context(batch, context),
+			docstatus=docstatus,
+			run_id=run_id,
+		)
+		if now:
+			for key in ("success", "failed"):
+				result[key] += batch_result[key]
+
+	result["failed"].sort(key=lambda d: d["idx"])
+	return result
+
+
+def get_batch_context(rows: list, context: frappe._dict) -> frappe._dict:
+	"""Returns the employees and salary components of the rows, so each queued chunk only carries its own"""
+	return frappe._dict(
+		employees={d.employee: context.employees[d.employee] for d in rows},
+		components={d.salary_component: context.components[d.salary_component] for d in rows},
+	)
+
+
+def insert_additional_salaries(rows: list, context: dict, docstatus: int, run_id: str | None = None) -> dict:
+	"""Inserts a chunk of validated rows with multi-row inserts"""
+	rows = [frappe._dict(d) for d in rows]
+	context = frappe._dict(context)
+	context.employees = {name: frappe._dict(d) for name, d in context.employees.items()}
+	context.components = {name: frappe._dict(d) for name, d in context.components.items()}
+
+	success, failed, docs, imported = [], [], [], []
+	for row in rows:
+		doc = make_additional_salary_from_row(row, context, docstatus)
+		if row.ref_doctype in REFERENCES_WITH_SUBMIT_HOOKS:
+			# the referenced documents are updated on submit, so these go through the regular path
+			try:
+				doc.insert()
+				if docstatus:
+					doc.submit()
+				success.append({"idx": row.idx, "name": doc.name})
+			except Exception as e:
+				failed.append({"idx": row.idx, "employee": row.employee, "error": str(e)})
+			continue
+
+		doc.set_new_name()
+		docs.append(doc)
+		imported.append({"idx": row.idx, "name": doc.name})
+
+	if docs:
+		savepoint = "before_additional_salary_import"
+		frappe.db.savepoint(savepoint)
+		try:
+			bulk_insert_documents(docs)
+		except Exception as e:
+			frappe.db.rollback(save_point=savepoint)
+			frappe.log_error(
+				"Bulk import failed for a chunk of Additional Salaries", reference_doctype="Additional Salary"
+			)
+			failed += [
+				{"idx": row.idx, "employee": row.employee, "error": str(e)}
+				for row in rows
+				if row.ref_doctype not in REFERENCES_WITH_SUBMIT_HOOKS
+			]
+		else:
+			success += imported
+
+	frappe.clear_messages()
+
+	if run_id:
+		update_bulk_import_progress(run_id, len(rows), success, failed)
+
+	return {"success": success, "failed": failed}
+
+
+def update_bulk_import_progress(run_id: str, processed: int, success: list, failed: list) -> None:
+	cache = frappe.cache()
+	# chunks finish in any order, so lock the run while merging the results of this chunk
+	with cache.lock(f"{BULK_IMPORT_RUN}::{run_id}", timeout=60):
+		run = cache.hget(BULK_IMPORT_RUN, run_id) or {}
+		run["processed"] = run.get("processed", 0) + processed
+		for key, value in (("success", success), ("failed", failed)):
+			run[key] = run.get(key, []) + value
+		cache.hset(BULK_IMPORT_RUN, run_id, run)
+
+	total = run.get("total") or processed
+	frappe.publish_progress(
+		run["processed"] * 100 / total if total else 100,
+		title=_("Importing Additional Salaries..."),
+		description=_("{0} of {1} rows processed").format(run["processed"], total),
+	)
+
+	if run["processed"] >= total:
+		cache.hdel(BULK_IMPORT_RUN, run_id)
+		time_taken = time.time() - run.get("started_at", time.time())
+		imported = len(run["success"])
+		frappe.publish_realtime(
+			"completed_additional_salary_import",
+			message={
+				"success": run["success"],
+				"failed": sorted(run["failed"], key=lambda d: d["idx"]),
+				"time_taken": flt(time_taken, 2),
+				"throughput": flt(imported / time_taken, 2) if time_taken else imported,
+			},
+			user=frappe.session.user,
+			after_commit=True,
+		)
+
+
+def get_bulk_import_context(rows: list) -> frappe._dict:
+	"""Loads the employees, salary components, assignments and existing Additional Salaries the rows
+	are validated against"""
+	employees = {d.employee for d in rows if d.employee}
+	components = {d.salary_component for d in rows if d.salary_component}
+
+	employee_details = frappe.get_all(
+		"Employee",
+		filters={"name": ("in", list(employees))},
+		fields=[
+			"name",
+			"employee_name",
+			"department",
+			"company",
+			"status",
+			"date_of_joining",
+			"relieving_date",
+		],
+	)
+	component_details = frappe.get_all(
+		"Salary Component",
+		filters={"name": ("in", list(components))},
+		fields=["name", "type", "variable_based_on_taxable_salary"],
+	)
+	employees_with_assignment = set(
+		frappe.get_all(
+			"Salary Structure Assignment",
+			filters={"employee": ("in", list(employees))},
+			pluck="employee",
+			distinct=True,
+		)
+	)
+
+	existing = {}
+	if employees and components:
+		AdditionalSalary = frappe.qb.DocType("Additional Salary")
+		for d in (
+			frappe.qb.from_(AdditionalSalary)
+			.select(
+				AdditionalSalary.name,
+				AdditionalSalary.employee,
+				AdditionalSalary.salary_component,
+				AdditionalSalary.is_recurring,
+				AdditionalSalary.overwrite_salary_structure_amount,
+				AdditionalSalary.payroll_date,
+				AdditionalSalary.from_date,
+				AdditionalSalary.to_date,
+			)
+			.where(
+				(AdditionalSalary.employee.isin(list(employees)))
+				& (AdditionalSalary.salary_component.isin(list(components)))
+				& (AdditionalSalary.docstatus == 1)
+				& (AdditionalSalary.disabled == 0)
+				& (
+					(AdditionalSalary.is_recurring == 1)
+					| (AdditionalSalary.overwrite_salary_structure_amount == 1)
+				)
+			)
+		).run(as_dict=True):
+			existing.setdefault((d.employee, d.salary_component), []).append(d)
+
+	return frappe._dict(
+		employees={d.name: d for d in employee_details},
+		components={d.name: d for d in component_details},
+		employees_with_assignment=employees_with_assignment,
+		# existing recurring and overwriting Additional Salaries, valid rows are added as they are validated
+		existing=existing,
+	)
+
+
+def validate_bulk_import_row(row: dict, context: frappe._dict) -> str | None:
+	"""Returns the reason the row cannot be imported, mirroring the validations of Additional Salary"""
+	for field in ("employee", "salary_component", "amount"):
+		if row.get(field) in (None, ""):
+			return _("{0} is mandatory").format(frappe.bold(frappe.unscrub(field)))
+
+	employee = context.employees.get(row.employee)
+	if not employee:
+		return _("Employee {0} not found").format(row.employee)
+	if employee.status == "Inactive":
+		return _("Transactions cannot be created for an Inactive Employee {0}.").format(row.employee)
+
+	component = context.components.get(row.salary_component)
+	if not component:
+		return _("Salary Component {0} not found").format(row.salary_component)
+
+	if row.employee not in context.employees_with_assignment:
+		return _("There is no Salary Structure assigned to {0}. First assign a Salary Stucture.").format(
+			row.employee
+		)
+
+	if flt(row.amount) < 0:
+		return _("Amount should not be less than zero")
+
+	row.is_recurring = cint(row.is_recurring)
+	row.overwrite_salary_structure_amount = cint(row.overwrite_salary_structure_amount)
+	for field in ("payroll_date", "from_date", "to_date"):
+		row[field] = getdate(row[field]) if row.get(field) else None
+
+	if row.is_recurring:
+		row.payroll_date = None
+		if not (row.from_date and row.to_date):
+			return _("From Date and To Date are mandatory for recurring Additional Salary")
+		if row.from_date > row.to_date:
+			return _("From Date cannot be greater than To Date")
+	elif not row.payroll_date:
+		return _("Payroll Date is mandatory")
+
+	if employee.date_of_joining:
+		if row.payroll_date and row.payroll_date < employee.date_of_joining:
+			return _("Payroll date can not be less than employee's joining date.")
+		if row.from_date and row.from_date < employee.date_of_joining:
+			return _("From date can not be less than employee's joining date.")
+	if employee.relieving_date:
+		if row.to_date and row.to_date > employee.relieving_date:
+			return _("To date can not be greater than employee's relieving date.")
+		if row.payroll_date and row.payroll_date > employee.relieving_date:
+			return _("Payroll date can not be greater than employee's relieving date.")
+
+	if component.variable_based_on_taxable_salary and not row.overwrite_salary_structure_amount:
+		return _("To overwrite the salary component amount for a tax component, please enable {0}").format(
+			_("Overwrite Salary Structure Amount")
+		)
+
+	existing = context.existing.setdefault((row.employee, row.salary_component), [])
+	for d in existing:
+		if row.is_recurring and d.is_recurring and d.to_date >= row.from_date and d.from_date <= row.to_date:
+			return _(
+				"Additional Salary: {0} already exist for Salary Component: {1} for period {2} and {3}"
+			).format(d.name or _("Row {0}").format(d.idx), row.salary_component, row.from_date, row.to_date)
+
+		if (
+			row.overwrite_salary_structure_amount
+			and d.overwrite_salary_structure_amount
+			and row.payroll_date
+			and (
+				d.payroll_date == row.payroll_date
+				or (d.from_date and d.to_date and d.from_date <= row.payroll_date <= d.to_date)
+			)
+		):
+			return _(
+				"Additional Salary for this salary component with {0} enabled already exists for this date"
+			).format(_("Overwrite Salary Structure Amount"))
+
+	# later rows are validated against this one too
+	if row.is_recurring or row.overwrite_salary_structure_amount:
+		existing.append(row)
+
+
+def make_additional_salary_from_row(row: dict, context: frappe._dict, docstatus: int):
+	employee = context.employees[row.employee]
+	company = row.company or employee.company
+	fields = {key: value for key, value in row.items() if key not in ("idx", "name", "doctype")}
+	fields.update(
+		employee_name=employee.employee_name,
+		department=employee.department,
+		company=company,
+		currency=row.currency or frappe.get_cached_value("Company", company, "default_currency"),
+		type=context.components[row.salary_component].type,
+		docstatus=docstatus,
+	)
+	return frappe.new_doc("Additional Salary", **fields)
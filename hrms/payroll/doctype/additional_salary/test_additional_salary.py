@@ -8,6 +8,7 @@ from frappe.utils import add_days, add_months, nowdate
 import erpnext
 from erpnext.setup.doctype.employee.test_employee import make_employee
 
+from hrms.payroll.doctype.additional_salary.additional_salary import import_additional_salaries
 from hrms.payroll.doctype.salary_component.test_salary_component import create_salary_component
 from hrms.payroll.doctype.salary_slip.test_salary_slip import make_employee_salary_slip, setup_test
 from hrms.payroll.doctype.salary_structure.test_salary_structure import (
@@ -165,6 +166,45 @@ class TestAdditionalSalary(IntegrationTestCase):
 		with self.assertRaises(frappe.ValidationError):
 			additional_salary_doc.save()
 
+	def test_bulk_import_additional_salaries(self):
+		emp_id = make_employee("test_additional@salary.com")
+		make_salary_structure("Test Salary Structure Additional Salary", "Monthly", employee=emp_id)
+		create_salary_component("Recurring Salary Component")
+		date = nowdate()
+
+		row = {
+			"employee": emp_id,
+			"salary_component": "Recurring Salary Component",
+			"amount": 5000,
+			"currency": erpnext.get_default_currency(),
+		}
+		recurring_row = {**row, "is_recurring": 1, "from_date": date, "to_date": add_days(date, 90)}
+		result = import_additional_salaries(
+			[
+				{**row, "payroll_date": date},
+				recurring_row,
+				# overlaps the recurring row above
+				{**recurring_row, "from_date": add_days(date, 30)},
+				{**row, "employee": "_T-Employee-NONEXISTENT", "payroll_date": date},
+				row,
+			],
+			now=True,
+		)
+
+		self.assertEqual([d["idx"] for d in result["success"]], [0, 1])
+		self.assertEqual([d["idx"] for d in result["failed"]], [2, 3, 4])
+
+		for d in result["success"]:
+			additional_salary = frappe.get_doc("Additional Salary", d["name"])
+			self.assertEqual(additional_salary.docstatus, 1)
+			self.assertEqual(additional_salary.type, "Earning")
+			self.assertEqual(additional_salary.company, frappe.db.get_value("Employee", emp_id, "company"))
+
+		# rows are validated against existing records as well
+		result = import_additional_salaries([{**recurring_row, "from_date": add_days(date, 60)}], now=True)
+		self.assertFalse(result["success"])
+		self.assertEqual(len(result["failed"]), 1)
+
 
 def get_additional_salary(
 	emp_id, recurring=True, payroll_date=None, salary_component=None, overwrite_salary_structure=0
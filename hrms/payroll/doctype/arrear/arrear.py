@@ -5,12 +5,22 @@ import frappe
 from frappe import _
 from frappe.model.document import Document
 from frappe.query_builder.functions import Sum
-from frappe.utils import getdate
+from frappe.utils import cint, create_batch, get_link_to_form, getdate
 
+from hrms.payroll.doctype.additional_salary.additional_salary import (
+	get_bulk_import_context,
+	make_additional_salary_from_row,
+	validate_bulk_import_row,
+)
 from hrms.payroll.doctype.employee_benefit_ledger.employee_benefit_ledger import (
 	delete_employee_benefit_ledger_entry,
 )
 from hrms.payroll.doctype.salary_structure.salary_structure import make_salary_slip
+from hrms.utils import bulk_insert_documents
+
+# employees processed per background job in a bulk arrear run
+BULK_ARREAR_SHARD_SIZE = 200
+BULK_ARREAR_RUN = "bulk_arrear_run"
 
 
 class Arrear(Document):
@@ -142,242 +152,29 @@ class Arrear(Document):
 		"""Fetch salary components and amounts from existing salary slips with arrear_component enabled.
 		Returns a dict: {"earnings": {component: total}, "deductions": {component: total}, "accruals": {component: total}}
 		"""
-		SalarySlipDetail = frappe.qb.DocType("Salary Detail")
-		SalaryComponent = frappe.qb.DocType("Salary Component")
-
-		slip_details = (
-			frappe.qb.from_(SalarySlipDetail)
-			.join(SalaryComponent)
-			.on(SalarySlipDetail.salary_component == SalaryComponent.name)
-			.select(
-				SalarySlipDetail.parentfield,
-				SalarySlipDetail.salary_component,
-				SalarySlipDetail.amount,
-			)
-			.where(
-				(SalarySlipDetail.parent.isin(salary_slips))
-				& (SalarySlipDetail.additional_salary.isnull())
-				& (SalarySlipDetail.variable_based_on_taxable_salary == 0)
-				& (SalaryComponent.arrear_component == 1)
-			)
-		).run(as_dict=True)
-
-		earnings_totals = {}
-		deductions_totals = {}
-
-		# Sum amounts per component grouped by parentfield
-		for detail in slip_details:
-			comp = detail.salary_component
-			amt = detail.amount
-			parentfield = detail.parentfield
-			if parentfield == "earnings":
-				earnings_totals[comp] = earnings_totals.get(comp, 0.0) + amt
-			elif parentfield == "deductions":
-				deductions_totals[comp] = deductions_totals.get(comp, 0.0) + amt
-
-		accrual_totals = self.fetch_existing_accrual_components(salary_slips)
+		existing_components = get_existing_arrear_components(salary_slips)
+		totals = get_component_totals(existing_components.values())
 
-		# Fetch and include existing Payroll Correction amounts for these salary slips
-		payroll_correction_totals = self.fetch_existing_payroll_corrections(salary_slips)
-
-		# Add payroll correction amounts to existing component totals
-		for component, amount in payroll_correction_totals.get("earnings", {}).items():
-			earnings_totals[component] = earnings_totals.get(component, 0.0) + amount
-
-		for component, amount in payroll_correction_totals.get("deductions", {}).items():
-			deductions_totals[component] = deductions_totals.get(component, 0.0) + amount
-
-		for component, amount in payroll_correction_totals.get("accruals", {}).items():
-			accrual_totals[component] = accrual_totals.get(component, 0.0) + amount
-
-		if not (earnings_totals or deductions_totals or accrual_totals):
+		if not any(totals.values()):
 			frappe.throw(_("No arrear components found in the existing salary slips."))
 
-		return {"earnings": earnings_totals, "deductions": deductions_totals, "accruals": accrual_totals}
-
-	def fetch_existing_accrual_components(self, salary_slips: list):
-		"""Fetch accrual components from existing salary slips with arrear_component enabled."""
-		if not salary_slips:
-			return {}
-
-		AccruedBenefit = frappe.qb.DocType("Employee Benefit Detail")
-		SalaryComponent = frappe.qb.DocType("Salary Component")
-
-		accrual_details = (
-			frappe.qb.from_(AccruedBenefit)
-			.inner_join(SalaryComponent)
-			.on(AccruedBenefit.salary_component == SalaryComponent.name)
-			.select(
-				AccruedBenefit.salary_component,
-				AccruedBenefit.amount,
-			)
-			.where((AccruedBenefit.parent.isin(salary_slips)) & (SalaryComponent.arrear_component == 1))
-		).run(as_dict=True)
-
-		accrual_totals = {}
-		for detail in accrual_details:
-			comp = detail.get("salary_component")
-			amt = detail.get("amount", 0.0)
-			accrual_totals[comp] = accrual_totals.get(comp, 0.0) + amt
-
-		return accrual_totals
-
-	def fetch_existing_payroll_corrections(self, salary_slips: list):
-		# fetch payroll correction amounts for existing salary slips with arrear_component enabled.
-		if not salary_slips:
-			return {"earnings": {}, "deductions": {}, "accruals": {}}
-
-		PayrollCorrection = frappe.qb.DocType("Payroll Correction")
-		PCChild = frappe.qb.DocType("Payroll Correction Child")
-		SalaryComponent = frappe.qb.DocType("Salary Component")
-
-		corrections = (
-			frappe.qb.from_(PayrollCorrection)
-			.join(PCChild)
-			.on(PayrollCorrection.name == PCChild.parent)
-			.join(SalaryComponent)
-			.on(PCChild.salary_component == SalaryComponent.name)
-			.select(
-				PCChild.parentfield,
-				PCChild.salary_component,
-				PCChild.amount,
-			)
-			.where(
-				(PayrollCorrection.salary_slip_reference.isin(salary_slips))
-				& (PayrollCorrection.docstatus == 1)
-				& (SalaryComponent.arrear_component == 1)
-			)
-		).run(as_dict=True)
-
-		earnings_totals = {}
-		deductions_totals = {}
-		accrual_totals = {}
-
-		# Sum corrections per component grouped by parentfield
-		for detail in corrections:
-			comp = detail.salary_component
-			amt = detail.amount or 0.0
-			parentfield = detail.parentfield
-
-			if parentfield == "earning_arrears":
-				earnings_totals[comp] = earnings_totals.get(comp, 0.0) + amt
-			elif parentfield == "deduction_arrears":
-				deductions_totals[comp] = deductions_totals.get(comp, 0.0) + amt
-			elif parentfield == "accrual_arrears":
-				accrual_totals[comp] = accrual_totals.get(comp, 0.0) + amt
-
-		return {"earnings": earnings_totals, "deductions": deductions_totals, "accruals": accrual_totals}
+		return totals
 
 	def generate_preview_components(self, salary_slips: list):
 		# Generate preview salary slip with new salary structure and return component and amounts.
 		if not salary_slips:
 			return {}
 
-		preview_earnings = {}
-		preview_deductions = {}
-		preview_accruals = {}
-
-		def is_arrear_component(component):
-			return frappe.get_cached_value("Salary Component", component, "arrear_component")
-
-		for slip in salary_slips:
-			# Build a preview salary slip doc
-			salary_slip_doc = frappe.get_doc(
-				{
-					"doctype": "Salary Slip",
-					"employee": self.employee,
-					"salary_structure": self.salary_structure,
-					"posting_date": slip.get("posting_date"),
-					"start_date": slip.get("start_date"),
-					"end_date": slip.get("end_date"),
-				}
-			)
-
-			# check if any Payroll Corrections exist for this slip and sum days_to_reverse to get actual payment days for when previewing salary slip for new structure
-			PayrollCorrection = frappe.qb.DocType("Payroll Correction")
-			total_days_to_reverse = (
-				frappe.qb.from_(PayrollCorrection)
-				.select(Sum(PayrollCorrection.days_to_reverse).as_("total_days"))
-				.where(
-					(PayrollCorrection.salary_slip_reference == slip.name)
-					& (PayrollCorrection.docstatus == 1)
-				)
-			).run(pluck=True)
-			total_days_to_reverse = total_days_to_reverse[0] or 0.0
-
-			preview_slip = make_salary_slip(
-				self.salary_structure,
-				salary_slip_doc,
-				self.employee,
-				lwp_days_corrected=total_days_to_reverse,
-			)
-
-			# earnings
-			for row in preview_slip.get("earnings", []) or []:
-				if (not getattr(row, "additional_salary", None)) and is_arrear_component(
-					row.salary_component
-				):
-					preview_earnings[row.salary_component] = preview_earnings.get(
-						row.salary_component, 0.0
-					) + getattr(row, "amount", 0.0)
-
-			# deductions
-			for row in preview_slip.get("deductions", []) or []:
-				if (
-					not getattr(row, "additional_salary", None)
-					and not getattr(row, "variable_based_on_taxable_salary", False)
-					and is_arrear_component(row.salary_component)
-				):
-					preview_deductions[row.salary_component] = preview_deductions.get(
-						row.salary_component, 0.0
-					) + getattr(row, "amount", 0.0)
-
-			# accruals
-			for row in getattr(preview_slip, "accrued_benefits", []) or []:
-				if is_arrear_component(row.salary_component):
-					preview_accruals[row.salary_component] = preview_accruals.get(
-						row.salary_component, 0.0
-					) + getattr(row, "amount", 0.0)
-
-		return {"earnings": preview_earnings, "deductions": preview_deductions, "accruals": preview_accruals}
+		days_to_reverse = get_days_to_reverse([slip.name for slip in salary_slips])
+		return get_preview_components(
+			self.employee, self.salary_structure, salary_slips, days_to_reverse, get_arrear_components()
+		)
 
 	def compute_component_differences(self, existing_components: dict, new_components: dict):
 		"""Calculate component differences between existing and preview salary slips.
 		existing_components and new_components params are dicts with keys 'earnings','deductions','accruals'
 		"""
-		if not existing_components:
-			existing_components = {"earnings": {}, "deductions": {}, "accruals": {}}
-		if not new_components:
-			new_components = {"earnings": {}, "deductions": {}, "accruals": {}}
-
-		earnings_diff = {}
-		deductions_diff = {}
-		accruals_diff = {}
-
-		# earnings
-		for comp, amount in new_components.get("earnings", {}).items():
-			existing_amount = existing_components.get("earnings", {}).get(comp, 0.0)
-			diff = amount - existing_amount
-			if diff > 0:
-				earnings_diff[comp] = diff
-
-		# deductions
-		for comp, amount in new_components.get("deductions", {}).items():
-			existing_amount = existing_components.get("deductions", {}).get(comp, 0.0)
-			diff = amount - existing_amount
-			if diff > 0:
-				deductions_diff[comp] = diff
-
-		# accruals
-		for comp, amount in new_components.get("accruals", {}).items():
-			existing_amount = existing_components.get("accruals", {}).get(comp, 0.0)
-			diff = amount - existing_amount
-			if diff > 0:
-				accruals_diff[comp] = diff
-
-		result = {}
-		if earnings_diff or deductions_diff or accruals_diff:
-			result = {"earnings": earnings_diff, "deductions": deductions_diff, "accruals": accruals_diff}
+		result = get_component_differences(existing_components, new_components)
 
 		if not result:
 			frappe.throw(
@@ -407,49 +204,523 @@ class Arrear(Document):
 			frappe.throw(_("No arrear details found"))
 
 	def create_additional_salary(self):
+		for additional_salary in self.get_additional_salaries():
+			additional_salary.insert()
+			additional_salary.submit()
+
+	def get_additional_salaries(self) -> list:
+		additional_salaries = []
 		for component in (self.earning_arrears or []) + (self.deduction_arrears or []):
 			if not component.salary_component or not component.amount:
 				continue
 
-			additional_salary = frappe.get_doc(
-				{
-					"doctype": "Additional Salary",
-					"employee": self.employee,
-					"company": self.company,
-					"payroll_date": self.payroll_date,
-					"salary_component": component.salary_component,
-					"currency": self.currency,
-					"amount": component.amount,
-					"ref_doctype": "Arrear",
-					"ref_docname": self.name,
-					"overwrite_salary_structure_amount": 0,
-				}
+			additional_salaries.append(
+				frappe.new_doc(
+					"Additional Salary",
+					employee=self.employee,
+					company=self.company,
+					payroll_date=self.payroll_date,
+					salary_component=component.salary_component,
+					currency=self.currency,
+					amount=component.amount,
+					ref_doctype="Arrear",
+					ref_docname=self.name,
+					overwrite_salary_structure_amount=0,
+				)
 			)
-			additional_salary.insert()
-			additional_salary.submit()
+
+		return additional_salaries
 
 	def create_benefit_ledger_entry(self):
+		for entry in self.get_benefit_ledger_entries():
+			entry.insert()
+
+	def get_benefit_ledger_entries(self) -> list:
+		entries = []
 		for component in self.accrual_arrears or []:
 			if not component.salary_component or not component.amount:
 				continue
 
-			is_flexible_benefit = frappe.db.get_value(
-				"Salary Component", component.salary_component, "is_flexible_benefit"
+			entries.append(
+				frappe.new_doc(
+					"Employee Benefit Ledger",
+					employee=self.employee,
+					employee_name=self.employee_name,
+					company=self.company,
+					payroll_period=self.payroll_period,
+					salary_component=component.salary_component,
+					transaction_type="Accrual",
+					amount=component.amount,
+					reference_doctype="Arrear",
+					reference_document=self.name,
+					remarks="Accrual via Arrears",
+					flexible_benefit=frappe.get_cached_value(
+						"Salary Component", component.salary_component, "is_flexible_benefit"
+					),
+				)
 			)
 
-			frappe.get_doc(
-				{
-					"doctype": "Employee Benefit Ledger",
-					"employee": self.employee,
-					"employee_name": self.employee_name,
-					"company": self.company,
-					"payroll_period": self.payroll_period,
-					"salary_component": component.salary_component,
-					"transaction_type": "Accrual",
-					"amount": component.amount,
-					"reference_doctype": "Arrear",
-					"reference_document": self.name,
-					"remarks": "Accrual via Arrears",
-					"flexible_benefit": is_flexible_benefit,
-				}
-			).insert()
+		return entries
+
+
+def get_arrear_components() -> set:
+	return set(frappe.get_all("Salary Component", filters={"arrear_component": 1}, pluck="name"))
+
+
+def get_existing_arrear_components(salary_slips: list) -> dict:
+	"""Returns the arrear component amounts paid through each salary slip, including payroll corrections.
+	{salary_slip: {"earnings": {component: amount}, "deductions": {...}, "accruals": {...}}}"""
+	existing_components = {slip: {"earnings": {}, "deductions": {}, "accruals": {}} for slip in salary_slips}
+	if not salary_slips:
+		return existing_components
+
+	def add_amount(slip, key, component, amount):
+		totals = existing_components[slip][key]
+		totals[component] = totals.get(component, 0.0) + (amount or 0.0)
+
+	SalarySlipDetail = frappe.qb.DocType("Salary Detail")
+	SalaryComponent = frappe.qb.DocType("Salary Component")
+	slip_details = (
+		frappe.qb.from_(SalarySlipDetail)
+		.join(SalaryComponent)
+		.on(SalarySlipDetail.salary_component == SalaryComponent.name)
+		.select(
+			SalarySlipDetail.parent,
+			SalarySlipDetail.parentfield,
+			SalarySlipDetail.salary_component,
+			SalarySlipDetail.amount,
+		)
+		.where(
+			(SalarySlipDetail.parent.isin(salary_slips))
+			& (SalarySlipDetail.parenttype == "Salary Slip")
+			& (SalarySlipDetail.additional_salary.isnull())
+			& (SalarySlipDetail.variable_based_on_taxable_salary == 0)
+			& (SalaryComponent.arrear_component == 1)
+		)
+	).run(as_dict=True)
+
+	for detail in slip_details:
+		if detail.parentfield in ("earnings", "deductions"):
+			add_amount(detail.parent, detail.parentfield, detail.salary_component, detail.amount)
+
+	AccruedBenefit = frappe.qb.DocType("Employee Benefit Detail")
+	accrual_details = (
+		frappe.qb.from_(AccruedBenefit)
+		.inner_join(SalaryComponent)
+		.on(AccruedBenefit.salary_component == SalaryComponent.name)
+		.select(AccruedBenefit.parent, AccruedBenefit.salary_component, AccruedBenefit.amount)
+		.where((AccruedBenefit.parent.isin(salary_slips)) & (SalaryComponent.arrear_component == 1))
+	).run(as_dict=True)
+
+	for detail in accrual_details:
+		add_amount(detail.parent, "accruals", detail.salary_component, detail.amount)
+
+	PayrollCorrection = frappe.qb.DocType("Payroll Correction")
+	PCChild = frappe.qb.DocType("Payroll Correction Child")
+	corrections = (
+		frappe.qb.from_(PayrollCorrection)
+		.join(PCChild)
+		.on(PayrollCorrection.name == PCChild.parent)
+		.join(SalaryComponent)
+		.on(PCChild.salary_component == SalaryComponent.name)
+		.select(
+			PayrollCorrection.salary_slip_reference,
+			PCChild.parentfield,
+			PCChild.salary_component,
+			PCChild.amount,
+		)
+		.where(
+			(PayrollCorrection.salary_slip_reference.isin(salary_slips))
+			& (PayrollCorrection.docstatus == 1)
+			& (SalaryComponent.arrear_component == 1)
+		)
+	).run(as_dict=True)
+
+	correction_fields = {
+		"earning_arrears": "earnings",
+		"deduction_arrears": "deductions",
+		"accrual_arrears": "accruals",
+	}
+	for detail in corrections:
+		if key := correction_fields.get(detail.parentfield):
+			add_amount(detail.salary_slip_reference, key, detail.salary_component, detail.amount)
+
+	return existing_components
+
+
+def get_days_to_reverse(salary_slips: list) -> dict:
+	"""Returns LWP days reversed through payroll corrections for each salary slip"""
+	if not salary_slips:
+		return {}
+
+	PayrollCorrection = frappe.qb.DocType("Payroll Correction")
+	return dict(
+		frappe.qb.from_(PayrollCorrection)
+		.select(PayrollCorrection.salary_slip_reference, Sum(PayrollCorrection.days_to_reverse))
+		.where(
+			(PayrollCorrection.salary_slip_reference.isin(salary_slips)) & (PayrollCorrection.docstatus == 1)
+		)
+		.groupby(PayrollCorrection.salary_slip_reference)
+		.run()
+	)
+
+
+def get_preview_components(
+	employee: str, salary_structure: str, salary_slips: list, days_to_reverse: dict, arrear_components: set
+) -> dict:
+	"""Returns arrear component totals of preview salary slips built with `salary_structure` for the
+	periods of `salary_slips`"""
+	preview_components = []
+
+	for slip in salary_slips:
+		# Build a preview salary slip doc
+		salary_slip_doc = frappe.get_doc(
+			{
+				"doctype": "Salary Slip",
+				"employee": employee,
+				"salary_structure": salary_structure,
+				"posting_date": slip.get("posting_date"),
+				"start_date": slip.get("start_date"),
+				"end_date": slip.get("end_date"),
+			}
+		)
+
+		# LWP days reversed through payroll corrections are paid when previewing the slip for the new structure
+		preview_slip = make_salary_slip(
+			salary_structure,
+			salary_slip_doc,
+			employee,
+			lwp_days_corrected=days_to_reverse.get(slip.name) or 0.0,
+		)
+
+		components = {"earnings": {}, "deductions": {}, "accruals": {}}
+		for key, table in (
+			("earnings", "earnings"),
+			("deductions", "deductions"),
+			("accruals", "accrued_benefits"),
+		):
+			for row in preview_slip.get(table) or []:
+				if (
+					row.salary_component not in arrear_components
+					or getattr(row, "additional_salary", None)
+					or (key == "deductions" and getattr(row, "variable_based_on_taxable_salary", False))
+				):
+					continue
+
+				components[key][row.salary_component] = components[key].get(row.salary_component, 0.0) + (
+					getattr(row, "amount", 0.0) or 0.0
+				)
+
+		preview_components.append(components)
+
+	return get_component_totals(preview_components)
+
+
+def get_component_totals(components: list) -> dict:
+	"""Adds up component amounts of several salary slips"""
+	totals = {"earnings": {}, "deductions": {}, "accruals": {}}
+	for slip_components in components:
+		for key, amounts in slip_components.items():
+			for component, amount in amounts.items():
+				totals[key][component] = totals[key].get(component, 0.0) + amount
+
+	return totals
+
+
+def get_component_differences(existing_components: dict, new_components: dict) -> dict:
+	"""Returns the positive differences between new and existing component totals, empty if there are none"""
+	existing_components = existing_components or {}
+	new_components = new_components or {}
+
+	differences = {"earnings": {}, "deductions": {}, "accruals": {}}
+	for key, diff in differences.items():
+		for comp, amount in new_components.get(key, {}).items():
+			existing_amount = existing_components.get(key, {}).get(comp, 0.0)
+			if amount - existing_amount > 0:
+				diff[comp] = amount - existing_amount
+
+	return differences if any(differences.values()) else {}
+
+
+@frappe.whitelist()
+def create_arrears_in_bulk(
+	payroll_period: str,
+	arrear_start_date: str,
+	payroll_date: str,
+	salary_structure: str | None = None,
+	employees: list | str | None = None,
+	submit: bool = False,
+) -> str:
+	"""Queues arrears for employees whose salary structure was assigned on or after `arrear_start_date`.
+	Employees are picked by salary structure, by a list of employees or both, and are split into shards
+	that run as separate background jobs. Employees that already have an arrear for the payroll period
+	are skipped, so re-running the same selection resumes a partially completed run."""
+	frappe.has_permission("Arrear", "submit" if cint(submit) else "create", throw=True)
+
+	if isinstance(employees, str):
+		employees = frappe.parse_json(employees)
+	if not (salary_structure or employees):
+		frappe.throw(_("Select a Salary Structure or Employees to create arrears for"))
+
+	frappe.get_doc(
+		{"doctype": "Arrear", "payroll_period": payroll_period, "arrear_start_date": arrear_start_date}
+	).validate_dates()
+
+	args = frappe._dict(
+		payroll_period=payroll_period,
+		company=frappe.db.get_value("Payroll Period", payroll_period, "company"),
+		arrear_start_date=getdate(arrear_start_date),
+		payroll_date=getdate(payroll_date),
+		submit=cint(submit),
+	)
+	assignments = get_retroactive_assignments(args, salary_structure, employees)
+	if not assignments:
+		frappe.throw(
+			_("No active Salary Structure Assignments found on or after arrear start date {0}").format(
+				frappe.bold(arrear_start_date)
+			)
+		)
+
+	run_id = frappe.generate_hash(length=12)
+	shards = list(create_batch(assignments, BULK_ARREAR_SHARD_SIZE))
+	frappe.cache().hset(BULK_ARREAR_RUN, run_id, {"total": len(assignments), "processed": 0})
+
+	for shard in shards:
+		frappe.enqueue(
+			process_arrear_shard,
+			queue="long",
+			timeout=3000,
+			args=args,
+			assignments=list(shard),
+			run_id=run_id,
+		)
+
+	frappe.msgprint(
+		_("Arrears for {0} employees have been queued in {1} batches. It may take a few minutes.").format(
+			len(assignments), len(shards)
+		),
+		alert=True,
+		indicator="blue",
+	)
+	return run_id
+
+
+def get_retroactive_assignments(args: dict, salary_structure: str | None, employees: list | None) -> list:
+	"""Returns the latest salary structure assignment of each active employee starting on or after
+	the arrear start date"""
+	Assignment = frappe.qb.DocType("Salary Structure Assignment")
+	Employee = frappe.qb.DocType("Employee")
+
+	query = (
+		frappe.qb.from_(Assignment)
+		.inner_join(Employee)
+		.on(Assignment.employee == Employee.name)
+		.select(
+			Assignment.employee,
+			Employee.employee_name,
+			Employee.department,
+			Assignment.salary_structure,
+			Assignment.currency,
+		)
+		.where(
+			(Assignment.docstatus == 1)
+			& (Assignment.company == args.company)
+			& (Assignment.from_date >= args.arrear_start_date)
+			& (Employee.status == "Active")
+			& (Employee.relieving_date.isnull() | (Employee.relieving_date >= args.payroll_date))
+		)
+		.orderby(Assignment.from_date, order=frappe.qb.desc)
+	)
+	if salary_structure:
+		query = query.where(Assignment.salary_structure == salary_structure)
+	if employees:
+		query = query.where(Assignment.employee.isin(employees))
+
+	assignments = {}
+	for assignment in query.run(as_dict=True):
+		assignments.setdefault(assignment.employee, assignment)
+
+	return list(assignments.values())
+
+
+def process_arrear_shard(args: dict, assignments: list, run_id: str) -> None:
+	"""Computes and creates the arrears of a shard of employees. Salary slips, their arrear components
+	and payroll corrections are fetched for the whole shard, and the arrears are inserted together."""
+	args = frappe._dict(args)
+	assignments = [frappe._dict(d) for d in assignments]
+
+	existing_arrears = get_existing_arrears([d.employee for d in assignments], args.payroll_period)
+	pending = [d for d in assignments if (d.employee, d.salary_structure) not in existing_arrears]
+	skipped = [d.employee for d in assignments if (d.employee, d.salary_structure) in existing_arrears]
+
+	salary_slips = get_salary_slips_by_employee([d.employee for d in pending], args.arrear_start_date)
+	slip_names = [slip.name for slips in salary_slips.values() for slip in slips]
+	existing_components = get_existing_arrear_components(slip_names)
+	days_to_reverse = get_days_to_reverse(slip_names)
+	arrear_components = get_arrear_components()
+
+	success, failure, arrears = [], [], []
+	for assignment in pending:
+		slips = salary_slips.get(assignment.employee)
+		if not slips:
+			failure.append(assignment.employee)
+			continue
+
+		try:
+			differences = get_component_differences(
+				get_component_totals(existing_components[slip.name] for slip in slips),
+				get_preview_components(
+					assignment.employee,
+					assignment.salary_structure,
+					slips,
+					days_to_reverse,
+					arrear_components,
+				),
+			)
+		except Exception:
+			frappe.log_error(
+				f"Arrear calculation failed for {assignment.employee}", reference_doctype="Arrear"
+			)
+			failure.append(assignment.employee)
+			continue
+
+		if not differences:
+			skipped.append(assignment.employee)
+			continue
+
+		arrear = frappe.new_doc(
+			"Arrear",
+			employee=assignment.employee,
+			employee_name=assignment.employee_name,
+			company=args.company,
+			payroll_period=args.payroll_period,
+			payroll_date=args.payroll_date,
+			arrear_start_date=args.arrear_start_date,
+			salary_structure=assignment.salary_structure,
+			currency=assignment.currency,
+			docstatus=args.submit,
+		)
+		arrear.populate_arrear_tables(differences)
+		arrear.set_new_name()
+		arrears.append(arrear)
+		success.append({"doc": get_link_to_form("Arrear", arrear.name), "employee": assignment.employee})
+
+	frappe.clear_messages()
+
+	try:
+		if failed := insert_arrears(arrears):
+			failure += failed
+			success = [d for d in success if d["employee"] not in failed]
+	except Exception:
+		frappe.db.rollback()
+		frappe.log_error("Bulk Arrear creation failed for a batch of employees", reference_doctype="Arrear")
+		failure += [d["employee"] for d in success]
+		success = []
+
+	update_bulk_arrear_progress(run_id, len(assignments), success, failure, skipped)
+
+
+def get_existing_arrears(employees: list, payroll_period: str) -> set:
+	return set(
+		frappe.get_all(
+			"Arrear",
+			filters={"employee": ("in", employees), "payroll_period": payroll_period, "docstatus": ("<", 2)},
+			fields=["employee", "salary_structure"],
+			as_list=True,
+		)
+	)
+
+
+def get_salary_slips_by_employee(employees: list, arrear_start_date) -> dict:
+	salary_slips = {}
+	if not employees:
+		return salary_slips
+
+	for slip in frappe.get_all(
+		"Salary Slip",
+		filters={"employee": ("in", employees), "docstatus": 1, "start_date": (">=", arrear_start_date)},
+		fields=["name", "employee", "posting_date", "start_date", "end_date"],
+		order_by="start_date",
+	):
+		salary_slips.setdefault(slip.employee, []).append(slip)
+
+	return salary_slips
+
+
+def insert_arrears(arrears: list) -> list:
+	"""Inserts the arrears with multi-row inserts, along with the Additional Salaries and benefit
+	ledger entries of submitted arrears. The Additional Salaries are validated like an Additional
+	Salary import first, and the employees whose arrears cannot be submitted are returned."""
+	submitted = [arrear for arrear in arrears if arrear.docstatus == 1]
+	rows = {
+		arrear.name: [
+			frappe._dict(
+				employee=d.employee,
+				company=d.company,
+				salary_component=d.salary_component,
+				amount=d.amount,
+				payroll_date=d.payroll_date,
+				currency=d.currency,
+				ref_doctype=d.ref_doctype,
+				ref_docname=d.ref_docname,
+				overwrite_salary_structure_amount=0,
+			)
+			for d in arrear.get_additional_salaries()
+		]
+		for arrear in submitted
+	}
+	context = get_bulk_import_context([row for arrear_rows in rows.values() for row in arrear_rows])
+
+	docs, failed = [], []
+	for arrear in arrears:
+		if arrear.docstatus != 1:
+			docs.append(arrear)
+			continue
+
+		errors = [error for row in rows[arrear.name] if (error := validate_bulk_import_row(row, context))]
+		if errors:
+			frappe.log_error(
+				f"Arrear for {arrear.employee} could not be submitted",
+				message="\n".join(errors),
+				reference_doctype="Arrear",
+			)
+			failed.append(arrear.employee)
+			continue
+
+		docs.append(arrear)
+		docs.extend(make_additional_salary_from_row(row, context, docstatus=1) for row in rows[arrear.name])
+		docs.extend(arrear.get_benefit_ledger_entries())
+
+	if docs:
+		bulk_insert_documents(docs)
+
+	return failed
+
+
+def update_bulk_arrear_progress(
+	run_id: str, processed: int, success: list, failure: list, skipped: list
+) -> None:
+	cache = frappe.cache()
+	# shards finish in any order, so lock the run while merging the results of this shard
+	with cache.lock(f"{BULK_ARREAR_RUN}::{run_id}", timeout=60):
+		run = cache.hget(BULK_ARREAR_RUN, run_id) or {}
+		run["processed"] = run.get("processed", 0) + processed
+		for key, value in (("success", success), ("failure", failure), ("skipped", skipped)):
+			run[key] = run.get(key, []) + value
+		cache.hset(BULK_ARREAR_RUN, run_id, run)
+
+	total = run.get("total") or processed
+	frappe.publish_progress(
+		run["processed"] * 100 / total,
+		title=_("Creating Arrears..."),
+		description=_("{0} of {1} employees processed").format(run["processed"], total),
+	)
+
+	if run["processed"] >= total:
+		cache.hdel(BULK_ARREAR_RUN, run_id)
+		frappe.publish_realtime(
+			"completed_bulk_arrear_creation",
+			message={"success": run["success"], "failure": run["failure"], "skipped": run["skipped"]},
+			user=frappe.session.user,
+			after_commit=True,
+		)
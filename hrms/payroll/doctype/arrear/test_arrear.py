@@ -8,6 +8,11 @@ from frappe.utils import add_days, add_months, getdate
 
 from erpnext.setup.doctype.employee.test_employee import make_employee
 
+from hrms.payroll.doctype.arrear.arrear import (
+	get_retroactive_assignments,
+	insert_arrears,
+	process_arrear_shard,
+)
 from hrms.payroll.doctype.salary_slip.test_salary_slip import (
 	make_payroll_period,
 )
@@ -193,3 +198,105 @@ class TestArrear(IntegrationTestCase):
 			self.assertIn("Accrued Earnings", accrual_components)
 
 		frappe.db.rollback()
+
+	def test_bulk_arrear_run(self):
+		emp = make_employee(
+			"test_bulk_arrear@salary.com",
+			company="_Test Company",
+			date_of_joining="2021-01-01",
+		)
+		make_payroll_period()
+		current_payroll_period = frappe.get_last_doc("Payroll Period", filters={"company": "_Test Company"})
+		old_salary_structure = make_salary_structure(
+			"Test Old Bulk Arrear Salary Structure",
+			"Monthly",
+			company="_Test Company",
+			employee=emp,
+			payroll_period=current_payroll_period,
+			test_arrear=True,
+			base=50000,
+		)
+
+		next_year_start = add_days(current_payroll_period.end_date, 1)
+		new_payroll_period = frappe.get_doc(
+			{
+				"doctype": "Payroll Period",
+				"name": f"Test Bulk Arrear Payroll Period {getdate(next_year_start).year}",
+				"company": "_Test Company",
+				"start_date": next_year_start,
+				"end_date": add_months(current_payroll_period.end_date, 1),
+			}
+		).insert()
+
+		for posting_date in (next_year_start, add_months(next_year_start, 1)):
+			slip = make_salary_slip(old_salary_structure.name, employee=emp, posting_date=posting_date)
+			slip.save()
+			slip.submit()
+
+		new_salary_structure = make_salary_structure(
+			"Test New Bulk Arrear Salary Structure",
+			"Monthly",
+			employee=emp,
+			from_date=next_year_start,
+			company="_Test Company",
+			payroll_period=new_payroll_period,
+			base=75000,
+			test_arrear=True,
+		)
+
+		args = frappe._dict(
+			payroll_period=new_payroll_period.name,
+			company="_Test Company",
+			arrear_start_date=getdate(next_year_start),
+			payroll_date=getdate(add_months(next_year_start, 2)),
+			submit=1,
+		)
+		assignments = get_retroactive_assignments(args, new_salary_structure.name, None)
+		self.assertEqual([d.employee for d in assignments], [emp])
+
+		process_arrear_shard(args, assignments, "test_bulk_arrear_run")
+
+		arrear = frappe.get_last_doc("Arrear", filters={"employee": emp})
+		self.assertEqual(arrear.docstatus, 1)
+
+		# same amounts as an arrear computed on its own
+		expected = frappe.get_doc(
+			{
+				"doctype": "Arrear",
+				"employee": emp,
+				"payroll_period": new_payroll_period.name,
+				"salary_structure": new_salary_structure.name,
+				"arrear_start_date": next_year_start,
+			}
+		)
+		expected.calculate_salary_structure_arrears()
+		self.assertEqual(
+			{row.salary_component: row.amount for row in arrear.earning_arrears},
+			{row.salary_component: row.amount for row in expected.earning_arrears},
+		)
+		self.assertEqual(
+			{row.salary_component: row.amount for row in arrear.deduction_arrears},
+			{row.salary_component: row.amount for row in expected.deduction_arrears},
+		)
+
+		additional_salaries = frappe.get_all(
+			"Additional Salary",
+			filters={"ref_docname": arrear.name, "docstatus": 1},
+			fields=["salary_component", "amount", "type"],
+		)
+		self.assertIn(
+			{"salary_component": "Basic Salary", "amount": 50000, "type": "Earning"}, additional_salaries
+		)
+
+		# employees with an arrear for the payroll period are skipped on a re-run
+		process_arrear_shard(args, assignments, "test_bulk_arrear_run")
+		self.assertEqual(frappe.db.count("Arrear", {"employee": emp}), 1)
+
+		# arrears whose Additional Salaries fail validation are not inserted as submitted
+		invalid_arrear = frappe.copy_doc(arrear)
+		invalid_arrear.update(docstatus=1, payroll_date="2020-12-01")
+		invalid_arrear.set_new_name()
+		self.assertEqual(insert_arrears([invalid_arrear]), [emp])
+		self.assertFalse(frappe.db.exists("Arrear", invalid_arrear.name))
+
+		frappe.db.rollback()
@@ -7,11 +7,11 @@ from frappe.model.document import Document
 from frappe.query_builder.custom import ConstantColumn
 from frappe.query_builder.functions import Coalesce
 from frappe.query_builder.terms import SubQuery
-from frappe.utils import get_link_to_form
 
 from hrms.hr.utils import validate_bulk_tool_fields
-from hrms.payroll.doctype.salary_structure.salary_structure import (
-	create_salary_structure_assignment,
+from hrms.payroll.doctype.salary_structure_assignment.salary_structure_assignment import (
+	enqueue_salary_structure_assignments,
+	get_bulk_assignment_args,
 )
 
 
@@ -65,56 +65,16 @@ class BulkSalaryStructureAssignment(Document):
 		mandatory_fields = ["salary_structure", "from_date", "company"]
 		validate_bulk_tool_fields(self, mandatory_fields, employees)
 
+		args = get_bulk_assignment_args(
+			self.salary_structure, self.from_date, self.payroll_payable_account, self.income_tax_slab
+		)
 		if len(employees) <= 30:
-			return self._bulk_assign_structure(employees)
+			enqueue_salary_structure_assignments(employees, args, now=True)
+			return
 
-		frappe.enqueue(self._bulk_assign_structure, timeout=3000, employees=employees)
+		enqueue_salary_structure_assignments(employees, args)
 		frappe.msgprint(
 			_("Creation of Salary Structure Assignments has been queued. It may take a few minutes."),
 			alert=True,
 			indicator="blue",
 		)
-
-	def _bulk_assign_structure(self, employees: list) -> None:
-		success, failure = [], []
-		count = 0
-		savepoint = "before_salary_assignment"
-
-		for d in employees:
-			try:
-				frappe.db.savepoint(savepoint)
-				assignment = create_salary_structure_assignment(
-					employee=d["employee"],
-					salary_structure=self.salary_structure,
-					company=self.company,
-					currency=self.currency,
-					payroll_payable_account=self.payroll_payable_account,
-					from_date=self.from_date,
-					base=d["base"],
-					variable=d["variable"],
-					income_tax_slab=self.income_tax_slab,
-				)
-			except Exception:
-				frappe.db.rollback(save_point=savepoint)
-				frappe.log_error(
-					f"Bulk Assignment - Salary Structure Assignment failed for employee {d['employee']}.",
-					reference_doctype="Salary Structure Assignment",
-				)
-				failure.append(d["employee"])
-			else:
-				success.append(
-					{
-						"doc": get_link_to_form("Salary Structure Assignment", assignment),
-						"employee": d["employee"],
-					}
-				)
-
-			count += 1
-			frappe.publish_progress(count * 100 / len(employees), title=_("Assigning Structure..."))
-
-		frappe.publish_realtime(
-			"completed_bulk_salary_structure_assignment",
-			message={"success": success, "failure": failure},
-			doctype="Bulk Salary Structure Assignment",
-			after_commit=True,
-		)
@@ -11,6 +11,10 @@ from hrms.payroll.doctype.bulk_salary_structure_assignment.bulk_salary_structure
 	BulkSalaryStructureAssignment,
 )
 from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+from hrms.payroll.doctype.salary_structure_assignment.salary_structure_assignment import (
+	create_salary_structure_assignments,
+	get_bulk_assignment_args,
+)
 from hrms.tests.test_utils import create_company, create_department, create_employee_grade
 
 
@@ -101,3 +105,38 @@ class TestBulkSalaryStructureAssignment(IntegrationTestCase):
 		)
 		self.assertEqual(ssa2.base, 40000)
 		self.assertEqual(ssa2.variable, 0)
+
+	def test_set_based_assignment(self):
+		today = getdate()
+		make_salary_structure("Salary Structure 1", "Monthly", self.emp2, today, company="_Test Company")
+		salary_structure = make_salary_structure("Salary Structure 2", "Monthly", company="_Test Company")
+		frappe.db.set_value("Employee", self.emp1, "payroll_cost_center", "Main - _TC")
+
+		args = get_bulk_assignment_args(salary_structure.name, today)
+		assigned = create_salary_structure_assignments(
+			[
+				{"employee": self.emp1, "base": 50000, "variable": 2000},
+				# already has an assignment on the same date
+				{"employee": self.emp2, "base": 40000, "variable": 0},
+				{"employee": self.emp3, "base": 30000, "variable": 0},
+			],
+			args,
+		)
+		self.assertEqual(assigned, [self.emp1, self.emp3])
+
+		assignment = frappe.get_doc(
+			"Salary Structure Assignment", {"employee": self.emp1, "salary_structure": salary_structure.name}
+		)
+		self.assertEqual(assignment.docstatus, 1)
+		self.assertEqual(assignment.department, frappe.db.get_value("Employee", self.emp1, "department"))
+		self.assertEqual(assignment.payroll_payable_account, args.payroll_payable_account)
+		self.assertEqual(assignment.base, 50000)
+		self.assertEqual(
+			[(d.cost_center, d.percentage) for d in assignment.payroll_cost_centers], [("Main - _TC", 100)]
+		)
+		self.assertFalse(
+			frappe.db.exists(
+				"Salary Structure Assignment",
+				{"employee": self.emp2, "salary_structure": salary_structure.name},
+			)
+		)
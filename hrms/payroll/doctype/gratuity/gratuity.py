@@ -3,12 +3,18 @@
 
 import frappe
 from frappe import _, bold
-from frappe.query_builder.functions import Abs, Sum
-from frappe.utils import cstr, flt, get_datetime, get_link_to_form
+from frappe.query_builder.functions import Abs, Count, Max, Sum
+from frappe.utils import cint, create_batch, cstr, flt, get_datetime, get_link_to_form, getdate, rounded
 
 from erpnext.accounts.general_ledger import make_gl_entries
 from erpnext.controllers.accounts_controller import AccountsController
 
+from hrms.utils import bulk_insert_documents
+
+GRATUITY_RULES = "gratuity_rules"
+# employees whose slips and attendance are fetched together when computing the gratuity liability
+LIABILITY_BATCH_SIZE = 1000
+
 
 class Gratuity(AccountsController):
 	def validate(self):
@@ -19,20 +25,7 @@ class Gratuity(AccountsController):
 
 	@property
 	def gratuity_settings(self):
-		if not hasattr(self, "_gratuity_settings"):
-			self._gratuity_settings = frappe.db.get_value(
-				"Gratuity Rule",
-				self.gratuity_rule,
-				[
-					"work_experience_calculation_function as method",
-					"total_working_days_per_year",
-					"minimum_year_for_gratuity",
-					"calculate_gratuity_amount_based_on",
-				],
-				as_dict=True,
-			)
-
-		return self._gratuity_settings
+		return get_gratuity_rule_details(self.gratuity_rule)
 
 	def set_status(self, update=False):
 		status = {"0": "Draft", "1": "Submitted", "2": "Cancelled"}[cstr(self.docstatus or 0)]
@@ -149,12 +142,9 @@ class Gratuity(AccountsController):
 	def get_work_experience(self) -> float:
 		total_working_days = self.get_total_working_days()
 		rule = self.gratuity_settings
-		work_experience = total_working_days / (rule.total_working_days_per_year or 1)
-
-		if rule.method == "Round off Work Experience":
-			work_experience = round(work_experience)
-		else:
-			work_experience = flt(work_experience, self.precision("current_work_experience"))
+		work_experience = get_work_experience_in_years(
+			rule, total_working_days, self.precision("current_work_experience")
+		)
 
 		if work_experience < rule.minimum_year_for_gratuity:
 			frappe.throw(
@@ -176,80 +166,17 @@ class Gratuity(AccountsController):
 			)
 
 		total_working_days = (get_datetime(relieving_date) - get_datetime(date_of_joining)).days
+		non_working_days = get_non_working_days([self.employee], relieving_date)
 
-		payroll_based_on = frappe.db.get_single_value("Payroll Settings", "payroll_based_on") or "Leave"
-		if payroll_based_on == "Leave":
-			total_lwp = self.get_non_working_days(relieving_date, "On Leave")
-			total_working_days -= total_lwp
-		elif payroll_based_on == "Attendance":
-			total_absent = self.get_non_working_days(relieving_date, "Absent")
-			total_working_days -= total_absent
-
-		return total_working_days
-
-	def get_non_working_days(self, relieving_date: str, status: str) -> float:
-		filters = {
-			"docstatus": 1,
-			"status": status,
-			"employee": self.employee,
-			"attendance_date": ("<=", get_datetime(relieving_date)),
-		}
-
-		if status == "On Leave":
-			lwp_leave_types = frappe.get_all("Leave Type", filters={"is_lwp": 1}, pluck="name")
-			filters["leave_type"] = ("IN", lwp_leave_types)
-
-		record = frappe.get_all("Attendance", filters=filters, fields=[{"COUNT": "*", "as": "total_lwp"}])
-		return record[0].total_lwp if len(record) else 0
+		return total_working_days - non_working_days.get(self.employee, 0)
 
 	def get_gratuity_amount(self, experience: float) -> float:
 		total_component_amount = self.get_total_component_amount()
-		calculate_amount_based_on = self.gratuity_settings.calculate_gratuity_amount_based_on
-
-		gratuity_amount = 0
-		slabs = self.get_gratuity_rule_slabs()
-		slab_found = False
-		years_left = experience
-
-		for slab in slabs:
-			if calculate_amount_based_on == "Current Slab":
-				if self._is_experience_within_slab(slab, experience):
-					gratuity_amount = (
-						total_component_amount * experience * slab.fraction_of_applicable_earnings
-					)
-					if slab.fraction_of_applicable_earnings:
-						slab_found = True
-
-				if slab_found:
-					break
-
-			elif calculate_amount_based_on == "Sum of all previous slabs":
-				# no slabs, fraction applicable for all years
-				if slab.to_year == 0 and slab.from_year == 0:
-					gratuity_amount += (
-						years_left * total_component_amount * slab.fraction_of_applicable_earnings
-					)
-					slab_found = True
-					break
-
-				# completed more years than the current slab, so consider fraction for current slab too
-				if self._is_experience_beyond_slab(slab, experience):
-					gratuity_amount += (
-						(slab.to_year - slab.from_year)
-						* total_component_amount
-						* slab.fraction_of_applicable_earnings
-					)
-					years_left -= slab.to_year - slab.from_year
-					slab_found = True
-
-				elif self._is_experience_within_slab(slab, experience):
-					gratuity_amount += (
-						years_left * total_component_amount * slab.fraction_of_applicable_earnings
-					)
-					slab_found = True
-					break
+		gratuity_amount = calculate_gratuity_amount(
+			self.gratuity_settings, experience, total_component_amount
+		)
 
-		if not slab_found:
+		if gratuity_amount is None:
 			frappe.throw(
 				_(
 					"No applicable slab found for the calculation of gratuity amount as per the Gratuity Rule: {0}"
@@ -286,9 +213,7 @@ class Gratuity(AccountsController):
 		return total_amount
 
 	def get_applicable_components(self) -> list[str]:
-		applicable_earning_components = frappe.get_all(
-			"Gratuity Applicable Component", filters={"parent": self.gratuity_rule}, pluck="salary_component"
-		)
+		applicable_earning_components = self.gratuity_settings.applicable_components
 		if not applicable_earning_components:
 			frappe.throw(
 				_("No applicable Earning components found for Gratuity Rule: {0}").format(
@@ -299,23 +224,346 @@ class Gratuity(AccountsController):
 		return applicable_earning_components
 
 	def get_gratuity_rule_slabs(self) -> list[dict]:
-		return frappe.get_all(
+		return self.gratuity_settings.slabs
+
+
+def get_last_salary_slip(employee: str) -> dict | None:
+	salary_slip = frappe.db.get_value(
+		"Salary Slip", {"employee": employee, "docstatus": 1}, order_by="start_date desc"
+	)
+	if salary_slip:
+		return frappe.get_doc("Salary Slip", salary_slip)
+
+
+def get_gratuity_rule_details(gratuity_rule: str) -> frappe._dict:
+	"""Returns the settings, slabs and applicable components of a gratuity rule, cached until the rule
+	is changed"""
+
+	def _get_gratuity_rule_details():
+		details = frappe.db.get_value(
+			"Gratuity Rule",
+			gratuity_rule,
+			[
+				"work_experience_calculation_function as method",
+				"total_working_days_per_year",
+				"minimum_year_for_gratuity",
+				"calculate_gratuity_amount_based_on",
+			],
+			as_dict=True,
+		)
+		if not details:
+			return None
+
+		details.slabs = frappe.get_all(
 			"Gratuity Rule Slab",
-			filters={"parent": self.gratuity_rule},
+			filters={"parent": gratuity_rule},
 			fields=["from_year", "to_year", "fraction_of_applicable_earnings"],
 			order_by="idx",
 		)
+		details.applicable_components = frappe.get_all(
+			"Gratuity Applicable Component", filters={"parent": gratuity_rule}, pluck="salary_component"
+		)
+		return details
 
-	def _is_experience_within_slab(self, slab: dict, experience: float) -> bool:
-		return bool(slab.from_year <= experience and (experience <= slab.to_year or slab.to_year == 0))
+	return frappe.cache().hget(GRATUITY_RULES, gratuity_rule, generator=_get_gratuity_rule_details)
 
-	def _is_experience_beyond_slab(self, slab: dict, experience: float) -> bool:
-		return bool(slab.from_year < experience and (slab.to_year < experience and slab.to_year != 0))
 
+def get_work_experience_in_years(rule: dict, total_working_days: float, precision: int) -> float:
+	work_experience = total_working_days / (rule.total_working_days_per_year or 1)
 
-def get_last_salary_slip(employee: str) -> dict | None:
-	salary_slip = frappe.db.get_value(
-		"Salary Slip", {"employee": employee, "docstatus": 1}, order_by="start_date desc"
+	if rule.method == "Round off Work Experience":
+		return round(work_experience)
+	return flt(work_experience, precision)
+
+
+def calculate_gratuity_amount(rule: dict, experience: float, total_component_amount: float) -> float | None:
+	"""Evaluates the slabs of a gratuity rule for the work experience. Returns None if no slab applies."""
+	gratuity_amount = 0
+	slab_found = False
+	years_left = experience
+
+	for slab in rule.slabs:
+		if rule.calculate_gratuity_amount_based_on == "Current Slab":
+			if is_experience_within_slab(slab, experience):
+				gratuity_amount = total_component_amount * experience * slab.fraction_of_applicable_earnings
+				if slab.fraction_of_applicable_earnings:
+					slab_found = True
+
+			if slab_found:
+				break
+
+		elif rule.calculate_gratuity_amount_based_on == "Sum of all previous slabs":
+			# no slabs, fraction applicable for all years
+			if slab.to_year == 0 and slab.from_year == 0:
+				gratuity_amount += years_left * total_component_amount * slab.fraction_of_applicable_earnings
+				slab_found = True
+				break
+
+			# completed more years than the current slab, so consider fraction for current slab too
+			if is_experience_beyond_slab(slab, experience):
+				gratuity_amount += (
+					(slab.to_year - slab.from_year)
+					* total_component_amount
+					* slab.fraction_of_applicable_earnings
+				)
+				years_left -= slab.to_year - slab.from_year
+				slab_found = True
+
+			elif is_experience_within_slab(slab, experience):
+				gratuity_amount += years_left * total_component_amount * slab.fraction_of_applicable_earnings
+				slab_found = True
+				break
+
+	return gratuity_amount if slab_found else None
+
+
+def is_experience_within_slab(slab: dict, experience: float) -> bool:
+	return bool(slab.from_year <= experience and (experience <= slab.to_year or slab.to_year == 0))
+
+
+def is_experience_beyond_slab(slab: dict, experience: float) -> bool:
+	return bool(slab.from_year < experience and (slab.to_year < experience and slab.to_year != 0))
+
+
+def get_non_working_days(employees: list[str], till_date) -> dict[str, int]:
+	"""Returns the leave without pay or absent days of employees, as per the payroll settings, till their
+	relieving date or `till_date`, whichever is earlier"""
+	payroll_based_on = frappe.db.get_single_value("Payroll Settings", "payroll_based_on") or "Leave"
+	if payroll_based_on not in ("Leave", "Attendance"):
+		return {}
+
+	Attendance = frappe.qb.DocType("Attendance")
+	Employee = frappe.qb.DocType("Employee")
+	query = (
+		frappe.qb.from_(Attendance)
+		.join(Employee)
+		.on(Attendance.employee == Employee.name)
+		.select(Attendance.employee, Count("*"))
+		.where(
+			(Attendance.docstatus == 1)
+			& (Attendance.employee.isin(employees))
+			& (Attendance.attendance_date <= getdate(till_date))
+			& (Employee.relieving_date.isnull() | (Attendance.attendance_date <= Employee.relieving_date))
+		)
+		.groupby(Attendance.employee)
 	)
-	if salary_slip:
-		return frappe.get_doc("Salary Slip", salary_slip)
+
+	if payroll_based_on == "Leave":
+		lwp_leave_types = frappe.get_all("Leave Type", filters={"is_lwp": 1}, pluck="name")
+		if not lwp_leave_types:
+			return {}
+		query = query.where((Attendance.status == "On Leave") & (Attendance.leave_type.isin(lwp_leave_types)))
+	else:
+		query = query.where(Attendance.status == "Absent")
+
+	return dict(query.run())
+
+
+@frappe.whitelist()
+def get_gratuity_liability(
+	company: str,
+	gratuity_rule: str,
+	as_on_date: str | None = None,
+	employees: list[str] | str | None = None,
+	persist: bool = False,
+) -> list[dict]:
+	"""Computes the gratuity of active employees, or of the given employees, as on a date without going
+	through Gratuity documents. With `persist`, draft Gratuity documents are also created for employees
+	relieved by then that do not have one yet."""
+	frappe.has_permission("Gratuity", "create" if cint(persist) else "read", throw=True)
+
+	as_on_date = getdate(as_on_date)
+	if isinstance(employees, str):
+		employees = frappe.parse_json(employees)
+
+	rule = get_gratuity_rule_details(gratuity_rule)
+	if not rule:
+		frappe.throw(_("Gratuity Rule {0} not found").format(bold(gratuity_rule)))
+
+	liability = []
+	for batch in create_batch(get_liability_employees(company, as_on_date, employees), LIABILITY_BATCH_SIZE):
+		liability += compute_gratuity_liability(list(batch), rule, as_on_date)
+
+	if cint(persist):
+		create_draft_gratuities(liability, company, gratuity_rule, as_on_date)
+
+	return liability
+
+
+def get_liability_employees(company: str, as_on_date, employees: list[str] | None = None) -> list[dict]:
+	filters = {"company": company, "date_of_joining": ("<=", as_on_date)}
+	if employees:
+		filters["name"] = ("in", employees)
+	else:
+		filters["status"] = "Active"
+
+	return frappe.get_all(
+		"Employee",
+		filters=filters,
+		fields=["name", "employee_name", "department", "designation", "date_of_joining", "relieving_date"],
+		order_by="name",
+	)
+
+
+def compute_gratuity_liability(employees: list[dict], rule: dict, as_on_date) -> list[dict]:
+	"""Computes the gratuity of a batch of employees from their last salary slips and non-working days,
+	fetched together. Employees not eligible for gratuity get a zero amount with the reason in remarks."""
+	names = [d.name for d in employees]
+	non_working_days = get_non_working_days(names, as_on_date)
+	salary_slips = get_last_salary_slips(names)
+	component_amounts = get_applicable_component_amounts(
+		list(salary_slips.values()), rule.applicable_components
+	)
+	experience_precision = frappe.get_precision("Gratuity", "current_work_experience")
+	amount_precision = frappe.get_precision("Gratuity", "amount")
+
+	liability = []
+	for employee in employees:
+		service_end_date = as_on_date
+		if employee.relieving_date and getdate(employee.relieving_date) < as_on_date:
+			service_end_date = getdate(employee.relieving_date)
+
+		row = frappe._dict(
+			employee=employee.name,
+			employee_name=employee.employee_name,
+			department=employee.department,
+			designation=employee.designation,
+			date_of_joining=employee.date_of_joining,
+			relieving_date=employee.relieving_date,
+			working_days=(service_end_date - getdate(employee.date_of_joining)).days
+			- non_working_days.get(employee.name, 0),
+			work_experience=0,
+			salary_slip=salary_slips.get(employee.name),
+			component_amount=0,
+			amount=0,
+			remarks=None,
+		)
+		liability.append(row)
+
+		if rule.method == "Manual":
+			row.remarks = _("Work experience is entered manually for this Gratuity Rule")
+			continue
+
+		row.work_experience = get_work_experience_in_years(rule, row.working_days, experience_precision)
+		if row.work_experience < rule.minimum_year_for_gratuity:
+			row.remarks = _("Minimum {0} years for gratuity not completed").format(
+				rule.minimum_year_for_gratuity
+			)
+		elif not row.salary_slip:
+			row.remarks = _("No Salary Slip found")
+		elif row.salary_slip not in component_amounts:
+			row.remarks = _("No applicable Earning component found in last salary slip")
+		else:
+			row.component_amount = component_amounts[row.salary_slip]
+			amount = calculate_gratuity_amount(rule, row.work_experience, row.component_amount)
+			if amount is None:
+				row.remarks = _("No applicable slab found")
+			else:
+				row.amount = flt(amount, amount_precision)
+
+	return liability
+
+
+def get_last_salary_slips(employees: list[str]) -> dict[str, str]:
+	"""Returns the latest submitted salary slip of each employee"""
+	SalarySlip = frappe.qb.DocType("Salary Slip")
+	latest = (
+		frappe.qb.from_(SalarySlip)
+		.select(SalarySlip.employee, Max(SalarySlip.start_date).as_("start_date"))
+		.where((SalarySlip.docstatus == 1) & (SalarySlip.employee.isin(employees)))
+		.groupby(SalarySlip.employee)
+	)
+	return dict(
+		frappe.qb.from_(SalarySlip)
+		.join(latest)
+		.on((SalarySlip.employee == latest.employee) & (SalarySlip.start_date == latest.start_date))
+		.select(SalarySlip.employee, SalarySlip.name)
+		.where(SalarySlip.docstatus == 1)
+		.orderby(SalarySlip.name)
+		.run()
+	)
+
+
+def get_applicable_component_amounts(salary_slips: list[str], components: list[str]) -> dict[str, float]:
+	"""Returns the total of the applicable earnings of each salary slip, at full payment days like
+	`Gratuity.get_total_component_amount`"""
+	if not salary_slips or not components:
+		return {}
+
+	earnings = frappe.get_all(
+		"Salary Detail",
+		filters={
+			"parenttype": "Salary Slip",
+			"parentfield": "earnings",
+			"parent": ("in", salary_slips),
+			"salary_component": ("in", components),
+		},
+		fields=[
+			"parent",
+			"salary_component",
+			"amount",
+			"default_amount",
+			"additional_salary",
+			"depends_on_payment_days",
+		],
+	)
+
+	amounts = {}
+	for row in earnings:
+		amount = flt(row.amount)
+		# the default amount of a structure component is its amount before proration by payment days
+		if cint(row.depends_on_payment_days) and row.default_amount and not row.additional_salary:
+			amount = flt(row.default_amount)
+			if frappe.db.get_value(
+				"Salary Component", row.salary_component, "round_to_the_nearest_integer", cache=True
+			):
+				amount = rounded(amount)
+
+		amounts[row.parent] = amounts.get(row.parent, 0) + amount
+
+	return amounts
+
+
+def create_draft_gratuities(liability: list[dict], company: str, gratuity_rule: str, as_on_date) -> None:
+	"""Creates draft Gratuity documents from the computed liability of employees relieved by `as_on_date`.
+	Accounts and the mode of payment are left to be set before submission."""
+	relieved = [
+		row
+		for row in liability
+		if row.amount and row.relieving_date and getdate(row.relieving_date) <= as_on_date
+	]
+	if not relieved:
+		return
+
+	existing = set(
+		frappe.get_all(
+			"Gratuity",
+			filters={"employee": ("in", [row.employee for row in relieved]), "docstatus": ("!=", 2)},
+			pluck="employee",
+		)
+	)
+
+	docs = []
+	for row in relieved:
+		if row.employee in existing:
+			continue
+
+		gratuity = frappe.new_doc(
+			"Gratuity",
+			employee=row.employee,
+			employee_name=row.employee_name,
+			department=row.department,
+			designation=row.designation,
+			company=company,
+			posting_date=as_on_date,
+			gratuity_rule=gratuity_rule,
+			current_work_experience=row.work_experience,
+			amount=row.amount,
+			pay_via_salary_slip=0,
+			status="Draft",
+		)
+		gratuity.set_new_name()
+		row.gratuity = gratuity.name
+		docs.append(gratuity)
+
+	bulk_insert_documents(docs)
@@ -10,7 +10,7 @@ from erpnext.setup.doctype.holiday_list.test_holiday_list import set_holiday_lis
 
 from hrms.hr.doctype.attendance.attendance import mark_attendance
 from hrms.hr.doctype.expense_claim.test_expense_claim import get_payable_account
-from hrms.payroll.doctype.gratuity.gratuity import get_last_salary_slip
+from hrms.payroll.doctype.gratuity.gratuity import get_gratuity_liability, get_last_salary_slip
 from hrms.payroll.doctype.salary_slip.test_salary_slip import (
 	make_deduction_salary_component,
 	make_earning_salary_component,
@@ -243,6 +243,35 @@ class TestGratuity(IntegrationTestCase):
 		gratuity.reload()
 		self.assertEqual(gratuity.status, "Unpaid")
 
+	@set_holiday_list("Salary Slip Test Holiday List", "_Test Company")
+	def test_gratuity_liability(self):
+		create_salary_slip(self.employee)
+		rule = setup_gratuity_rule("Rule Under Limited Contract (UAE)")
+		set_mode_of_payment_account()
+
+		gratuity = create_gratuity(
+			expense_account="Payment Account - _TC", mode_of_payment="Cash", employee=self.employee
+		)
+		liability = get_gratuity_liability(
+			"_Test Company", rule.name, as_on_date=self.relieving_date, employees=[self.employee]
+		)
+		self.assertEqual(len(liability), 1)
+		self.assertEqual(liability[0].work_experience, gratuity.current_work_experience)
+		self.assertEqual(liability[0].amount, gratuity.amount)
+
+		# employees relieved by the date get a draft gratuity with the computed amount
+		frappe.db.delete("Gratuity", gratuity.name)
+		liability = get_gratuity_liability(
+			"_Test Company",
+			rule.name,
+			as_on_date=self.relieving_date,
+			employees=[self.employee],
+			persist=True,
+		)
+		draft = frappe.get_doc("Gratuity", liability[0].gratuity)
+		self.assertEqual(draft.docstatus, 0)
+		self.assertEqual(draft.amount, gratuity.amount)
+
 
 def setup_gratuity_rule(name: str) -> dict:
 	from hrms.regional.united_arab_emirates.setup import setup
@@ -8,6 +8,12 @@ from frappe.model.document import Document
 
 
 class GratuityRule(Document):
+	def clear_cache(self):
+		from hrms.payroll.doctype.gratuity.gratuity import GRATUITY_RULES
+
+		frappe.cache().hdel(GRATUITY_RULES, self.name)
+		return super().clear_cache()
+
 	def validate(self):
 		for current_slab in self.gratuity_rule_slabs:
 			if (current_slab.from_year > current_slab.to_year) and current_slab.to_year != 0:
@@ -1215,6 +1215,7 @@ class PayrollEntry(Document):
 	def create_overtime_slips(self):
 		from hrms.hr.doctype.overtime_slip.overtime_slip import (
 			create_overtime_slips_for_employees,
+			enqueue_overtime_run,
 			filter_employees_for_overtime_slip_creation,
 		)
 
@@ -1234,12 +1235,7 @@ class PayrollEntry(Document):
 			)
 			if len(employees) > 30 or frappe.flags.enqueue_payroll_entry:
 				self.db_set("status", "Queued")
-				frappe.enqueue(
-					create_overtime_slips_for_employees,
-					timeout=3000,
-					employees=employees,
-					args=args,
-				)
+				enqueue_overtime_run(create_overtime_slips_for_employees, "employees", employees, args=args)
 				frappe.msgprint(
 					_("Overtime Slip creation is queued. It may take a few minutes"),
 					alert=True,
@@ -1251,6 +1247,7 @@ class PayrollEntry(Document):
 	@frappe.whitelist()
 	def submit_overtime_slips(self):
 		from hrms.hr.doctype.overtime_slip.overtime_slip import (
+			enqueue_overtime_run,
 			submit_overtime_slips_for_employees,
 		)
 
@@ -1258,10 +1255,10 @@ class PayrollEntry(Document):
 		if overtime_slips:
 			if len(overtime_slips) > 30 or frappe.flags.enqueue_payroll_entry:
 				self.db_set("status", "Queued")
-				frappe.enqueue(
+				enqueue_overtime_run(
 					submit_overtime_slips_for_employees,
-					timeout=3000,
-					overtime_slips=overtime_slips,
+					"overtime_slips",
+					overtime_slips,
 					payroll_entry=self.name,
 				)
 				frappe.msgprint(
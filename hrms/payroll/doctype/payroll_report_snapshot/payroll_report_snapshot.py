@@ -0,0 +1,262 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and contributors
+# For license information, please see license.txt
+
+import base64
+import functools
+import hashlib
+import json
+
+import frappe
+from frappe.model.document import Document
+from frappe.query_builder import Interval
+from frappe.query_builder.functions import Now
+from frappe.utils import (
+	cint,
+	get_first_day,
+	get_last_day,
+	get_year_ending,
+	get_year_start,
+	getdate,
+	gzip_compress,
+	gzip_decompress,
+	now,
+)
+
+
+class PayrollReportSnapshot(Document):
+	"""Compressed result of a payroll report for one set of filters. Snapshots are marked stale when a
+	salary slip of their company and period changes and are rebuilt in the background."""
+
+	def get_result(self):
+		return load_result(self.data)
+
+	@staticmethod
+	def clear_old_logs(days=30):
+		table = frappe.qb.DocType("Payroll Report Snapshot")
+		frappe.db.delete(table, filters=(table.generated_on < (Now() - Interval(days=days))))
+
+
+def report_snapshot(report_name: str):
+	"""Serves the decorated report `execute` from an up to date snapshot for the same filters, else
+	runs the report and queues a background job to store its result as the snapshot. Report requests
+	are read only, so snapshots are never written by them."""
+
+	def decorator(execute):
+		@functools.wraps(execute)
+		def wrapper(filters=None):
+			if frappe.flags.building_report_snapshot or not is_enabled():
+				return execute(filters)
+
+			filters = frappe._dict(filters or {})
+			key = get_snapshot_key(report_name, filters)
+			snapshot = frappe.db.get_value(
+				"Payroll Report Snapshot", key, ["status", "revision", "data"], as_dict=True
+			)
+			if snapshot and snapshot.status == "Completed":
+				return load_result(snapshot.data)
+
+			run_at = now()
+			result = execute(filters)
+			# stale snapshots are already queued for a refresh by `invalidate_snapshots`
+			if not snapshot:
+				frappe.enqueue(
+					store_snapshot,
+					queue="short",
+					job_id=f"store_payroll_report_snapshot::{key}",
+					deduplicate=True,
+					report_name=report_name,
+					key=key,
+					filters=filters,
+					data=dump_result(result),
+					row_count=get_row_count(result),
+					run_at=run_at,
+					language=frappe.local.lang,
+				)
+
+			return result
+
+		return wrapper
+
+	return decorator
+
+
+def load_result(data: str):
+	return json.loads(gzip_decompress(base64.b64decode(data)))
+
+
+def dump_result(result) -> str:
+	return base64.b64encode(gzip_compress(frappe.as_json(result, indent=None).encode())).decode()
+
+
+def is_enabled() -> bool:
+	return cint(frappe.db.get_single_value("Payroll Settings", "enable_report_snapshots"))
+
+
+def get_snapshot_key(report_name: str, filters: dict) -> str:
+	# column labels are translated, so snapshots are kept per language
+	filters_json = json.dumps(filters, sort_keys=True, default=str)
+	return hashlib.sha256(f"{report_name}|{frappe.local.lang}|{filters_json}".encode()).hexdigest()[:40]
+
+
+def get_snapshot_period(filters: dict) -> tuple:
+	"""Returns the posting period covered by the filters, `None` on a side that is unbounded"""
+	if filters.get("from_date") or filters.get("to_date"):
+		return filters.get("from_date"), filters.get("to_date")
+
+	if not filters.get("year"):
+		return None, None
+
+	if filters.get("month"):
+		month_start = getdate(f"{cint(filters.year)}-{cint(filters.month):02d}-01")
+		return get_first_day(month_start), get_last_day(month_start)
+
+	year_start = getdate(f"{cint(filters.year)}-01-01")
+	return get_year_start(year_start), get_year_ending(year_start)
+
+
+def get_row_count(result) -> int:
+	return len(result[1]) if len(result) > 1 and result[1] else 0
+
+
+def save_snapshot(
+	report_name: str,
+	key: str,
+	filters: dict,
+	data: str,
+	row_count: int,
+	revision: int,
+	language: str | None = None,
+) -> None:
+	"""Stores the compressed result unless a salary slip of the period changed since `revision` was
+	read"""
+	from_date, to_date = get_snapshot_period(filters)
+
+	if not frappe.db.exists("Payroll Report Snapshot", key):
+		doc = frappe.new_doc("Payroll Report Snapshot")
+		doc.update(
+			name=key,
+			report_name=report_name,
+			language=language or frappe.local.lang,
+			company=filters.get("company"),
+			from_date=from_date,
+			to_date=to_date,
+			filters=json.dumps(filters, sort_keys=True, default=str),
+			status="Completed",
+			revision=revision,
+			generated_on=now(),
+			row_count=row_count,
+			data=data,
+		)
+		try:
+			doc.db_insert()
+		except frappe.DuplicateEntryError:
+			# stored by a concurrent run of the same report
+			pass
+		return
+
+	Snapshot = frappe.qb.DocType("Payroll Report Snapshot")
+	(
+		frappe.qb.update(Snapshot)
+		.set(Snapshot.status, "Completed")
+		.set(Snapshot.generated_on, now())
+		.set(Snapshot.row_count, row_count)
+		.set(Snapshot.data, data)
+		.where((Snapshot.name == key) & (Snapshot.revision == revision))
+	).run()
+
+
+def invalidate_snapshots(company: str, from_date, to_date) -> None:
+	"""Marks snapshots overlapping the period as stale and queues their refresh"""
+	if not frappe.db.count("Payroll Report Snapshot"):
+		return
+
+	Snapshot = frappe.qb.DocType("Payroll Report Snapshot")
+	(
+		frappe.qb.update(Snapshot)
+		.set(Snapshot.status, "Stale")
+		.set(Snapshot.revision, Snapshot.revision + 1)
+		.where(
+			(Snapshot.company.isnull() | (Snapshot.company == "") | (Snapshot.company == company))
+			& (Snapshot.from_date.isnull() | (Snapshot.from_date <= to_date))
+			& (Snapshot.to_date.isnull() | (Snapshot.to_date >= from_date))
+		)
+	).run()
+
+	if not frappe.flags.report_snapshot_refresh_queued:
+		frappe.flags.report_snapshot_refresh_queued = True
+		frappe.enqueue(
+			refresh_stale_snapshots,
+			queue="long",
+			timeout=3000,
+			job_id="refresh_payroll_report_snapshots",
+			deduplicate=True,
+			enqueue_after_commit=True,
+		)
+
+
+def invalidate_salary_slip_snapshots(doc) -> None:
+	dates = [getdate(d) for d in (doc.start_date, doc.end_date, doc.posting_date) if d]
+	if dates and is_enabled():
+		invalidate_snapshots(doc.company, min(dates), max(dates))
+
+
+def store_snapshot(
+	report_name: str,
+	key: str,
+	filters: dict,
+	data: str,
+	row_count: int,
+	run_at: str,
+	language: str | None = None,
+) -> None:
+	"""Stores the result of a report run that had no snapshot for its filters, unless salary slips
+	changed after the run. The next run of the report queues it again then."""
+	if frappe.db.exists("Payroll Report Snapshot", key):
+		return
+
+	filters = frappe._dict(filters)
+	slip_filters = {"modified": (">=", run_at)}
+	if filters.get("company"):
+		slip_filters["company"] = filters.company
+	if frappe.db.exists("Salary Slip", slip_filters):
+		return
+
+	save_snapshot(report_name, key, filters, data, row_count, 0, language)
+
+
+def refresh_stale_snapshots() -> None:
+	"""Re-runs the reports of stale snapshots, one snapshot per commit"""
+	for snapshot in frappe.get_all(
+		"Payroll Report Snapshot",
+		filters={"status": "Stale"},
+		fields=["name", "report_name", "language", "filters", "revision"],
+		order_by="generated_on desc",
+	):
+		filters = frappe._dict(json.loads(snapshot.filters or "{}"))
+		result = run_report_for_snapshot(snapshot.report_name, filters, snapshot.language)
+		save_snapshot(
+			snapshot.report_name,
+			snapshot.name,
+			filters,
+			dump_result(result),
+			get_row_count(result),
+			snapshot.revision,
+		)
+		frappe.db.commit()
+
+
+def run_report_for_snapshot(report_name: str, filters: dict, language: str | None = None):
+	from frappe.desk.query_report import get_report_doc
+
+	lang = frappe.local.lang
+	frappe.local.lang = language or lang
+	frappe.flags.building_report_snapshot = True
+	try:
+		return get_report_doc(report_name).execute_script_report(filters)
+	finally:
+		frappe.local.lang = lang
+		frappe.flags.building_report_snapshot = False
+
+
+def on_doctype_update():
+	frappe.db.add_index("Payroll Report Snapshot", ["company", "from_date", "to_date"])
@@ -0,0 +1,109 @@
+# Copyright (c) 2026, Frappe Technologies Pvt. Ltd. and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import add_days, getdate, now_datetime
+
+from erpnext.setup.doctype.employee.test_employee import make_employee
+
+from hrms.payroll.doctype.employee_tax_exemption_declaration.test_employee_tax_exemption_declaration import (
+	create_payroll_period,
+)
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import (
+	PayrollReportSnapshot,
+	dump_result,
+	get_snapshot_key,
+	get_snapshot_period,
+	refresh_stale_snapshots,
+)
+from hrms.payroll.doctype.salary_slip.test_salary_slip import create_salary_slips_for_payroll_period
+from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+from hrms.payroll.report.income_tax_deductions.income_tax_deductions import execute
+
+
+class TestPayrollReportSnapshot(IntegrationTestCase):
+	def setUp(self):
+		frappe.db.delete("Payroll Period")
+		frappe.db.delete("Salary Slip")
+		frappe.db.delete("Payroll Report Snapshot")
+		frappe.db.set_single_value("Payroll Settings", "enable_report_snapshots", 1)
+		frappe.db.set_single_value("Payroll Settings", "consider_unmarked_attendance_as", "Present")
+
+		self.employee = make_employee(
+			"test_report_snapshot@example.com",
+			company="_Test Company",
+			date_of_joining=getdate("01-10-2021"),
+		)
+		payroll_period = create_payroll_period(name="_Test Payroll Period 1", company="_Test Company")
+		salary_structure = make_salary_structure(
+			"Monthly Salary Structure Test Report Snapshot",
+			"Monthly",
+			employee=self.employee,
+			company="_Test Company",
+			currency="INR",
+			payroll_period=payroll_period,
+			test_tax=True,
+		)
+		create_salary_slips_for_payroll_period(self.employee, salary_structure.name, payroll_period, num=1)
+		self.filters = frappe._dict({"company": "_Test Company"})
+
+	def make_snapshot(self):
+		"""Runs the report and stores its result like the job queued by the report request"""
+		with patch(
+			"hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot.frappe.enqueue"
+		) as enqueue:
+			result = execute(self.filters)
+
+		store_snapshot, kwargs = enqueue.call_args.args[0], enqueue.call_args.kwargs
+		store_snapshot(**{k: v for k, v in kwargs.items() if k not in ("queue", "job_id", "deduplicate")})
+		return result
+
+	def test_report_served_from_snapshot(self):
+		key = get_snapshot_key("Income Tax Deductions", self.filters)
+		columns, data = self.make_snapshot()
+		snapshot = frappe.get_doc("Payroll Report Snapshot", key)
+		self.assertEqual(snapshot.status, "Completed")
+		self.assertEqual(snapshot.row_count, len(data))
+		self.assertEqual(len(snapshot.get_result()[1]), len(data))
+
+		# a completed snapshot is served without running the report
+		frappe.db.set_value("Payroll Report Snapshot", key, "data", dump_result([columns, []]))
+		self.assertEqual(execute(self.filters)[1], [])
+
+	def test_snapshot_refresh_on_slip_cancellation(self):
+		key = get_snapshot_key("Income Tax Deductions", self.filters)
+		self.make_snapshot()
+
+		slip = frappe.get_last_doc("Salary Slip", {"employee": self.employee})
+		slip.cancel()
+		self.assertEqual(frappe.db.get_value("Payroll Report Snapshot", key, "status"), "Stale")
+
+		refresh_stale_snapshots()
+		snapshot = frappe.get_doc("Payroll Report Snapshot", key)
+		self.assertEqual(snapshot.status, "Completed")
+		self.assertEqual(snapshot.get_result()[1], [])
+
+	def test_old_snapshots_cleared(self):
+		key = get_snapshot_key("Income Tax Deductions", self.filters)
+		self.make_snapshot()
+
+		PayrollReportSnapshot.clear_old_logs(days=30)
+		self.assertTrue(frappe.db.exists("Payroll Report Snapshot", key))
+
+		frappe.db.set_value("Payroll Report Snapshot", key, "generated_on", add_days(now_datetime(), -31))
+		PayrollReportSnapshot.clear_old_logs(days=30)
+		self.assertFalse(frappe.db.exists("Payroll Report Snapshot", key))
+
+	def test_snapshot_period(self):
+		self.assertEqual(
+			get_snapshot_period(frappe._dict(year=2024, month=2)),
+			(getdate("2024-02-01"), getdate("2024-02-29")),
+		)
+		self.assertEqual(
+			get_snapshot_period(frappe._dict(from_date="2024-01-01", to_date="2024-03-31")),
+			("2024-01-01", "2024-03-31"),
+		)
+		self.assertEqual(get_snapshot_period(frappe._dict(month=2)), (None, None))
@@ -44,6 +44,9 @@ from hrms.payroll.doctype.payroll_period.payroll_period import (
 	get_payroll_period,
 	get_period_factor,
 )
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import (
+	invalidate_salary_slip_snapshots,
+)
 from hrms.payroll.doctype.salary_slip.salary_slip_loan_utils import (
 	cancel_loan_repayment_entry,
 	make_loan_repayment_entry,
@@ -209,6 +212,7 @@ class SalarySlip(TransactionBase):
 			frappe.throw(_("Net Pay cannot be less than 0"))
 		else:
 			self.set_status()
+			invalidate_salary_slip_snapshots(self)
 			self.update_status(self.name)
 
 			make_loan_repayment_entry(self)
@@ -259,6 +263,7 @@ class SalarySlip(TransactionBase):
 
 	def on_cancel(self):
 		self.set_status()
+		invalidate_salary_slip_snapshots(self)
 		self.update_status()
 		self.update_payment_status_for_gratuity_and_leave_encashment()
 		delete_employee_benefit_ledger_entry("salary_slip", self.name)
@@ -282,6 +287,8 @@ class SalarySlip(TransactionBase):
 			revert_series_if_last(self.default_series, self.name)
 
 		delete_employee_benefit_ledger_entry("salary_slip", self.name)
+		if self.docstatus == 1:
+			invalidate_salary_slip_snapshots(self)
 
 	def get_status(self):
 		if self.docstatus == 2:
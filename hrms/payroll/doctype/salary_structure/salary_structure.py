@@ -192,28 +192,15 @@ class SalaryStructure(Document):
 		)
 
 		if employees:
-			if len(employees) > 20:
-				frappe.enqueue(
-					assign_salary_structure_for_employees,
-					timeout=3000,
-					employees=employees,
-					salary_structure=self,
-					payroll_payable_account=payroll_payable_account,
-					from_date=from_date,
-					base=base,
-					variable=variable,
-					income_tax_slab=income_tax_slab,
-				)
-			else:
-				assign_salary_structure_for_employees(
-					employees,
-					self,
-					payroll_payable_account=payroll_payable_account,
-					from_date=from_date,
-					base=base,
-					variable=variable,
-					income_tax_slab=income_tax_slab,
-				)
+			assign_salary_structure_for_employees(
+				employees,
+				self,
+				payroll_payable_account=payroll_payable_account,
+				from_date=from_date,
+				base=base,
+				variable=variable,
+				income_tax_slab=income_tax_slab,
+			)
 		else:
 			frappe.msgprint(_("No Employee Found"))
 
@@ -227,43 +214,32 @@ def assign_salary_structure_for_employees(
 	variable=None,
 	income_tax_slab=None,
 ):
-	assignments = []
+	from hrms.payroll.doctype.salary_structure_assignment.salary_structure_assignment import (
+		create_salary_structure_assignments,
+		enqueue_salary_structure_assignments,
+		get_bulk_assignment_args,
+	)
+
 	existing_assignments_for = get_existing_assignments(employees, salary_structure, from_date)
-	count = 0
-	savepoint = "before_assignment_submission"
-
-	for employee in employees:
-		try:
-			frappe.db.savepoint(savepoint)
-			if employee in existing_assignments_for:
-				continue
-
-			count += 1
-
-			assignment = create_salary_structure_assignment(
-				employee,
-				salary_structure.name,
-				salary_structure.company,
-				salary_structure.currency,
-				from_date,
-				payroll_payable_account,
-				base,
-				variable,
-				income_tax_slab,
-			)
-			assignments.append(assignment)
-			frappe.publish_progress(
-				count * 100 / len(set(employees) - set(existing_assignments_for)),
-				title=_("Assigning Structures..."),
-			)
-		except Exception:
-			frappe.db.rollback(save_point=savepoint)
-			frappe.log_error(
-				f"Salary Structure Assignment failed for employee {employee}",
-				reference_doctype="Salary Structure Assignment",
-			)
+	employees = [
+		{"employee": employee, "base": base, "variable": variable}
+		for employee in employees
+		if employee not in existing_assignments_for
+	]
+	if not employees:
+		return
 
-	if assignments:
+	args = get_bulk_assignment_args(
+		salary_structure.name, from_date, payroll_payable_account, income_tax_slab
+	)
+	if len(employees) > 20:
+		enqueue_salary_structure_assignments(employees, args)
+		frappe.msgprint(
+			_("Assignment of Structures has been queued. It may take a few minutes."),
+			alert=True,
+			indicator="blue",
+		)
+	elif create_salary_structure_assignments(employees, args):
 		frappe.msgprint(_("Structures have been assigned successfully"))
 
 
@@ -279,7 +255,24 @@ def create_salary_structure_assignment(
 	income_tax_slab=None,
 ):
 	assignment = frappe.new_doc("Salary Structure Assignment")
+	payroll_payable_account = get_payroll_payable_account(company, currency, payroll_payable_account)
 
+	assignment.employee = employee
+	assignment.salary_structure = salary_structure
+	assignment.company = company
+	assignment.currency = currency
+	assignment.payroll_payable_account = payroll_payable_account
+	assignment.from_date = from_date
+	assignment.base = base
+	assignment.variable = variable
+	assignment.income_tax_slab = income_tax_slab
+	assignment.save(ignore_permissions=True)
+	assignment.submit()
+
+	return assignment.name
+
+
+def get_payroll_payable_account(company, currency, payroll_payable_account=None):
 	if not payroll_payable_account:
 		payroll_payable_account = frappe.db.get_value("Company", company, "default_payroll_payable_account")
 		if not payroll_payable_account:
@@ -296,19 +289,7 @@ def create_salary_structure_assignment(
 			)
 		)
 
-	assignment.employee = employee
-	assignment.salary_structure = salary_structure
-	assignment.company = company
-	assignment.currency = currency
-	assignment.payroll_payable_account = payroll_payable_account
-	assignment.from_date = from_date
-	assignment.base = base
-	assignment.variable = variable
-	assignment.income_tax_slab = income_tax_slab
-	assignment.save(ignore_permissions=True)
-	assignment.submit()
-
-	return assignment.name
+	return payroll_payable_account
 
 
 def get_existing_assignments(employees, salary_structure, from_date):
@@ -5,10 +5,18 @@
 import frappe
 from frappe import _
 from frappe.model.document import Document
-from frappe.utils import cint, flt, get_link_to_form, getdate
+from frappe.utils import cint, create_batch, flt, get_link_to_form, getdate
 
 from hrms.payroll.doctype.payroll_period.payroll_period import get_payroll_period
-from hrms.payroll.doctype.salary_structure.salary_structure import validate_max_benefit_for_flexible_benefit
+from hrms.payroll.doctype.salary_structure.salary_structure import (
+	get_payroll_payable_account,
+	validate_max_benefit_for_flexible_benefit,
+)
+from hrms.utils import bulk_insert_documents
+
+# employees assigned per background job in a bulk assignment run
+BULK_ASSIGNMENT_SHARD_SIZE = 500
+BULK_ASSIGNMENT_RUN = "bulk_salary_structure_assignment_run"
 
 
 class DuplicateAssignment(frappe.ValidationError):
@@ -73,28 +81,7 @@ class SalaryStructureAssignment(Document):
 			)
 
 	def validate_income_tax_slab(self):
-		tax_component = get_tax_component(self.salary_structure)
-		if tax_component and not self.income_tax_slab:
-			frappe.throw(
-				_(
-					"Income Tax Slab is mandatory since the Salary Structure {0} has a tax component {1}"
-				).format(
-					get_link_to_form("Salary Structure", self.salary_structure), frappe.bold(tax_component)
-				),
-				exc=frappe.MandatoryError,
-				title=_("Missing Mandatory Field"),
-			)
-
-		if not self.income_tax_slab:
-			return
-
-		income_tax_slab_currency = frappe.db.get_value("Income Tax Slab", self.income_tax_slab, "currency")
-		if self.currency != income_tax_slab_currency:
-			frappe.throw(
-				_("Currency of selected Income Tax Slab should be {0} instead of {1}").format(
-					self.currency, income_tax_slab_currency
-				)
-			)
+		validate_income_tax_slab(self.salary_structure, self.income_tax_slab, self.currency)
 
 	def set_payroll_payable_account(self):
 		if not self.payroll_payable_account:
@@ -169,14 +156,7 @@ class SalaryStructureAssignment(Document):
 
 	@frappe.whitelist()
 	def are_opening_entries_required(self) -> bool:
-		if not get_tax_component(self.salary_structure):
-			return False
-
-		payroll_period = get_payroll_period(self.from_date, self.from_date, self.company)
-		if payroll_period and getdate(self.from_date) <= getdate(payroll_period.start_date):
-			return False
-
-		return True
+		return are_opening_entries_required(self.salary_structure, self.from_date, self.company)
 
 
 def get_assigned_salary_structure(employee, on_date):
@@ -217,3 +197,283 @@ def get_tax_component(salary_structure: str) -> str | None:
 		if cint(d.variable_based_on_taxable_salary) and not d.formula and not flt(d.amount):
 			return d.salary_component
 	return None
+
+
+def validate_income_tax_slab(salary_structure: str, income_tax_slab: str | None, currency: str) -> None:
+	tax_component = get_tax_component(salary_structure)
+	if tax_component and not income_tax_slab:
+		frappe.throw(
+			_("Income Tax Slab is mandatory since the Salary Structure {0} has a tax component {1}").format(
+				get_link_to_form("Salary Structure", salary_structure), frappe.bold(tax_component)
+			),
+			exc=frappe.MandatoryError,
+			title=_("Missing Mandatory Field"),
+		)
+
+	if not income_tax_slab:
+		return
+
+	income_tax_slab_currency = frappe.db.get_value("Income Tax Slab", income_tax_slab, "currency")
+	if currency != income_tax_slab_currency:
+		frappe.throw(
+			_("Currency of selected Income Tax Slab should be {0} instead of {1}").format(
+				currency, income_tax_slab_currency
+			)
+		)
+
+
+def are_opening_entries_required(salary_structure: str, from_date, company: str) -> bool:
+	if not get_tax_component(salary_structure):
+		return False
+
+	payroll_period = get_payroll_period(from_date, from_date, company)
+	if payroll_period and getdate(from_date) <= getdate(payroll_period.start_date):
+		return False
+
+	return True
+
+
+def get_bulk_assignment_args(
+	salary_structure: str,
+	from_date,
+	payroll_payable_account: str | None = None,
+	income_tax_slab: str | None = None,
+) -> frappe._dict:
+	"""Resolves and validates the values shared by all assignments of a bulk run"""
+	structure = frappe.get_cached_doc("Salary Structure", salary_structure)
+	if structure.docstatus != 1:
+		frappe.throw(
+			_("Salary Structure {0} must be submitted before assigning it").format(
+				get_link_to_form("Salary Structure", salary_structure)
+			)
+		)
+
+	args = frappe._dict(
+		salary_structure=structure.name,
+		company=structure.company,
+		currency=structure.currency,
+		max_benefits=structure.max_benefits,
+		from_date=getdate(from_date),
+		payroll_payable_account=get_payroll_payable_account(
+			structure.company, structure.currency, payroll_payable_account
+		),
+		income_tax_slab=income_tax_slab,
+	)
+	validate_income_tax_slab(args.salary_structure, args.income_tax_slab, args.currency)
+
+	# bulk assignments never have opening entries, so warn once for the run instead of per assignment
+	if are_opening_entries_required(args.salary_structure, args.from_date, args.company):
+		frappe.msgprint(
+			_(
+				"Please specify {0} and {1} (if any) in the assignments, for the correct tax calculation in future salary slips."
+			).format(
+				frappe.bold(_("Taxable Earnings Till Date")),
+				frappe.bold(_("Tax Deducted Till Date")),
+			),
+			indicator="orange",
+			title=_("Missing Opening Entries"),
+		)
+
+	return args
+
+
+def enqueue_salary_structure_assignments(employees: list, args: dict, now: bool = False) -> str:
+	"""Splits the employees (dicts with employee, base and variable) into shards that are assigned
+	by separate background jobs, or assigns all of them in this request if `now` is set"""
+	run_id = frappe.generate_hash(length=12)
+	shards = [employees] if now else list(create_batch(employees, BULK_ASSIGNMENT_SHARD_SIZE))
+	frappe.cache().hset(BULK_ASSIGNMENT_RUN, run_id, {"total": len(employees), "processed": 0})
+
+	for shard in shards:
+		frappe.enqueue(
+			create_salary_structure_assignments,
+			queue="long",
+			timeout=3000,
+			now=now,
+			employees=list(shard),
+			args=args,
+			run_id=run_id,
+		)
+
+	return run_id
+
+
+def create_salary_structure_assignments(employees: list, args: dict, run_id: str | None = None) -> list:
+	"""Validates the assignments of a batch of employees together and inserts the valid ones, along
+	with their payroll cost centers, as submitted documents. Returns the assigned employees."""
+	args = frappe._dict(args)
+	employees = [frappe._dict(d) for d in employees]
+	context = get_bulk_assignment_context([d.employee for d in employees], args)
+
+	success, failure, docs = [], [], []
+	for d in employees:
+		try:
+			assignment = build_salary_structure_assignment(d, args, context)
+		except frappe.ValidationError as e:
+			failure.append({"employee": d.employee, "error": str(e)})
+		else:
+			docs.append(assignment)
+			success.append(
+				{
+					"doc": get_link_to_form("Salary Structure Assignment", assignment.name),
+					"employee": d.employee,
+				}
+			)
+
+	frappe.clear_messages()
+
+	if docs:
+		savepoint = "before_bulk_salary_structure_assignment"
+		frappe.db.savepoint(savepoint)
+		try:
+			bulk_insert_documents(docs)
+		except Exception as e:
+			frappe.db.rollback(save_point=savepoint)
+			failure += [{"employee": d["employee"], "error": str(e)} for d in success]
+			success = []
+
+	if failure:
+		frappe.log_error(
+			"Bulk Assignment - Salary Structure Assignment failed for some employees",
+			message="\n".join(f"{d['employee']}: {d['error']}" for d in failure),
+			reference_doctype="Salary Structure Assignment",
+		)
+
+	if run_id:
+		update_bulk_assignment_progress(run_id, len(employees), success, [d["employee"] for d in failure])
+
+	return [d["employee"] for d in success]
+
+
+def get_bulk_assignment_context(employees: list, args: dict) -> frappe._dict:
+	"""Loads the employees, their existing assignments on the from date and their payroll cost centers"""
+	employee_details = frappe.get_all(
+		"Employee",
+		filters={"name": ("in", employees)},
+		fields=[
+			"name",
+			"employee_name",
+			"department",
+			"designation",
+			"grade",
+			"date_of_joining",
+			"relieving_date",
+			"payroll_cost_center",
+		],
+	)
+	department_cost_centers = dict(
+		frappe.get_all(
+			"Department",
+			filters={"name": ("in", {d.department for d in employee_details if d.department})},
+			fields=["name", "payroll_cost_center"],
+			as_list=True,
+		)
+	)
+	cost_centers = {d.payroll_cost_center for d in employee_details if d.payroll_cost_center}
+	cost_centers.update(d for d in department_cost_centers.values() if d)
+
+	return frappe._dict(
+		employees={d.name: d for d in employee_details},
+		existing_assignments=set(
+			frappe.get_all(
+				"Salary Structure Assignment",
+				filters={"employee": ("in", employees), "from_date": args.from_date, "docstatus": 1},
+				pluck="employee",
+			)
+		),
+		department_cost_centers=department_cost_centers,
+		cost_center_companies=dict(
+			frappe.get_all(
+				"Cost Center",
+				filters={"name": ("in", cost_centers)},
+				fields=["name", "company"],
+				as_list=True,
+			)
+		),
+	)
+
+
+def build_salary_structure_assignment(row: dict, args: dict, context: dict):
+	"""In-memory equivalent of `SalaryStructureAssignment.validate` for an assignment of a bulk run"""
+	employee = context.employees.get(row.employee)
+	if not employee:
+		frappe.throw(_("Employee {0} not found").format(row.employee))
+
+	if employee.name in context.existing_assignments:
+		frappe.throw(_("Salary Structure Assignment for Employee already exists"), DuplicateAssignment)
+
+	if employee.date_of_joining and args.from_date < employee.date_of_joining:
+		frappe.throw(
+			_("From Date {0} cannot be before employee's joining Date {1}").format(
+				args.from_date, employee.date_of_joining
+			)
+		)
+
+	if employee.relieving_date and args.from_date > employee.relieving_date:
+		frappe.throw(
+			_("From Date {0} cannot be after employee's relieving Date {1}").format(
+				args.from_date, employee.relieving_date
+			)
+		)
+
+	assignment = frappe.new_doc(
+		"Salary Structure Assignment",
+		employee=employee.name,
+		employee_name=employee.employee_name,
+		department=employee.department,
+		designation=employee.designation,
+		grade=employee.grade,
+		salary_structure=args.salary_structure,
+		company=args.company,
+		currency=args.currency,
+		max_benefits=args.max_benefits,
+		payroll_payable_account=args.payroll_payable_account,
+		income_tax_slab=args.income_tax_slab,
+		from_date=args.from_date,
+		base=row.base,
+		variable=row.variable,
+		docstatus=1,
+	)
+
+	payroll_cost_center = employee.payroll_cost_center or context.department_cost_centers.get(
+		employee.department
+	)
+	if payroll_cost_center:
+		if context.cost_center_companies.get(payroll_cost_center) != args.company:
+			frappe.throw(
+				_("Payroll Cost Center {0} does not belong to Company {1}").format(
+					frappe.bold(payroll_cost_center), frappe.bold(args.company)
+				),
+				title=_("Invalid Cost Center"),
+			)
+		assignment.append("payroll_cost_centers", {"cost_center": payroll_cost_center, "percentage": 100})
+
+	assignment.set_new_name()
+	return assignment
+
+
+def update_bulk_assignment_progress(run_id: str, processed: int, success: list, failure: list) -> None:
+	cache = frappe.cache()
+	# shards finish in any order, so lock the run while merging the results of this shard
+	with cache.lock(f"{BULK_ASSIGNMENT_RUN}::{run_id}", timeout=60):
+		run = cache.hget(BULK_ASSIGNMENT_RUN, run_id) or {}
+		run["processed"] = run.get("processed", 0) + processed
+		for key, value in (("success", success), ("failure", failure)):
+			run[key] = run.get(key, []) + value
+		cache.hset(BULK_ASSIGNMENT_RUN, run_id, run)
+
+	total = run.get("total") or processed
+	frappe.publish_progress(
+		run["processed"] * 100 / total,
+		title=_("Assigning Structure..."),
+		description=_("{0} of {1} employees processed").format(run["processed"], total),
+	)
+
+	if run["processed"] >= total:
+		cache.hdel(BULK_ASSIGNMENT_RUN, run_id)
+		frappe.publish_realtime(
+			"completed_bulk_salary_structure_assignment",
+			message={"success": run["success"], "failure": run["failure"]},
+			user=frappe.session.user,
+			after_commit=True,
+		)
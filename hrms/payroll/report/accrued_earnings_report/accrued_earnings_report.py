@@ -6,7 +6,10 @@ from frappe import _
 from frappe.query_builder import DocType
 from frappe.utils import getdate
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Accrued Earnings Report")
 def execute(filters: dict | None = None):
 	columns = get_columns()
 	data = get_data(filters)
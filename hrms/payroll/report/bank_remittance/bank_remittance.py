@@ -5,7 +5,12 @@
 import frappe
 from frappe import _, get_all
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import report_snapshot
 
+
+@report_profiler("Bank Remittance")
+@report_snapshot("Bank Remittance")
 def execute(filters=None):
 	columns = [
 		{
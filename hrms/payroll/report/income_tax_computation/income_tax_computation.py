@@ -1,15 +1,24 @@
 # Copyright (c) 2022, Frappe Technologies Pvt. Ltd. and contributors
 # For license information, please see license.txt
 
+import re
+
 import frappe
 from frappe import _, scrub
 from frappe.query_builder.functions import Sum
 from frappe.utils import add_days, flt, getdate, rounded
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 from hrms.payroll.doctype.payroll_entry.payroll_entry import get_start_end_dates
 from hrms.payroll.doctype.salary_slip.salary_slip import calculate_tax_by_tax_slab
 
+# formula variables that change from one payroll period to another
+PERIOD_DEPENDENT_VARIABLES = re.compile(
+	r"\b(payment_days|total_working_days|leave_without_pay|absent_days|start_date|end_date|posting_date)\b"
+)
+
 
+@report_profiler("Income Tax Computation")
 def execute(filters=None):
 	return IncomeTaxComputationReport(filters).run()
 
@@ -20,6 +29,7 @@ class IncomeTaxComputationReport:
 		self.columns = []
 		self.data = []
 		self.employees = frappe._dict()
+		self.last_salary_slips = None
 		self.payroll_period_start_date = None
 		self.payroll_period_end_date = None
 		if self.filters.payroll_period:
@@ -92,6 +102,7 @@ class IncomeTaxComputationReport:
 			},
 			fields=[
 				"employee",
+				"from_date",
 				"income_tax_slab",
 				"salary_structure",
 				"taxable_earnings_till_date",
@@ -100,6 +111,11 @@ class IncomeTaxComputationReport:
 			order_by="from_date desc",
 		)
 
+		# a new assignment in the remaining periods changes the structure inputs of the projection
+		self.ss_assignment_dates = frappe._dict()
+		for d in ss_assignments:
+			self.ss_assignment_dates.setdefault(d.employee, []).append(getdate(d.from_date))
+
 		employee_ss_assignments = frappe._dict()
 		for d in ss_assignments:
 			if d.employee not in list(employee_ss_assignments.keys()):
@@ -121,7 +137,12 @@ class IncomeTaxComputationReport:
 		return employee_ss_assignments
 
 	def get_future_salary_slips(self):
+		"""Projects salary slips for the remaining periods of the payroll period. Only the first period
+		of an employee is computed from the salary structure, later periods reuse it unless their
+		structure inputs (assignment, joining/relieving, additional salary, LWP) differ."""
 		self.future_salary_slips = frappe._dict()
+		self.set_projection_inputs()
+
 		for employee in list(self.employees.keys()):
 			last_ss = self.get_last_salary_slip(employee)
 			if last_ss and last_ss.end_date == self.payroll_period_end_date:
@@ -139,40 +160,171 @@ class IncomeTaxComputationReport:
 					}
 				)
 
+			projected_ss = None
 			while getdate(ss_start_date) < getdate(self.payroll_period_end_date) and (
 				not relieving_date or getdate(ss_start_date) < relieving_date
 			):
 				ss_end_date = get_start_end_dates(last_ss.payroll_frequency, ss_start_date).end_date
 
-				ss = frappe.new_doc("Salary Slip")
-				ss.employee = employee
-				ss.start_date = ss_start_date
-				ss.end_date = ss_end_date
-				ss.salary_structure = last_ss.salary_structure
-				ss.payroll_frequency = last_ss.payroll_frequency
-				ss.company = self.filters.company
-				try:
-					ss.process_salary_structure(for_preview=1)
-					self.future_salary_slips.setdefault(employee, []).append(ss.as_dict())
-				except Exception:
-					break
-
+				if projected_ss and self.can_extrapolate(employee, projected_ss, ss_start_date, ss_end_date):
+					ss = frappe._dict(projected_ss, start_date=getdate(ss_start_date), end_date=ss_end_date)
+				else:
+					ss = frappe.new_doc("Salary Slip")
+					ss.employee = employee
+					ss.start_date = ss_start_date
+					ss.end_date = ss_end_date
+					ss.salary_structure = last_ss.salary_structure
+					ss.payroll_frequency = last_ss.payroll_frequency
+					ss.company = self.filters.company
+					try:
+						ss.process_salary_structure(for_preview=1)
+					except Exception:
+						break
+
+					ss = ss.as_dict()
+					projected_ss = ss if self.is_recurring_period(employee, ss) else None
+
+				self.future_salary_slips.setdefault(employee, []).append(ss)
 				ss_start_date = add_days(ss_end_date, 1)
 
+	def set_projection_inputs(self):
+		"""Bulk loads the inputs that make a period's salary differ from the other periods"""
+		employees = list(self.employees.keys())
+		self.additional_salary_periods = frappe._dict()
+		self.lwp_periods = frappe._dict()
+
+		AdditionalSalary = frappe.qb.DocType("Additional Salary")
+		additional_salaries = (
+			frappe.qb.from_(AdditionalSalary)
+			.select(
+				AdditionalSalary.employee,
+				AdditionalSalary.payroll_date,
+				AdditionalSalary.is_recurring,
+				AdditionalSalary.from_date,
+				AdditionalSalary.to_date,
+			)
+			.where(
+				(AdditionalSalary.docstatus == 1)
+				& (AdditionalSalary.disabled == 0)
+				& (AdditionalSalary.employee.isin(employees))
+				& (
+					(
+						(AdditionalSalary.is_recurring == 0)
+						& (
+							AdditionalSalary.payroll_date.between(
+								self.payroll_period_start_date, self.payroll_period_end_date
+							)
+						)
+					)
+					| (
+						(AdditionalSalary.is_recurring == 1)
+						& (AdditionalSalary.from_date <= self.payroll_period_end_date)
+						& (AdditionalSalary.to_date >= self.payroll_period_start_date)
+					)
+				)
+			)
+		).run(as_dict=True)
+
+		for d in additional_salaries:
+			period = (d.from_date, d.to_date) if d.is_recurring else (d.payroll_date, d.payroll_date)
+			self.additional_salary_periods.setdefault(d.employee, []).append(period)
+
+		LeaveApplication = frappe.qb.DocType("Leave Application")
+		LeaveType = frappe.qb.DocType("Leave Type")
+		lwp_applications = (
+			frappe.qb.from_(LeaveApplication)
+			.inner_join(LeaveType)
+			.on(LeaveApplication.leave_type == LeaveType.name)
+			.select(LeaveApplication.employee, LeaveApplication.from_date, LeaveApplication.to_date)
+			.where(
+				(LeaveApplication.docstatus == 1)
+				& (LeaveApplication.status == "Approved")
+				& (LeaveApplication.employee.isin(employees))
+				& ((LeaveType.is_lwp == 1) | (LeaveType.is_ppl == 1))
+				& (LeaveApplication.from_date <= self.payroll_period_end_date)
+				& (LeaveApplication.to_date >= self.payroll_period_start_date)
+			)
+		).run(as_dict=True)
+
+		for d in lwp_applications:
+			self.lwp_periods.setdefault(d.employee, []).append((d.from_date, d.to_date))
+
+		self.period_dependent_structures = self.get_period_dependent_structures()
+
+	def get_period_dependent_structures(self) -> set:
+		"""Returns salary structures with formulas or conditions that depend on the payroll period,
+		whose slips are always computed instead of extrapolated"""
+		structures = {d.salary_structure for d in self.employees.values()}
+		components = frappe.get_all(
+			"Salary Detail",
+			filters={"parenttype": "Salary Structure", "parent": ("in", structures)},
+			fields=["parent", "formula", "condition"],
+		)
+
+		return {
+			d.parent
+			for d in components
+			if PERIOD_DEPENDENT_VARIABLES.search(f"{d.formula or ''} {d.condition or ''}")
+		}
+
+	def is_recurring_period(self, employee: str, ss: dict) -> bool:
+		"""Checks if the computed slip can be reused for the following periods"""
+		return (
+			ss.salary_structure not in self.period_dependent_structures
+			and flt(ss.payment_days) == flt(ss.total_working_days)
+			and not self.has_period_specific_inputs(employee, ss.start_date, ss.end_date)
+		)
+
+	def can_extrapolate(self, employee: str, projected_ss: dict, start_date, end_date) -> bool:
+		start_date, end_date = getdate(start_date), getdate(end_date)
+		if any(
+			getdate(projected_ss.start_date) < d <= end_date
+			for d in self.ss_assignment_dates.get(employee, [])
+		):
+			return False
+
+		return not self.has_period_specific_inputs(employee, start_date, end_date)
+
+	def has_period_specific_inputs(self, employee: str, start_date, end_date) -> bool:
+		start_date, end_date = getdate(start_date), getdate(end_date)
+		details = self.employees[employee]
+
+		for d in (details.date_of_joining, details.relieving_date):
+			if d and start_date <= getdate(d) <= end_date:
+				return True
+
+		return any(
+			getdate(from_date) <= end_date and getdate(to_date) >= start_date
+			for from_date, to_date in (
+				*self.additional_salary_periods.get(employee, []),
+				*self.lwp_periods.get(employee, []),
+			)
+		)
+
 	def get_last_salary_slip(self, employee):
-		last_salary_slip = frappe.db.get_value(
+		if self.last_salary_slips is None:
+			self.last_salary_slips = self.get_last_salary_slips()
+
+		return self.last_salary_slips.get(employee)
+
+	def get_last_salary_slips(self) -> dict:
+		"""Returns the latest submitted salary slip of each employee in the payroll period"""
+		salary_slips = frappe.get_all(
 			"Salary Slip",
-			{
-				"employee": employee,
+			filters={
+				"employee": ("in", list(self.employees.keys())),
 				"docstatus": 1,
 				"start_date": ["between", [self.payroll_period_start_date, self.payroll_period_end_date]],
 			},
-			["name", "start_date", "end_date", "salary_structure", "payroll_frequency"],
+			fields=["employee", "name", "start_date", "end_date", "salary_structure", "payroll_frequency"],
 			order_by="start_date desc",
-			as_dict=1,
 		)
 
-		return last_salary_slip
+		last_salary_slips = frappe._dict()
+		for d in salary_slips:
+			last_salary_slips.setdefault(d.employee, d)
+
+		return last_salary_slips
 
 	def get_gross_earnings(self):
 		# Get total earnings from existing salary slip
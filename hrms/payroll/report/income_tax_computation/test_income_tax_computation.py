@@ -1,6 +1,6 @@
 import frappe
 from frappe.tests import IntegrationTestCase
-from frappe.utils import getdate
+from frappe.utils import add_days, add_months, getdate
 
 from erpnext.setup.doctype.employee.test_employee import make_employee
 
@@ -13,7 +13,10 @@ from hrms.payroll.doctype.salary_slip.test_salary_slip import (
 	create_tax_slab,
 )
 from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
-from hrms.payroll.report.income_tax_computation.income_tax_computation import execute
+from hrms.payroll.report.income_tax_computation.income_tax_computation import (
+	IncomeTaxComputationReport,
+	execute,
+)
 
 
 class TestIncomeTaxComputation(IntegrationTestCase):
@@ -111,3 +114,34 @@ class TestIncomeTaxComputation(IntegrationTestCase):
 
 		for key, val in expected_data.items():
 			self.assertEqual(result[1][0].get(key), val)
+
+	def test_future_salary_slip_projection(self):
+		filters = frappe._dict(
+			{
+				"company": "_Test Company",
+				"payroll_period": self.payroll_period.name,
+				"employee": self.employee,
+			}
+		)
+		report = IncomeTaxComputationReport(filters)
+		report.get_employee_details()
+		report.get_future_salary_slips()
+
+		# 3 slips are submitted, the remaining 9 periods are projected from the first one
+		future_salary_slips = report.future_salary_slips[self.employee]
+		self.assertEqual(len(future_salary_slips), 9)
+		for ss in future_salary_slips[1:]:
+			self.assertEqual(ss.base_gross_pay, future_salary_slips[0].base_gross_pay)
+			self.assertEqual(len(ss.earnings), len(future_salary_slips[0].earnings))
+
+		# relieving mid-period changes the structure inputs, so that period is computed again
+		relieving_date = add_days(add_months(self.payroll_period.start_date, 8), 14)
+		frappe.db.set_value("Employee", self.employee, "relieving_date", relieving_date)
+
+		report = IncomeTaxComputationReport(filters)
+		report.get_employee_details()
+		report.get_future_salary_slips()
+
+		future_salary_slips = report.future_salary_slips[self.employee]
+		self.assertEqual(len(future_salary_slips), 6)
+		self.assertLess(future_salary_slips[-1].base_gross_pay, future_salary_slips[0].base_gross_pay)
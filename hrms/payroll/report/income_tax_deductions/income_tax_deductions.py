@@ -8,9 +8,14 @@ from frappe.query_builder.functions import Extract
 
 import erpnext
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import report_snapshot
+
 Filters = frappe._dict
 
 
+@report_profiler("Income Tax Deductions")
+@report_snapshot("Income Tax Deductions")
 def execute(filters: Filters = None) -> tuple:
 	is_indian_company = erpnext.get_region(filters.get("company")) == "India"
 	columns = get_columns(is_indian_company)
@@ -5,9 +5,13 @@
 import frappe
 from frappe import _
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import report_snapshot
 from hrms.payroll.report.provident_fund_deductions.provident_fund_deductions import get_conditions
 
 
+@report_profiler("Professional Tax Deductions")
+@report_snapshot("Professional Tax Deductions")
 def execute(filters=None):
 	data = get_data(filters)
 	columns = get_columns(filters) if len(data) else []
@@ -6,7 +6,12 @@ import frappe
 from frappe import _
 from frappe.utils import getdate
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import report_snapshot
 
+
+@report_profiler("Provident Fund Deductions")
+@report_snapshot("Provident Fund Deductions")
 def execute(filters=None):
 	data = []
 	provident_fund_components = ["Provident Fund", "Additional Provident Fund", "Provident Fund Loan"]
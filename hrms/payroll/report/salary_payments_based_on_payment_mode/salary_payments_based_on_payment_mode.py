@@ -7,9 +7,11 @@ from frappe import _
 
 import erpnext
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 from hrms.payroll.report.provident_fund_deductions.provident_fund_deductions import get_conditions
 
 
+@report_profiler("Salary Payments Based On Payment Mode")
 def execute(filters=None):
 	mode_of_payments = get_payment_modes()
 
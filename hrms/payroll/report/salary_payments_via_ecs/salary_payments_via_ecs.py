@@ -7,7 +7,10 @@ from frappe import _
 
 import erpnext
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
 
+
+@report_profiler("Salary Payments via ECS")
 def execute(filters=None):
 	columns = get_columns(filters)
 	data = get_data(filters)
@@ -80,4 +80,31 @@ frappe.query_reports["Salary Register"] = {
 			width: "100px",
 		},
 	],
+
+	onload: (report) => {
+		report.page.add_inner_button(__("Export in Background"), () => {
+			frappe.prompt(
+				{
+					fieldname: "file_format",
+					label: __("File Format"),
+					fieldtype: "Select",
+					options: ["CSV", "Excel"],
+					default: "CSV",
+					reqd: 1,
+				},
+				({ file_format }) => {
+					frappe.call({
+						method: "hrms.payroll.report.salary_register.salary_register.export_salary_register",
+						args: { filters: report.get_values(), file_format },
+					});
+				},
+				__("Export Salary Register"),
+			);
+		});
+
+		frappe.realtime.off("salary_register_export_ready");
+		frappe.realtime.on("salary_register_export_ready", ({ file_url }) => {
+			window.open(file_url);
+		});
+	},
 };
@@ -1,6 +1,9 @@
 # Copyright (c) 2015, Frappe Technologies Pvt. Ltd. and Contributors
 # License: GNU General Public License v3. See license.txt
 
+import csv
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
 
 import frappe
 from frappe import _
@@ -8,11 +11,19 @@ from frappe.utils import flt
 
 import erpnext
 
+from hrms.hr.doctype.report_execution_log.report_execution_log import report_profiler
+from hrms.payroll.doctype.payroll_report_snapshot.payroll_report_snapshot import report_snapshot
+
 salary_slip = frappe.qb.DocType("Salary Slip")
 salary_detail = frappe.qb.DocType("Salary Detail")
 salary_component = frappe.qb.DocType("Salary Component")
 
+# salary slips read and written per round trip by the background export
+EXPORT_CHUNK_SIZE = 1000
+
 
+@report_profiler("Salary Register")
+@report_snapshot("Salary Register")
 def execute(filters=None):
 	if not filters:
 		filters = {}
@@ -26,7 +37,7 @@ def execute(filters=None):
 	if not salary_slips:
 		return [], []
 
-	earning_types, ded_types = get_earning_and_deduction_types(salary_slips)
+	earning_types, ded_types = get_earning_and_deduction_types(get_salary_components(salary_slips))
 	columns = get_columns(earning_types, ded_types)
 
 	ss_earning_map = get_salary_slip_details(salary_slips, currency, company_currency, "earnings")
@@ -36,60 +47,69 @@ def execute(filters=None):
 
 	data = []
 	for ss in salary_slips:
-		row = {
-			"salary_slip_id": ss.name,
-			"employee": ss.employee,
-			"employee_name": ss.employee_name,
-			"data_of_joining": doj_map.get(ss.employee),
-			"branch": ss.branch,
-			"department": ss.department,
-			"designation": ss.designation,
-			"company": ss.company,
-			"start_date": ss.start_date,
-			"end_date": ss.end_date,
-			"leave_without_pay": ss.leave_without_pay,
-			"absent_days": ss.absent_days,
-			"payment_days": ss.payment_days,
-			"currency": currency or company_currency,
-			"total_loan_repayment": ss.total_loan_repayment,
-		}
-
 		update_column_width(ss, columns)
+		data.append(
+			get_row(
+				ss, earning_types, ded_types, ss_earning_map, ss_ded_map, doj_map, currency, company_currency
+			)
+		)
 
-		for e in earning_types:
-			row.update({frappe.scrub(e): ss_earning_map.get(ss.name, {}).get(e)})
-
-		for d in ded_types:
-			row.update({frappe.scrub(d): ss_ded_map.get(ss.name, {}).get(d)})
+	return columns, data
 
-		if currency == company_currency:
-			row.update(
-				{
-					"gross_pay": flt(ss.gross_pay) * flt(ss.exchange_rate),
-					"total_deduction": (flt(ss.total_deduction) + flt(ss.total_loan_repayment))
-					* flt(ss.exchange_rate),
-					"net_pay": flt(ss.net_pay) * flt(ss.exchange_rate),
-				}
-			)
 
-		else:
-			row.update(
-				{
-					"gross_pay": ss.gross_pay,
-					"total_deduction": flt(ss.total_deduction) + flt(ss.total_loan_repayment),
-					"net_pay": ss.net_pay,
-				}
-			)
+def get_row(
+	ss, earning_types, ded_types, ss_earning_map, ss_ded_map, doj_map, currency, company_currency
+) -> dict:
+	row = {
+		"salary_slip_id": ss.name,
+		"employee": ss.employee,
+		"employee_name": ss.employee_name,
+		"data_of_joining": doj_map.get(ss.employee),
+		"branch": ss.branch,
+		"department": ss.department,
+		"designation": ss.designation,
+		"company": ss.company,
+		"start_date": ss.start_date,
+		"end_date": ss.end_date,
+		"leave_without_pay": ss.leave_without_pay,
+		"absent_days": ss.absent_days,
+		"payment_days": ss.payment_days,
+		"currency": currency or company_currency,
+		"total_loan_repayment": ss.total_loan_repayment,
+	}
+
+	for e in earning_types:
+		row.update({frappe.scrub(e): ss_earning_map.get(ss.name, {}).get(e)})
+
+	for d in ded_types:
+		row.update({frappe.scrub(d): ss_ded_map.get(ss.name, {}).get(d)})
+
+	if currency == company_currency:
+		row.update(
+			{
+				"gross_pay": flt(ss.gross_pay) * flt(ss.exchange_rate),
+				"total_deduction": (flt(ss.total_deduction) + flt(ss.total_loan_repayment))
+				* flt(ss.exchange_rate),
+				"net_pay": flt(ss.net_pay) * flt(ss.exchange_rate),
+			}
+		)
 
-		data.append(row)
+	else:
+		row.update(
+			{
+				"gross_pay": ss.gross_pay,
+				"total_deduction": flt(ss.total_deduction) + flt(ss.total_loan_repayment),
+				"net_pay": ss.net_pay,
+			}
+		)
 
-	return columns, data
+	return row
 
 
-def get_earning_and_deduction_types(salary_slips):
+def get_earning_and_deduction_types(salary_components):
 	salary_component_and_type = {_("Earning"): [], _("Deduction"): []}
 
-	for salary_component in get_salary_components(salary_slips):
+	for salary_component in salary_components:
 		component_type = get_salary_component_type(salary_component)
 		salary_component_and_type[_(component_type)].append(salary_component)
 
@@ -276,9 +296,14 @@ def get_salary_component_type(salary_component):
 
 
 def get_salary_slips(filters, company_currency):
-	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
-
 	query = frappe.qb.from_(salary_slip).select(salary_slip.star)
+	salary_slips = apply_filters(query, filters, company_currency).run(as_dict=1)
+
+	return salary_slips or []
+
+
+def apply_filters(query, filters, company_currency):
+	doc_status = {"Draft": 0, "Submitted": 1, "Cancelled": 2}
 
 	if filters.get("docstatus"):
 		query = query.where(salary_slip.docstatus == doc_status[filters.get("docstatus")])
@@ -307,15 +332,17 @@ def get_salary_slips(filters, company_currency):
 	if filters.get("branch"):
 		query = query.where(salary_slip.branch == filters["branch"])
 
-	salary_slips = query.run(as_dict=1)
-
-	return salary_slips or []
+	return query
 
 
-def get_employee_doj_map():
+def get_employee_doj_map(employees=None):
 	employee = frappe.qb.DocType("Employee")
 
-	result = (frappe.qb.from_(employee).select(employee.name, employee.date_of_joining)).run()
+	query = frappe.qb.from_(employee).select(employee.name, employee.date_of_joining)
+	if employees is not None:
+		query = query.where(employee.name.isin(employees or [""]))
+
+	result = query.run()
 
 	return frappe._dict(result)
 
@@ -348,3 +375,123 @@ def get_salary_slip_details(salary_slips, currency, company_currency, component_
 			ss_map[d.parent][d.salary_component] += flt(d.amount)
 
 	return ss_map
+
+
+@frappe.whitelist()
+def export_salary_register(filters: str | dict, file_format: str = "CSV") -> None:
+	"""Queues an export of the register that is built in chunks and attached as a private file"""
+	frappe.has_permission("Salary Slip", "export", throw=True)
+	if file_format not in ("CSV", "Excel"):
+		frappe.throw(_("Export format should be either CSV or Excel"))
+
+	frappe.enqueue(
+		build_salary_register_export,
+		queue="long",
+		timeout=3000,
+		filters=frappe.parse_json(filters),
+		file_format=file_format,
+		user=frappe.session.user,
+	)
+	frappe.msgprint(
+		_("Salary Register export has been queued. The file will download once it is ready."), alert=True
+	)
+
+
+def build_salary_register_export(filters: dict, file_format: str, user: str) -> str:
+	"""Writes the register to a file one chunk of salary slips at a time, so memory does not grow with
+	the number of slips. Returns the file url."""
+	filters = frappe._dict(filters)
+	currency = filters.get("currency")
+	company_currency = erpnext.get_company_currency(filters.get("company"))
+
+	earning_types, ded_types = get_earning_and_deduction_types(
+		get_filtered_salary_components(filters, company_currency)
+	)
+	columns = [d for d in get_columns(earning_types, ded_types) if not d.get("hidden")]
+
+	file_name = "salary_register_{}.{}".format(
+		frappe.generate_hash(length=10), "csv" if file_format == "CSV" else "xlsx"
+	)
+	with get_export_writer(frappe.get_site_path("private", "files", file_name), file_format) as write_row:
+		write_row([d["label"] for d in columns])
+
+		for salary_slips in get_salary_slip_chunks(filters, company_currency):
+			ss_earning_map = get_salary_slip_details(salary_slips, currency, company_currency, "earnings")
+			ss_ded_map = get_salary_slip_details(salary_slips, currency, company_currency, "deductions")
+			doj_map = get_employee_doj_map(list({ss.employee for ss in salary_slips}))
+
+			for ss in salary_slips:
+				row = get_row(
+					ss,
+					earning_types,
+					ded_types,
+					ss_earning_map,
+					ss_ded_map,
+					doj_map,
+					currency,
+					company_currency,
+				)
+				write_row([row.get(d["fieldname"]) for d in columns])
+
+	file = frappe.get_doc(
+		{
+			"doctype": "File",
+			"file_name": file_name,
+			"file_url": f"/private/files/{file_name}",
+			"is_private": 1,
+		}
+	).insert(ignore_permissions=True)
+
+	frappe.publish_realtime("salary_register_export_ready", {"file_url": file.file_url}, user=user)
+	return file.file_url
+
+
+@contextmanager
+def get_export_writer(path: str, file_format: str) -> Iterator[Callable]:
+	"""Yields a function that appends a row to the file at `path`. Rows are flushed as they are written."""
+	if file_format == "CSV":
+		with open(path, "w", newline="", encoding="utf-8") as f:
+			yield csv.writer(f).writerow
+		return
+
+	from openpyxl import Workbook
+
+	workbook = Workbook(write_only=True)
+	sheet = workbook.create_sheet(_("Salary Register"))
+	yield sheet.append
+	workbook.save(path)
+
+
+def get_salary_slip_chunks(filters: dict, company_currency: str) -> Iterator[list]:
+	"""Yields filtered salary slips in chunks ordered by name, each chunk starting after the last name of
+	the previous one"""
+	last_name = None
+	while True:
+		query = (
+			apply_filters(frappe.qb.from_(salary_slip).select(salary_slip.star), filters, company_currency)
+			.orderby(salary_slip.name)
+			.limit(EXPORT_CHUNK_SIZE)
+		)
+		if last_name:
+			query = query.where(salary_slip.name > last_name)
+
+		salary_slips = query.run(as_dict=1)
+		if salary_slips:
+			yield salary_slips
+
+		if len(salary_slips) < EXPORT_CHUNK_SIZE:
+			return
+
+		last_name = salary_slips[-1].name
+
+
+def get_filtered_salary_components(filters: dict, company_currency: str) -> list[str]:
+	query = (
+		frappe.qb.from_(salary_slip)
+		.join(salary_detail)
+		.on(salary_slip.name == salary_detail.parent)
+		.where(salary_detail.amount != 0)
+		.select(salary_detail.salary_component)
+		.distinct()
+	)
+	return apply_filters(query, filters, company_currency).run(pluck=True)
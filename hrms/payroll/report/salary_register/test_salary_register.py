@@ -0,0 +1,67 @@
+import csv
+from unittest.mock import patch
+
+import frappe
+from frappe.tests import IntegrationTestCase
+from frappe.utils import getdate
+
+from erpnext.setup.doctype.employee.test_employee import make_employee
+
+from hrms.payroll.doctype.employee_tax_exemption_declaration.test_employee_tax_exemption_declaration import (
+	create_payroll_period,
+)
+from hrms.payroll.doctype.salary_slip.test_salary_slip import create_salary_slips_for_payroll_period
+from hrms.payroll.doctype.salary_structure.test_salary_structure import make_salary_structure
+from hrms.payroll.report.salary_register.salary_register import build_salary_register_export, execute
+
+
+class TestSalaryRegister(IntegrationTestCase):
+	def setUp(self):
+		frappe.db.delete("Payroll Period")
+		frappe.db.delete("Salary Slip")
+		frappe.db.set_single_value("Payroll Settings", "consider_unmarked_attendance_as", "Present")
+
+		self.employee = make_employee(
+			"test_salary_register@example.com",
+			company="_Test Company",
+			date_of_joining=getdate("01-10-2021"),
+		)
+		self.payroll_period = create_payroll_period(name="_Test Payroll Period 1", company="_Test Company")
+		salary_structure = make_salary_structure(
+			"Monthly Salary Structure Test Salary Register",
+			"Monthly",
+			employee=self.employee,
+			company="_Test Company",
+			currency="INR",
+			payroll_period=self.payroll_period,
+		)
+		create_salary_slips_for_payroll_period(
+			self.employee, salary_structure.name, self.payroll_period, deduct_random=False, num=3
+		)
+
+	def test_export_matches_report(self):
+		filters = {
+			"company": "_Test Company",
+			"from_date": self.payroll_period.start_date,
+			"to_date": self.payroll_period.end_date,
+			"currency": "INR",
+			"docstatus": "Submitted",
+		}
+		columns, data = execute(frappe._dict(filters))
+		self.assertEqual(len(data), 3)
+
+		# chunks smaller than the result set to exercise the keyset pagination
+		with patch("hrms.payroll.report.salary_register.salary_register.EXPORT_CHUNK_SIZE", 2):
+			file_url = build_salary_register_export(filters, "CSV", frappe.session.user)
+
+		file = frappe.get_doc("File", {"file_url": file_url})
+		with open(file.get_full_path(), newline="", encoding="utf-8") as f:
+			header, *rows = list(csv.reader(f))
+
+		columns = [d for d in columns if not d.get("hidden")]
+		self.assertEqual(header, [d["label"] for d in columns])
+		self.assertEqual(len(rows), 3)
+
+		net_pay_idx = header.index("Net Pay")
+		exported = {row[0]: float(row[net_pay_idx]) for row in rows}
+		self.assertEqual(exported, {row["salary_slip_id"]: row["net_pay"] for row in data})
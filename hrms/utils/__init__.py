@@ -1,9 +1,12 @@
+from collections import defaultdict
 from collections.abc import Generator
 
 import requests
 
 import frappe
-from frappe.utils import add_days, date_diff
+from frappe.model.document import Document
+from frappe.model.naming import set_new_name
+from frappe.utils import add_days, date_diff, now
 
 country_info = {}
 
@@ -60,3 +63,34 @@ def get_employee_email(employee_id: str) -> str | None:
 		or employee_emails.company_email
 		or employee_emails.personal_email
 	)
+
+
+def bulk_insert_documents(docs: list[Document], chunk_size: int = 1000) -> None:
+	"""Inserts documents along with their child rows using multi-row inserts.
+
+	Controller hooks, validations and permission checks are skipped, so callers must validate
+	the documents and set derived values (docstatus, totals, etc.) before calling this.
+	"""
+	timestamp = now()
+	rows_by_doctype = defaultdict(list)
+
+	for doc in docs:
+		for d in [doc, *doc.get_all_children()]:
+			if d is not doc:
+				d.parenttype = doc.doctype
+				d.parent = doc.name
+				d.docstatus = doc.docstatus
+			if not d.name:
+				set_new_name(d)
+
+			d.owner = d.modified_by = frappe.session.user
+			d.creation = d.modified = timestamp
+			rows_by_doctype[d.doctype].append(
+				d.get_valid_dict(convert_dates_to_str=True, ignore_virtual=True)
+			)
+
+	for doctype, rows in rows_by_doctype.items():
+		fields = list(rows[0])
+		frappe.db.bulk_insert(
+			doctype, fields, [[row.get(field) for field in fields] for row in rows], chunk_size=chunk_size
+		)
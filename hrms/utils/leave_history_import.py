@@ -0,0 +1,627 @@
+import json
+import time
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.query_builder.functions import Sum
+from frappe.utils import add_days, cint, create_batch, date_diff, flt, getdate
+
+import hrms
+from hrms.hr.doctype.employee_attendance_day.employee_attendance_day import enqueue_sync
+from hrms.hr.doctype.leave_application.leave_application import LEAVE_CALENDAR_FEED
+from hrms.hr.doctype.leave_ledger_entry.leave_ledger_entry import process_expired_allocation
+from hrms.utils import bulk_insert_documents
+
+
+@frappe.whitelist()
+def import_leave_history(
+	allocations: list | str | None = None, applications: list | str | None = None, chunk_size: int = 1000
+) -> dict:
+	"""Migration fast path for historical Leave Allocations and Leave Applications.
+
+	Rows are validated against each other and the existing records with a handful of queries,
+	then persisted as submitted documents along with their Leave Ledger Entries and attendance
+	using multi-row inserts. Notifications, block date and salary slip checks are skipped, and
+	expiry of past allocations is rebuilt once in the background after the import.
+
+	Allocation rows have `employee`, `leave_type`, `from_date`, `to_date`, `new_leaves_allocated`
+	and optionally `unused_leaves`. Application rows have `employee`, `leave_type`, `from_date`,
+	`to_date`, `status` (Approved or Rejected) and optionally `half_day`, `half_day_date`,
+	`posting_date`, `description` and `leave_approver`.
+	"""
+	frappe.has_permission("Leave Allocation", "import", throw=True)
+	frappe.has_permission("Leave Application", "import", throw=True)
+
+	allocations = [frappe._dict(d) for d in parse_rows(allocations)]
+	applications = [frappe._dict(d) for d in parse_rows(applications)]
+	chunk_size = cint(chunk_size) or 1000
+
+	start = time.monotonic()
+	context = get_import_context(allocations + applications)
+	result = {
+		"allocations": {"success": [], "failed": []},
+		"applications": {"success": [], "failed": []},
+	}
+
+	# allocations go first so that applications are validated and split against them
+	for batch in create_batch(allocations, chunk_size):
+		import_allocations(list(batch), context, result["allocations"])
+
+	for batch in create_batch(applications, chunk_size):
+		import_applications(list(batch), context, result["applications"])
+
+	rebuild_leave_history(context)
+
+	frappe.clear_messages()
+	time_taken = time.monotonic() - start
+	result["time_taken"] = flt(time_taken, 2)
+	return result
+
+
+def parse_rows(rows: list | str | None) -> list:
+	if isinstance(rows, str):
+		rows = json.loads(rows)
+	return rows or []
+
+
+def get_import_context(rows: list) -> frappe._dict:
+	"""Loads everything the validations need for all rows at once"""
+	employee_names = {d.employee for d in rows if d.employee}
+	employees = frappe.get_all(
+		"Employee",
+		filters={"name": ("in", employee_names)},
+		fields=["name", "employee_name", "company", "department", "holiday_list"],
+	)
+	companies = {d.company for d in employees}
+	default_holiday_lists = dict(
+		frappe.get_all(
+			"Company",
+			filters={"name": ("in", companies)},
+			fields=["name", "default_holiday_list"],
+			as_list=True,
+		)
+	)
+	for employee in employees:
+		employee.holiday_list = employee.holiday_list or default_holiday_lists.get(employee.company)
+
+	leave_types = frappe.get_all(
+		"Leave Type",
+		fields=[
+			"name",
+			"is_lwp",
+			"include_holiday",
+			"allow_negative",
+			"expire_carry_forwarded_leaves_after_days",
+		],
+	)
+
+	dates = [getdate(d[field]) for d in rows for field in ("from_date", "to_date") if d.get(field)]
+	from_date, to_date = (min(dates), max(dates)) if dates else (None, None)
+
+	context = frappe._dict(
+		employees={d.name: d for d in employees},
+		companies=companies,
+		leave_types={d.name: d for d in leave_types},
+		from_date=from_date,
+		to_date=to_date,
+		holidays=get_holidays_by_list(
+			{d.holiday_list for d in employees if d.holiday_list}, from_date, to_date
+		),
+		allocations=defaultdict(list),
+		allocation_balances=defaultdict(float),
+		carry_forward_expiry=defaultdict(set),
+		applications=defaultdict(list),
+		attendance={},
+	)
+	if employee_names and from_date:
+		load_existing_records(context, employee_names)
+
+	return context
+
+
+def get_holidays_by_list(holiday_lists: set, from_date, to_date) -> dict:
+	holidays = defaultdict(set)
+	if not holiday_lists or not from_date:
+		return holidays
+
+	Holiday = frappe.qb.DocType("Holiday")
+	for holiday_list, holiday_date in (
+		frappe.qb.from_(Holiday)
+		.select(Holiday.parent, Holiday.holiday_date)
+		.where(
+			(Holiday.parenttype == "Holiday List")
+			& (Holiday.parent.isin(list(holiday_lists)))
+			& (Holiday.holiday_date.between(from_date, to_date))
+		)
+	).run():
+		holidays[holiday_list].add(getdate(holiday_date))
+
+	return holidays
+
+
+def load_existing_records(context: frappe._dict, employees: set) -> None:
+	"""Indexes existing allocations, carry forward expiries, active leave applications and attendance
+	of the employees in the import window by employee (and leave type)"""
+	for d in frappe.get_all(
+		"Leave Allocation",
+		filters={
+			"employee": ("in", employees),
+			"docstatus": 1,
+			"to_date": (">=", context.from_date),
+			"from_date": ("<=", context.to_date),
+		},
+		fields=["name", "employee", "leave_type", "from_date", "to_date"],
+	):
+		context.allocations[(d.employee, d.leave_type)].append(d)
+
+	context.allocation_balances.update(
+		get_allocation_balances([d.name for allocations in context.allocations.values() for d in allocations])
+	)
+
+	for d in frappe.get_all(
+		"Leave Ledger Entry",
+		filters={
+			"employee": ("in", employees),
+			"transaction_type": "Leave Allocation",
+			"is_carry_forward": 1,
+			"is_expired": 0,
+			"docstatus": 1,
+			"to_date": ("between", [context.from_date, context.to_date]),
+		},
+		fields=["employee", "leave_type", "to_date"],
+	):
+		context.carry_forward_expiry[(d.employee, d.leave_type)].add(d.to_date)
+
+	for d in frappe.get_all(
+		"Leave Application",
+		filters={
+			"employee": ("in", employees),
+			"docstatus": ("<", 2),
+			"status": ("in", ["Open", "Approved"]),
+			"to_date": (">=", context.from_date),
+			"from_date": ("<=", context.to_date),
+		},
+		fields=["name", "employee", "leave_type", "from_date", "to_date", "half_day", "half_day_date"],
+	):
+		context.applications[d.employee].append(d)
+
+	for d in frappe.get_all(
+		"Attendance",
+		filters={
+			"employee": ("in", employees),
+			"docstatus": ("!=", 2),
+			"attendance_date": ("between", [context.from_date, context.to_date]),
+		},
+		fields=["name", "employee", "attendance_date", "status"],
+	):
+		context.attendance[(d.employee, d.attendance_date)] = d
+
+
+def get_allocation_balances(allocations: list[str]) -> dict:
+	"""Returns the leaves left in each allocation, from the unexpired ledger entries in its period"""
+	if not allocations:
+		return {}
+
+	Allocation = frappe.qb.DocType("Leave Allocation")
+	Ledger = frappe.qb.DocType("Leave Ledger Entry")
+	return dict(
+		frappe.qb.from_(Allocation)
+		.inner_join(Ledger)
+		.on(
+			(Ledger.employee == Allocation.employee)
+			& (Ledger.leave_type == Allocation.leave_type)
+			& (Ledger.from_date.between(Allocation.from_date, Allocation.to_date))
+		)
+		.select(Allocation.name, Sum(Ledger.leaves))
+		.where((Allocation.name.isin(allocations)) & (Ledger.docstatus == 1) & (Ledger.is_expired == 0))
+		.groupby(Allocation.name)
+		.run()
+	)
+
+
+def get_batch_changes() -> frappe._dict:
+	"""Records added by a batch. Rows of the batch are validated against them too, but they are merged
+	into the import context only once the batch is inserted."""
+	return frappe._dict(
+		allocations=defaultdict(list),
+		# changes in the leaves left in each allocation
+		allocation_balances=defaultdict(float),
+		carry_forward_expiry=defaultdict(set),
+		applications=defaultdict(list),
+		attendance={},
+	)
+
+
+def apply_batch_changes(context: frappe._dict, changes: frappe._dict) -> None:
+	for key, allocations in changes.allocations.items():
+		context.allocations[key].extend(allocations)
+	for allocation, leaves in changes.allocation_balances.items():
+		context.allocation_balances[allocation] += leaves
+	for key, expiry_dates in changes.carry_forward_expiry.items():
+		context.carry_forward_expiry[key].update(expiry_dates)
+	for key, applications in changes.applications.items():
+		context.applications[key].extend(applications)
+	context.attendance.update(changes.attendance)
+
+
+def import_allocations(rows: list, context: frappe._dict, result: dict) -> None:
+	docs, success = [], []
+	changes = get_batch_changes()
+
+	for row in rows:
+		try:
+			employee, leave_type = validate_allocation_row(row, context, changes)
+		except frappe.ValidationError as e:
+			result["failed"].append({"employee": row.employee, "leave_type": row.leave_type, "error": str(e)})
+			continue
+
+		allocation, ledger_entries = build_allocation(row, employee, leave_type)
+		docs.extend([allocation, *ledger_entries])
+		success.append({"employee": row.employee, "leave_allocation": allocation.name})
+
+		changes.allocations[(row.employee, row.leave_type)].append(allocation)
+		changes.allocation_balances[allocation.name] += flt(allocation.total_leaves_allocated)
+		if flt(row.unused_leaves) and ledger_entries[0].to_date < allocation.to_date:
+			changes.carry_forward_expiry[(row.employee, row.leave_type)].add(ledger_entries[0].to_date)
+
+	if insert_batch(docs, success, result, "Leave Allocation"):
+		apply_batch_changes(context, changes)
+
+
+def validate_allocation_row(
+	row: frappe._dict, context: frappe._dict, changes: frappe._dict
+) -> tuple[frappe._dict, frappe._dict]:
+	employee, leave_type = validate_common_fields(row, context)
+
+	if leave_type.is_lwp:
+		frappe.throw(
+			_("Leave Type {0} cannot be allocated since it is leave without pay").format(row.leave_type)
+		)
+
+	if date_diff(row.to_date, row.from_date) <= 0:
+		frappe.throw(_("To date cannot be before from date"))
+
+	key = (row.employee, row.leave_type)
+	for d in [*context.allocations[key], *changes.allocations[key]]:
+		if d.to_date >= row.from_date and d.from_date <= row.to_date:
+			frappe.throw(
+				_("{0} already allocated for Employee {1} in {2}").format(
+					row.leave_type, row.employee, d.name
+				)
+			)
+
+	return employee, leave_type
+
+
+def build_allocation(row: frappe._dict, employee: frappe._dict, leave_type: frappe._dict) -> tuple:
+	new_leaves, unused_leaves = flt(row.new_leaves_allocated), flt(row.unused_leaves)
+	allocation = frappe.new_doc(
+		"Leave Allocation",
+		employee=employee.name,
+		employee_name=employee.employee_name,
+		department=employee.department,
+		company=employee.company,
+		leave_type=row.leave_type,
+		from_date=row.from_date,
+		to_date=row.to_date,
+		new_leaves_allocated=new_leaves,
+		unused_leaves=unused_leaves,
+		carry_forward=1 if unused_leaves else 0,
+		total_leaves_allocated=new_leaves + unused_leaves,
+		description=row.description,
+		docstatus=1,
+	)
+	allocation.set_new_name()
+
+	ledger_entries = []
+	if unused_leaves:
+		expiry_days = cint(leave_type.expire_carry_forwarded_leaves_after_days)
+		cf_to_date = add_days(row.from_date, expiry_days - 1) if expiry_days else row.to_date
+		ledger_entries.append(
+			make_ledger_entry(
+				allocation,
+				leaves=unused_leaves,
+				from_date=row.from_date,
+				to_date=min(getdate(cf_to_date), row.to_date),
+				is_carry_forward=1,
+			)
+		)
+
+	ledger_entries.append(
+		make_ledger_entry(allocation, leaves=new_leaves, from_date=row.from_date, to_date=row.to_date)
+	)
+	return allocation, ledger_entries
+
+
+def import_applications(rows: list, context: frappe._dict, result: dict) -> None:
+	docs, success, attendance_updates = [], [], []
+	changes = get_batch_changes()
+
+	for row in rows:
+		try:
+			employee, leave_type = validate_application_row(row, context, changes)
+		except frappe.ValidationError as e:
+			result["failed"].append({"employee": row.employee, "leave_type": row.leave_type, "error": str(e)})
+			continue
+
+		application = build_application(row, employee, leave_type, context)
+		docs.append(application)
+		success.append({"employee": row.employee, "leave_application": application.name})
+
+		if application.status == "Approved":
+			docs.extend(build_ledger_entries(application, employee, leave_type, context))
+			attendance, updates = build_attendance(application, employee, leave_type, context, changes)
+			docs.extend(attendance)
+			attendance_updates.extend(updates)
+			changes.applications[row.employee].append(application)
+
+	if insert_batch(docs, success, result, "Leave Application"):
+		update_existing_attendance(attendance_updates)
+		apply_batch_changes(context, changes)
+
+
+def validate_application_row(
+	row: frappe._dict, context: frappe._dict, changes: frappe._dict
+) -> tuple[frappe._dict, frappe._dict]:
+	employee, leave_type = validate_common_fields(row, context)
+
+	row.status = row.status or "Approved"
+	if row.status not in ("Approved", "Rejected"):
+		frappe.throw(_("Only Leave Applications with status 'Approved' and 'Rejected' can be imported"))
+
+	if row.to_date < row.from_date:
+		frappe.throw(_("To date cannot be before from date"))
+
+	row.half_day = cint(row.half_day)
+	row.half_day_date = getdate(row.half_day_date) if row.half_day_date else None
+	if row.half_day and row.from_date == row.to_date:
+		row.half_day_date = row.from_date
+	if row.half_day_date and not (row.from_date <= row.half_day_date <= row.to_date):
+		frappe.throw(_("Half Day Date should be between From Date and To Date"))
+
+	if row.status == "Approved":
+		validate_application_overlap(row, context, changes)
+
+		if not leave_type.is_lwp:
+			validate_application_balance(row, employee, leave_type, context, changes)
+
+	return employee, leave_type
+
+
+def validate_application_balance(row, employee, leave_type, context, changes) -> None:
+	"""Checks that one allocation covers the application and has enough leaves left for it after
+	the applications imported before it, and deducts its leaves from that allocation"""
+	key = (row.employee, row.leave_type)
+	allocation = next(
+		(
+			d
+			for d in [*context.allocations[key], *changes.allocations[key]]
+			if getdate(d.from_date) <= row.from_date and getdate(d.to_date) >= row.to_date
+		),
+		None,
+	)
+	if not allocation:
+		frappe.throw(_("No leave allocation found for {0} in this period").format(row.leave_type))
+
+	leaves = get_leave_days(row, employee, leave_type, context)
+	balance = context.allocation_balances[allocation.name] + changes.allocation_balances[allocation.name]
+	if not leave_type.allow_negative and flt(balance, 3) < flt(leaves, 3):
+		frappe.throw(
+			_("There is not enough leave balance for Leave Type {0}: {1} left, {2} applied").format(
+				row.leave_type, flt(balance, 3), leaves
+			)
+		)
+
+	changes.allocation_balances[allocation.name] -= leaves
+
+
+def validate_common_fields(row: frappe._dict, context: frappe._dict) -> tuple[frappe._dict, frappe._dict]:
+	for field in ("employee", "leave_type", "from_date", "to_date"):
+		if not row.get(field):
+			frappe.throw(_("{0} is mandatory").format(frappe.unscrub(field)))
+
+	employee = context.employees.get(row.employee)
+	if not employee:
+		frappe.throw(_("Employee {0} does not exist").format(row.employee))
+
+	leave_type = context.leave_types.get(row.leave_type)
+	if not leave_type:
+		frappe.throw(_("Leave Type {0} does not exist").format(row.leave_type))
+
+	row.from_date, row.to_date = getdate(row.from_date), getdate(row.to_date)
+	return employee, leave_type
+
+
+def validate_application_overlap(row: frappe._dict, context: frappe._dict, changes: frappe._dict) -> None:
+	for d in [*context.applications[row.employee], *changes.applications[row.employee]]:
+		if getdate(d.to_date) < row.from_date or getdate(d.from_date) > row.to_date:
+			continue
+
+		# two half days on the same date make up a single day
+		if (
+			row.half_day
+			and d.half_day
+			and row.from_date == row.to_date
+			and getdate(d.half_day_date) == row.half_day_date
+		):
+			continue
+
+		frappe.throw(
+			_("Employee {0} has already applied for {1} between {2} and {3}").format(
+				row.employee, d.leave_type, d.from_date, d.to_date
+			)
+		)
+
+
+def build_application(
+	row: frappe._dict, employee: frappe._dict, leave_type: frappe._dict, context: frappe._dict
+) -> Document:
+	application = frappe.new_doc(
+		"Leave Application",
+		employee=employee.name,
+		employee_name=employee.employee_name,
+		department=employee.department,
+		company=employee.company,
+		leave_type=row.leave_type,
+		from_date=row.from_date,
+		to_date=row.to_date,
+		half_day=row.half_day,
+		half_day_date=row.half_day_date,
+		posting_date=row.posting_date or row.from_date,
+		description=row.description,
+		leave_approver=row.leave_approver,
+		status=row.status,
+		docstatus=1,
+	)
+	application.total_leave_days = get_leave_days(application, employee, leave_type, context)
+	application.set_new_name()
+	return application
+
+
+def get_leave_days(application, employee, leave_type, context, from_date=None, to_date=None) -> float:
+	"""In-memory equivalent of `get_number_of_leave_days`"""
+	from_date, to_date = getdate(from_date or application.from_date), getdate(to_date or application.to_date)
+	days = date_diff(to_date, from_date) + 1
+
+	if (
+		application.half_day
+		and application.half_day_date
+		and from_date <= application.half_day_date <= to_date
+	):
+		days -= 0.5
+
+	if not leave_type.include_holiday:
+		days -= len([d for d in context.holidays[employee.holiday_list] if from_date <= d <= to_date])
+
+	return days
+
+
+def build_ledger_entries(application, employee, leave_type, context) -> list:
+	"""Splits the application at allocation boundaries and carry forward expiries like
+	`LeaveApplication.create_leave_ledger_entry` does"""
+	key = (application.employee, application.leave_type)
+	split_dates = {getdate(d.to_date) for d in context.allocations[key]} | context.carry_forward_expiry[key]
+	split_dates = sorted(d for d in split_dates if application.from_date <= d < application.to_date)
+
+	entries = []
+	from_date = application.from_date
+	for to_date in [*split_dates, application.to_date]:
+		leaves = get_leave_days(application, employee, leave_type, context, from_date, to_date)
+		if leaves:
+			entries.append(
+				make_ledger_entry(
+					application,
+					leaves=leaves * -1,
+					from_date=from_date,
+					to_date=to_date,
+					is_lwp=leave_type.is_lwp,
+					holiday_list=employee.holiday_list or "",
+				)
+			)
+		from_date = add_days(to_date, 1)
+
+	return entries
+
+
+def build_attendance(application, employee, leave_type, context, changes) -> tuple[list, list]:
+	"""Returns new attendance records and updates to existing ones for the application period,
+	skipping holidays if the leave type does not include them"""
+	new_attendance, updates = [], []
+	holidays = set() if leave_type.include_holiday else context.holidays[employee.holiday_list]
+
+	for offset in range(date_diff(application.to_date, application.from_date) + 1):
+		date = add_days(application.from_date, offset)
+		if date in holidays:
+			continue
+
+		status = "Half Day" if application.half_day_date == date else "On Leave"
+		key = (application.employee, date)
+		if existing := context.attendance.get(key) or changes.attendance.get(key):
+			updates.append(
+				(
+					existing.name,
+					{
+						"status": status,
+						"leave_type": application.leave_type,
+						"leave_application": application.name,
+						"half_day_status": "Present" if status == "Half Day" else None,
+						"modify_half_day_status": 1
+						if existing.status == "Absent" and status == "Half Day"
+						else 0,
+					},
+				)
+			)
+			continue
+
+		attendance = frappe.new_doc(
+			"Attendance",
+			employee=application.employee,
+			employee_name=application.employee_name,
+			department=application.department,
+			company=application.company,
+			attendance_date=date,
+			status=status,
+			leave_type=application.leave_type,
+			leave_application=application.name,
+			half_day_status="Present" if status == "Half Day" else None,
+			modify_half_day_status=1 if status == "Half Day" else 0,
+			docstatus=1,
+		)
+		new_attendance.append(attendance)
+		changes.attendance[key] = frappe._dict(name=None, status=status)
+
+	return new_attendance, updates
+
+
+def update_existing_attendance(updates: list) -> None:
+	for name, values in updates:
+		if name:
+			frappe.db.set_value("Attendance", name, values)
+
+
+def make_ledger_entry(ref_doc, **kwargs) -> Document:
+	ledger_entry = frappe.new_doc(
+		"Leave Ledger Entry",
+		employee=ref_doc.employee,
+		employee_name=ref_doc.employee_name,
+		company=ref_doc.company,
+		leave_type=ref_doc.leave_type,
+		transaction_type=ref_doc.doctype,
+		transaction_name=ref_doc.name,
+		is_carry_forward=0,
+		is_expired=0,
+		is_lwp=0,
+		docstatus=1,
+	)
+	ledger_entry.update(kwargs)
+	return ledger_entry
+
+
+def insert_batch(docs: list, success: list, result: dict, doctype: str) -> bool:
+	savepoint = "before_leave_history_import"
+	try:
+		frappe.db.savepoint(savepoint)
+		bulk_insert_documents(docs)
+	except Exception as e:
+		frappe.db.rollback(save_point=savepoint)
+		frappe.log_error(
+			f"Leave history import failed for a batch of {doctype} records", reference_doctype=doctype
+		)
+		result["failed"].extend({**d, "error": str(e)} for d in success)
+		return False
+
+	result["success"].extend(success)
+	return True
+
+
+def rebuild_leave_history(context: frappe._dict) -> None:
+	"""Rebuilds data derived from leave records once for the whole import"""
+	for company in context.companies:
+		frappe.cache().delete_keys(f"{LEAVE_CALENDAR_FEED}::{company}::")
+
+	hrms.refetch_resource("hrms:team_leaves")
+	if context.from_date:
+		enqueue_sync(list(context.employees), context.from_date, context.to_date)
+	frappe.enqueue(process_expired_allocation, queue="long", timeout=3000, enqueue_after_commit=True)